@@ -0,0 +1,33 @@
+"""add_table_versions
+
+Revision ID: 3f6c1d2a9b7e
+Revises: 24833637a4ef
+Create Date: 2026-10-19 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6c1d2a9b7e'
+down_revision = '24833637a4ef'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ['users', 'clients', 'projects', 'project_statuses', 'transcriptions']
+
+
+def upgrade() -> None:
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [{'table_name': name, 'version': 0} for name in TRACKED_TABLES])
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
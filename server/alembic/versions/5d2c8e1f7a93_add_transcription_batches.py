@@ -0,0 +1,61 @@
+"""add_transcription_batches
+
+Revision ID: 5d2c8e1f7a93
+Revises: a91f3c6d8b24
+Create Date: 2026-10-19 19:12:44.630158
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8e1f7a93'
+down_revision = 'a91f3c6d8b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'transcription_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transcription_batches_id'), 'transcription_batches', ['id'], unique=False)
+    op.create_index(op.f('ix_transcription_batches_project_id'), 'transcription_batches', ['project_id'], unique=False)
+    
+    op.add_column('transcriptions', sa.Column('batch_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_transcriptions_batch_id', 'transcriptions', 'transcription_batches',
+        ['batch_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_transcriptions_batch_id'), 'transcriptions', ['batch_id'], unique=False)
+    op.add_column('transcriptions', sa.Column('processing_status', sa.String(length=20), nullable=True))
+    op.add_column('transcriptions', sa.Column('processing_error', sa.Text(), nullable=True))
+    op.add_column('transcriptions', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    
+    # Existing rows were processed inline or by request-scoped background tasks,
+    # which are gone by now: anything without a processed_at never will be
+    op.execute(
+        "UPDATE transcriptions SET processing_status = "
+        "CASE WHEN processed_at IS NOT NULL THEN 'completed' ELSE 'failed' END"
+    )
+    op.alter_column('transcriptions', 'processing_status', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('transcriptions', 'lease_expires_at')
+    op.drop_column('transcriptions', 'processing_error')
+    op.drop_column('transcriptions', 'processing_status')
+    op.drop_index(op.f('ix_transcriptions_batch_id'), table_name='transcriptions')
+    op.drop_constraint('fk_transcriptions_batch_id', 'transcriptions', type_='foreignkey')
+    op.drop_column('transcriptions', 'batch_id')
+    op.drop_index(op.f('ix_transcription_batches_project_id'), table_name='transcription_batches')
+    op.drop_index(op.f('ix_transcription_batches_id'), table_name='transcription_batches')
+    op.drop_table('transcription_batches')
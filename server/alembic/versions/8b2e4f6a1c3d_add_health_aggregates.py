@@ -0,0 +1,98 @@
+"""add_health_aggregates
+
+Revision ID: 8b2e4f6a1c3d
+Revises: 3f6c1d2a9b7e
+Create Date: 2026-10-19 11:40:07.552013
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f6a1c3d'
+down_revision = '3f6c1d2a9b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_current_statuses',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('status_id', sa.Integer(), nullable=True),
+        sa.Column('is_on_scope', sa.Boolean(), nullable=True),
+        sa.Column('is_on_time', sa.Boolean(), nullable=True),
+        sa.Column('is_on_budget', sa.Boolean(), nullable=True),
+        sa.Column('health_status', sa.String(length=10), nullable=False),
+        sa.Column('has_status', sa.Boolean(), nullable=False),
+        sa.Column('status_updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_index(op.f('ix_project_current_statuses_client_id'), 'project_current_statuses', ['client_id'], unique=False)
+    
+    op.create_table(
+        'client_health_aggregates',
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('total_projects', sa.Integer(), nullable=False),
+        sa.Column('healthy_projects', sa.Integer(), nullable=False),
+        sa.Column('at_risk_projects', sa.Integer(), nullable=False),
+        sa.Column('critical_projects', sa.Integer(), nullable=False),
+        sa.Column('no_status_projects', sa.Integer(), nullable=False),
+        sa.Column('scope_compliant', sa.Integer(), nullable=False),
+        sa.Column('time_compliant', sa.Integer(), nullable=False),
+        sa.Column('budget_compliant', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('client_id')
+    )
+    
+    # Backfill from the latest status of every project
+    op.execute("""
+        INSERT INTO project_current_statuses (
+            project_id, client_id, status_id, is_on_scope, is_on_time, is_on_budget,
+            health_status, has_status, status_updated_at
+        )
+        SELECT
+            p.id, p.client_id, s.id, s.is_on_scope, s.is_on_time, s.is_on_budget,
+            CASE (CASE WHEN s.is_on_scope THEN 1 ELSE 0 END
+                  + CASE WHEN s.is_on_time THEN 1 ELSE 0 END
+                  + CASE WHEN s.is_on_budget THEN 1 ELSE 0 END)
+                WHEN 3 THEN 'green'
+                WHEN 2 THEN 'yellow'
+                ELSE 'red'
+            END,
+            s.id IS NOT NULL,
+            s.updated_at
+        FROM projects p
+        LEFT JOIN LATERAL (
+            SELECT ps.id, ps.is_on_scope, ps.is_on_time, ps.is_on_budget, ps.updated_at
+            FROM project_statuses ps
+            WHERE ps.project_id = p.id
+            ORDER BY ps.updated_at DESC, ps.id DESC
+            LIMIT 1
+        ) s ON true
+    """)
+    op.execute("""
+        INSERT INTO client_health_aggregates (
+            client_id, total_projects, healthy_projects, at_risk_projects, critical_projects,
+            no_status_projects, scope_compliant, time_compliant, budget_compliant
+        )
+        SELECT
+            client_id,
+            COUNT(*),
+            SUM(CASE WHEN health_status = 'green' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN health_status = 'yellow' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN health_status = 'red' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN has_status THEN 0 ELSE 1 END),
+            SUM(CASE WHEN is_on_scope THEN 1 ELSE 0 END),
+            SUM(CASE WHEN is_on_time THEN 1 ELSE 0 END),
+            SUM(CASE WHEN is_on_budget THEN 1 ELSE 0 END)
+        FROM project_current_statuses
+        GROUP BY client_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('client_health_aggregates')
+    op.drop_index(op.f('ix_project_current_statuses_client_id'), table_name='project_current_statuses')
+    op.drop_table('project_current_statuses')
@@ -0,0 +1,47 @@
+"""unique_project_names
+
+Revision ID: a91f3c6d8b24
+Revises: e7a3b5c9d1f2
+Create Date: 2026-10-19 18:05:31.207415
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a91f3c6d8b24'
+down_revision = 'e7a3b5c9d1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The API has always rejected duplicate project names; enforce it in the
+    # database so bulk provisioning can rely on INSERT ... ON CONFLICT (name)
+    connection = op.get_bind()
+    duplicates = connection.execute(sa.text(
+        "SELECT name, COUNT(*) FROM projects GROUP BY name HAVING COUNT(*) > 1 ORDER BY name"
+    )).fetchall()
+    if duplicates:
+        if context.get_x_argument(as_dictionary=True).get('rename_duplicate_projects') != 'true':
+            listed = ', '.join(f'{name!r} ({count}x)' for name, count in duplicates[:20])
+            more = f' and {len(duplicates) - 20} more' if len(duplicates) > 20 else ''
+            raise RuntimeError(
+                f'Cannot make project names unique, {len(duplicates)} names are used more than once: {listed}{more}. '
+                'Rename or merge those projects, or run `alembic -x rename_duplicate_projects=true upgrade head` '
+                'to keep the oldest project of each name and append " (#<id>)" to the names of the others.'
+            )
+        # Keep the oldest project of each name as it is
+        connection.execute(sa.text(
+            "UPDATE projects SET name = name || ' (#' || CAST(id AS VARCHAR) || ')' "
+            "WHERE id NOT IN (SELECT MIN(id) FROM projects GROUP BY name)"
+        ))
+
+    op.drop_index(op.f('ix_projects_name'), table_name='projects')
+    op.create_index(op.f('ix_projects_name'), 'projects', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_projects_name'), table_name='projects')
+    op.create_index(op.f('ix_projects_name'), 'projects', ['name'], unique=False)
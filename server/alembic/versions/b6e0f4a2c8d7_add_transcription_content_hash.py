@@ -0,0 +1,26 @@
+"""add_transcription_content_hash
+
+Revision ID: b6e0f4a2c8d7
+Revises: 5d2c8e1f7a93
+Create Date: 2026-10-19 20:31:09.418226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e0f4a2c8d7'
+down_revision = '5d2c8e1f7a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('transcriptions', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_transcriptions_content_hash'), 'transcriptions', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_transcriptions_content_hash'), table_name='transcriptions')
+    op.drop_column('transcriptions', 'content_hash')
@@ -0,0 +1,52 @@
+"""add_health_trend_rollups
+
+Revision ID: c4d9a7e2f5b1
+Revises: 8b2e4f6a1c3d
+Create Date: 2026-10-19 14:05:31.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9a7e2f5b1'
+down_revision = '8b2e4f6a1c3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_project_statuses_project_id_updated_at',
+        'project_statuses',
+        ['project_id', 'updated_at'],
+        unique=False
+    )
+    
+    op.create_table(
+        'health_trend_rollups',
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('total_projects', sa.Integer(), nullable=False),
+        sa.Column('healthy_projects', sa.Integer(), nullable=False),
+        sa.Column('at_risk_projects', sa.Integer(), nullable=False),
+        sa.Column('critical_projects', sa.Integer(), nullable=False),
+        sa.Column('no_status_projects', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('bucket_start', 'client_id')
+    )
+    
+    op.create_table(
+        'health_trend_invalidations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('health_trend_invalidations')
+    op.drop_table('health_trend_rollups')
+    op.drop_index('ix_project_statuses_project_id_updated_at', table_name='project_statuses')
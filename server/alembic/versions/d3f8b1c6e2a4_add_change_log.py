@@ -0,0 +1,52 @@
+"""add_change_log
+
+Revision ID: d3f8b1c6e2a4
+Revises: b6e0f4a2c8d7
+Create Date: 2026-10-20 10:14:52.601937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8b1c6e2a4'
+down_revision = 'b6e0f4a2c8d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index(
+        'ix_change_log_table_name_row_id_seq',
+        'change_log',
+        ['table_name', 'row_id', 'seq'],
+        unique=False
+    )
+
+    change_log_state = op.create_table(
+        'change_log_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('last_seq', sa.BigInteger(), nullable=False),
+        sa.Column('compacted_through', sa.BigInteger(), nullable=False),
+        sa.Column('truncated_through', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Existing rows are not in the log: consumers start by reading the tables, then follow from 0
+    op.bulk_insert(change_log_state, [{'id': 1, 'last_seq': 0, 'compacted_through': 0, 'truncated_through': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('change_log_state')
+    op.drop_index('ix_change_log_table_name_row_id_seq', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,47 @@
+"""add_generated_health_columns
+
+Revision ID: e7a3b5c9d1f2
+Revises: c4d9a7e2f5b1
+Create Date: 2026-10-19 16:42:08.511230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b5c9d1f2'
+down_revision = 'c4d9a7e2f5b1'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the expressions in app.db.models.project_status
+GREEN_COUNT_SQL = (
+    "(CASE WHEN is_on_scope THEN 1 ELSE 0 END)"
+    " + (CASE WHEN is_on_time THEN 1 ELSE 0 END)"
+    " + (CASE WHEN is_on_budget THEN 1 ELSE 0 END)"
+)
+HEALTH_STATUS_SQL = (
+    f"CASE WHEN {GREEN_COUNT_SQL} >= 3 THEN 'green'"
+    f" WHEN {GREEN_COUNT_SQL} = 2 THEN 'yellow'"
+    " ELSE 'red' END"
+)
+
+
+def upgrade() -> None:
+    # Stored generated columns are filled for existing rows when added (table rewrite)
+    op.add_column(
+        'project_statuses',
+        sa.Column('green_count', sa.Integer(), sa.Computed(GREEN_COUNT_SQL, persisted=True), nullable=True)
+    )
+    op.add_column(
+        'project_statuses',
+        sa.Column('health_status', sa.String(length=10), sa.Computed(HEALTH_STATUS_SQL, persisted=True), nullable=True)
+    )
+    op.create_index(op.f('ix_project_statuses_health_status'), 'project_statuses', ['health_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_project_statuses_health_status'), table_name='project_statuses')
+    op.drop_column('project_statuses', 'health_status')
+    op.drop_column('project_statuses', 'green_count')
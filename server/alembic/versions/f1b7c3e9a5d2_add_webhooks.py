@@ -0,0 +1,71 @@
+"""add_webhooks
+
+Revision ID: f1b7c3e9a5d2
+Revises: d3f8b1c6e2a4
+Create Date: 2026-10-20 15:32:08.417293
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7c3e9a5d2'
+down_revision = 'd3f8b1c6e2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'webhook_subscriptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=2048), nullable=False),
+        sa.Column('secret', sa.String(length=64), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('client_id', sa.Integer(), nullable=True),
+        sa.Column('from_health', sa.String(length=10), nullable=True),
+        sa.Column('to_health', sa.String(length=10), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('consecutive_failures', sa.Integer(), nullable=False),
+        sa.Column('circuit_open_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('last_delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_subscriptions_id'), 'webhook_subscriptions', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_subscriptions_client_id'), 'webhook_subscriptions', ['client_id'], unique=False)
+
+    op.create_table(
+        'webhook_deliveries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subscription_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('previous_health_status', sa.String(length=10), nullable=True),
+        sa.Column('health_status', sa.String(length=10), nullable=False),
+        sa.Column('status_id', sa.Integer(), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['webhook_subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_webhook_deliveries_subscription_id_id',
+        'webhook_deliveries',
+        ['subscription_id', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_deliveries_subscription_id_id', table_name='webhook_deliveries')
+    op.drop_table('webhook_deliveries')
+    op.drop_index(op.f('ix_webhook_subscriptions_client_id'), table_name='webhook_subscriptions')
+    op.drop_index(op.f('ix_webhook_subscriptions_id'), table_name='webhook_subscriptions')
+    op.drop_table('webhook_subscriptions')
@@ -2,6 +2,7 @@
 Authentication endpoints.
 """
 from datetime import timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -17,39 +18,47 @@ from app.core.security import (
     decode_access_token
 )
 from app.core.config import settings
+from app.core.query_inspector import query_budget
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def authenticate_token(db: Session, token: Optional[str]) -> Optional[User]:
+    """Resolve an access token to its user, or None if it is missing or invalid."""
+    if not token:
+        return None
     
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
+        return None
     
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
+        return None
     
-    user = db.query(User).filter(User.email == email).first()
+    return db.query(User).filter(User.email == email).first()
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user."""
+    user = authenticate_token(db, token)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return user
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(4)
 async def register(
     user_data: UserRegister,
     db: Session = Depends(get_db)
@@ -89,6 +98,7 @@ async def register(
 
 
 @router.post("/login", response_model=Token)
+@query_budget(1)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -113,6 +123,7 @@ async def login(
 
 
 @router.post("/login/json", response_model=Token)
+@query_budget(1)
 async def login_json(
     user_data: UserLogin,
     db: Session = Depends(get_db)
@@ -137,6 +148,7 @@ async def login_json(
 
 
 @router.get("/me", response_model=UserResponse)
+@query_budget(1)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
@@ -0,0 +1,76 @@
+"""
+Change data capture endpoints.
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.query_inspector import query_budget
+from app.db.database import get_db
+from app.db.change_log import CAPTURED_TABLES
+from app.db.models.user import User
+from app.schemas.change import ChangeBatch, ChangeLogHead
+from app.api.v1.endpoints.auth import get_current_user
+from app.services.change_feed import ChangesUnavailableError, get_change_log_head, wait_for_changes
+
+router = APIRouter()
+
+
+@router.get("/", response_model=ChangeBatch)
+@query_budget(4)
+async def get_changes(
+    since: int = Query(0, ge=0, description="next_since of the last batch processed (or the head after a full read)"),
+    limit: int = Query(500, ge=1, le=settings.CHANGES_MAX_BATCH),
+    timeout: float = Query(
+        settings.CHANGES_LONG_POLL_SECONDS, ge=0, le=settings.CHANGES_LONG_POLL_SECONDS,
+        description="Seconds to wait when there are no changes yet (0 returns at once)"
+    ),
+    tables: Optional[List[str]] = Query(None, description="Only changes of these tables"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the changes made after sequence number `since`, oldest first.
+
+    Inserts, updates and deletes of clients, projects, project statuses and
+    transcriptions are logged in the same transaction as the change. When no
+    change is pending the request waits up to `timeout` seconds for one. Pass
+    the returned `next_since` as `since` on the next request; `has_more` means
+    the next batch is already available.
+
+    Older parts of the log are compacted (only the latest change of each row
+    is kept, so apply inserts and updates as upserts) and eventually dropped:
+    a position that is no longer retained gets 410 Gone, and the consumer
+    must re-read the tables and continue from GET /changes/head.
+    """
+    if tables:
+        unknown = sorted(set(tables) - set(CAPTURED_TABLES))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Changes are not captured for: {', '.join(unknown)}. Available: {', '.join(CAPTURED_TABLES)}"
+            )
+
+    try:
+        return await wait_for_changes(db, since, limit, tables, timeout)
+    except ChangesUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"{str(e)}; re-read the tables and continue from GET /changes/head"
+        )
+
+
+@router.get("/head", response_model=ChangeLogHead)
+@query_budget(2)
+async def get_changes_head(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current head of the change log.
+
+    A new consumer reads this first, then the tables in full, then polls
+    /changes with since set to the head it read.
+    """
+    return get_change_log_head(db)
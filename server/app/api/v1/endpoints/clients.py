@@ -1,31 +1,56 @@
 """
 Client management endpoints.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.http_cache import make_etag, etag_matches, not_modified, cache_headers
+from app.core.query_inspector import query_budget
 from app.db.database import get_db
+from app.db.change_tracking import get_table_versions
 from app.db.models.client import Client
 from app.db.models.user import User
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse, ClientDetailResponse
 from app.schemas.project import ProjectResponse  # Import to resolve forward reference
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.fast_response_service import get_client_rows
+from app.services.provisioning_service import encode_results, provision_clients
+from app.utils.bulk_payload import read_bulk_rows
 
 router = APIRouter()
 
+# Tables whose changes invalidate the client list representation
+CLIENT_LIST_TABLES = ("clients", "projects")
+
 
 @router.get("/", response_model=List[ClientDetailResponse])
+@query_budget(3)
 async def get_clients(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all clients with their projects."""
+    etag = make_etag(request, get_table_versions(db, CLIENT_LIST_TABLES))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(get_client_rows(db), headers=cache_headers(etag))
+    
     clients = db.query(Client).options(joinedload(Client.projects)).all()
     return clients
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
+@query_budget(2)
 async def get_client(
     client_id: int,
     db: Session = Depends(get_db),
@@ -43,6 +68,7 @@ async def get_client(
 
 
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(9)
 async def create_client(
     client_data: ClientCreate,
     db: Session = Depends(get_db),
@@ -66,7 +92,34 @@ async def create_client(
     return db_client
 
 
+@router.post("/bulk")
+@query_budget(8)
+async def bulk_provision_clients(
+    request: Request,
+    payload_format: Optional[str] = Query(
+        None, alias="format", pattern="^(csv|ndjson)$",
+        description="Payload format (defaults to the Content-Type: text/csv or NDJSON)"
+    ),
+    mode: str = Query(
+        "create", pattern="^(create|upsert)$",
+        description="create rejects existing names; upsert reports them as unchanged"
+    ),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many clients from an NDJSON or CSV payload (one name per row).
+    
+    Rows are written in chunks, each committed on its own. The response is
+    NDJSON: one result per row (row, name, id, outcome, error) as its chunk
+    commits, followed by a summary line with the totals.
+    """
+    parsed_rows = await read_bulk_rows(request, payload_format)
+    results = await run_in_threadpool(provision_clients, parsed_rows, mode == "upsert")
+    return StreamingResponse(encode_results(results), media_type="application/x-ndjson")
+
+
 @router.put("/{client_id}", response_model=ClientResponse)
+@query_budget(10)
 async def update_client(
     client_id: int,
     client_data: ClientUpdate,
@@ -106,6 +159,7 @@ async def update_client(
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(8)
 async def delete_client(
     client_id: int,
     db: Session = Depends(get_db),
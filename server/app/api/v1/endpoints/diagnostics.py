@@ -0,0 +1,184 @@
+"""
+Diagnostics endpoints (admin only).
+"""
+import hmac
+import time
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
+from starlette.types import Scope
+
+from app.core.config import settings
+from app.core.profiler import Profile, profile_history, profile_worker
+from app.core.query_inspector import query_budget
+from app.core.security import decode_access_token
+from app.db.database import SessionLocal
+from app.db.models.user import User, UserRole
+from app.db.slow_query_log import slow_query_log
+from app.schemas.diagnostics import ProfileSummary, SlowQueryEntry, SlowQueryLogResponse
+from app.api.v1.endpoints.users import require_admin
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_model=SlowQueryLogResponse)
+@query_budget(1)
+async def get_slow_queries(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get the statements slower than SLOW_QUERY_THRESHOLD_MS, newest first.
+    
+    Each worker process keeps its own log; with several workers, repeat the
+    request to see the others.
+    """
+    return SlowQueryLogResponse(
+        enabled=settings.SLOW_QUERY_LOG_ENABLED,
+        threshold_ms=slow_query_log.threshold * 1000,
+        sample_rate=slow_query_log.sample_rate,
+        slow_statements=slow_query_log.slow_statements,
+        entries=[SlowQueryEntry(**entry._asdict()) for entry in slow_query_log.entries()]
+    )
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(1)
+async def clear_slow_queries(
+    current_user: User = Depends(require_admin)
+):
+    """Empty the slow query log of this worker process."""
+    slow_query_log.clear()
+    return None
+
+
+def _bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" else None
+    return None
+
+
+# email -> (looked up at, role or None if the user is gone)
+_role_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+
+
+def _current_role(email: str) -> Optional[str]:
+    """The user's role in the database, cached for ADMIN_ROLE_CACHE_SECONDS."""
+    now = time.monotonic()
+    cached = _role_cache.get(email)
+    if cached is not None and now - cached[0] < settings.ADMIN_ROLE_CACHE_SECONDS:
+        return cached[1]
+    with SessionLocal() as db:
+        role = db.scalar(select(User.role).where(User.email == email))
+    value = role.value if role is not None else None
+    _role_cache[email] = (now, value)
+    return value
+
+
+def _admin_token(token: Optional[str]) -> bool:
+    payload = decode_access_token(token) if token else None
+    if payload is None or payload.get("role") != UserRole.ADMIN.value or not payload.get("sub"):
+        return False
+    # The token's claim is only a pre-check: a demoted or deleted admin loses
+    # access within ADMIN_ROLE_CACHE_SECONDS, not when the token expires
+    return _current_role(payload["sub"]) == UserRole.ADMIN.value
+
+
+def profiling_authorized(scope: Scope) -> bool:
+    """
+    Whether a request may be profiled with the X-Profile header: its bearer
+    token must be valid and belong to a user who is an admin.
+
+    The role is looked up once per ADMIN_ROLE_CACHE_SECONDS per user (one
+    indexed query), so profiled requests rarely pay for the check.
+    """
+    return _admin_token(_bearer_token(scope))
+
+
+def metrics_authorized(scope: Scope) -> bool:
+    """
+    Whether a request may read /metrics: its bearer token must be METRICS_TOKEN
+    (for the Prometheus scraper) or, as for profiling, an admin's access token.
+    """
+    token = _bearer_token(scope)
+    if token and settings.METRICS_TOKEN and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return True
+    return _admin_token(token)
+
+
+def _collapsed_stacks(profile: Profile) -> PlainTextResponse:
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile.started_at:%Y%m%dT%H%M%S}-{profile.id}.collapsed"',
+            "X-Profile-Samples": str(profile.samples)
+        }
+    )
+
+
+def _require_profiling() -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled"
+        )
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+@query_budget(1)
+async def profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILING_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    idle: bool = Query(False, description="Include samples of waiting threads"),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Profile this worker process for a number of seconds and return the sampled
+    stacks in collapsed format (flamegraph.pl, inferno, speedscope).
+    
+    Only the worker that serves this request is profiled; with several workers,
+    profile each one. Returns 409 while another profile runs in the worker.
+    """
+    _require_profiling()
+    result = await profile_worker(seconds, interval_ms / 1000, include_idle=idle)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running in this worker"
+        )
+    return _collapsed_stacks(result)
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+@query_budget(1)
+async def get_profiles(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get the profiles of requests sent with an X-Profile: 1 header by an admin,
+    newest first (the last PROFILING_HISTORY_SIZE, in this worker process).
+    """
+    _require_profiling()
+    return [
+        ProfileSummary(**{field: getattr(entry, field) for field in ProfileSummary.model_fields})
+        for entry in profile_history.profiles()
+    ]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+@query_budget(1)
+async def get_profile(
+    profile_id: str,
+    current_user: User = Depends(require_admin)
+):
+    """Get the stacks of a per-request profile (its X-Profile-Id) in collapsed format."""
+    _require_profiling()
+    result = profile_history.get(profile_id)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return _collapsed_stacks(result)
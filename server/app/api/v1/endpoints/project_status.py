@@ -1,11 +1,15 @@
 """
 Project Status management endpoints.
 """
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc
+from starlette.concurrency import run_in_threadpool
 
+from app.core.query_inspector import query_budget
 from app.db.database import get_db
 from app.db.models.project_status import ProjectStatus
 from app.db.models.project import Project
@@ -14,14 +18,27 @@ from app.schemas.project_status import (
     ProjectStatusCreate,
     ProjectStatusUpdate,
     ProjectStatusResponse,
-    ProjectStatusDetailResponse
+    ProjectStatusDetailResponse,
+    ProjectStatusBulkResult
 )
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.export_service import (
+    EXPORT_MEDIA_TYPES,
+    STATUS_EXPORT_FIELDS,
+    export_filename,
+    get_status_watermark,
+    iter_status_history_export,
+    write_export_to_storage
+)
+from app.services.bulk_status_service import ingest_project_statuses
+from app.services.columnar_export_service import COLUMNAR_MEDIA_TYPES, PYARROW_AVAILABLE, iter_columnar_export
+from app.utils.bulk_payload import read_bulk_rows
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ProjectStatusResponse])
+@query_budget(2)
 async def get_project_statuses(
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     skip: int = Query(0, ge=0),
@@ -42,7 +59,99 @@ async def get_project_statuses(
     return statuses
 
 
+@router.get("/export")
+@query_budget(3)
+async def export_project_statuses(
+    export_format: str = Query(
+        "csv", alias="format", pattern="^(csv|ndjson|arrow|parquet)$",
+        description="Export format (csv, ndjson, arrow, parquet)"
+    ),
+    columns: Optional[List[str]] = Query(None, description="Columns to export (defaults to all)"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    date_from: Optional[datetime] = Query(None, description="Filter by date from"),
+    date_to: Optional[datetime] = Query(None, description="Filter by date to"),
+    since: Optional[int] = Query(
+        None, ge=0, description="Watermark of the previous export; only statuses created or edited since are exported"
+    ),
+    destination: str = Query(
+        "stream", pattern="^(stream|storage)$",
+        description="Stream the export or write it to the configured storage backend"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export the status history (oldest first) joined with project and client names.
+    
+    The X-Export-Watermark header (or the watermark field for storage exports)
+    holds the change log position the export covers; pass it back as `since`
+    to export only statuses created or edited since, with their current
+    values. A status changed while an export runs may appear in two exports;
+    keep the latest row per id. A watermark older than the retained change
+    log gets 410 Gone: export in full again.
+    """
+    if columns:
+        unknown = [column for column in columns if column not in STATUS_EXPORT_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown columns: {', '.join(unknown)}"
+            )
+    
+    columnar = export_format in COLUMNAR_MEDIA_TYPES
+    if columnar and not PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Arrow and Parquet exports require pyarrow"
+        )
+    
+    bounds = get_status_watermark(db)
+    if since is not None and since < bounds.truncated_through:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Changes up to sequence {bounds.truncated_through} are no longer retained; export in full again"
+        )
+    watermark = bounds.last_seq
+    export = iter_columnar_export if columnar else iter_status_history_export
+    chunks = export(
+        export_format,
+        project_id=project_id,
+        date_from=date_from,
+        date_to=date_to,
+        columns=columns,
+        since_seq=since,
+        through_seq=watermark
+    )
+    filename = export_filename("project-statuses", export_format)
+    
+    if destination == "storage":
+        try:
+            path = await run_in_threadpool(write_export_to_storage, chunks, filename)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error writing export: {str(e)}"
+            )
+        return {"path": path, "format": export_format, "watermark": watermark}
+    
+    media_type = COLUMNAR_MEDIA_TYPES[export_format] if columnar else EXPORT_MEDIA_TYPES[export_format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Watermark": str(watermark)
+        }
+    )
+
+
 @router.get("/{status_id}", response_model=ProjectStatusDetailResponse)
+@query_budget(2)
 async def get_project_status(
     status_id: int,
     db: Session = Depends(get_db),
@@ -66,6 +175,7 @@ async def get_project_status(
 
 
 @router.get("/project/{project_id}/latest", response_model=Optional[ProjectStatusDetailResponse])
+@query_budget(3)
 async def get_latest_project_status(
     project_id: int,
     db: Session = Depends(get_db),
@@ -92,6 +202,7 @@ async def get_latest_project_status(
 
 
 @router.post("/", response_model=ProjectStatusResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(15)
 async def create_project_status(
     status_data: ProjectStatusCreate,
     db: Session = Depends(get_db),
@@ -123,7 +234,42 @@ async def create_project_status(
     return db_status
 
 
+@router.post("/bulk", response_model=ProjectStatusBulkResult)
+@query_budget(15)
+async def bulk_create_project_statuses(
+    request: Request,
+    payload_format: Optional[str] = Query(
+        None, alias="format", pattern="^(csv|ndjson)$",
+        description="Payload format (defaults to the Content-Type: text/csv or NDJSON)"
+    ),
+    atomic: bool = Query(False, description="Reject the whole batch if any row is invalid"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many project statuses from an NDJSON or CSV payload.
+    
+    Each row has the fields of a single create (project_id, is_on_scope,
+    is_on_time, is_on_budget, next_delivery, risks) plus an optional
+    updated_at. Invalid rows are skipped and reported by line number. Rows are
+    committed in chunks of INGEST_CHUNK_SIZE; atomic batches in one transaction.
+    """
+    parsed_rows = await read_bulk_rows(request, payload_format)
+    
+    try:
+        return await run_in_threadpool(
+            ingest_project_statuses, db, parsed_rows, current_user.id, atomic
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error importing project statuses: {str(e)}"
+        )
+
+
 @router.put("/{status_id}", response_model=ProjectStatusResponse)
+@query_budget(16)
 async def update_project_status(
     status_id: int,
     status_data: ProjectStatusUpdate,
@@ -153,6 +299,7 @@ async def update_project_status(
 
 
 @router.delete("/{status_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(13)
 async def delete_project_status(
     status_id: int,
     db: Session = Depends(get_db),
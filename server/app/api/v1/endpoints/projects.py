@@ -2,22 +2,42 @@
 Project management endpoints.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.http_cache import make_etag, etag_matches, not_modified, cache_headers
+from app.core.query_inspector import query_budget
 from app.db.database import get_db
+from app.db.change_tracking import get_table_versions
 from app.db.models.project import Project
 from app.db.models.user import User
 from app.db.models.client import Client
+from app.db.models.transcription import Transcription, TranscriptionStatus
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse
+from app.schemas.transcription import TranscriptionJobStatus
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.event_broadcaster import broadcaster, project_topic
+from app.services.fast_response_service import get_project_rows
+from app.services.provisioning_service import encode_results, provision_projects
+from app.utils.bulk_payload import read_bulk_rows
+from app.utils.sse import EventStreamResponse, sse_frame
 
 router = APIRouter()
 
+# Tables whose changes invalidate the project list representation
+PROJECT_LIST_TABLES = ("projects", "clients")
+
 
 @router.get("/", response_model=List[ProjectResponse])
+@query_budget(3)
 async def get_projects(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = Query(None, description="Search by name or client"),
@@ -25,6 +45,17 @@ async def get_projects(
     current_user: User = Depends(get_current_user)
 ):
     """Get all projects with optional search."""
+    etag = make_etag(request, get_table_versions(db, PROJECT_LIST_TABLES))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(
+            get_project_rows(db, skip=skip, limit=limit, search=search),
+            headers=cache_headers(etag)
+        )
+    
     query = db.query(Project).options(joinedload(Project.client))
     
     # Apply search filter if provided
@@ -41,6 +72,7 @@ async def get_projects(
 
 
 @router.get("/{project_id}", response_model=ProjectDetailResponse)
+@query_budget(3)
 async def get_project(
     project_id: int,
     db: Session = Depends(get_db),
@@ -57,7 +89,52 @@ async def get_project(
     return project
 
 
+@router.get("/{project_id}/events")
+@query_budget(None)
+async def stream_project_events(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream transcription processing stages for a project as Server-Sent Events.
+    
+    A "status" event is sent first for every transcription still pending or
+    processing, then a "stage" event for each pipeline transition of any of
+    the project's transcriptions. The stream stays open until the client leaves.
+    """
+    # Subscribe before reading the state so no transition can fall in between
+    subscription = broadcaster.subscribe(project_topic(project_id))
+    project = db.query(Project.id).filter(Project.id == project_id).first()
+    in_flight = db.query(
+        Transcription.id,
+        Transcription.project_id,
+        Transcription.batch_id,
+        Transcription.processing_status,
+        Transcription.processing_error,
+        Transcription.processed_at
+    ).filter(
+        Transcription.project_id == project_id,
+        Transcription.processing_status.in_([TranscriptionStatus.PENDING, TranscriptionStatus.PROCESSING])
+    ).order_by(Transcription.id).all()
+    # Release the connection: an open stream must not hold one while it waits
+    db.close()
+    if project is None:
+        subscription.close()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    initial = [
+        sse_frame("status", TranscriptionJobStatus.model_validate(job).model_dump_json())
+        for job in in_flight
+    ]
+    return EventStreamResponse(subscription, initial, settings.EVENTS_KEEPALIVE_SECONDS)
+
+
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(17)
 async def create_project(
     project_data: ProjectCreate,
     db: Session = Depends(get_db),
@@ -93,7 +170,35 @@ async def create_project(
     return db_project
 
 
+@router.post("/bulk")
+@query_budget(15)
+async def bulk_provision_projects(
+    request: Request,
+    payload_format: Optional[str] = Query(
+        None, alias="format", pattern="^(csv|ndjson)$",
+        description="Payload format (defaults to the Content-Type: text/csv or NDJSON)"
+    ),
+    mode: str = Query(
+        "create", pattern="^(create|upsert)$",
+        description="create rejects existing names; upsert moves them to the given client"
+    ),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many projects from an NDJSON or CSV payload.
+    
+    Each row has a name and either a client_id or a client_name. Rows are
+    written in chunks, each committed on its own. The response is NDJSON: one
+    result per row (row, name, id, outcome, error) as its chunk commits,
+    followed by a summary line with the totals.
+    """
+    parsed_rows = await read_bulk_rows(request, payload_format)
+    results = await run_in_threadpool(provision_projects, parsed_rows, current_user.id, mode == "upsert")
+    return StreamingResponse(encode_results(results), media_type="application/x-ndjson")
+
+
 @router.put("/{project_id}", response_model=ProjectResponse)
+@query_budget(11)
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
@@ -142,6 +247,7 @@ async def update_project(
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(17)
 async def delete_project(
     project_id: int,
     db: Session = Depends(get_db),
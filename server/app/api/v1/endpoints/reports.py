@@ -2,21 +2,37 @@
 Report generation endpoints.
 """
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
 
-from app.db.database import get_db
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.http_cache import make_etag, etag_matches, not_modified, cache_headers
+from app.core.query_inspector import query_budget
+from app.db.database import get_db, SessionLocal
+from app.db.change_tracking import get_table_versions
 from app.db.models.user import User
-from app.schemas.report import ProjectHealthReport, ReportFilters
-from app.api.v1.endpoints.auth import get_current_user
-from app.services.report_service import generate_project_health_report
+from app.schemas.report import ProjectHealthReport, ProjectHealthSummary, HealthTrendReport, ReportFilters
+from app.api.v1.endpoints.auth import authenticate_token, get_current_user
+from app.api.v1.endpoints.users import require_admin
+from app.services.report_cache import REPORT_TABLES, report_cache, get_project_health_report_cached
+from app.services.dashboard_feed import dashboard_feed
+from app.services.report_service import generate_project_health_summary
+from app.services.export_service import EXPORT_MEDIA_TYPES, export_filename, iter_health_export
+from app.services.trend_service import MAX_BUCKETS, get_bucket_starts, get_health_trend
+from app.db.health_trends import week_start
 
 router = APIRouter()
 
 
 @router.get("/health", response_model=ProjectHealthReport)
+@query_budget(4)
 async def get_project_health_report(
+    request: Request,
+    response: Response,
     client_ids: Optional[List[int]] = Query(None, description="Filter by client IDs"),
     health_status: Optional[str] = Query(None, description="Filter by health status (green, yellow, red, none)"),
     date_from: Optional[datetime] = Query(None, description="Filter by date from"),
@@ -26,6 +42,12 @@ async def get_project_health_report(
     current_user: User = Depends(get_current_user)
 ):
     """Generate a project health report with optional filters."""
+    # The report embeds the requesting user's name, so the ETag is per user
+    versions = get_table_versions(db, REPORT_TABLES)
+    etag = make_etag(request, versions, current_user.id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     filters = ReportFilters(
         client_ids=client_ids,
         health_status=health_status,
@@ -35,14 +57,149 @@ async def get_project_health_report(
     )
     
     try:
-        report = generate_project_health_report(
+        report, report_versions = await get_project_health_report_cached(
             db=db,
             filters=filters,
-            user_name=current_user.name
+            user_name=current_user.name,
+            versions=versions
         )
+        if report_versions != versions:
+            # A stale report (stale-while-revalidate) is tagged with the versions it
+            # was built from, so the next poll gets the fresh one instead of a 304
+            etag = make_etag(request, report_versions, current_user.id)
+        response.headers.update(cache_headers(etag))
+        if settings.FAST_JSON_RESPONSES:
+            # The report was validated when it was built; skip response_model re-validation
+            return FastJSONResponse(report, headers=cache_headers(etag))
         return report
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating report: {str(e)}"
         )
+
+
+@router.get("/health/export")
+@query_budget(2)
+async def export_project_health_report(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="Export format (csv, ndjson)"),
+    client_ids: Optional[List[int]] = Query(None, description="Filter by client IDs"),
+    health_status: Optional[str] = Query(None, description="Filter by health status (green, yellow, red, none)"),
+    date_from: Optional[datetime] = Query(None, description="Filter by date from"),
+    date_to: Optional[datetime] = Query(None, description="Filter by date to"),
+    include_no_status: bool = Query(True, description="Include projects with no status"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream per-project health metrics as CSV or NDJSON, one row per project."""
+    filters = ReportFilters(
+        client_ids=client_ids,
+        health_status=health_status,
+        date_from=date_from,
+        date_to=date_to,
+        include_no_status=include_no_status
+    )
+    
+    return StreamingResponse(
+        iter_health_export(filters, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename("health-report", export_format)}"'}
+    )
+
+
+@router.get("/health/summary", response_model=ProjectHealthSummary)
+@query_budget(3)
+async def get_project_health_summary(
+    request: Request,
+    response: Response,
+    client_ids: Optional[List[int]] = Query(None, description="Filter by client IDs"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get overall and per-client health counts, answered from the health aggregates."""
+    etag = make_etag(request, get_table_versions(db, REPORT_TABLES))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    
+    return generate_project_health_summary(db, client_ids=client_ids)
+
+
+def _authenticate_websocket(websocket: WebSocket, token: Optional[str]) -> Optional[User]:
+    # Browsers cannot set headers on WebSocket requests, so a ?token= query parameter is accepted too
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer":
+            token = credentials
+    with SessionLocal() as db:
+        return authenticate_token(db, token)
+
+
+@router.websocket("/health/live")
+@query_budget(None)
+async def project_health_feed(
+    websocket: WebSocket,
+    client_ids: Optional[List[int]] = Query(None, description="Only send projects of these clients"),
+    token: Optional[str] = Query(None, description="Access token, if not sent as a bearer Authorization header")
+):
+    """
+    Live project health over a WebSocket.
+    
+    The first message is a snapshot of every project's current health
+    ({"type": "snapshot", "fields": [...], "projects": [[...], ...]}); after
+    that only deltas are sent when project statuses are created, updated or
+    deleted ({"type": "delta", "projects": [...], "removed": [project ids]}).
+    A client that falls too far behind is sent a new snapshot instead of the
+    deltas it missed.
+    """
+    user = await run_in_threadpool(_authenticate_websocket, websocket, token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+    
+    await websocket.accept()
+    await dashboard_feed.serve(websocket, client_ids)
+
+
+@router.get("/health/trend", response_model=HealthTrendReport)
+@query_budget(6)
+async def get_project_health_trend(
+    request: Request,
+    response: Response,
+    client_ids: Optional[List[int]] = Query(None, description="Filter by client IDs"),
+    date_from: Optional[datetime] = Query(None, description="Start of the range (defaults to `weeks` before date_to)"),
+    date_to: Optional[datetime] = Query(None, description="End of the range (defaults to now)"),
+    weeks: int = Query(12, ge=1, le=MAX_BUCKETS, description="Number of weekly buckets when date_from is omitted"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get weekly healthy/at-risk/critical counts for the portfolio and each client."""
+    now = datetime.now(timezone.utc)
+    date_to = date_to or now
+    date_from = date_from or date_to - timedelta(weeks=weeks - 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must be before date_to"
+        )
+    if len(get_bucket_starts(date_from, date_to)) > MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot span more than {MAX_BUCKETS} weeks"
+        )
+    
+    # The open bucket moves with the calendar, so it is part of the version
+    etag = make_etag(request, get_table_versions(db, REPORT_TABLES), week_start(now))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    
+    return get_health_trend(db, date_from, date_to, client_ids=client_ids, now=now)
+
+
+@router.get("/cache/metrics")
+@query_budget(1)
+async def get_report_cache_metrics(
+    current_user: User = Depends(require_admin)
+):
+    """Get report cache hit rate, build time and coalesced request counts (admin only)."""
+    return report_cache.stats.as_dict()
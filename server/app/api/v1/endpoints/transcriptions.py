@@ -1,156 +1,66 @@
 """
 Transcription management endpoints.
 """
+import asyncio
+import json
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
 
+from app.core.config import settings
+from app.core.query_inspector import query_budget
 from app.db.database import get_db
-from app.db.models.transcription import Transcription
+from app.db.models.transcription import Transcription, TranscriptionStatus
+from app.db.models.transcription_batch import TranscriptionBatch
 from app.db.models.project import Project
 from app.db.models.user import User
 from app.schemas.transcription import (
     TranscriptionResponse,
     TranscriptionDetailResponse,
+    TranscriptionBatchResponse,
+    TranscriptionJobStatus,
+    TranscriptionStage,
     ManualTranscriptionCreate,
 )
 from app.api.v1.endpoints.auth import get_current_user
-from app.utils.file_upload import save_uploaded_file, get_file_type, delete_file
-from app.services.openai_service import transcribe_audio_video, read_text_file
+from app.utils.file_upload import save_uploaded_file, store_uploaded_file, validate_file, get_file_type, delete_file
+from app.services.event_broadcaster import Event, broadcaster, transcription_topic
+from app.services.transcription_queue import transcription_queue
+from app.services.transcription_service import get_batch_progress, publish_stage
+from app.utils.sse import EventStreamResponse, sse_frame
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def _extract_status_from_text(
-    db: Session,
-    project: Project,
-    transcription_text: str,
-    updated_by: int
-) -> bool:
-    """Extract status information from text and persist it as a project status entry."""
-    if not transcription_text:
-        return False
-    
-    from app.db.models.project_status import ProjectStatus
-    from app.services.ai_status_extractor import extract_status_from_transcription, validate_extracted_status
-    
-    client_name = project.client.name if project.client else "Unknown"
-    extracted_status = extract_status_from_transcription(
-        transcription_text=transcription_text,
-        project_name=project.name,
-        client_name=client_name
-    )
-    
-    if not extracted_status:
-        logger.warning(f"Failed to extract status from transcription for project {project.id}")
-        return False
-    
-    validated_status = validate_extracted_status(extracted_status)
-    project_status = ProjectStatus(
-        project_id=project.id,
-        is_on_scope=validated_status.get("is_on_scope"),
-        is_on_time=validated_status.get("is_on_time"),
-        is_on_budget=validated_status.get("is_on_budget"),
-        next_delivery=validated_status.get("next_delivery"),
-        risks=validated_status.get("risks"),
-        updated_by=updated_by
-    )
-    
-    db.add(project_status)
-    db.commit()
-    logger.info(f"Status extracted and saved for project {project.id}")
-    return True
+def job_status_url(request: Request, transcription_id: int) -> str:
+    """Polling URL for a queued transcription."""
+    return str(request.url_for("get_transcription_status", transcription_id=transcription_id))
 
 
-async def process_transcription_background(
-    transcription_id: int,
-    file_path: str,
-    file_type: str
-):
-    """Background task to process transcription and extract status."""
-    from app.db.database import SessionLocal
-    from app.db.models.project import Project
-    from app.db.models.project_status import ProjectStatus
-    from app.services.ai_status_extractor import extract_status_from_transcription, validate_extracted_status
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    db = SessionLocal()
-    
-    try:
-        transcription = db.query(Transcription).filter(Transcription.id == transcription_id).first()
-        if not transcription:
-            logger.warning(f"Transcription {transcription_id} not found")
-            return
-        
-        raw_text = None
-        
-        if file_type in ["audio", "video"]:
-            # Transcribe audio/video using OpenAI Whisper
-            logger.info(f"Starting transcription for {transcription_id}")
-            raw_text = await transcribe_audio_video(file_path)
-            logger.info(f"Transcription completed for {transcription_id}")
-        elif file_type == "text":
-            # Read text file directly
-            raw_text = read_text_file(file_path)
-        
-        if raw_text:
-            transcription.raw_text = raw_text
-            transcription.processed_at = func.now()
-            db.commit()
-            db.refresh(transcription)
-            logger.info(f"Transcription {transcription_id} processed successfully")
-            
-            # Extract status from transcription using AI
-            project = db.query(Project).filter(Project.id == transcription.project_id).first()
-            if project:
-                logger.info(f"Extracting status from transcription {transcription_id} for project {project.id}")
-                
-                # Get client name
-                client_name = project.client.name if project.client else "Unknown"
-                
-                # Extract status using AI
-                extracted_status = extract_status_from_transcription(
-                    transcription_text=raw_text,
-                    project_name=project.name,
-                    client_name=client_name
-                )
-                
-                if extracted_status:
-                    # Validate and normalize the extracted data
-                    validated_status = validate_extracted_status(extracted_status)
-                    
-                    # Create new project status record
-                    project_status = ProjectStatus(
-                        project_id=project.id,
-                        is_on_scope=validated_status.get("is_on_scope"),
-                        is_on_time=validated_status.get("is_on_time"),
-                        is_on_budget=validated_status.get("is_on_budget"),
-                        next_delivery=validated_status.get("next_delivery"),
-                        risks=validated_status.get("risks"),
-                        updated_by=transcription.created_by
-                    )
-                    
-                    db.add(project_status)
-                    db.commit()
-                    logger.info(f"Status extracted and saved for project {project.id} from transcription {transcription_id}")
-                else:
-                    logger.warning(f"Failed to extract status from transcription {transcription_id}")
-            else:
-                logger.warning(f"Project not found for transcription {transcription_id}")
-        else:
-            logger.warning(f"No text extracted from transcription {transcription_id}")
-    except Exception as e:
-        # Log error but don't fail the request
-        logger.error(f"Error processing transcription {transcription_id}: {str(e)}", exc_info=True)
-    finally:
-        db.close()
+def get_job_status(db: Session, transcription_id: int):
+    """Processing state columns of a transcription, or None."""
+    return db.query(
+        Transcription.id,
+        Transcription.project_id,
+        Transcription.batch_id,
+        Transcription.processing_status,
+        Transcription.processing_error,
+        Transcription.processed_at
+    ).filter(Transcription.id == transcription_id).first()
+
+
+FINAL_STAGES = {TranscriptionStage.COMPLETED.value, TranscriptionStage.FAILED.value}
+
+
+def is_final_stage(event: Event) -> bool:
+    """True for the last event of a transcription's stream."""
+    return json.loads(event.data)["stage"] in FINAL_STAGES
 
 
 @router.get("/", response_model=List[TranscriptionResponse])
+@query_budget(2)
 async def get_transcriptions(
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     db: Session = Depends(get_db),
@@ -166,7 +76,59 @@ async def get_transcriptions(
     return transcriptions
 
 
+@router.get("/{transcription_id}/status", response_model=TranscriptionJobStatus)
+@query_budget(2)
+async def get_transcription_status(
+    transcription_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the processing state of a transcription (cheap to poll: no text is returned)."""
+    job = get_job_status(db, transcription_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transcription not found"
+        )
+    
+    return job
+
+
+@router.get("/{transcription_id}/events")
+@query_budget(None)
+async def stream_transcription_events(
+    transcription_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the processing stages of a transcription as Server-Sent Events.
+    
+    A "status" event with the current state (as in GET
+    /transcriptions/{id}/status) comes first, then a "stage" event for each
+    pipeline transition. The stream ends after the completed or failed stage.
+    """
+    # Subscribe before reading the state so no transition can fall in between
+    subscription = broadcaster.subscribe(transcription_topic(transcription_id))
+    job = get_job_status(db, transcription_id)
+    # Release the connection: an open stream must not hold one while it waits
+    db.close()
+    if job is None:
+        subscription.close()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transcription not found"
+        )
+    
+    if job.processing_status in (TranscriptionStatus.COMPLETED, TranscriptionStatus.FAILED):
+        subscription.close()
+        subscription = None
+    initial = [sse_frame("status", TranscriptionJobStatus.model_validate(job).model_dump_json())]
+    return EventStreamResponse(subscription, initial, settings.EVENTS_KEEPALIVE_SECONDS, until=is_final_stage)
+
+
 @router.get("/{transcription_id}", response_model=TranscriptionDetailResponse)
+@query_budget(4)
 async def get_transcription(
     transcription_id: int,
     db: Session = Depends(get_db),
@@ -183,15 +145,23 @@ async def get_transcription(
     return transcription
 
 
-@router.post("/", response_model=TranscriptionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=TranscriptionResponse, status_code=status.HTTP_202_ACCEPTED)
+@query_budget(9)
 async def upload_transcription(
-    background_tasks: BackgroundTasks,
+    request: Request,
+    response: Response,
     project_id: int = Form(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Upload a transcription file for a project."""
+    """
+    Upload a transcription file for a project.
+    
+    Returns 202 once the file is stored; processing happens on the
+    transcription queue. Poll the URL in the Location header
+    (GET /transcriptions/{id}/status) until it is completed or failed.
+    """
     # Verify project exists
     project = db.query(Project).filter(Project.id == project_id).first()
     if project is None:
@@ -228,35 +198,145 @@ async def upload_transcription(
     db.commit()
     db.refresh(db_transcription)
     
-    # Process transcription in background (for audio/video) or immediately (for text)
-    if file_type == "text":
-        # Read text file immediately
-        raw_text = read_text_file(file_path)
-        if raw_text:
-            db_transcription.raw_text = raw_text
-            db_transcription.processed_at = func.now()
-            db.commit()
-            db.refresh(db_transcription)
-            _extract_status_from_text(db, project, raw_text, db_transcription.created_by)
-    else:
-        # Process audio/video in background
-        background_tasks.add_task(
-            process_transcription_background,
-            db_transcription.id,
-            file_path,
-            file_type
-        )
+    # Text extraction and the LLM call run on the transcription queue
+    publish_stage(db_transcription, TranscriptionStage.STORED)
+    transcription_queue.enqueue(project_id, db_transcription.id)
+    response.headers["Location"] = job_status_url(request, db_transcription.id)
     
     return db_transcription
 
 
-@router.post("/text", response_model=TranscriptionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/batch", response_model=TranscriptionBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+@query_budget(11)
+async def upload_transcription_batch(
+    project_id: int = Form(...),
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload several transcription files for a project at once.
+    
+    Files are streamed to storage concurrently and all transcriptions are
+    created in one transaction, then queued for processing. Poll
+    GET /transcriptions/batches/{batch_id} for progress.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    if len(files) > settings.MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can contain at most {settings.MAX_BATCH_FILES} files"
+        )
+    
+    # Reject the whole batch before storing anything
+    for file in files:
+        try:
+            validate_file(file)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=f"{file.filename}: {e.detail}")
+    
+    semaphore = asyncio.Semaphore(settings.TRANSCRIPTION_UPLOAD_CONCURRENCY)
+    
+    async def store(file: UploadFile):
+        async with semaphore:
+            return await store_uploaded_file(file, project_id)
+    
+    results = await asyncio.gather(*(store(file) for file in files), return_exceptions=True)
+    stored = [result for result in results if not isinstance(result, BaseException)]
+    errors = [(file, result) for file, result in zip(files, results) if isinstance(result, BaseException)]
+    
+    def discard_stored_files():
+        for file_path, _ in stored:
+            try:
+                delete_file(file_path)
+            except Exception as e:
+                logger.warning(f"Could not delete stored file {file_path}: {str(e)}")
+    
+    if errors:
+        discard_stored_files()
+        file, error = errors[0]
+        if isinstance(error, HTTPException):
+            raise HTTPException(status_code=error.status_code, detail=f"{file.filename}: {error.detail}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving file {file.filename}: {str(error)}"
+        )
+    
+    try:
+        batch = TranscriptionBatch(project_id=project_id, created_by=current_user.id)
+        db.add(batch)
+        transcriptions = [
+            Transcription(
+                project_id=project_id,
+                batch=batch,
+                file_path=file_path,
+                file_name=file.filename,
+                file_type=get_file_type(file.filename),
+                file_size=file_size,
+                processing_status=TranscriptionStatus.PENDING,
+                created_by=current_user.id
+            )
+            for file, (file_path, file_size) in zip(files, stored)
+        ]
+        db.add_all(transcriptions)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        discard_stored_files()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating transcriptions: {str(e)}"
+        )
+    
+    # Reloads the committed rows, so announcing them below needs no extra queries
+    progress = get_batch_progress(db, batch)
+    for transcription in transcriptions:
+        publish_stage(transcription, TranscriptionStage.STORED)
+        transcription_queue.enqueue(project_id, transcription.id)
+    logger.info("Batch %s: %s files queued for project %s", batch.id, len(transcriptions), project_id)
+    
+    return progress
+
+
+@router.get("/batches/{batch_id}", response_model=TranscriptionBatchResponse)
+@query_budget(3)
+async def get_transcription_batch(
+    batch_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the aggregated processing progress of a transcription batch."""
+    batch = db.query(TranscriptionBatch).filter(TranscriptionBatch.id == batch_id).first()
+    if batch is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transcription batch not found"
+        )
+    
+    return get_batch_progress(db, batch)
+
+
+@router.post("/text", response_model=TranscriptionResponse, status_code=status.HTTP_202_ACCEPTED)
+@query_budget(9)
 async def create_transcription_from_text(
+    request: Request,
+    response: Response,
     payload: ManualTranscriptionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Create a transcription directly from pasted text (no file upload)."""
+    """
+    Create a transcription directly from pasted text (no file upload).
+    
+    Status extraction runs on the transcription queue, as for uploads; poll
+    the URL in the Location header for completion.
+    """
     project = db.query(Project).filter(Project.id == payload.project_id).first()
     if project is None:
         raise HTTPException(
@@ -280,7 +360,7 @@ async def create_transcription_from_text(
         file_type="text",
         file_size=text_size_bytes,
         raw_text=raw_text,
-        processed_at=func.now(),
+        processing_status=TranscriptionStatus.PENDING,
         created_by=current_user.id
     )
     
@@ -288,12 +368,15 @@ async def create_transcription_from_text(
     db.commit()
     db.refresh(db_transcription)
     
-    _extract_status_from_text(db, project, raw_text, db_transcription.created_by)
+    publish_stage(db_transcription, TranscriptionStage.STORED)
+    transcription_queue.enqueue(payload.project_id, db_transcription.id)
+    response.headers["Location"] = job_status_url(request, db_transcription.id)
     
     return db_transcription
 
 
 @router.delete("/{transcription_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(7)
 async def delete_transcription(
     transcription_id: int,
     db: Session = Depends(get_db),
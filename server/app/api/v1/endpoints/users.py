@@ -9,6 +9,7 @@ from app.db.database import get_db
 from app.db.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.core.security import get_password_hash, verify_password
+from app.core.query_inspector import query_budget
 from app.api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
@@ -25,6 +26,7 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
 
 
 @router.get("/", response_model=List[UserResponse])
+@query_budget(2)
 async def get_users(
     skip: int = 0,
     limit: int = 100,
@@ -37,6 +39,7 @@ async def get_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
+@query_budget(2)
 async def get_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -61,6 +64,7 @@ async def get_user(
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(5)
 async def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
@@ -94,6 +98,7 @@ async def create_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
+@query_budget(5)
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
@@ -141,6 +146,7 @@ async def update_user(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(7)
 async def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -0,0 +1,172 @@
+"""
+Webhook subscription endpoints.
+"""
+import secrets
+from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.query_inspector import query_budget
+from app.db.database import get_db
+from app.db.models.client import Client
+from app.db.models.user import User
+from app.db.models.webhook import WebhookDelivery, WebhookSubscription
+from app.schemas.webhook import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionResponse,
+    WebhookSubscriptionCreated,
+)
+from app.api.v1.endpoints.users import require_admin
+from app.services.webhook_delivery import publish_outbox_pending, webhook_dispatcher
+
+router = APIRouter()
+
+# Changing any of these gives the endpoint a fresh start (closes its circuit)
+DELIVERY_FIELDS = ("url", "is_active")
+
+
+def _pending_counts(db: Session, subscription_ids: List[int]) -> Dict[int, int]:
+    if not subscription_ids:
+        return {}
+    return dict(
+        db.query(WebhookDelivery.subscription_id, func.count(WebhookDelivery.id))
+        .filter(WebhookDelivery.subscription_id.in_(subscription_ids))
+        .group_by(WebhookDelivery.subscription_id)
+        .all()
+    )
+
+
+def _response(subscription: WebhookSubscription, pending: int) -> WebhookSubscriptionResponse:
+    response = WebhookSubscriptionResponse.model_validate(subscription)
+    response.pending_events = pending
+    return response
+
+
+def _get_subscription(db: Session, subscription_id: int) -> WebhookSubscription:
+    subscription = db.query(WebhookSubscription).filter(WebhookSubscription.id == subscription_id).first()
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook subscription not found"
+        )
+    return subscription
+
+
+def _check_client(db: Session, client_id) -> None:
+    if client_id is not None and db.query(Client.id).filter(Client.id == client_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+
+
+@router.get("/", response_model=List[WebhookSubscriptionResponse])
+@query_budget(3)
+async def get_webhook_subscriptions(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Get all webhook subscriptions with their delivery state (admin only)."""
+    subscriptions = db.query(WebhookSubscription).order_by(WebhookSubscription.id).all()
+    pending = _pending_counts(db, [subscription.id for subscription in subscriptions])
+    return [_response(subscription, pending.get(subscription.id, 0)) for subscription in subscriptions]
+
+
+@router.get("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+@query_budget(3)
+async def get_webhook_subscription(
+    subscription_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Get a webhook subscription with its delivery state (admin only)."""
+    subscription = _get_subscription(db, subscription_id)
+    return _response(subscription, _pending_counts(db, [subscription_id]).get(subscription_id, 0))
+
+
+@router.post("/", response_model=WebhookSubscriptionCreated, status_code=status.HTTP_201_CREATED)
+@query_budget(3)
+async def create_webhook_subscription(
+    subscription_data: WebhookSubscriptionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Subscribe an endpoint to project health transitions (admin only).
+
+    Only transitions committed after the subscription is created are sent. The
+    response carries the signing secret; it is not returned again.
+    """
+    _check_client(db, subscription_data.client_id)
+
+    data = subscription_data.model_dump()
+    if data["secret"] is None:
+        data["secret"] = secrets.token_hex(32)
+    subscription = WebhookSubscription(**data, is_active=True, consecutive_failures=0, created_by=current_user.id)
+
+    db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+
+    return WebhookSubscriptionCreated.model_validate(subscription)
+
+
+@router.put("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+@query_budget(5)
+async def update_webhook_subscription(
+    subscription_id: int,
+    subscription_data: WebhookSubscriptionUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Update a webhook subscription (admin only).
+
+    Changing the URL or re-activating the subscription resets its failure count
+    and closes its circuit, so pending events are retried right away.
+    """
+    subscription = _get_subscription(db, subscription_id)
+
+    update_data = subscription_data.model_dump(exclude_unset=True)
+    if "client_id" in update_data:
+        _check_client(db, update_data["client_id"])
+
+    reset = any(
+        field in update_data and update_data[field] != getattr(subscription, field)
+        for field in DELIVERY_FIELDS
+    )
+    for field, value in update_data.items():
+        setattr(subscription, field, value)
+    if reset:
+        subscription.consecutive_failures = 0
+        subscription.circuit_open_until = None
+        subscription.last_error = None
+
+    db.commit()
+    db.refresh(subscription)
+
+    if reset:
+        webhook_dispatcher.reset(subscription_id)
+        publish_outbox_pending()
+
+    return _response(subscription, _pending_counts(db, [subscription_id]).get(subscription_id, 0))
+
+
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(4)
+async def delete_webhook_subscription(
+    subscription_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Delete a webhook subscription and its undelivered events (admin only)."""
+    subscription = _get_subscription(db, subscription_id)
+
+    db.query(WebhookDelivery).filter(WebhookDelivery.subscription_id == subscription_id).delete()
+    db.delete(subscription)
+    db.commit()
+    webhook_dispatcher.reset(subscription_id)
+
+    return None
@@ -3,7 +3,8 @@ API v1 router.
 """
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, projects, clients, transcriptions, project_status, reports
+from app.core.query_inspector import query_budget
+from app.api.v1.endpoints import auth, users, projects, clients, transcriptions, project_status, reports, changes, webhooks, diagnostics
 
 api_router = APIRouter()
 
@@ -15,9 +16,13 @@ api_router.include_router(clients.router, prefix="/clients", tags=["clients"])
 api_router.include_router(transcriptions.router, prefix="/transcriptions", tags=["transcriptions"])
 api_router.include_router(project_status.router, prefix="/project-status", tags=["project-status"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
 
 
 @api_router.get("/")
+@query_budget(0)
 async def api_root():
     """API root endpoint."""
     return {"message": "API v1", "version": "1.0.0"}
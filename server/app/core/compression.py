@@ -0,0 +1,170 @@
+"""
+Response compression middleware (brotli or gzip).
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.http_cache import encoded_etag
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Media types that must reach the client unbuffered or are already compressed
+EXCLUDED_MEDIA_TYPES = ("text/event-stream", "image/", "audio/", "video/", "application/zip")
+
+# Streamed media types whose chunks are flushed as they come (per-item progress)
+FLUSHED_MEDIA_TYPES = ("application/x-ndjson",)
+
+
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for a single response body."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compress data; with flush, also emit everything buffered so far."""
+        chunk = self._compress(data)
+        if flush:
+            chunk += self._flush()
+        return chunk
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress HTTP responses with brotli (when installed and accepted) or gzip.
+
+    Single-body responses smaller than minimum_size are sent unchanged. Streaming
+    responses are compressed chunk by chunk, except for excluded media types such
+    as Server-Sent Events; NDJSON chunks are flushed so each item reaches the
+    client when it is produced. Strong ETags get the content coding as a suffix,
+    as the compressed body differs from the identity one.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        flush = False
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, flush, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                if message["status"] == 304:
+                    # Answer with the ETag the client revalidated, if it was the encoded one
+                    headers = MutableHeaders(raw=message["headers"])
+                    etag = headers.get("etag")
+                    if etag and encoded_etag(etag, encoding) in if_none_match:
+                        headers["ETag"] = encoded_etag(etag, encoding)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                media_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or start_message["status"] < 200
+                    or start_message["status"] in (204, 304)
+                    or media_type.startswith(EXCLUDED_MEDIA_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                flush = media_type.startswith(FLUSHED_MEDIA_TYPES)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                    await send({
+                        "type": "http.response.body", "body": compressor.compress(body, flush), "more_body": True
+                    })
+                else:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                return
+
+            chunk = compressor.compress(body, flush and more_body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -45,6 +45,76 @@ class Settings(BaseSettings):
     AWS_ACCESS_KEY_ID: str = ""  # AWS access key (or use IAM role)
     AWS_SECRET_ACCESS_KEY: str = ""  # AWS secret key (or use IAM role)
     
+    # Performance
+    FAST_JSON_RESPONSES: bool = False  # Build list/report responses from row tuples and skip re-validation
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Responses smaller than this (bytes) are sent uncompressed
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_MAX_ENTRIES: int = 128  # Distinct filter combinations kept per worker
+    REPORT_CACHE_STALE_WHILE_REVALIDATE: bool = False  # Serve the previous report while a new one builds
+    HEALTH_AGGREGATES_ENABLED: bool = True  # Read report overall/client sections from incremental counters
+    HEALTH_AGGREGATES_VERIFY_INTERVAL_SECONDS: int = 3600  # Full-recompute drift check period (0 disables)
+    HEALTH_TRENDS_REFRESH_INTERVAL_SECONDS: int = 300  # Stored weekly trend rollup refresh period (0 disables)
+    REPORT_ENGINE: str = "python"  # "python" or "vectorized" (NumPy; falls back to python if numpy is missing)
+    METRICS_ENABLED: bool = True  # Per-route request metrics at /metrics (Prometheus text format)
+    METRICS_TOKEN: str = ""  # Bearer token for scraping /metrics; without it only admins' access tokens are accepted
+    METRICS_SERVER_TIMING_THRESHOLD_MS: int = 500  # Slower responses get a Server-Timing header (negative disables)
+    QUERY_INSPECTOR_ENABLED: bool = False  # Log query budget overruns and repeated (N+1) statements per request
+    QUERY_REPEAT_THRESHOLD: int = 5  # Same statement shape this many times in one request is reported as N+1
+    SLOW_QUERY_LOG_ENABLED: bool = True  # Log slow statements with their plans (GET /diagnostics/slow-queries)
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0  # Fraction of slow statements recorded
+    SLOW_QUERY_EXPLAIN: bool = True  # Capture the plan (EXPLAIN without ANALYZE) of recorded statements
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300  # The same statement shape is explained at most this often
+    SLOW_QUERY_BUFFER_SIZE: int = 200  # Recorded statements kept per worker
+    PROFILING_ENABLED: bool = True  # Sampling profiler for admins (GET /diagnostics/profile, X-Profile header); idle until asked
+    PROFILING_MAX_SECONDS: int = 60  # Longest on-demand profile
+    PROFILING_REQUEST_INTERVAL_MS: float = 1.0  # Sampling interval of per-request profiles
+    PROFILING_HISTORY_SIZE: int = 20  # Per-request profiles kept per worker
+    ADMIN_ROLE_CACHE_SECONDS: int = 30  # How long /metrics and X-Profile trust a looked-up users.role (0: every request)
+    LOG_FORMAT: str = "auto"  # "json", "text" or "auto" (text in development, json otherwise)
+    LOG_REQUESTS: bool = True  # One access record per request (logger app.access) with route, status and duration
+    LOG_QUEUE_SIZE: int = 10000  # Records waiting for the writer thread; more are dropped and counted
+    LOG_DEBUG_BURST: int = 20  # DEBUG records kept per call site each second before sampling
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01  # Fraction of DEBUG records kept past the burst
+
+    # Transcription processing
+    TRANSCRIPTION_WORKERS: int = 2  # Concurrent queue workers per process (0 disables processing)
+    TRANSCRIPTION_UPLOAD_CONCURRENCY: int = 4  # Files of a batch stored to storage at the same time
+    TRANSCRIPTION_LEASE_SECONDS: int = 300  # A job whose worker stopped renewing its lease this long is taken over
+    TRANSCRIPTION_REQUEUE_INTERVAL_SECONDS: int = 60  # Sweep for pending jobs and expired leases (0: only at startup)
+    MAX_BATCH_FILES: int = 50  # Files accepted by one batch upload
+    DOCUMENT_EXTRACTION_WORKERS: int = 2  # Processes parsing PDF/DOCX/TXT uploads
+    DOCUMENT_EXTRACTION_TIMEOUT_SECONDS: int = 30  # Per-document parse time limit
+    DOCUMENT_EXTRACTION_MAX_MEMORY_MB: int = 512  # Address-space limit of each extraction process
+    DOCUMENT_MAX_TEXT_CHARS: int = 200000  # Extraction stops after this much text (bounds LLM tokens)
+
+    # Real-time events (Server-Sent Events)
+    EVENTS_SUBSCRIBER_QUEUE_SIZE: int = 100  # Undelivered events buffered per subscriber (oldest dropped first)
+    EVENTS_KEEPALIVE_SECONDS: int = 15  # Comment sent on idle streams so proxies keep them open
+    EVENTS_PG_NOTIFY_ENABLED: bool = False  # Relay events between worker processes via Postgres LISTEN/NOTIFY
+    EVENTS_PG_CHANNEL: str = "app_events"
+    DASHBOARD_FEED_MAX_PENDING: int = 500  # Projects with unsent deltas before a slow dashboard gets a snapshot instead
+
+    # Change data capture feed (GET /changes)
+    CHANGES_MAX_BATCH: int = 1000  # Largest limit= a consumer may ask for
+    CHANGES_LONG_POLL_SECONDS: int = 30  # Longest a /changes request waits for new changes
+    CHANGES_RECHECK_SECONDS: int = 5  # Waiting requests re-read the head this often (other workers' writes without the bridge)
+    CHANGE_LOG_COMPACT_AFTER_HOURS: int = 24  # Older segments keep only the latest change of each row
+    CHANGE_LOG_RETENTION_DAYS: int = 30  # Older segments are dropped; consumers behind them must re-read the tables
+    CHANGE_LOG_MAINTENANCE_INTERVAL_SECONDS: int = 3600  # Compaction/retention period (0 disables)
+
+    # Outbound webhooks
+    WEBHOOK_DELIVERY_ENABLED: bool = False  # Run the delivery worker here; on PostgreSQL one enabled process is elected
+    WEBHOOK_BATCH_SIZE: int = 100  # Events sent to an endpoint in one request
+    WEBHOOK_TIMEOUT_SECONDS: float = 10  # Per-request timeout
+    WEBHOOK_MAX_CONNECTIONS: int = 50  # Shared HTTP connection pool across all endpoints
+    WEBHOOK_POLL_SECONDS: int = 5  # Outbox re-check period (events queued by other workers without the bridge)
+    WEBHOOK_RETRY_BASE_SECONDS: float = 1  # First retry delay; doubles with each consecutive failure
+    WEBHOOK_RETRY_MAX_SECONDS: float = 300  # Longest retry delay
+    WEBHOOK_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open an endpoint's circuit
+    WEBHOOK_CIRCUIT_OPEN_SECONDS: int = 600  # How long an open circuit pauses delivery before a probe
+    WEBHOOK_RETENTION_HOURS: int = 72  # Undelivered events older than this are dropped
+
     # Environment
     ENVIRONMENT: str = "development"
     
@@ -0,0 +1,68 @@
+"""
+Conditional GET helpers (ETag / If-None-Match).
+"""
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request, Response, status
+
+CACHE_CONTROL = "private, no-cache"
+
+# Content codings whose representations get their own strong ETag (see encoded_etag)
+ETAG_ENCODINGS = ("gzip", "br")
+
+
+def make_etag(request: Request, *parts: Any) -> str:
+    """
+    Build a strong ETag for a request from its path, query string and version parts.
+
+    Parts should be cheap version stamps (e.g. table change counters) plus anything
+    else the representation depends on, such as the requesting user.
+    """
+    query = sorted(request.query_params.multi_items())
+    digest = hashlib.blake2b(repr((request.url.path, query, parts)).encode("utf-8"), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    The ETag of the representation compressed with `encoding`.
+
+    A strong ETag promises byte-identical bodies, so each content coding gets
+    its own ("...-gzip", "...-br"); weak ETags are left as they are.
+    """
+    if etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _identity_etag(candidate: str) -> str:
+    """An If-None-Match candidate without the weak prefix and content coding suffix."""
+    if candidate.startswith("W/"):
+        candidate = candidate[2:]
+    for encoding in ETAG_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if candidate.endswith(suffix):
+            return candidate[:-len(suffix)] + '"'
+    return candidate
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Headers that let clients revalidate the representation on every poll."""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the given ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Clients revalidate with the ETag of the encoding they were sent
+    return any(_identity_etag(candidate.strip()) == etag for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 Not Modified response."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
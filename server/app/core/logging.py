@@ -1,23 +1,220 @@
 """
 Logging configuration.
+
+Records are handed to a background writer thread through a bounded queue, so
+logging never blocks the event loop on a slow stdout (a full pipe, a log
+shipper falling behind). The calling thread only filters the record, resolves
+its message and request context and enqueues it; formatting and writing happen
+on the writer thread. When the writer falls so far behind that the queue is
+full, records are dropped rather than waited for, and the number dropped is
+logged once there is room again.
+
+With LOG_FORMAT json (the default outside development), every record is one
+JSON object per line:
+
+    {"timestamp": "...", "level": "INFO", "logger": "app.access",
+     "message": "GET /api/v1/projects/{project_id} 200 12.3ms",
+     "request_id": "...", "endpoint": "GET /api/v1/projects/{project_id}",
+     "method": "GET", "route": "/api/v1/projects/{project_id}", "status": 200, "duration_ms": 12.3}
+
+carrying the id and endpoint of the request being served (see
+app.core.request_context) and any extra= fields of the logging call.
+
+DEBUG records are sampled per call site, so a debug statement in a hot loop
+cannot flood the output: the first LOG_DEBUG_BURST records of each second are
+kept, then LOG_DEBUG_SAMPLE_RATE of the rest. The next record kept from that
+call site says how many were skipped (sampled_out).
 """
+import atexit
 import logging
+import queue
+import random
 import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Tuple
+
 from app.core.config import settings
+from app.core.request_context import current_endpoint, current_request_id
+from app.core.responses import _json_default, dumps
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; any other attribute came from extra= (or a filter)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None))) | {"message", "asctime"}
+
+_stream_handler = logging.StreamHandler(sys.stdout)
+_listener: Optional[QueueListener] = None
+
+
+def _log_default(value: Any) -> Any:
+    try:
+        return _json_default(value)
+    except TypeError:
+        return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return dumps(entry, default=_log_default).decode("utf-8")
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the id and endpoint of the request being served; runs in the thread that logs."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = current_request_id()
+        if request_id is not None:
+            record.request_id = request_id
+            record.endpoint = current_endpoint()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """
+    Per call site, keep the first burst DEBUG records of each second and a rate
+    fraction of the rest.
+
+    Counts are kept without a lock, so under contention they are approximate.
+    """
+
+    def __init__(self, burst: int, rate: float):
+        super().__init__()
+        self.burst = burst
+        self.rate = rate
+        self._sites: Dict[Tuple[str, int], List[float]] = {}  # (pathname, lineno) -> [window start, kept, skipped]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        site = self._sites.get((record.pathname, record.lineno))
+        if site is None:
+            site = self._sites[(record.pathname, record.lineno)] = [record.created, 0, 0]
+        elif record.created - site[0] >= 1:
+            site[0] = record.created
+            site[1] = 0
+        if site[1] < self.burst or random.random() < self.rate:
+            site[1] += 1
+            if site[2]:
+                record.sampled_out = site[2]
+                site[2] = 0
+            return True
+        site[2] += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when its bounded queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0  # Since startup
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve what may change once the call returns (args, the exception
+        # being handled); formatting is left to the writer thread. Not copied:
+        # the record is still fine for other handlers with msg resolved
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self._unreported:
+                self.queue.put_nowait(self._dropped_record())
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "%d log records dropped, the log writer could not keep up", (self._unreported,), None
+        )
+
+
+class _LogWriter(QueueListener):
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._monitor, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail on a full queue; records before it are still written
+        self.queue.put(self._sentinel)
+
+
+def _use_json() -> bool:
+    if settings.LOG_FORMAT == "auto":
+        return settings.ENVIRONMENT != "development"
+    return settings.LOG_FORMAT == "json"
 
 
 def setup_logging():
     """Configure application logging."""
+    global _listener
+    if _listener is not None:
+        return
     log_level = logging.DEBUG if settings.ENVIRONMENT == "development" else logging.INFO
-    
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    
+
+    root = logging.getLogger()
+    if _stream_handler in root.handlers:
+        # Left writing directly by shutdown_logging; queue again
+        root.removeHandler(_stream_handler)
+    _stream_handler.setFormatter(JsonFormatter() if _use_json() else logging.Formatter(TEXT_FORMAT))
+    queue_handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(DebugSampler(settings.LOG_DEBUG_BURST, settings.LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.addFilter(RequestContextFilter())
+
+    logging.basicConfig(level=log_level, handlers=[queue_handler])
+    if queue_handler in root.handlers:
+        _listener = _LogWriter(queue_handler.queue, _stream_handler)
+        _listener.start()
+
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # One line per webhook request otherwise
+
+
+def shutdown_logging():
+    """
+    Write out the queued records and stop the writer thread; records logged
+    afterwards are written directly.
+    """
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, NonBlockingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_stream_handler)
+    _listener.stop()
+    _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,308 @@
+"""
+Per-request performance metrics (Prometheus text format at /metrics).
+
+MetricsMiddleware records, per method and route template (e.g.
+/api/v1/projects/{project_id}, so cardinality stays bounded):
+- request count by status code, and a latency histogram
+- database queries and time spent in them, counted by SQLAlchemy cursor hooks
+  (install_query_metrics) into the request being served
+- response bytes sent (after compression)
+- time spent in external services (OpenAI, S3, SharePoint), measured by
+  wrapping those calls in external_call(); calls made outside a request (the
+  transcription queue) only show up in the per-service histogram
+
+Per-request counters live in a context variable, which run_in_threadpool copies
+into worker threads, so synchronous database work is attributed too. Responses
+slower than the Server-Timing threshold carry a Server-Timing header with the
+same breakdown. WebSocket connections are not measured.
+
+Metrics are kept per process; with several workers, scrape each one.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestMetrics:
+    """Database and external time accumulated while serving one request."""
+
+    __slots__ = ("db_queries", "db_seconds", "external")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.external: Dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+class Histogram:
+    """Cumulative-on-render histogram: per-bucket counts plus sum and count."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> Iterator[str]:
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class RouteStats:
+    __slots__ = ("statuses", "latency", "db_queries", "db_seconds", "response_bytes", "external")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+        self.external: Dict[str, float] = {}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Process-wide metrics store, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._external: Dict[str, Histogram] = {}
+        self._external_errors: Dict[str, int] = {}
+        # Request stats are only touched on the event loop; external calls also come from threads
+        self._lock = threading.Lock()
+
+    def record_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        response_bytes: int,
+        request: RequestMetrics
+    ) -> None:
+        stats = self._routes.get((method, route))
+        if stats is None:
+            stats = self._routes[(method, route)] = RouteStats()
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.latency.observe(seconds)
+        stats.db_queries += request.db_queries
+        stats.db_seconds += request.db_seconds
+        stats.response_bytes += response_bytes
+        for service, elapsed in request.external.items():
+            stats.external[service] = stats.external.get(service, 0.0) + elapsed
+
+    def record_external(self, service: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            histogram = self._external.get(service)
+            if histogram is None:
+                histogram = self._external[service] = Histogram(EXTERNAL_BUCKETS)
+            histogram.observe(seconds)
+            if failed:
+                self._external_errors[service] = self._external_errors.get(service, 0) + 1
+
+    def render(self) -> str:
+        lines: List[str] = []
+        routes = sorted(self._routes.items())
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("http_requests_total", "counter", "HTTP requests served, by route template and status code.")
+        for (method, route), stats in routes:
+            labels = f'method="{method}",route="{_label(route)}"'
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        family("http_request_duration_seconds", "histogram", "Time to serve a request (whole body sent).")
+        for (method, route), stats in routes:
+            lines.extend(stats.latency.lines("http_request_duration_seconds", f'method="{method}",route="{_label(route)}"'))
+
+        for name, attribute, help_text in (
+            ("http_request_db_queries_total", "db_queries", "Database queries issued while serving requests."),
+            ("http_request_db_seconds_total", "db_seconds", "Time spent in database queries while serving requests."),
+            ("http_response_size_bytes_total", "response_bytes", "Response body bytes sent (after compression)."),
+        ):
+            family(name, "counter", help_text)
+            for (method, route), stats in routes:
+                lines.append(f'{name}{{method="{method}",route="{_label(route)}"}} {getattr(stats, attribute)}')
+
+        family("http_request_external_seconds_total", "counter", "Time spent in external services while serving requests.")
+        for (method, route), stats in routes:
+            for service, seconds in sorted(stats.external.items()):
+                lines.append(
+                    f'http_request_external_seconds_total{{method="{method}",route="{_label(route)}",'
+                    f'service="{service}"}} {seconds}'
+                )
+
+        with self._lock:
+            external = sorted(self._external.items())
+            errors = sorted(self._external_errors.items())
+        family("external_call_duration_seconds", "histogram", "External service calls, in and outside requests.")
+        for service, histogram in external:
+            lines.extend(histogram.lines("external_call_duration_seconds", f'service="{service}"'))
+        family("external_call_errors_total", "counter", "External service calls that raised.")
+        for service, count in errors:
+            lines.append(f'external_call_errors_total{{service="{service}"}} {count}')
+
+        lines.append("")
+        return "\n".join(lines)
+
+
+metrics_registry = MetricsRegistry()
+
+
+@contextmanager
+def external_call(service: str) -> Iterator[None]:
+    """Time a call to an external service (openai, s3, sharepoint)."""
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics_registry.record_external(service, elapsed, failed)
+        request = _current.get()
+        if request is not None:
+            request.external[service] = request.external.get(service, 0.0) + elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    request = _current.get()
+    if request is not None:
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            request.db_queries += 1
+            request.db_seconds += time.perf_counter() - started
+
+
+def install_query_metrics(engine: Engine) -> None:
+    """Count queries (and their time) into the request being served."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def uninstall_query_metrics(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(elapsed: float, request: RequestMetrics) -> str:
+    """Server-Timing header value: total, db and each external service, in milliseconds."""
+    parts = [f"app;dur={elapsed * 1000:.1f}"]
+    if request.db_queries:
+        parts.append(f'db;dur={request.db_seconds * 1000:.1f};desc="{request.db_queries} queries"')
+    for service, seconds in request.external.items():
+        parts.append(f"{service};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The matched route's path template, e.g. /api/v1/projects/{project_id}.
+
+    Routes of an included router may only know their own part of the path
+    (/{project_id}); the router prefixes in front of it are static, so they are
+    taken from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    return scope["path"].rsplit("/", template.count("/"))[0] + template
+
+
+class MetricsMiddleware:
+    """
+    Record per-route request metrics into a registry.
+
+    Responses whose headers go out at least server_timing_threshold seconds
+    after the request arrived get a Server-Timing header (None disables it).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: MetricsRegistry = metrics_registry,
+        server_timing_threshold: Optional[float] = 0.5
+    ):
+        self.app = app
+        self.registry = registry
+        self.server_timing_threshold = server_timing_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request = RequestMetrics()
+        token = _current.set(request)
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                threshold = self.server_timing_threshold
+                if threshold is not None:
+                    elapsed = time.perf_counter() - start
+                    if elapsed >= threshold:
+                        MutableHeaders(scope=message).append("Server-Timing", server_timing(elapsed, request))
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self.registry.record_request(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - start,
+                response_bytes,
+                request
+            )
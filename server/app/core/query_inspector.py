@@ -0,0 +1,177 @@
+"""
+Per-request query inspection: N+1 detection and query budgets.
+
+While a request is inspected, every statement sent to the database is recorded
+by its shape (the SQL with parameters, IN-lists and literals collapsed), so the
+same lookup issued once per row shows up as one shape repeated many times.
+
+Endpoints declare how many statements a request may issue with @query_budget;
+QueryInspectorMiddleware reports requests over budget and repeated shapes
+(logged as warnings; enabled with QUERY_INSPECTOR_ENABLED in development), and
+tests/test_query_budgets.py exercises every endpoint and fails when one goes
+over its budget or repeats a statement. Budgets are counted on SQLite, so
+PostgreSQL-only paths (advisory locks, dialect-specific upserts) are not
+covered by them.
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.compiler import InsertmanyvaluesSentinelOpts
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ATTRIBUTE = "query_budget"
+
+_PLACEHOLDER = re.compile(r"%\([^)]*\)s|%s|:\w+|\$\d+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with parameters, IN-lists and literals replaced by ?."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryReport:
+    """Statements issued while one request (or block of code) was inspected."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.closed = False
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def record(self, statement: str, unbatched_insert: bool = False) -> None:
+        # Tasks started by the request keep its context after it finished
+        if self.closed:
+            return
+        if unbatched_insert and self.statements and self.statements[-1] == statement:
+            return
+        self.statements.append(statement)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes issued at least threshold times, most frequent first."""
+        shapes = Counter(statement_shape(statement) for statement in self.statements)
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+_current: ContextVar[Optional[QueryReport]] = ContextVar("query_report", default=None)
+
+
+@contextmanager
+def inspect_queries() -> Iterator[QueryReport]:
+    """Record the statements issued inside the block (needs install_query_inspector)."""
+    report = QueryReport()
+    token = _current.set(report)
+    try:
+        yield report
+    finally:
+        report.closed = True
+        _current.reset(token)
+
+
+def _unbatched_insert(context) -> bool:
+    # The ORM flushes new rows as one multi-row INSERT .. RETURNING, except on
+    # dialects that cannot match the returned rows to their parameters (SQLite),
+    # which get one INSERT per row; count those as the one statement they are
+    # on PostgreSQL
+    return bool(context is not None and context.isinsert and not (
+        context.dialect.insertmanyvalues_implicit_sentinel & InsertmanyvaluesSentinelOpts.ANY_AUTOINCREMENT
+    ))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    report = _current.get()
+    if report is not None:
+        report.record(statement, _unbatched_insert(context))
+
+
+def install_query_inspector(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def uninstall_query_inspector(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def query_budget(queries: Optional[int]) -> Callable:
+    """
+    Declare the most statements one request to this endpoint may issue.
+
+    None declares an endpoint without a budget (long-lived streams, whose query
+    count grows with how long they stay open).
+    """
+    def decorate(endpoint: Callable) -> Callable:
+        setattr(endpoint, QUERY_BUDGET_ATTRIBUTE, queries)
+        return endpoint
+    return decorate
+
+
+def has_query_budget(endpoint: Callable) -> bool:
+    return hasattr(endpoint, QUERY_BUDGET_ATTRIBUTE)
+
+
+def get_query_budget(endpoint: Callable) -> Optional[int]:
+    return getattr(endpoint, QUERY_BUDGET_ATTRIBUTE, None)
+
+
+def find_problems(report: QueryReport, budget: Optional[int], repeat_threshold: int) -> List[str]:
+    """Budget overrun and repeated statement shapes of one request, as messages."""
+    problems = []
+    if budget is not None and report.count > budget:
+        problems.append(f"{report.count} queries, budget is {budget}")
+    for shape, count in report.repeated(repeat_threshold):
+        problems.append(f"same statement {count} times (N+1?): {shape}")
+    return problems
+
+
+def log_problems(method: str, route: str, report: QueryReport, problems: List[str]) -> None:
+    for problem in problems:
+        logger.warning(f"{method} {route}: {problem}")
+
+
+class QueryInspectorMiddleware:
+    """
+    Inspect the queries of each HTTP request and report budget overruns and
+    repeated statements to reporter(method, route, report, problems).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        repeat_threshold: int = 5,
+        reporter: Callable[[str, str, QueryReport, List[str]], None] = log_problems
+    ):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.reporter = reporter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with inspect_queries() as report:
+            await self.app(scope, receive, send)
+
+        budget = get_query_budget(getattr(scope.get("route"), "endpoint", None))
+        problems = find_problems(report, budget, self.repeat_threshold)
+        if problems:
+            self.reporter(scope["method"], route_template(scope), report, problems)
@@ -0,0 +1,92 @@
+"""
+The HTTP request being served, for code that runs far from the endpoint
+(database hooks, logging) and needs to say which request it was for.
+
+RequestContextMiddleware keeps the ASGI scope and a request id in context
+variables, which run_in_threadpool and tasks started by the request inherit.
+The request id is taken from the X-Request-ID header when the caller (or a
+proxy in front) sent a usable one, generated otherwise, and returned in the
+X-Request-ID response header. With access_log, the middleware also logs one
+record per request (logger app.access) with its method, route, status and
+duration.
+"""
+import logging
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import route_template
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_REQUEST_ID_HEADER_KEY = REQUEST_ID_HEADER.lower().encode("latin-1")
+_VALID_REQUEST_ID = re.compile(rb"[A-Za-z0-9._:-]{1,64}")
+
+access_logger = logging.getLogger("app.access")
+
+_current_scope: ContextVar[Optional[Scope]] = ContextVar("request_scope", default=None)
+_current_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def current_endpoint() -> Optional[str]:
+    """Method and route template of the request being served, e.g. GET /api/v1/projects/{project_id}."""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    return f"{scope['method']} {route_template(scope)}"
+
+
+def current_request_id() -> Optional[str]:
+    """Id of the request being served (its X-Request-ID)."""
+    return _current_request_id.get()
+
+
+def _request_id(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == _REQUEST_ID_HEADER_KEY:
+            if _VALID_REQUEST_ID.fullmatch(value):
+                return value.decode("latin-1")
+            break
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp, access_log: bool = False):
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        scope_token = _current_scope.set(scope)
+        request_id_token = _current_request_id.set(request_id)
+        started = time.perf_counter()
+        status = 500  # Unless a response started
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if self.access_log:
+                duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                route = route_template(scope)
+                access_logger.info(
+                    "%s %s %s %.1fms", scope["method"], route, status, duration_ms,
+                    extra={"method": scope["method"], "route": route, "status": status, "duration_ms": duration_ms}
+                )
+            _current_request_id.reset(request_id_token)
+            _current_scope.reset(scope_token)
@@ -0,0 +1,54 @@
+"""
+Fast JSON response rendering.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Callable
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the JSON encoders do not handle natively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, datetime):
+        # Match Pydantic's output for UTC timestamps
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any, default: Callable[[Any], Any] = _json_default) -> bytes:
+    """Serialize content to JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        default=default,
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for trusted, already-shaped data.
+
+    Returning this from an endpoint bypasses FastAPI's response_model validation,
+    so content must already match the declared response schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return dumps(content)
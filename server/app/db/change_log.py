@@ -0,0 +1,347 @@
+"""
+Change data capture log.
+
+Every insert, update and delete on clients, projects, project statuses and
+transcriptions appends an entry to change_log in the same transaction as the
+change, numbered from the counter in change_log_state. The counter row stays
+locked until the transaction commits, so sequence numbers become visible in
+order and without gaps: a consumer that has read everything up to N never
+misses an entry below N that commits later. (This serializes writers to the
+captured tables, much as table_versions already serializes writers per table.)
+
+The lock is held from a transaction's first logged change until it commits,
+so the longest hold is that of the largest write transaction: a bulk import.
+Bulk paths therefore commit in chunks (INGEST_CHUNK_SIZE status rows,
+PROVISIONING_CHUNK_SIZE clients or projects), bounding the wait of other
+writers to one chunk; only atomic status imports hold it for a whole batch.
+
+ORM flushes are captured by a session listener; Core bulk paths call
+record_row_changes() themselves, as they do for the other derived tables.
+
+Old entries are maintained a segment (SEGMENT_SIZE sequence numbers) at a time:
+- compaction drops entries superseded by a later entry for the same row, so a
+  consumer catching up reaches the same final state through fewer entries
+- retention drops whole segments once they are past the retention period;
+  consumers behind the truncation point have to re-read the tables
+"""
+import asyncio
+import enum
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+from starlette.concurrency import run_in_threadpool
+
+from app.db.models.change_log import ChangeLogEntry, ChangeLogState, ChangeOperation
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.db.models.transcription import Transcription
+
+logger = logging.getLogger(__name__)
+
+# Parents first: inserts and updates are logged in this order, deletes in reverse
+CAPTURED_TABLES = ("clients", "projects", "project_statuses", "transcriptions")
+_captured = {model.__tablename__: model.__table__ for model in (Client, Project, ProjectStatus, Transcription)}
+
+# Large bodies stay out of the log (consumers fetch them through the API), and so
+# does lease bookkeeping
+EXCLUDED_COLUMNS = {"transcriptions": frozenset({"raw_text", "lease_expires_at"})}
+
+SEGMENT_SIZE = 10000
+STATE_ID = 1
+
+# Dialects whose insert() supports ON CONFLICT DO NOTHING
+_IDEMPOTENT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Session.info key holding the last sequence number logged by the current transaction
+CHANGE_LOG_HEAD_KEY = "change_log_head"
+
+log_table = ChangeLogEntry.__table__
+state_table = ChangeLogState.__table__
+
+# (table name, operation, row id, row data or None for deletes)
+Change = Tuple[str, str, int, Optional[Dict[str, Any]]]
+
+_change_listeners: List[Callable[[int], None]] = []
+
+
+class ChangeLogBounds(NamedTuple):
+    last_seq: int
+    compacted_through: int
+    truncated_through: int
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def row_changes(connection: Connection, table_name: str, operation: ChangeOperation, row_ids: Iterable[int]) -> List[Change]:
+    """Log entries for the given rows, with their current values unless deleted."""
+    ids = sorted(set(row_ids))
+    if not ids:
+        return []
+    if operation == ChangeOperation.DELETE:
+        return [(table_name, operation.value, row_id, None) for row_id in ids]
+    table = _captured[table_name]
+    excluded = EXCLUDED_COLUMNS.get(table_name, ())
+    columns = [column for column in table.columns if column.name not in excluded]
+    rows = connection.execute(select(*columns).where(table.c.id.in_(ids)).order_by(table.c.id)).mappings()
+    return [
+        (table_name, operation.value, row["id"], {key: _jsonable(value) for key, value in row.items()})
+        for row in rows
+    ]
+
+
+def create_state_row(connection: Connection) -> None:
+    """
+    Insert the counter row unless it exists. The migration and create_all() add
+    it with the table; writers racing to recreate a missing one insert it once.
+    """
+    values = {"id": STATE_ID, "last_seq": 0, "compacted_through": 0, "truncated_through": 0}
+    dialect_insert = _IDEMPOTENT_INSERTS.get(connection.dialect.name)
+    if dialect_insert is None:
+        connection.execute(insert(state_table).values(**values))
+    else:
+        connection.execute(dialect_insert(state_table).values(**values).on_conflict_do_nothing(index_elements=["id"]))
+
+
+@event.listens_for(state_table, "after_create")
+def _create_state_row_with_table(target, connection: Connection, **kw) -> None:
+    create_state_row(connection)
+
+
+def allocate_sequence(connection: Connection, count: int) -> int:
+    """Reserve count sequence numbers and return the first; the counter stays locked until commit."""
+    increment = (
+        update(state_table)
+        .where(state_table.c.id == STATE_ID)
+        .values(last_seq=state_table.c.last_seq + count)
+    )
+    if connection.execute(increment).rowcount == 0:
+        # Waits for a concurrent writer's insert to commit, then increments the row it created
+        create_state_row(connection)
+        connection.execute(increment)
+    last_seq = connection.execute(select(state_table.c.last_seq).where(state_table.c.id == STATE_ID)).scalar_one()
+    return last_seq - count + 1
+
+
+def record_changes(connection: Connection, changes: List[Change]) -> Optional[int]:
+    """Append changes to the log; returns the last sequence number used."""
+    if not changes:
+        return None
+    first = allocate_sequence(connection, len(changes))
+    connection.execute(insert(log_table), [
+        {"seq": first + offset, "table_name": table_name, "row_id": row_id, "operation": operation, "data": data}
+        for offset, (table_name, operation, row_id, data) in enumerate(changes)
+    ])
+    return first + len(changes) - 1
+
+
+def record_session_changes(session: Session, changes: List[Change]) -> None:
+    """record_changes() in a session's transaction; listeners are notified when it commits."""
+    last_seq = record_changes(session.connection(), changes)
+    if last_seq is not None:
+        session.info[CHANGE_LOG_HEAD_KEY] = last_seq
+
+
+def record_row_changes(session: Session, table_name: str, operation: ChangeOperation, row_ids: Iterable[int]) -> None:
+    """Log rows written by Core statements, as the flush listener does for ORM writes."""
+    record_session_changes(session, row_changes(session.connection(), table_name, operation, row_ids))
+
+
+def add_change_listener(listener: Callable[[int], None]) -> None:
+    """Call listener with the new head sequence number after every commit that logged changes."""
+    _change_listeners.append(listener)
+
+
+def _row_id(obj) -> Optional[int]:
+    state = attributes.instance_state(obj)
+    if state.key is not None:
+        return state.key[1][0]
+    # Inserted by this flush: the key is only assigned once the flush finishes
+    return state.dict.get("id")
+
+
+def _flush_changes(session: Session) -> List[Change]:
+    ids: Dict[Tuple[str, ChangeOperation], set] = defaultdict(set)
+    for operation, objects in (
+        (ChangeOperation.INSERT, session.new),
+        (ChangeOperation.UPDATE, session.dirty),
+        (ChangeOperation.DELETE, session.deleted),
+    ):
+        for obj in objects:
+            table = getattr(obj, "__table__", None)
+            if table is None or table.name not in _captured:
+                continue
+            if operation == ChangeOperation.UPDATE and not session.is_modified(obj, include_collections=False):
+                continue
+            row_id = _row_id(obj)
+            if row_id is not None:
+                ids[(table.name, operation)].add(row_id)
+    if not ids:
+        return []
+
+    connection = session.connection()
+    return list(chain(
+        chain.from_iterable(
+            row_changes(connection, table_name, operation, ids.get((table_name, operation), ()))
+            for table_name in CAPTURED_TABLES
+            for operation in (ChangeOperation.INSERT, ChangeOperation.UPDATE)
+        ),
+        chain.from_iterable(
+            row_changes(connection, table_name, ChangeOperation.DELETE, ids.get((table_name, ChangeOperation.DELETE), ()))
+            for table_name in reversed(CAPTURED_TABLES)
+        ),
+    ))
+
+
+@event.listens_for(Session, "after_flush")
+def _log_changes_after_flush(session: Session, flush_context) -> None:
+    """Append an entry for every captured row this flush inserted, updated or deleted."""
+    changes = _flush_changes(session)
+    if changes:
+        record_session_changes(session, changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_change_listeners(session: Session) -> None:
+    last_seq = session.info.pop(CHANGE_LOG_HEAD_KEY, None)
+    if last_seq is None:
+        return
+    for listener in _change_listeners:
+        try:
+            listener(last_seq)
+        except Exception as e:
+            # The transaction is committed; a listener failure must not surface as a write error
+            logger.error(f"Change log listener failed: {str(e)}", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_change_head(session: Session) -> None:
+    session.info.pop(CHANGE_LOG_HEAD_KEY, None)
+
+
+def get_change_log_bounds(connection: Connection) -> ChangeLogBounds:
+    """Head sequence number and maintenance watermarks (all 0 before the first change)."""
+    row = connection.execute(
+        select(state_table.c.last_seq, state_table.c.compacted_through, state_table.c.truncated_through)
+        .where(state_table.c.id == STATE_ID)
+    ).first()
+    return ChangeLogBounds(*row) if row is not None else ChangeLogBounds(0, 0, 0)
+
+
+def _segment_newest(connection: Connection, start: int, end: int) -> Optional[datetime]:
+    newest = connection.execute(
+        select(func.max(log_table.c.changed_at)).where(log_table.c.seq > start, log_table.c.seq <= end)
+    ).scalar()
+    if newest is None:
+        return None
+    # SQLite returns naive datetimes, stored as UTC (not app.db.health_trends.as_utc:
+    # that module imports the models, which import this one)
+    return newest.replace(tzinfo=timezone.utc) if newest.tzinfo is None else newest.astimezone(timezone.utc)
+
+
+def compact_segment(connection: Connection, start: int, end: int) -> int:
+    """Delete entries in (start, end] superseded by a later entry for the same row."""
+    later = log_table.alias("later")
+    superseded = (
+        select(later.c.seq)
+        .where(
+            later.c.table_name == log_table.c.table_name,
+            later.c.row_id == log_table.c.row_id,
+            later.c.seq > log_table.c.seq
+        )
+        .exists()
+    )
+    return connection.execute(
+        delete(log_table).where(log_table.c.seq > start, log_table.c.seq <= end, superseded)
+    ).rowcount
+
+
+def maintain_change_log(
+    session_factory,
+    compact_after: timedelta,
+    retain_for: timedelta,
+    segment_size: int = SEGMENT_SIZE
+) -> Tuple[int, int]:
+    """
+    Expire segments past retention, then compact segments older than
+    compact_after. Each segment is handled in its own short transaction.
+    Returns (entries removed by compaction, entries expired).
+    """
+    now = datetime.now(timezone.utc)
+    expired = 0
+    compacted = 0
+
+    while True:
+        with session_factory() as db:
+            connection = db.connection()
+            bounds = get_change_log_bounds(connection)
+            start = bounds.truncated_through
+            end = start + segment_size
+            newest = _segment_newest(connection, start, end)
+            # The open segment is never dropped
+            if end > bounds.last_seq or (newest is not None and newest > now - retain_for):
+                break
+            expired += connection.execute(
+                delete(log_table).where(log_table.c.seq > start, log_table.c.seq <= end)
+            ).rowcount
+            connection.execute(
+                update(state_table)
+                .where(state_table.c.id == STATE_ID, state_table.c.truncated_through == start)
+                .values(truncated_through=end, compacted_through=max(bounds.compacted_through, end))
+            )
+            db.commit()
+
+    while True:
+        with session_factory() as db:
+            connection = db.connection()
+            bounds = get_change_log_bounds(connection)
+            start = max(bounds.compacted_through, bounds.truncated_through)
+            end = start + segment_size
+            newest = _segment_newest(connection, start, end)
+            if end > bounds.last_seq or (newest is not None and newest > now - compact_after):
+                break
+            compacted += compact_segment(connection, start, end)
+            connection.execute(
+                update(state_table)
+                .where(state_table.c.id == STATE_ID, state_table.c.compacted_through == bounds.compacted_through)
+                .values(compacted_through=end)
+            )
+            db.commit()
+
+    return compacted, expired
+
+
+async def run_periodic_change_log_maintenance(
+    session_factory,
+    interval_seconds: int,
+    compact_after: timedelta,
+    retain_for: timedelta
+) -> None:
+    """Compact and expire old change log segments now and then every interval_seconds."""
+    while True:
+        try:
+            compacted, expired = await run_in_threadpool(maintain_change_log, session_factory, compact_after, retain_for)
+            if compacted or expired:
+                logger.info("Change log maintenance removed %s superseded and %s expired entries", compacted, expired)
+        except Exception as e:
+            logger.error(f"Change log maintenance failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,54 @@
+"""
+Per-table change counters.
+
+Every flush that inserts, updates or deletes rows in a tracked table bumps that
+table's counter in the same transaction, so readers can get a cheap version
+stamp (for ETags or cache keys) without scanning the table itself.
+"""
+from itertools import chain
+from typing import Dict, Iterable
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.db.models.table_version import TableVersion
+
+TRACKED_TABLES = frozenset({"users", "clients", "projects", "project_statuses", "transcriptions"})
+
+
+def bump_table_versions(connection: Connection, table_names: Iterable[str]) -> None:
+    """Increment the change counter of each given table."""
+    # Sorted so concurrent writers always lock counter rows in the same order
+    for table_name in sorted(set(table_names) & TRACKED_TABLES):
+        result = connection.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name == table_name)
+            .values(version=TableVersion.version + 1, updated_at=func.now())
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(TableVersion).values(table_name=table_name, version=1))
+
+
+def get_table_versions(db: Session, table_names: Iterable[str]) -> Dict[str, int]:
+    """Get the current change counter of each given table (0 if never written)."""
+    names = sorted(table_names)
+    rows = db.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(names))
+    ).all()
+    versions = {name: 0 for name in names}
+    versions.update({name: version for name, version in rows})
+    return versions
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_after_flush(session: Session, flush_context) -> None:
+    """Bump counters for every tracked table touched by this flush."""
+    table_names = {
+        obj.__table__.name
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if getattr(obj, "__table__", None) is not None and obj.__table__.name in TRACKED_TABLES
+    }
+    if table_names:
+        bump_table_versions(session.connection(), table_names)
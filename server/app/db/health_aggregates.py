@@ -0,0 +1,387 @@
+"""
+Incremental project health aggregates.
+
+Every flush that touches projects or project statuses re-derives the latest
+status of the affected projects, diffs it against project_current_statuses and
+applies the difference (old health contribution out, new one in) to the
+per-client counters in client_health_aggregates, in the same transaction.
+Reports can then read overall and per-client counts in O(clients).
+
+Changed current rows are also handed to health change writers (such as the
+webhook outbox) inside the transaction that produced them, and to health change
+listeners (such as the live dashboard feed) once that transaction commits.
+
+verify_health_aggregates() recomputes everything from scratch to detect drift,
+and rebuild_health_aggregates() repairs it.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, delete, event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+from starlette.concurrency import run_in_threadpool
+
+from app.db.models.client_health_aggregate import ClientHealthAggregate
+from app.db.models.project import Project
+from app.db.models.project_current_status import ProjectCurrentStatus
+from app.db.models.project_status import ProjectStatus
+from app.utils.project_status_utils import calculate_project_health_status
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = (
+    "total_projects",
+    "healthy_projects",
+    "at_risk_projects",
+    "critical_projects",
+    "no_status_projects",
+    "scope_compliant",
+    "time_compliant",
+    "budget_compliant",
+)
+
+# Current-row fields that determine a project's contribution
+COMPARED_FIELDS = ("client_id", "status_id", "is_on_scope", "is_on_time", "is_on_budget", "health_status", "has_status")
+
+Contribution = Tuple[int, ...]
+ZERO = (0,) * len(COUNTER_FIELDS)
+
+# Session.info key collecting the health changes of the current transaction
+HEALTH_CHANGES_KEY = "health_changes"
+
+
+class HealthChange(NamedTuple):
+    """A project's current row before and after a write (current is None once the project is gone)."""
+    previous_client_id: Optional[int]
+    current: Optional[Dict]
+    previous_health_status: Optional[str] = None  # None when the project had no status yet
+
+
+HealthChanges = Dict[int, HealthChange]
+_health_change_writers: List[Callable[[Session, HealthChanges], None]] = []
+_health_change_listeners: List[Callable[[HealthChanges], None]] = []
+
+current_table = ProjectCurrentStatus.__table__
+aggregate_table = ClientHealthAggregate.__table__
+
+UPDATED_FIELDS = COMPARED_FIELDS + ("status_updated_at",)
+
+_update_current_statement = (
+    update(current_table)
+    .where(current_table.c.project_id == bindparam("_project_id"))
+    .values({field: bindparam(field) for field in UPDATED_FIELDS})
+)
+
+_add_to_aggregate_statement = (
+    update(aggregate_table)
+    .where(aggregate_table.c.client_id == bindparam("_client_id"))
+    .values({field: aggregate_table.c[field] + bindparam(f"_{field}") for field in COUNTER_FIELDS})
+)
+
+
+def _aggregate_increments(client_id: int, counters: List[int]) -> Dict:
+    return {"_client_id": client_id, **{f"_{field}": value for field, value in zip(COUNTER_FIELDS, counters)}}
+
+
+def project_contribution(health_status: str, has_status: bool, is_on_scope, is_on_time, is_on_budget) -> Contribution:
+    """Counter increments a single project adds to its client's aggregate."""
+    return (
+        1,
+        int(health_status == "green"),
+        int(health_status == "yellow"),
+        int(health_status == "red"),
+        int(not has_status),
+        int(is_on_scope is True),
+        int(is_on_time is True),
+        int(is_on_budget is True),
+    )
+
+
+def _row_contribution(row) -> Contribution:
+    return project_contribution(row.health_status, row.has_status, row.is_on_scope, row.is_on_time, row.is_on_budget)
+
+
+def latest_status_query(project_ids: Optional[Iterable[int]] = None):
+    """Select the latest status row per project (ties broken by highest id)."""
+    rank = func.row_number().over(
+        partition_by=ProjectStatus.project_id,
+        order_by=(ProjectStatus.updated_at.desc(), ProjectStatus.id.desc())
+    ).label("rank")
+    ranked = select(
+        ProjectStatus.project_id,
+        ProjectStatus.id,
+        ProjectStatus.is_on_scope,
+        ProjectStatus.is_on_time,
+        ProjectStatus.is_on_budget,
+        ProjectStatus.updated_at,
+        rank
+    )
+    if project_ids is not None:
+        ranked = ranked.where(ProjectStatus.project_id.in_(list(project_ids)))
+    ranked = ranked.subquery()
+    return select(ranked).where(ranked.c.rank == 1)
+
+
+def _current_values(project_id: int, client_id: int, status) -> Dict:
+    """Build a project_current_statuses row from a latest-status row (or None)."""
+    flags = {
+        "is_on_scope": status.is_on_scope if status is not None else None,
+        "is_on_time": status.is_on_time if status is not None else None,
+        "is_on_budget": status.is_on_budget if status is not None else None,
+    }
+    return {
+        "project_id": project_id,
+        "client_id": client_id,
+        "status_id": status.id if status is not None else None,
+        **flags,
+        "health_status": calculate_project_health_status(flags),
+        "has_status": status is not None,
+        "status_updated_at": status.updated_at if status is not None else None,
+    }
+
+
+def _add(deltas: Dict[int, List[int]], client_id: int, contribution: Contribution, sign: int) -> None:
+    counters = deltas[client_id]
+    for index, value in enumerate(contribution):
+        counters[index] += sign * value
+
+
+def _apply_deltas(connection: Connection, deltas: Dict[int, List[int]]) -> None:
+    # Sorted so concurrent writers always lock aggregate rows in the same order
+    changed = [(client_id, deltas[client_id]) for client_id in sorted(deltas) if any(deltas[client_id])]
+    if len(changed) == 1:
+        client_id, counters = changed[0]
+        result = connection.execute(_add_to_aggregate_statement, _aggregate_increments(client_id, counters))
+        if result.rowcount == 0:
+            connection.execute(insert(aggregate_table).values(client_id=client_id, **dict(zip(COUNTER_FIELDS, counters))))
+    elif changed:
+        # Bulk writes touch many clients: one statement for the existing rows and
+        # one for new ones (executemany row counts are unreliable, so look first)
+        existing = set(connection.execute(
+            select(aggregate_table.c.client_id).where(aggregate_table.c.client_id.in_([c for c, _ in changed]))
+        ).scalars())
+        updates = [_aggregate_increments(c, counters) for c, counters in changed if c in existing]
+        if updates:
+            connection.execute(_add_to_aggregate_statement, updates)
+        inserts = [
+            {"client_id": c, **dict(zip(COUNTER_FIELDS, counters))} for c, counters in changed if c not in existing
+        ]
+        if inserts:
+            connection.execute(insert(aggregate_table), inserts)
+
+
+def refresh_project_health(connection: Connection, project_ids: Iterable[int]) -> HealthChanges:
+    """Reconcile current status rows and client aggregates for the given projects; returns what changed."""
+    ids = sorted(set(project_ids))
+    if not ids:
+        return {}
+
+    # Lock existing current rows so concurrent writers to the same project serialize
+    current = {
+        row.project_id: row
+        for row in connection.execute(
+            select(current_table).where(current_table.c.project_id.in_(ids)).with_for_update()
+        )
+    }
+    clients = dict(connection.execute(select(Project.id, Project.client_id).where(Project.id.in_(ids))).all())
+    latest = {row.project_id: row for row in connection.execute(latest_status_query(ids))}
+
+    deltas: Dict[int, List[int]] = defaultdict(lambda: list(ZERO))
+    inserts: List[Dict] = []
+    updates: List[Dict] = []
+    deletes: List[int] = []
+    changes: HealthChanges = {}
+    for project_id in ids:
+        old = current.get(project_id)
+        old_health = None
+        if old is not None:
+            _add(deltas, old.client_id, _row_contribution(old), -1)
+            old_health = old.health_status if old.has_status else None
+
+        if project_id not in clients:
+            if old is not None:
+                deletes.append(project_id)
+                changes[project_id] = HealthChange(old.client_id, None, old_health)
+            continue
+
+        values = _current_values(project_id, clients[project_id], latest.get(project_id))
+        _add(deltas, values["client_id"], project_contribution(
+            values["health_status"], values["has_status"],
+            values["is_on_scope"], values["is_on_time"], values["is_on_budget"]
+        ), 1)
+        if old is None:
+            inserts.append(values)
+            changes[project_id] = HealthChange(None, values)
+        elif any(getattr(old, field) != values[field] for field in UPDATED_FIELDS):
+            updates.append({**values, "_project_id": project_id})
+            changes[project_id] = HealthChange(old.client_id, values, old_health)
+
+    # One statement per kind (executemany), not one per project
+    if deletes:
+        connection.execute(delete(current_table).where(current_table.c.project_id.in_(deletes)))
+    if inserts:
+        connection.execute(insert(current_table), inserts)
+    if updates:
+        connection.execute(_update_current_statement, updates)
+
+    _apply_deltas(connection, deltas)
+    return changes
+
+
+def refresh_session_project_health(session: Session, project_ids: Iterable[int]) -> None:
+    """
+    refresh_project_health() in a session's transaction. Writers see each
+    batch of changes right away; listeners are notified when it commits.
+    """
+    changes = refresh_project_health(session.connection(), project_ids)
+    if not changes:
+        return
+    for writer in _health_change_writers:
+        writer(session, changes)
+    pending = session.info.setdefault(HEALTH_CHANGES_KEY, {})
+    for project_id, change in changes.items():
+        earlier = pending.get(project_id)
+        if earlier is not None:
+            # Listeners get the state before the transaction, not before its last flush
+            change = HealthChange(earlier.previous_client_id, change.current, earlier.previous_health_status)
+        pending[project_id] = change
+
+
+def add_health_change_writer(writer: Callable[[Session, HealthChanges], None]) -> None:
+    """Call writer with every batch of health changes, inside the transaction making them."""
+    _health_change_writers.append(writer)
+
+
+def add_health_change_listener(listener: Callable[[HealthChanges], None]) -> None:
+    """Call listener with the health changes of every committed transaction."""
+    _health_change_listeners.append(listener)
+
+
+def _affected_project_ids(session: Session) -> Set[int]:
+    project_ids: Set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, ProjectStatus):
+            history = attributes.get_history(obj, "project_id")
+            project_ids.update(pid for pid in chain([obj.project_id], history.deleted) if pid is not None)
+        elif isinstance(obj, Project):
+            history = attributes.get_history(obj, "client_id")
+            if obj in session.new or obj in session.deleted or history.has_changes():
+                if obj.id is not None:
+                    project_ids.add(obj.id)
+    return project_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_health_after_flush(session: Session, flush_context) -> None:
+    """Apply health deltas for every project touched by this flush."""
+    project_ids = _affected_project_ids(session)
+    if project_ids:
+        refresh_session_project_health(session, project_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_health_changes(session: Session) -> None:
+    changes = session.info.pop(HEALTH_CHANGES_KEY, None)
+    if not changes:
+        return
+    for listener in _health_change_listeners:
+        try:
+            listener(changes)
+        except Exception as e:
+            # The transaction is committed; a listener failure must not surface as a write error
+            logger.error(f"Health change listener failed: {str(e)}", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_health_changes(session: Session) -> None:
+    session.info.pop(HEALTH_CHANGES_KEY, None)
+
+
+def compute_health_aggregates(connection: Connection) -> Tuple[Dict[int, Dict], Dict[int, Contribution]]:
+    """Recompute current status rows and client aggregates from scratch."""
+    latest = {row.project_id: row for row in connection.execute(latest_status_query())}
+    current: Dict[int, Dict] = {}
+    aggregates: Dict[int, List[int]] = defaultdict(lambda: list(ZERO))
+    for project_id, client_id in connection.execute(select(Project.id, Project.client_id)):
+        values = _current_values(project_id, client_id, latest.get(project_id))
+        current[project_id] = values
+        _add(aggregates, client_id, project_contribution(
+            values["health_status"], values["has_status"],
+            values["is_on_scope"], values["is_on_time"], values["is_on_budget"]
+        ), 1)
+    return current, {client_id: tuple(counters) for client_id, counters in aggregates.items()}
+
+
+def verify_health_aggregates(connection: Connection) -> List[str]:
+    """Compare stored aggregates against a full recompute and describe any drift."""
+    expected_current, expected_aggregates = compute_health_aggregates(connection)
+    drift: List[str] = []
+
+    stored_current = {row.project_id: row for row in connection.execute(select(current_table))}
+    for project_id in sorted(set(expected_current) | set(stored_current)):
+        expected = expected_current.get(project_id)
+        stored = stored_current.get(project_id)
+        if expected is None or stored is None:
+            drift.append(f"project {project_id}: current row {'missing' if stored is None else 'orphaned'}")
+        elif any(getattr(stored, field) != expected[field] for field in COMPARED_FIELDS):
+            drift.append(f"project {project_id}: current row out of date")
+
+    stored_aggregates = {
+        row.client_id: tuple(row[field] for field in COUNTER_FIELDS)
+        for row in connection.execute(select(aggregate_table)).mappings()
+    }
+    for client_id in sorted(set(expected_aggregates) | set(stored_aggregates)):
+        expected = expected_aggregates.get(client_id, ZERO)
+        stored = stored_aggregates.get(client_id, ZERO)
+        if expected != stored:
+            drift.append(f"client {client_id}: expected {expected}, stored {stored}")
+
+    return drift
+
+
+def rebuild_health_aggregates(connection: Connection) -> None:
+    """Replace current status rows and client aggregates with a full recompute."""
+    if connection.dialect.name == "postgresql":
+        # Writers lock current rows FOR UPDATE, so they wait for the rebuild to commit
+        connection.exec_driver_sql(
+            "LOCK TABLE project_current_statuses, client_health_aggregates IN EXCLUSIVE MODE"
+        )
+    current, aggregates = compute_health_aggregates(connection)
+    connection.execute(delete(current_table))
+    connection.execute(delete(aggregate_table))
+    if current:
+        connection.execute(insert(current_table), list(current.values()))
+    if aggregates:
+        connection.execute(insert(aggregate_table), [
+            {"client_id": client_id, **dict(zip(COUNTER_FIELDS, counters))}
+            for client_id, counters in aggregates.items()
+        ])
+
+
+def verify_and_repair_health_aggregates(session_factory) -> int:
+    """Detect drift with a full recompute, log it and rebuild; returns the drift count."""
+    with session_factory() as db:
+        drift = verify_health_aggregates(db.connection())
+        if drift:
+            logger.warning(
+                f"Health aggregate drift detected ({len(drift)} differences); rebuilding. "
+                f"First differences: {drift[:5]}"
+            )
+            rebuild_health_aggregates(db.connection())
+            db.commit()
+        return len(drift)
+
+
+async def run_periodic_verifier(session_factory, interval_seconds: int) -> None:
+    """Verify (and repair) health aggregates now and then every interval_seconds."""
+    while True:
+        try:
+            drift = await run_in_threadpool(verify_and_repair_health_aggregates, session_factory)
+            logger.info("Health aggregate verification finished with %s differences", drift)
+        except Exception as e:
+            logger.error(f"Health aggregate verification failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
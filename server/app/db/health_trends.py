@@ -0,0 +1,85 @@
+"""
+Invalidation of health trend rollups.
+
+Closed weekly buckets in health_trend_rollups are immutable unless history
+changes underneath them: an existing status is edited or deleted, or a project
+is deleted or moved to another client. Each such flush appends a marker to
+health_trend_invalidations with the earliest affected bucket; reads compute
+buckets from there live until the trend service's periodic refresh consumes the
+marker and recomputes the stored rollups. New statuses only affect the open
+bucket, which is always computed live, so they need no marker.
+"""
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+
+from app.db.models.health_trend_rollup import HealthTrendInvalidation
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+
+BUCKET_SIZE = timedelta(weeks=1)
+EPOCH = datetime(1970, 1, 5, tzinfo=timezone.utc)  # A Monday, before any data
+
+# Status fields whose changes alter historical health counts
+TREND_STATUS_FIELDS = ("project_id", "is_on_scope", "is_on_time", "is_on_budget", "updated_at")
+
+
+def as_utc(value: datetime) -> datetime:
+    """Interpret naive datetimes as UTC and convert aware ones to UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def week_start(value: datetime) -> datetime:
+    """Start (Monday 00:00 UTC) of the weekly bucket containing value."""
+    value = as_utc(value)
+    start = value - timedelta(days=value.weekday())
+    return start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _history(obj, field: str):
+    # Never load expired attributes here: the row may already be deleted
+    return attributes.get_history(obj, field, passive=attributes.PASSIVE_NO_INITIALIZE)
+
+
+def _history_values(obj, field: str) -> List:
+    history = _history(obj, field)
+    return [value for value in chain(history.deleted, history.unchanged, history.added) if value is not None]
+
+
+def _earliest_affected(session: Session) -> Optional[datetime]:
+    times: List[datetime] = []
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, ProjectStatus):
+            deleted = obj in session.deleted
+            if deleted or any(_history(obj, f).has_changes() for f in TREND_STATUS_FIELDS):
+                updated_at = _history_values(obj, "updated_at")
+                times.extend(updated_at if updated_at else [EPOCH])
+        elif isinstance(obj, Project):
+            if obj in session.deleted or _history(obj, "client_id").has_changes():
+                # created_at may be unloaded on a deleted row; then invalidate everything
+                times.append(obj.__dict__.get("created_at") or EPOCH)
+    for obj in session.new:
+        if isinstance(obj, ProjectStatus):
+            # Explicitly set (e.g. backdated imports); server defaults fetched back
+            # after the INSERT are not part of the attribute history
+            times.extend(value for value in _history(obj, "updated_at").added if value is not None)
+    return min((as_utc(t) for t in times), default=None)
+
+
+def invalidate_trend_rollups(connection: Connection, earliest: datetime) -> None:
+    """Mark rollups from the bucket containing earliest onwards as stale."""
+    connection.execute(insert(HealthTrendInvalidation).values(bucket_start=week_start(earliest)))
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_trend_rollups(session: Session, flush_context) -> None:
+    """Record the earliest weekly bucket whose rollups this flush made stale."""
+    earliest = _earliest_affected(session)
+    if earliest is not None:
+        invalidate_trend_rollups(session.connection(), earliest)
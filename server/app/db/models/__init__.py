@@ -2,7 +2,25 @@
 from app.db.models.user import User
 from app.db.models.project import Project
 from app.db.models.project_status import ProjectStatus
-from app.db.models.transcription import Transcription
+from app.db.models.transcription import Transcription, TranscriptionStatus
+from app.db.models.transcription_batch import TranscriptionBatch
 from app.db.models.client import Client
+from app.db.models.table_version import TableVersion
+from app.db.models.project_current_status import ProjectCurrentStatus
+from app.db.models.client_health_aggregate import ClientHealthAggregate
+from app.db.models.health_trend_rollup import HealthTrendRollup, HealthTrendInvalidation
+from app.db.models.change_log import ChangeLogEntry, ChangeLogState, ChangeOperation
+from app.db.models.webhook import WebhookSubscription, WebhookDelivery
 
-__all__ = ["User", "Project", "ProjectStatus", "Transcription", "Client"]
+__all__ = [
+    "User", "Project", "ProjectStatus", "Transcription", "TranscriptionStatus", "TranscriptionBatch", "Client", "TableVersion",
+    "ProjectCurrentStatus", "ClientHealthAggregate", "HealthTrendRollup", "HealthTrendInvalidation",
+    "ChangeLogEntry", "ChangeLogState", "ChangeOperation", "WebhookSubscription", "WebhookDelivery",
+]
+
+# Register session listeners that depend on the models above
+import app.db.change_log  # noqa: E402, F401
+import app.db.change_tracking  # noqa: E402, F401
+import app.db.health_aggregates  # noqa: E402, F401
+import app.db.health_trends  # noqa: E402, F401
+import app.db.webhook_outbox  # noqa: E402, F401
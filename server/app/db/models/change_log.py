@@ -0,0 +1,41 @@
+"""
+Change log models.
+"""
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, JSON, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.db.database import Base
+
+
+class ChangeOperation(str, enum.Enum):
+    """Kind of row change recorded in the change log."""
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class ChangeLogEntry(Base):
+    """Append-only record of a row change, numbered in commit order."""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Compaction looks for later entries of the same row
+        Index("ix_change_log_table_name_row_id_seq", "table_name", "row_id", "seq"),
+    )
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=False)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    data = Column(JSON, nullable=True)  # Row after the change; None for deletes
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ChangeLogState(Base):
+    """Single row holding the change log's sequence counter and maintenance watermarks."""
+    __tablename__ = "change_log_state"
+
+    id = Column(Integer, primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)  # Last sequence number handed out
+    compacted_through = Column(BigInteger, nullable=False, default=0)  # Segments up to here are compacted
+    truncated_through = Column(BigInteger, nullable=False, default=0)  # Entries up to here were dropped
@@ -0,0 +1,21 @@
+"""
+Client health aggregate model.
+"""
+from sqlalchemy import Column, Integer
+
+from app.db.database import Base
+
+
+class ClientHealthAggregate(Base):
+    """Per-client health counters, updated incrementally as project statuses change."""
+    __tablename__ = "client_health_aggregates"
+    
+    client_id = Column(Integer, primary_key=True)
+    total_projects = Column(Integer, nullable=False, default=0)
+    healthy_projects = Column(Integer, nullable=False, default=0)
+    at_risk_projects = Column(Integer, nullable=False, default=0)
+    critical_projects = Column(Integer, nullable=False, default=0)
+    no_status_projects = Column(Integer, nullable=False, default=0)
+    scope_compliant = Column(Integer, nullable=False, default=0)
+    time_compliant = Column(Integer, nullable=False, default=0)
+    budget_compliant = Column(Integer, nullable=False, default=0)
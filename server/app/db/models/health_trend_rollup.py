@@ -0,0 +1,30 @@
+"""
+Health trend rollup models.
+"""
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class HealthTrendRollup(Base):
+    """As-of health counts per client at the end of a closed weekly bucket."""
+    __tablename__ = "health_trend_rollups"
+    
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    client_id = Column(Integer, primary_key=True)  # 0 holds portfolio totals and marks the bucket as computed
+    total_projects = Column(Integer, nullable=False, default=0)
+    healthy_projects = Column(Integer, nullable=False, default=0)
+    at_risk_projects = Column(Integer, nullable=False, default=0)
+    critical_projects = Column(Integer, nullable=False, default=0)
+    no_status_projects = Column(Integer, nullable=False, default=0)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class HealthTrendInvalidation(Base):
+    """Append-only marker that rollups from bucket_start onward must be recomputed."""
+    __tablename__ = "health_trend_invalidations"
+    
+    id = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
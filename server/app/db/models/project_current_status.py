@@ -0,0 +1,26 @@
+"""
+Project current status model.
+"""
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
+
+from app.db.database import Base
+
+
+class ProjectCurrentStatus(Base):
+    """
+    Latest status of each project, maintained from status writes.
+
+    Denormalized and derived from projects and project_statuses, so it carries no
+    foreign keys: rows must outlive the project deletes they are reconciled with.
+    """
+    __tablename__ = "project_current_statuses"
+    
+    project_id = Column(Integer, primary_key=True)
+    client_id = Column(Integer, nullable=False, index=True)
+    status_id = Column(Integer, nullable=True)
+    is_on_scope = Column(Boolean, nullable=True)
+    is_on_time = Column(Boolean, nullable=True)
+    is_on_budget = Column(Boolean, nullable=True)
+    health_status = Column(String(10), nullable=False)  # green, yellow, red
+    has_status = Column(Boolean, nullable=False, default=False)
+    status_updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,16 +1,33 @@
 """
 Project Status model.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, Computed
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.database import Base
 
+# Stored generated columns mirroring calculate_project_health_status (the reference
+# implementation in app.utils.project_status_utils); only true flags count as green.
+GREEN_COUNT_SQL = (
+    "(CASE WHEN is_on_scope THEN 1 ELSE 0 END)"
+    " + (CASE WHEN is_on_time THEN 1 ELSE 0 END)"
+    " + (CASE WHEN is_on_budget THEN 1 ELSE 0 END)"
+)
+HEALTH_STATUS_SQL = (
+    f"CASE WHEN {GREEN_COUNT_SQL} >= 3 THEN 'green'"
+    f" WHEN {GREEN_COUNT_SQL} = 2 THEN 'yellow'"
+    " ELSE 'red' END"
+)
+
 
 class ProjectStatus(Base):
     """Project Status model."""
     __tablename__ = "project_statuses"
+    __table_args__ = (
+        # Latest-status lookups per project (reports, trends, aggregates)
+        Index("ix_project_statuses_project_id_updated_at", "project_id", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
@@ -21,6 +38,8 @@ class ProjectStatus(Base):
     risks = Column(Text, nullable=True)
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    green_count = Column(Integer, Computed(GREEN_COUNT_SQL, persisted=True))
+    health_status = Column(String(10), Computed(HEALTH_STATUS_SQL, persisted=True), index=True)
     
     # Relationships
     project = relationship("Project", back_populates="statuses", foreign_keys=[project_id])
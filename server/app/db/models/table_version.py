@@ -0,0 +1,16 @@
+"""
+Table version model.
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped in the same transaction as each write."""
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
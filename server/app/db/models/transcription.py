@@ -1,28 +1,43 @@
 """
 Transcription model.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import enum
 
 from app.db.database import Base
 
 
+class TranscriptionStatus(str, enum.Enum):
+    """Processing state of a transcription in the processing queue."""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class Transcription(Base):
     """Transcription model."""
     __tablename__ = "transcriptions"
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    batch_id = Column(Integer, ForeignKey("transcription_batches.id", ondelete="SET NULL"), nullable=True, index=True)
     file_path = Column(String, nullable=True)
     file_name = Column(String, nullable=True)
     file_type = Column(String, nullable=True)  # audio, video, text
     file_size = Column(Integer, nullable=True)  # in bytes
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of document uploads, keys the extracted-text cache
     raw_text = Column(Text, nullable=True)
+    processing_status = Column(Enum(TranscriptionStatus, native_enum=False, length=20, values_callable=lambda x: [e.value for e in x]), default=TranscriptionStatus.PENDING, nullable=False)
+    processing_error = Column(Text, nullable=True)
     processed_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # While processing: renewed by the worker holding the job
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     project = relationship("Project", back_populates="transcriptions", foreign_keys=[project_id])
     creator = relationship("User", back_populates="transcriptions", foreign_keys=[created_by])
+    batch = relationship("TranscriptionBatch", back_populates="transcriptions")
@@ -0,0 +1,21 @@
+"""
+Transcription batch model.
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class TranscriptionBatch(Base):
+    """A set of transcription files uploaded together; progress is derived from its transcriptions."""
+    __tablename__ = "transcription_batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    transcriptions = relationship("Transcription", back_populates="batch")
@@ -0,0 +1,58 @@
+"""
+Webhook subscription and delivery outbox models.
+"""
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class WebhookSubscription(Base):
+    """
+    An endpoint notified of project health transitions, optionally only for one
+    client and/or one transition (e.g. to_health "red": projects turning red).
+
+    Also holds the endpoint's delivery state, kept by the webhook dispatcher.
+    """
+    __tablename__ = "webhook_subscriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(2048), nullable=False)
+    secret = Column(String(64), nullable=False)  # Signs every request (X-Webhook-Signature)
+    description = Column(String(255), nullable=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=True, index=True)
+    from_health = Column(String(10), nullable=True)  # green, yellow, red; None matches any
+    to_health = Column(String(10), nullable=True)  # green, yellow, red; None matches any
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Delivery state
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    circuit_open_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    last_delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class WebhookDelivery(Base):
+    """
+    An event waiting to be delivered to one subscription (deleted once delivered).
+
+    Written in the transaction that made the change; carries no foreign keys to
+    projects or clients so it outlives deletes of the rows it describes.
+    """
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("ix_webhook_deliveries_subscription_id_id", "subscription_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(String(50), nullable=False)
+    project_id = Column(Integer, nullable=False)
+    client_id = Column(Integer, nullable=False)
+    previous_health_status = Column(String(10), nullable=True)  # None when the project had no status yet
+    health_status = Column(String(10), nullable=False)
+    status_id = Column(Integer, nullable=True)
+    occurred_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,188 @@
+"""
+Slow query log.
+
+Statements that take longer than a threshold are kept in a bounded in-memory
+buffer (GET /api/v1/diagnostics/slow-queries) and logged, with their duration,
+the endpoint that issued them and the plan the database chose for them.
+
+Parameter values are never kept: statements are stored with placeholders and
+inline literals replaced by ?, and string literals are blanked in plans too
+(PostgreSQL plans show the inlined parameters).
+
+Safe to leave on in production:
+- timing a statement costs two clock reads; nothing else happens below the
+  threshold
+- only sample_rate of the slow statements are recorded
+- each statement shape is EXPLAINed at most once per explain_interval, later
+  occurrences reuse that plan. EXPLAIN plans without executing (no ANALYZE),
+  on the statement's own connection and parameters; on PostgreSQL it runs in
+  a savepoint, so a failing EXPLAIN cannot abort the request's transaction
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.core.query_inspector import statement_shape
+from app.core.request_context import current_endpoint
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE off) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+MAX_CACHED_PLANS = 1000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+class SlowQuery(NamedTuple):
+    occurred_at: datetime
+    duration_ms: float
+    endpoint: Optional[str]  # None for statements issued outside a request (queue workers, maintenance)
+    statement: str
+    plan: Optional[str]
+    executemany: bool
+
+
+def explain(connection: Connection, statement: str, parameters) -> Optional[str]:
+    """The database's plan for a statement, or None when it cannot be explained."""
+    prefix = EXPLAIN_PREFIXES.get(connection.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    savepoint = connection.dialect.name == "postgresql"
+    # A cursor of its own, so the results of the statement being explained stay unread
+    cursor = connection.connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as e:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.debug("Could not explain slow statement: %s", e)
+            return None
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception as e:
+        logger.debug("Could not explain slow statement: %s", e)
+        return None
+    finally:
+        cursor.close()
+    # PostgreSQL: one line per row; SQLite: (id, parent, notused, detail)
+    return _STRING_LITERAL.sub("'?'", "\n".join(str(row[-1]) for row in rows))
+
+
+class SlowQueryLog:
+    """Records statements slower than threshold seconds from the engines it is installed on."""
+
+    def __init__(
+        self,
+        threshold: float,
+        sample_rate: float = 1.0,
+        explain: bool = True,
+        explain_interval: float = 300,
+        max_entries: int = 200
+    ):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.slow_statements = 0  # Every slow statement seen, sampled or not
+        self._entries: Deque[SlowQuery] = deque(maxlen=max_entries)
+        self._plans: Dict[str, Tuple[float, Optional[str]]] = {}  # shape -> (explained at, plan)
+        # Statements finish on the event loop and in threadpool workers
+        self._lock = threading.Lock()
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def uninstall(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def entries(self) -> List[SlowQuery]:
+        """Recorded statements, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+            self.slow_statements = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold:
+            return
+        with self._lock:
+            self.slow_statements += 1
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        self.record(conn, statement, parameters, executemany, elapsed)
+
+    def record(self, conn: Connection, statement: str, parameters, executemany: bool, elapsed: float) -> SlowQuery:
+        shape = statement_shape(statement)
+        entry = SlowQuery(
+            occurred_at=datetime.now(timezone.utc),
+            duration_ms=round(elapsed * 1000, 1),
+            endpoint=current_endpoint(),
+            statement=shape,
+            plan=None if executemany else self._plan(conn, shape, statement, parameters),
+            executemany=executemany
+        )
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning(
+            f"Slow query ({entry.duration_ms} ms) in {entry.endpoint or 'background'}: {shape}",
+            extra={"slow_query": entry._asdict()}
+        )
+        return entry
+
+    def _plan(self, conn: Connection, shape: str, statement: str, parameters) -> Optional[str]:
+        if not self.explain:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            cached = self._plans.get(shape)
+        if cached is not None and now - cached[0] < self.explain_interval:
+            return cached[1]
+        plan = explain(conn, statement, parameters)
+        with self._lock:
+            self._plans.pop(shape, None)
+            self._plans[shape] = (now, plan)
+            if len(self._plans) > MAX_CACHED_PLANS:
+                # Forget the plan explained longest ago
+                self._plans.pop(next(iter(self._plans)))
+        return plan
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+    sample_rate=settings.SLOW_QUERY_SAMPLE_RATE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+    max_entries=settings.SLOW_QUERY_BUFFER_SIZE
+)
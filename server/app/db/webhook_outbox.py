@@ -0,0 +1,107 @@
+"""
+Webhook outbox.
+
+Project health transitions are fanned out to the matching active webhook
+subscriptions as webhook_deliveries rows, inside the transaction that made
+them: one INSERT ... SELECT per transition, so the write path never loads
+subscriptions or talks to the network. The webhook dispatcher
+(app.services.webhook_delivery) delivers the rows later, and is woken by
+outbox listeners once the transaction commits.
+
+A transition is a change of a project's health (green, yellow, red), including
+its first status; projects losing their last status or being deleted are not
+reported.
+"""
+import logging
+from typing import Callable, Dict, List
+
+from sqlalchemy import bindparam, event, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.db.health_aggregates import HealthChanges, add_health_change_writer
+from app.db.models.webhook import WebhookDelivery, WebhookSubscription
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHANGED_EVENT = "project.health_changed"
+
+# Session.info key flagging that the current transaction queued webhook events
+WEBHOOKS_PENDING_KEY = "webhooks_pending"
+
+_outbox_listeners: List[Callable[[], None]] = []
+
+subscription_table = WebhookSubscription.__table__
+delivery_table = WebhookDelivery.__table__
+
+_fan_out_statement = insert(delivery_table).from_select(
+    ["subscription_id", "event_type", "project_id", "client_id", "previous_health_status", "health_status", "status_id"],
+    select(
+        subscription_table.c.id,
+        literal(HEALTH_CHANGED_EVENT),
+        bindparam("project_id"),
+        bindparam("client_id"),
+        bindparam("previous_health_status"),
+        bindparam("health_status"),
+        bindparam("status_id"),
+    ).where(
+        subscription_table.c.is_active.is_(True),
+        or_(subscription_table.c.client_id.is_(None), subscription_table.c.client_id == bindparam("client_id")),
+        or_(
+            subscription_table.c.from_health.is_(None),
+            subscription_table.c.from_health == bindparam("previous_health_status")
+        ),
+        or_(subscription_table.c.to_health.is_(None), subscription_table.c.to_health == bindparam("health_status")),
+    )
+)
+
+
+def health_transitions(changes: HealthChanges) -> List[Dict]:
+    """Fan-out parameters for the changes that moved a project to another health."""
+    transitions = []
+    for project_id, change in sorted(changes.items()):
+        current = change.current
+        if current is None or not current["has_status"]:
+            continue
+        if current["health_status"] == change.previous_health_status:
+            continue
+        transitions.append({
+            "project_id": project_id,
+            "client_id": current["client_id"],
+            "previous_health_status": change.previous_health_status,
+            "health_status": current["health_status"],
+            "status_id": current["status_id"],
+        })
+    return transitions
+
+
+def write_webhook_deliveries(session: Session, changes: HealthChanges) -> None:
+    """Health change writer: queue deliveries for every subscription matching a transition."""
+    transitions = health_transitions(changes)
+    if transitions:
+        session.connection().execute(_fan_out_statement, transitions)
+        session.info[WEBHOOKS_PENDING_KEY] = True
+
+
+add_health_change_writer(write_webhook_deliveries)
+
+
+def add_outbox_listener(listener: Callable[[], None]) -> None:
+    """Call listener after every commit that queued webhook events."""
+    _outbox_listeners.append(listener)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_outbox_listeners(session: Session) -> None:
+    if not session.info.pop(WEBHOOKS_PENDING_KEY, False):
+        return
+    for listener in _outbox_listeners:
+        try:
+            listener()
+        except Exception as e:
+            # The transaction is committed; a listener failure must not surface as a write error
+            logger.error(f"Webhook outbox listener failed: {str(e)}", exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_outbox_flag(session: Session) -> None:
+    session.info.pop(WEBHOOKS_PENDING_KEY, None)
@@ -0,0 +1,34 @@
+"""
+Change feed schemas.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+class ChangeLogEntryResponse(BaseModel):
+    """One row change from the change log."""
+    seq: int
+    table_name: str  # clients, projects, project_statuses or transcriptions
+    row_id: int
+    operation: str  # insert, update or delete
+    data: Optional[Dict[str, Any]] = None  # Row after the change (transcriptions without raw_text); None for deletes
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChangeBatch(BaseModel):
+    """A page of the change feed."""
+    changes: List[ChangeLogEntryResponse]
+    next_since: int  # Pass as since= on the next request
+    head: int  # Last sequence number in the log when the batch was read
+    has_more: bool  # More changes are available right away
+
+
+class ChangeLogHead(BaseModel):
+    """Current position and retention bounds of the change log."""
+    head: int  # Start here (since=head) after reading the tables in full
+    retained_from: int  # Oldest since= still served; earlier positions must re-read the tables
+    compacted_through: int  # Entries up to here only keep the latest change of each row
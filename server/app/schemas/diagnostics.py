@@ -0,0 +1,35 @@
+"""
+Diagnostics schemas.
+"""
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class SlowQueryEntry(BaseModel):
+    """A statement that exceeded the slow query threshold."""
+    occurred_at: datetime
+    duration_ms: float
+    endpoint: Optional[str] = None  # None for statements issued outside a request
+    statement: str  # Parameters and literals replaced by ?
+    plan: Optional[str] = None
+    executemany: bool
+
+
+class SlowQueryLogResponse(BaseModel):
+    """Slow query log of the worker process that served the request."""
+    enabled: bool
+    threshold_ms: float
+    sample_rate: float
+    slow_statements: int  # Seen since start (or the last clear), including those not sampled
+    entries: List[SlowQueryEntry]  # Newest first
+
+
+class ProfileSummary(BaseModel):
+    """A per-request profile; its stacks are at GET /diagnostics/profiles/{id}."""
+    id: str
+    started_at: datetime
+    duration_ms: float
+    interval_ms: float
+    samples: int
+    endpoint: Optional[str] = None
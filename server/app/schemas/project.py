@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 from app.schemas.user import UserResponse
 from app.schemas.client import ClientResponse
@@ -22,6 +22,19 @@ class ProjectCreate(ProjectBase):
     pass
 
 
+class ProjectBulkRow(BaseModel):
+    """A single row of a bulk project provisioning request."""
+    name: str
+    client_id: Optional[int] = None
+    client_name: Optional[str] = None  # Resolved to client_id when client_id is not given
+
+    @model_validator(mode="after")
+    def check_client(self) -> "ProjectBulkRow":
+        if self.client_id is None and self.client_name is None:
+            raise ValueError("client_id or client_name is required")
+        return self
+
+
 class ProjectUpdate(BaseModel):
     """Project update schema."""
     name: Optional[str] = None
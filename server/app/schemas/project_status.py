@@ -2,7 +2,7 @@
 Project Status schemas.
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 from app.schemas.user import UserResponse
@@ -44,3 +44,23 @@ class ProjectStatusDetailResponse(ProjectStatusResponse):
 
     class Config:
         from_attributes = True
+
+
+class ProjectStatusBulkRow(ProjectStatusCreate):
+    """A single row of a bulk status import; updated_at defaults to the import time."""
+    updated_at: Optional[datetime] = None
+
+
+class ProjectStatusBulkError(BaseModel):
+    """Validation or integrity error for one row of a bulk import."""
+    row: int  # 1-based line number in the payload (CSV header is line 1)
+    project_id: Optional[int] = None
+    error: str
+
+
+class ProjectStatusBulkResult(BaseModel):
+    """Outcome of a bulk status import."""
+    received: int
+    inserted: int
+    failed: int
+    errors: List[ProjectStatusBulkError]
@@ -0,0 +1,23 @@
+"""
+Bulk provisioning schemas.
+"""
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ProvisioningItemResult(BaseModel):
+    """Outcome of one item of a bulk client or project provisioning request."""
+    row: int  # 1-based line number in the payload (CSV header is line 1)
+    name: Optional[str] = None
+    id: Optional[int] = None
+    outcome: str  # created, updated, unchanged or failed
+    error: Optional[str] = None
+
+
+class ProvisioningSummary(BaseModel):
+    """Totals of a bulk provisioning request, streamed after the item results."""
+    received: int
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
@@ -75,6 +75,39 @@ class ProjectHealthReport(BaseModel):
         from_attributes = True
 
 
+class ProjectHealthSummary(BaseModel):
+    """Overall and per-client health counts without per-project detail."""
+    generated_at: datetime
+    overall_metrics: OverallHealthMetrics
+    client_summaries: List[ClientHealthSummary]
+
+
+class HealthTrendPoint(BaseModel):
+    """As-of health counts at the end of one time bucket."""
+    bucket_start: datetime
+    total_projects: int
+    healthy_projects: int
+    at_risk_projects: int
+    critical_projects: int
+    no_status_projects: int
+
+
+class ClientHealthTrend(BaseModel):
+    """Health counts over time for a client."""
+    client_id: int
+    client_name: str
+    points: List[HealthTrendPoint]
+
+
+class HealthTrendReport(BaseModel):
+    """Portfolio and per-client health counts over time."""
+    bucket: str  # "week"
+    date_from: datetime
+    date_to: datetime
+    portfolio: List[HealthTrendPoint]
+    clients: List[ClientHealthTrend]
+
+
 class ReportFilters(BaseModel):
     """Filters for report generation."""
     client_ids: Optional[List[int]] = None
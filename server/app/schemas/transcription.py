@@ -1,10 +1,12 @@
 """
 Transcription schemas.
 """
+import enum
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
+from app.db.models.transcription import TranscriptionStatus
 from app.schemas.user import UserResponse
 from app.schemas.project import ProjectResponse
 
@@ -33,11 +35,14 @@ class ManualTranscriptionCreate(BaseModel):
 class TranscriptionResponse(TranscriptionBase):
     """Transcription response schema."""
     id: int
+    batch_id: Optional[int] = None
     file_path: Optional[str] = None
     file_name: Optional[str] = None
     file_type: Optional[str] = None
     file_size: Optional[int] = None
     raw_text: Optional[str] = None
+    processing_status: TranscriptionStatus
+    processing_error: Optional[str] = None
     processed_at: Optional[datetime] = None
     created_by: int
     created_at: datetime
@@ -53,3 +58,71 @@ class TranscriptionDetailResponse(TranscriptionResponse):
 
     class Config:
         from_attributes = True
+
+
+class TranscriptionJobStatus(BaseModel):
+    """Processing state of a queued transcription."""
+    id: int
+    project_id: int
+    batch_id: Optional[int] = None
+    processing_status: TranscriptionStatus
+    processing_error: Optional[str] = None
+    processed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TranscriptionBatchItem(BaseModel):
+    """Processing state of one file in a transcription batch."""
+    id: int
+    file_name: Optional[str] = None
+    file_type: Optional[str] = None
+    file_size: Optional[int] = None
+    processing_status: TranscriptionStatus
+    processing_error: Optional[str] = None
+    processed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TranscriptionBatchResponse(BaseModel):
+    """Transcription batch with aggregated processing progress."""
+    id: int
+    project_id: int
+    created_by: int
+    created_at: datetime
+    total: int
+    pending: int
+    processing: int
+    completed: int
+    failed: int
+    progress: float  # Percentage of files finished (completed or failed)
+    transcriptions: List[TranscriptionBatchItem]
+
+
+class TranscriptionStage(str, enum.Enum):
+    """Pipeline stages announced on the transcription event streams."""
+    STORED = "stored"
+    PROCESSING = "processing"
+    TRANSCRIBING = "transcribing"
+    EXTRACTING_TEXT = "extracting_text"
+    EXTRACTING_STATUS = "extracting_status"
+    STATUS_CREATED = "status_created"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class TranscriptionEvent(BaseModel):
+    """Stage transition pushed to /transcriptions/{id}/events and /projects/{id}/events."""
+    transcription_id: int
+    project_id: int
+    batch_id: Optional[int] = None
+    stage: TranscriptionStage
+    processing_status: TranscriptionStatus
+    segment: Optional[int] = None  # Audio/video: segment being transcribed (1-based)
+    segments: Optional[int] = None
+    project_status_id: Optional[int] = None  # Set on status_created
+    error: Optional[str] = None
+    at: datetime
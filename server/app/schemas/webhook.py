@@ -0,0 +1,61 @@
+"""
+Webhook subscription schemas.
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+URL_PATTERN = r"^https?://"
+HEALTH_PATTERN = r"^(green|yellow|red)$"
+
+
+class WebhookSubscriptionBase(BaseModel):
+    """Base webhook subscription schema."""
+    url: str = Field(..., max_length=2048, pattern=URL_PATTERN, description="Endpoint receiving POSTed event batches")
+    description: Optional[str] = Field(None, max_length=255)
+    client_id: Optional[int] = Field(None, description="Only projects of this client (all clients when empty)")
+    from_health: Optional[str] = Field(
+        None, pattern=HEALTH_PATTERN, description="Only transitions from this health (any when empty)"
+    )
+    to_health: Optional[str] = Field(
+        None, pattern=HEALTH_PATTERN, description="Only transitions to this health, e.g. red (any when empty)"
+    )
+
+
+class WebhookSubscriptionCreate(WebhookSubscriptionBase):
+    """Webhook subscription creation schema."""
+    secret: Optional[str] = Field(
+        None, min_length=16, max_length=64, description="Signing secret (generated when empty)"
+    )
+
+
+class WebhookSubscriptionUpdate(BaseModel):
+    """Webhook subscription update schema."""
+    url: Optional[str] = Field(None, max_length=2048, pattern=URL_PATTERN)
+    description: Optional[str] = Field(None, max_length=255)
+    client_id: Optional[int] = None
+    from_health: Optional[str] = Field(None, pattern=HEALTH_PATTERN)
+    to_health: Optional[str] = Field(None, pattern=HEALTH_PATTERN)
+    is_active: Optional[bool] = None
+
+
+class WebhookSubscriptionResponse(WebhookSubscriptionBase):
+    """Webhook subscription response schema, with its delivery state."""
+    id: int
+    is_active: bool
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    consecutive_failures: int
+    circuit_open_until: Optional[datetime] = None  # Delivery is paused until then
+    last_error: Optional[str] = None
+    last_delivered_at: Optional[datetime] = None
+    pending_events: int = 0
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookSubscriptionCreated(WebhookSubscriptionResponse):
+    """Creation response: the only time the signing secret is returned."""
+    secret: str
@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any
 from openai import OpenAI
 
 from app.core.config import settings
+from app.core.metrics import external_call
 from app.services.openai_service import get_openai_client
 
 logger = logging.getLogger(__name__)
@@ -68,21 +69,22 @@ Return format:
 }}"""
 
         # Call OpenAI API
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Using gpt-4o-mini for cost efficiency
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a project management assistant that extracts structured information from meeting transcriptions. Always return valid JSON only."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.3,  # Lower temperature for more consistent extraction
-            response_format={"type": "json_object"}  # Force JSON response
-        )
+        with external_call("openai"):
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",  # Using gpt-4o-mini for cost efficiency
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a project management assistant that extracts structured information from meeting transcriptions. Always return valid JSON only."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,  # Lower temperature for more consistent extraction
+                response_format={"type": "json_object"}  # Force JSON response
+            )
         
         # Parse response
         content = response.choices[0].message.content
@@ -93,7 +95,7 @@ Return format:
         # Parse JSON response
         try:
             extracted_data = json.loads(content)
-            logger.info(f"Successfully extracted status from transcription")
+            logger.info("Successfully extracted status from transcription")
             return extracted_data
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
@@ -0,0 +1,241 @@
+"""
+Service for bulk project status ingestion.
+
+Rows are parsed and validated up front (one query checks every project id),
+then inserted in transactions of INGEST_CHUNK_SIZE rows: with COPY on
+PostgreSQL and a multi-row executemany elsewhere. Bulk inserts bypass the ORM
+flush hooks, so the change log, health aggregates, table versions and trend
+invalidations are maintained explicitly in the same transaction.
+
+Each transaction holds the change log counter (app.db.change_log) from its
+first logged row until commit, blocking every other write to the captured
+tables; chunking bounds that hold to one chunk. Atomic imports are a single
+transaction and hold it for the whole batch.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.change_log import record_row_changes
+from app.db.change_tracking import bump_table_versions
+from app.db.health_aggregates import refresh_session_project_health
+from app.db.health_trends import invalidate_trend_rollups
+from app.db.models.change_log import ChangeOperation
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.schemas.project_status import ProjectStatusBulkRow, ProjectStatusBulkError, ProjectStatusBulkResult
+
+logger = logging.getLogger(__name__)
+
+INGEST_CHUNK_SIZE = 5000  # Rows per transaction (non-atomic imports)
+
+# Columns written by bulk inserts; green_count/health_status are generated
+INSERT_COLUMNS = (
+    "project_id",
+    "is_on_scope",
+    "is_on_time",
+    "is_on_budget",
+    "next_delivery",
+    "risks",
+    "updated_by",
+    "updated_at",
+)
+
+ParsedRow = Tuple[int, Any]  # (line number, dict or parse error message)
+
+
+def parse_ndjson(content: bytes) -> Iterator[ParsedRow]:
+    """Yield one JSON object per non-empty line."""
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(value, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        yield line_number, value
+
+
+def parse_csv(content: bytes) -> Iterator[ParsedRow]:
+    """Yield one dict per CSV record (header required); empty cells are null."""
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    for record in reader:
+        if not any(value for value in record.values() if isinstance(value, str)):
+            continue
+        yield reader.line_num, {key: (value if value != "" else None) for key, value in record.items() if key}
+
+
+def _safe_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    )
+
+
+def validate_rows(
+    db: Session,
+    parsed_rows: Iterator[ParsedRow]
+) -> Tuple[int, List[Tuple[int, ProjectStatusBulkRow]], List[ProjectStatusBulkError]]:
+    """Validate parsed rows and check all referenced projects exist in one query."""
+    received = 0
+    candidates: List[Tuple[int, ProjectStatusBulkRow]] = []
+    errors: List[ProjectStatusBulkError] = []
+    for line_number, value in parsed_rows:
+        received += 1
+        if isinstance(value, str):
+            errors.append(ProjectStatusBulkError(row=line_number, error=value))
+            continue
+        try:
+            candidates.append((line_number, ProjectStatusBulkRow.model_validate(value)))
+        except ValidationError as e:
+            errors.append(ProjectStatusBulkError(
+                row=line_number,
+                project_id=_safe_int(value.get("project_id")),
+                error=describe_validation_error(e)
+            ))
+
+    project_ids = {row.project_id for _, row in candidates}
+    existing = set(db.scalars(select(Project.id).where(Project.id.in_(project_ids)))) if project_ids else set()
+
+    valid = []
+    for line_number, row in candidates:
+        if row.project_id in existing:
+            valid.append((line_number, row))
+        else:
+            errors.append(ProjectStatusBulkError(row=line_number, project_id=row.project_id, error="Project not found"))
+    errors.sort(key=lambda e: e.row)
+    return received, valid, errors
+
+
+def _copy_text_value(value: Any) -> str:
+    """Encode a value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _allocate_ids(connection: Connection, count: int) -> List[int]:
+    # COPY cannot return generated keys, so take them from the id sequence up front
+    return list(connection.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table_name, 'id')) FROM generate_series(1, :count)"),
+        {"table_name": ProjectStatus.__tablename__, "count": count}
+    ).scalars())
+
+
+def _copy_rows(connection: Connection, rows: List[Dict[str, Any]]) -> None:
+    columns = ("id",) + INSERT_COLUMNS
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_text_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {ProjectStatus.__tablename__} ({', '.join(columns)}) FROM STDIN",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def insert_status_rows(connection: Connection, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert status rows with COPY on PostgreSQL, executemany elsewhere; returns their ids."""
+    if not rows:
+        return []
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        ids = _allocate_ids(connection, len(rows))
+        _copy_rows(connection, [{**row, "id": row_id} for row, row_id in zip(rows, ids)])
+        return ids
+    return list(connection.execute(
+        insert(ProjectStatus.__table__).returning(ProjectStatus.id, sort_by_parameter_order=True), rows
+    ).scalars())
+
+
+def _insert_chunk(db: Session, valid: List[Tuple[int, ProjectStatusBulkRow]], user_id: int, now: datetime) -> None:
+    """Insert validated rows and maintain the derived tables, in one transaction."""
+    rows = [
+        {
+            "project_id": row.project_id,
+            "is_on_scope": row.is_on_scope,
+            "is_on_time": row.is_on_time,
+            "is_on_budget": row.is_on_budget,
+            "next_delivery": row.next_delivery,
+            "risks": row.risks,
+            "updated_by": user_id,
+            "updated_at": row.updated_at or now,
+        }
+        for _, row in valid
+    ]
+    connection = db.connection()
+    ids = insert_status_rows(connection, rows)
+
+    # Keep derived tables consistent, as the ORM flush hooks would
+    record_row_changes(db, ProjectStatus.__tablename__, ChangeOperation.INSERT, ids)
+    refresh_session_project_health(db, {row["project_id"] for row in rows})
+    bump_table_versions(connection, [ProjectStatus.__tablename__])
+    backdated = [row.updated_at for _, row in valid if row.updated_at is not None]
+    if backdated:
+        invalidate_trend_rollups(connection, min(backdated))
+    db.commit()
+
+
+def ingest_project_statuses(
+    db: Session,
+    parsed_rows: Iterator[ParsedRow],
+    user_id: int,
+    atomic: bool = False,
+    chunk_size: int = INGEST_CHUNK_SIZE
+) -> ProjectStatusBulkResult:
+    """
+    Validate and insert status rows, committing every chunk_size rows.
+
+    Invalid rows are reported and skipped; with atomic=True any error rejects
+    the whole batch, and valid batches are inserted in one transaction.
+    """
+    received, valid, errors = validate_rows(db, parsed_rows)
+    if atomic and errors:
+        valid = []
+
+    if valid:
+        now = datetime.now(timezone.utc)
+        step = len(valid) if atomic else chunk_size
+        for offset in range(0, len(valid), step):
+            _insert_chunk(db, valid[offset:offset + step], user_id, now)
+        logger.info("Bulk inserted %s project statuses (%s rows rejected)", len(valid), len(errors))
+
+    return ProjectStatusBulkResult(
+        received=received,
+        inserted=len(valid),
+        failed=received - len(valid),
+        errors=errors
+    )
@@ -0,0 +1,113 @@
+"""
+Incremental change feed over the change log (GET /changes).
+
+Consumers remember the next_since of the last batch they processed and ask
+for what follows. When nothing is new the request waits (long poll) until a
+commit logs changes or the timeout expires: every such commit publishes the new
+head sequence number on the event broadcaster, which wakes waiting requests
+right away (in every worker when the Postgres bridge is enabled). Waiting
+requests also re-read the head every CHANGES_RECHECK_SECONDS, which bounds the
+delay for writes made by other workers when the bridge is off.
+"""
+import asyncio
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.change_log import add_change_listener, get_change_log_bounds, log_table
+from app.db.database import SessionLocal
+from app.schemas.change import ChangeBatch, ChangeLogEntryResponse, ChangeLogHead
+from app.services.event_broadcaster import broadcaster
+
+CHANGES_TOPIC = "changes"
+
+
+class ChangesUnavailableError(Exception):
+    """The requested position is no longer (or not yet) in the log; the consumer must re-read the tables."""
+
+
+def publish_change_head(last_seq: int) -> None:
+    """Change log listener: wake long polls waiting in any worker."""
+    broadcaster.publish((CHANGES_TOPIC,), "head", str(last_seq))
+
+
+add_change_listener(publish_change_head)
+
+
+def get_change_log_head(db: Session) -> ChangeLogHead:
+    bounds = get_change_log_bounds(db.connection())
+    return ChangeLogHead(
+        head=bounds.last_seq,
+        retained_from=bounds.truncated_through,
+        compacted_through=bounds.compacted_through
+    )
+
+
+def read_changes(db: Session, since: int, limit: int, table_names: Optional[List[str]] = None) -> ChangeBatch:
+    """Up to limit changes after sequence number since, optionally of some tables only."""
+    connection = db.connection()
+    # Entries up to the head are all committed: sequence numbers are handed out in commit order
+    head = get_change_log_bounds(connection).last_seq
+    if since > head:
+        raise ChangesUnavailableError(f"Sequence {since} is ahead of the change log (head {head})")
+
+    query = (
+        select(log_table)
+        .where(log_table.c.seq > since, log_table.c.seq <= head)
+        .order_by(log_table.c.seq)
+        .limit(limit)
+    )
+    if table_names:
+        query = query.where(log_table.c.table_name.in_(table_names))
+    rows = connection.execute(query).all()
+
+    # Checked after reading, so entries expired meanwhile cannot go unnoticed
+    truncated_through = get_change_log_bounds(connection).truncated_through
+    if since < truncated_through:
+        raise ChangesUnavailableError(f"Changes up to sequence {truncated_through} are no longer retained")
+
+    # A short page means every entry up to the head was scanned, including ones filtered out
+    next_since = rows[-1].seq if len(rows) == limit else head
+    return ChangeBatch(
+        changes=[ChangeLogEntryResponse.model_validate(row) for row in rows],
+        next_since=next_since,
+        head=head,
+        has_more=next_since < head
+    )
+
+
+def _read_changes_in_session(since: int, limit: int, table_names: Optional[List[str]]) -> ChangeBatch:
+    with SessionLocal() as db:
+        return read_changes(db, since, limit, table_names)
+
+
+async def wait_for_changes(
+    db: Session,
+    since: int,
+    limit: int,
+    table_names: Optional[List[str]],
+    timeout: float
+) -> ChangeBatch:
+    """read_changes(), waiting up to timeout seconds for changes if there are none yet."""
+    loop = asyncio.get_running_loop()
+    # Subscribe before the first read so no commit can fall in between
+    subscription = broadcaster.subscribe(CHANGES_TOPIC)
+    try:
+        batch = read_changes(db, since, limit, table_names)
+        # Release the connection: a waiting request must not hold one
+        db.close()
+        deadline = loop.time() + timeout
+        while not batch.changes:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            event = await subscription.get(min(remaining, settings.CHANGES_RECHECK_SECONDS))
+            if event is not None and int(event.data) <= batch.next_since:
+                continue
+            batch = await run_in_threadpool(_read_changes_in_session, batch.next_since, limit, table_names)
+        return batch
+    finally:
+        subscription.close()
@@ -0,0 +1,255 @@
+"""
+Live project health feed for dashboards (WebSocket).
+
+A subscriber first receives a compact snapshot of every project's current
+health (project_current_statuses), then only deltas: the rows that changed
+whenever a committed write touched a project's latest status, whether it came
+from the CRUD endpoints, AI extraction or the bulk paths. Changes are
+published through the event broadcaster, so with the Postgres bridge enabled
+every worker sees every other worker's writes.
+
+Pending deltas are coalesced per project, so a slow consumer only ever gets
+the latest row of each project; if it falls behind by more than max_pending
+projects, its pending deltas are dropped and it is sent a fresh snapshot.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import anyio
+from fastapi import WebSocket
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.change_tracking import get_table_versions
+from app.db.database import SessionLocal
+from app.db.health_aggregates import HealthChanges, add_health_change_listener
+from app.db.models.project_current_status import ProjectCurrentStatus
+from app.services.event_broadcaster import EventBroadcaster, Subscription, broadcaster
+
+logger = logging.getLogger(__name__)
+
+# Column order of the rows in snapshot and delta messages
+HEALTH_FIELDS = (
+    "project_id",
+    "client_id",
+    "health_status",
+    "has_status",
+    "is_on_scope",
+    "is_on_time",
+    "is_on_budget",
+    "status_updated_at",
+)
+CLIENT_ID_INDEX = HEALTH_FIELDS.index("client_id")
+
+# Tables whose writes can change project_current_statuses
+SNAPSHOT_TABLES = ("projects", "project_statuses")
+
+DASHBOARD_TOPIC = "dashboard:health"
+PUBLISH_CHUNK_SIZE = 50  # Projects per event, keeps relayed payloads under the NOTIFY size limit
+PUMP_MAX_QUEUED = 10000
+
+# (project_id, previous client_id, current row or None once the project is gone)
+Change = Tuple[int, Optional[int], Optional[list]]
+
+
+def _health_row(values: Dict) -> list:
+    return [values[field] for field in HEALTH_FIELDS]
+
+
+def publish_health_changes(changes: HealthChanges) -> None:
+    """Health change listener: publish committed changes to every worker's feed."""
+    items = [
+        [project_id, change.previous_client_id, _health_row(change.current) if change.current is not None else None]
+        for project_id, change in sorted(changes.items())
+    ]
+    for start in range(0, len(items), PUBLISH_CHUNK_SIZE):
+        broadcaster.publish((DASHBOARD_TOPIC,), "health", dumps(items[start:start + PUBLISH_CHUNK_SIZE]).decode("utf-8"))
+
+
+add_health_change_listener(publish_health_changes)
+
+
+class HealthSnapshotCache:
+    """Current health rows, reloaded only when the tables they derive from changed."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._versions: Optional[Dict[str, int]] = None
+        self._rows: List[tuple] = []
+        self._encoded: Optional[bytes] = None  # Unfiltered snapshot message
+        self._queued: Optional[asyncio.Future] = None  # Threadpool load that has not started yet
+
+    async def snapshot(self) -> Tuple[List[tuple], bytes]:
+        """load() in the threadpool; callers arriving together share a single load."""
+        queued = self._queued
+        if queued is None:
+            queued = self._queued = asyncio.ensure_future(run_in_threadpool(self._load_queued))
+        # Shielded: one caller disconnecting must not cancel the load for the others
+        return await asyncio.shield(queued)
+
+    def _load_queued(self) -> Tuple[List[tuple], bytes]:
+        # Later callers start a new load, so nobody is handed data read before they asked
+        self._queued = None
+        return self.load()
+
+    def load(self) -> Tuple[List[tuple], bytes]:
+        """Rows and encoded unfiltered snapshot, as of now (blocking)."""
+        with self.session_factory() as db:
+            versions = get_table_versions(db, SNAPSHOT_TABLES)
+            with self._lock:
+                if versions == self._versions:
+                    return self._rows, self._encoded
+            rows = [
+                tuple(row)
+                for row in db.execute(
+                    select(*(ProjectCurrentStatus.__table__.c[field] for field in HEALTH_FIELDS))
+                    .order_by(ProjectCurrentStatus.project_id)
+                )
+            ]
+        encoded = encode_snapshot(rows)
+        with self._lock:
+            self._versions, self._rows, self._encoded = versions, rows, encoded
+        return rows, encoded
+
+
+def encode_snapshot(rows: Iterable[tuple]) -> bytes:
+    return dumps({"type": "snapshot", "fields": HEALTH_FIELDS, "projects": list(rows)})
+
+
+class DashboardSubscriber:
+    """One WebSocket's view of the feed: client filter plus coalesced pending deltas."""
+
+    __slots__ = ("client_ids", "max_pending", "needs_snapshot", "resyncs", "_pending", "_wakeup")
+
+    def __init__(self, client_ids: Optional[FrozenSet[int]], max_pending: int):
+        self.client_ids = client_ids
+        self.max_pending = max_pending
+        self.needs_snapshot = True
+        self.resyncs = 0  # Snapshots sent because the subscriber fell behind
+        self._pending: Dict[int, Optional[list]] = {}
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+
+    def offer(self, changes: Iterable[Change]) -> None:
+        pending = self._pending
+        client_ids = self.client_ids
+        for project_id, previous_client_id, row in changes:
+            if client_ids is None:
+                pending[project_id] = row
+            elif row is not None and row[CLIENT_ID_INDEX] in client_ids:
+                pending[project_id] = row
+            elif previous_client_id in client_ids:
+                # Deleted, or moved to a client this subscriber does not watch
+                pending[project_id] = None
+            else:
+                continue
+            self._wakeup.set()
+        if len(pending) > self.max_pending:
+            self.resync()
+
+    def resync(self) -> None:
+        """Drop pending deltas and send a snapshot next."""
+        self._pending.clear()
+        if not self.needs_snapshot:
+            self.needs_snapshot = True
+            self.resyncs += 1
+        self._wakeup.set()
+
+    async def next_message(self, cache: HealthSnapshotCache) -> bytes:
+        """Wait for and encode the next snapshot or delta message."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.needs_snapshot:
+                self.needs_snapshot = False
+                # Changes arriving while the snapshot loads stay pending and follow it
+                self._pending.clear()
+                rows, encoded = await cache.snapshot()
+                if self.client_ids is None:
+                    return encoded
+                return encode_snapshot(row for row in rows if row[CLIENT_ID_INDEX] in self.client_ids)
+            if self._pending:
+                pending, self._pending = self._pending, {}
+                return dumps({
+                    "type": "delta",
+                    "projects": [row for row in pending.values() if row is not None],
+                    "removed": [project_id for project_id, row in pending.items() if row is None],
+                })
+
+
+class DashboardFeed:
+    """Relays published health changes to connected dashboard subscribers."""
+
+    def __init__(self, events: EventBroadcaster, cache: HealthSnapshotCache, max_pending: int):
+        self.events = events
+        self.cache = cache
+        self.max_pending = max_pending
+        self.subscribers: Set[DashboardSubscriber] = set()
+        self._pump: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start relaying changes (done on the first connection)."""
+        if self._pump is None:
+            # Subscribe now, so no change published after this call can be missed
+            subscription = self.events.subscribe(DASHBOARD_TOPIC, max_queued=PUMP_MAX_QUEUED)
+            self._pump = asyncio.create_task(self._run_pump(subscription))
+
+    async def stop(self) -> None:
+        pump, self._pump = self._pump, None
+        if pump is not None:
+            pump.cancel()
+            await asyncio.gather(pump, return_exceptions=True)
+
+    async def _run_pump(self, subscription: Subscription) -> None:
+        dropped = 0
+        try:
+            while True:
+                event = await subscription.get()
+                if subscription.dropped != dropped:
+                    # Changes were lost before reaching subscribers; only a snapshot is safe now
+                    dropped = subscription.dropped
+                    for subscriber in self.subscribers:
+                        subscriber.resync()
+                try:
+                    changes = [tuple(change) for change in json.loads(event.data)]
+                except ValueError as e:
+                    logger.error(f"Discarding malformed dashboard event: {str(e)}")
+                    continue
+                for subscriber in self.subscribers:
+                    subscriber.offer(changes)
+        finally:
+            subscription.close()
+
+    async def serve(self, websocket: WebSocket, client_ids: Optional[Iterable[int]] = None) -> None:
+        """Send a snapshot then deltas to an accepted WebSocket until it disconnects."""
+        self.start()
+        subscriber = DashboardSubscriber(frozenset(client_ids) if client_ids else None, self.max_pending)
+        self.subscribers.add(subscriber)
+
+        async def send(cancel_scope: anyio.CancelScope) -> None:
+            try:
+                while True:
+                    await websocket.send_text((await subscriber.next_message(self.cache)).decode("utf-8"))
+            except Exception as e:
+                logger.info("Dashboard feed connection closed: %r", e)
+            cancel_scope.cancel()
+
+        try:
+            # Same shape as StreamingResponse: send until the client disconnects
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(send, task_group.cancel_scope)
+                # Clients send nothing; this only notices the disconnect
+                while (await websocket.receive())["type"] != "websocket.disconnect":
+                    pass
+                task_group.cancel_scope.cancel()
+        finally:
+            self.subscribers.discard(subscriber)
+
+
+dashboard_feed = DashboardFeed(broadcaster, HealthSnapshotCache(), settings.DASHBOARD_FEED_MAX_PENDING)
@@ -0,0 +1,230 @@
+"""
+Text extraction for uploaded documents (.txt, .pdf, .docx).
+
+Parsers are streaming: PDFs are read a page at a time and DOCX bodies are
+iterated paragraph by paragraph straight from the zip member, and extraction
+stops once max_chars of text have been collected, so a huge document costs no
+more than its first max_chars. Extraction runs in a process pool whose workers
+have an address-space limit and a per-document timer, so a malicious or
+pathological file can only fail its own job. pypdf is optional; without it PDF
+uploads fail with a clear error instead of feeding binary to the LLM.
+
+This module is imported by the pool's (spawned) worker processes, so it only
+depends on the standard library and pypdf.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import signal
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Optional
+from xml.etree.ElementTree import iterparse
+
+try:
+    import resource
+    RESOURCE_LIMITS_AVAILABLE = True
+except ImportError:
+    RESOURCE_LIMITS_AVAILABLE = False
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class DocumentExtractionError(Exception):
+    """The document could not be turned into text."""
+
+
+class DocumentTimeoutError(DocumentExtractionError):
+    """Extraction exceeded the per-document time limit."""
+
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest used as the extracted-text cache key."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def iter_text_lines(stream: io.BufferedIOBase) -> Iterator[str]:
+    """Decode a plain text file line by line (UTF-8, BOM tolerated)."""
+    for line in io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace"):
+        yield line
+
+
+def iter_pdf_pages(stream: io.BufferedIOBase) -> Iterator[str]:
+    """Yield the text of each PDF page; pages are parsed only when reached."""
+    if not PYPDF_AVAILABLE:
+        raise DocumentExtractionError("PDF extraction requires pypdf. Install it with: pip install pypdf")
+    reader = PdfReader(stream)
+    if reader.is_encrypted:
+        raise DocumentExtractionError("Encrypted PDFs are not supported")
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            yield text + "\n"
+
+
+def iter_docx_paragraphs(stream: io.BufferedIOBase) -> Iterator[str]:
+    """Yield each paragraph of word/document.xml, parsed incrementally from the zip."""
+    with zipfile.ZipFile(stream) as archive:
+        try:
+            document = archive.open("word/document.xml")
+        except KeyError:
+            raise DocumentExtractionError("Not a Word document (word/document.xml is missing)")
+        with document:
+            parts = []
+            for event, element in iterparse(document, events=("end",)):
+                tag = element.tag
+                if tag == f"{WORD_NAMESPACE}t":
+                    parts.append(element.text or "")
+                elif tag == f"{WORD_NAMESPACE}tab":
+                    parts.append("\t")
+                elif tag in (f"{WORD_NAMESPACE}br", f"{WORD_NAMESPACE}cr"):
+                    parts.append("\n")
+                elif tag == f"{WORD_NAMESPACE}p":
+                    yield "".join(parts) + "\n"
+                    parts = []
+                    # Drop parsed paragraphs so memory stays flat on long documents
+                    element.clear()
+
+
+def _collect(parts: Iterable[str], max_chars: int) -> str:
+    collected = []
+    size = 0
+    for part in parts:
+        if size + len(part) >= max_chars:
+            collected.append(part[:max_chars - size])
+            break
+        collected.append(part)
+        size += len(part)
+    return "".join(collected).strip()
+
+
+def extract_text(content: bytes, extension: str, max_chars: int) -> str:
+    """Extract up to max_chars of text from a document of the given extension."""
+    extension = extension.lower()
+    stream = io.BytesIO(content)
+    try:
+        if extension == ".pdf":
+            parts = iter_pdf_pages(stream)
+        elif extension == ".docx":
+            parts = iter_docx_paragraphs(stream)
+        elif extension == ".txt":
+            parts = iter_text_lines(stream)
+        elif extension == ".doc":
+            raise DocumentExtractionError("Legacy .doc files are not supported; save the document as .docx")
+        else:
+            raise DocumentExtractionError(f"Text extraction is not supported for {extension or 'this'} files")
+        return _collect(parts, max_chars)
+    except DocumentExtractionError:
+        raise
+    except MemoryError:
+        raise DocumentExtractionError("Document exceeded the extraction memory limit")
+    except Exception as e:
+        # Parser errors on corrupt or mislabelled files
+        raise DocumentExtractionError(f"Could not read {extension} document: {str(e)}")
+
+
+def _raise_timeout(signum, frame):
+    raise DocumentTimeoutError("Document extraction timed out")
+
+
+def _init_worker(max_memory_bytes: int) -> None:
+    """Pool initializer: cap the worker's address space."""
+    if RESOURCE_LIMITS_AVAILABLE and max_memory_bytes > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+
+def _extract_in_worker(content: bytes, extension: str, max_chars: int, timeout_seconds: float) -> str:
+    # Pool tasks run on the worker's main thread, so an interval timer can interrupt the parser
+    timer = hasattr(signal, "setitimer") and timeout_seconds > 0
+    if timer:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        return extract_text(content, extension, max_chars)
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class DocumentExtractor:
+    """Process pool running extract_text with per-document time and memory limits."""
+
+    def __init__(self, workers: int, timeout_seconds: float, max_memory_mb: int, max_chars: int):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.max_chars = max_chars
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _new_pool(self, workers: int) -> ProcessPoolExecutor:
+        # spawn: never fork a process that is running event loop and threadpool threads
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.max_memory_bytes,)
+        )
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._new_pool(self.workers)
+        return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Stop a pool after a worker died or stopped responding, and replace it if
+        it is the shared one. Documents still running or queued in it fail with
+        BrokenProcessPool, and are retried by extract().
+        """
+        if self._executor is executor:
+            self._executor = None
+        for process in list((executor._processes or {}).values()):  # None once shut down
+            process.terminate()
+        executor.shutdown(wait=False)
+
+    async def _run(self, executor: ProcessPoolExecutor, content: bytes, extension: str) -> str:
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(
+                executor, _extract_in_worker, content, extension, self.max_chars, self.timeout_seconds
+            )
+            # The worker's own timer fires first; this only catches a wedged worker
+            return await asyncio.wait_for(future, timeout=self.timeout_seconds + 5)
+        except asyncio.TimeoutError:
+            self._reset(executor)
+            raise DocumentTimeoutError("Document extraction timed out")
+
+    async def extract(self, content: bytes, extension: str) -> str:
+        """Extract text in a worker process; raises DocumentExtractionError on failure."""
+        executor = self._pool()
+        try:
+            return await self._run(executor, content, extension)
+        except BrokenProcessPool:
+            # A worker of the shared pool was killed (e.g. by the OS for exceeding
+            # memory) or the pool was reset; the cause may be another document
+            self._reset(executor)
+
+        # Retry in a pool of its own, so a document that kills its worker fails alone
+        isolated = self._new_pool(1)
+        try:
+            return await self._run(isolated, content, extension)
+        except BrokenProcessPool:
+            raise DocumentExtractionError("Document extraction worker crashed")
+        finally:
+            isolated.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,258 @@
+"""
+In-process publish/subscribe for real-time events (Server-Sent Events).
+
+Publishers name the topics an event belongs to ("transcription:42",
+"project:7"); each subscriber holds a small bounded buffer and is only woken
+when an event for one of its topics arrives, so idle subscribers cost a few
+objects and no polling. An event is serialized once and the same frame is
+shared by every subscriber.
+
+With several worker processes, PostgresEventBridge relays events between them
+through LISTEN/NOTIFY: each process delivers its own events locally right
+away and forwards them on the channel, and the other processes deliver what
+they receive to their own subscribers.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_MAX_PAYLOAD_BYTES = 7900  # Postgres rejects NOTIFY payloads of 8000 bytes or more
+BRIDGE_RECONNECT_SECONDS = 5
+
+
+def transcription_topic(transcription_id: int) -> str:
+    return f"transcription:{transcription_id}"
+
+
+def project_topic(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+class Event:
+    """A named event with a JSON payload, formatted once as an SSE frame."""
+
+    __slots__ = ("name", "data", "_frame")
+
+    def __init__(self, name: str, data: str):
+        self.name = name
+        self.data = data
+        self._frame: Optional[bytes] = None
+
+    @property
+    def frame(self) -> bytes:
+        if self._frame is None:
+            self._frame = f"event: {self.name}\ndata: {self.data}\n\n".encode("utf-8")
+        return self._frame
+
+
+class Subscription:
+    """Buffered stream of the events published to a set of topics."""
+
+    __slots__ = ("topics", "dropped", "_broadcaster", "_events", "_wakeup")
+
+    def __init__(self, broadcaster: "EventBroadcaster", topics: Tuple[str, ...], max_queued: int):
+        self.topics = topics
+        self.dropped = 0  # Events discarded because the subscriber fell behind
+        self._broadcaster = broadcaster
+        self._events: Deque[Event] = deque(maxlen=max_queued)
+        self._wakeup = asyncio.Event()
+
+    def _put(self, event: Event) -> None:
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self._wakeup.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, or None if none arrived within timeout seconds."""
+        if not self._events:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._events.popleft()
+
+    def close(self) -> None:
+        self._broadcaster.unsubscribe(self)
+
+
+class EventBroadcaster:
+    """Fans published events out to the subscribers of their topics."""
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+        self.origin = uuid.uuid4().hex  # Identifies this process on the bridge channel
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge: Optional["PostgresEventBridge"] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({subscription for subscriptions in self._topics.values() for subscription in subscriptions})
+
+    def subscribe(self, *topics: str, max_queued: Optional[int] = None) -> Subscription:
+        """Subscribe to topics; must be called on the event loop, and closed when done."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, topics, max_queued or self.max_queued)
+        for topic in topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for topic in subscription.topics:
+            subscriptions = self._topics.get(topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._topics[topic]
+
+    def publish(self, topics: Iterable[str], name: str, data: str) -> None:
+        """Publish a JSON-encoded event to topics; safe to call from any thread."""
+        topics = tuple(topics)
+        event = Event(name, data)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if self._loop is not None and running_loop is not self._loop:
+            if not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._publish, topics, event)
+        else:
+            self._publish(topics, event)
+
+    def _publish(self, topics: Tuple[str, ...], event: Event) -> None:
+        self.deliver(topics, event)
+        if self._bridge is not None:
+            self._bridge.forward(self.origin, topics, event)
+
+    def deliver(self, topics: Tuple[str, ...], event: Event) -> None:
+        """Hand an event to local subscribers only (each subscriber gets it once)."""
+        if len(topics) == 1:
+            for subscription in self._topics.get(topics[0], ()):
+                subscription._put(event)
+            return
+        recipients = set()
+        for topic in topics:
+            recipients.update(self._topics.get(topic, ()))
+        for subscription in recipients:
+            subscription._put(event)
+
+    async def start_bridge(self, bridge: "PostgresEventBridge") -> None:
+        self._loop = asyncio.get_running_loop()
+        self._bridge = bridge
+        await bridge.start(self)
+
+    async def stop_bridge(self) -> None:
+        bridge, self._bridge = self._bridge, None
+        if bridge is not None:
+            await bridge.stop()
+
+
+class PostgresEventBridge:
+    """Relays events between worker processes over a Postgres LISTEN/NOTIFY channel."""
+
+    def __init__(self, engine: Engine, channel: str):
+        self.engine = engine
+        self.channel = channel
+        self._broadcaster: Optional[EventBroadcaster] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, broadcaster: EventBroadcaster) -> None:
+        self._broadcaster = broadcaster
+        self._outbox = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._send())]
+        logger.info("Event bridge relaying through Postgres channel %s", self.channel)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def forward(self, origin: str, topics: Tuple[str, ...], event: Event) -> None:
+        message = json.dumps({"origin": origin, "topics": topics, "name": event.name, "data": event.data})
+        if len(message.encode("utf-8")) > NOTIFY_MAX_PAYLOAD_BYTES:
+            logger.warning(f"Event {event.name} for {topics[0]} is too large to relay to other workers")
+            return
+        self._outbox.put_nowait(message)
+
+    def _notify(self, messages: List[str]) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                [{"channel": self.channel, "payload": message} for message in messages]
+            )
+
+    async def _send(self) -> None:
+        while True:
+            messages = [await self._outbox.get()]
+            while not self._outbox.empty():
+                messages.append(self._outbox.get_nowait())
+            try:
+                await run_in_threadpool(self._notify, messages)
+            except Exception as e:
+                logger.error(f"Could not relay {len(messages)} events to other workers: {str(e)}")
+
+    def _connect(self):
+        # A dedicated connection: LISTEN registrations belong to the session
+        connection = self.engine.raw_connection()
+        connection.driver_connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    def _receive(self, driver_connection, lost: asyncio.Event) -> None:
+        try:
+            driver_connection.poll()
+        except Exception as e:
+            logger.warning(f"Event bridge connection lost: {str(e)}")
+            lost.set()
+            return
+        while driver_connection.notifies:
+            notification = driver_connection.notifies.pop(0)
+            try:
+                message = json.loads(notification.payload)
+            except ValueError:
+                continue
+            if message.get("origin") == self._broadcaster.origin:
+                continue
+            self._broadcaster.deliver(tuple(message["topics"]), Event(message["name"], message["data"]))
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            connection = None
+            lost = asyncio.Event()
+            try:
+                connection = await run_in_threadpool(self._connect)
+                driver_connection = connection.driver_connection
+                loop.add_reader(driver_connection.fileno(), self._receive, driver_connection, lost)
+                try:
+                    await lost.wait()
+                finally:
+                    loop.remove_reader(driver_connection.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event bridge could not listen on {self.channel}: {str(e)}")
+            finally:
+                if connection is not None:
+                    # Never hand a LISTENing autocommit connection back to the pool
+                    connection.invalidate()
+            await asyncio.sleep(BRIDGE_RECONNECT_SECONDS)
+
+
+broadcaster = EventBroadcaster(max_queued=settings.EVENTS_SUBSCRIBER_QUEUE_SIZE)
@@ -0,0 +1,306 @@
+"""
+Service for streaming report and status history exports.
+
+Rows are read through a server-side cursor in fixed-size partitions and encoded
+chunk by chunk, so memory stays constant regardless of how many rows are
+exported. Each generator opens its own session because it keeps running after
+the endpoint (and its request-scoped session) has returned.
+"""
+import csv
+import io
+import logging
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.change_log import ChangeLogBounds, get_change_log_bounds, log_table as change_log_table
+from app.db.database import SessionLocal
+from app.db.models.change_log import ChangeOperation
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.schemas.report import ReportFilters
+from app.services.report_service import apply_report_filters, latest_status_id_subquery, project_health_status_column
+from app.services.s3_service import upload_fileobj_to_s3
+from app.utils.project_status_utils import get_health_status_label
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+HEALTH_EXPORT_FIELDS = [
+    "project_id",
+    "project_name",
+    "client_name",
+    "health_status",
+    "health_label",
+    "is_on_scope",
+    "is_on_time",
+    "is_on_budget",
+    "next_delivery",
+    "risks",
+    "last_updated",
+    "green_count",
+]
+
+STATUS_EXPORT_FIELDS = [
+    "id",
+    "project_id",
+    "project_name",
+    "client_id",
+    "client_name",
+    "is_on_scope",
+    "is_on_time",
+    "is_on_budget",
+    "next_delivery",
+    "risks",
+    "updated_by",
+    "updated_at",
+]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_rows(rows: Iterator[Sequence[Dict[str, Any]]], fields: List[str], export_format: str) -> Iterator[bytes]:
+    """Encode batches of row dicts as CSV (with header) or NDJSON, one chunk per batch."""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for batch in rows:
+            for row in batch:
+                writer.writerow([_csv_value(row[field]) for field in fields])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    else:
+        for batch in rows:
+            yield b"".join(dumps(row) + b"\n" for row in batch)
+
+
+def stream_partitions(
+    statement,
+    session_factory: Callable[[], Session],
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[Sequence]:
+    """Yield result rows in partitions of batch_size from a server-side cursor."""
+    db = session_factory()
+    try:
+        result = db.execute(statement, execution_options={"yield_per": batch_size})
+        yield from result.partitions()
+    finally:
+        db.close()
+
+
+def _map_partitions(partitions: Iterator[Sequence], to_row: Callable) -> Iterator[List[Dict[str, Any]]]:
+    for partition in partitions:
+        batch = [row for row in (to_row(record) for record in partition) if row is not None]
+        if batch:
+            yield batch
+
+
+def health_export_query(filters: Optional[ReportFilters] = None):
+    """Select each project with its latest status (within the filter dates), ordered by project."""
+    query = (
+        select(
+            Project.id,
+            Project.name,
+            Client.name,
+            project_health_status_column(),
+            ProjectStatus.is_on_scope,
+            ProjectStatus.is_on_time,
+            ProjectStatus.is_on_budget,
+            ProjectStatus.next_delivery,
+            ProjectStatus.risks,
+            ProjectStatus.updated_at,
+            func.coalesce(ProjectStatus.green_count, 0),
+        )
+        .join(Client, Project.client_id == Client.id)
+        .outerjoin(ProjectStatus, ProjectStatus.id == latest_status_id_subquery(filters))
+        .order_by(Project.id)
+    )
+    return apply_report_filters(query, filters)
+
+
+def _health_row(record) -> Dict[str, Any]:
+    (project_id, project_name, client_name, health_status, is_on_scope, is_on_time, is_on_budget,
+     next_delivery, risks, updated_at, green_count) = record
+    return {
+        "project_id": project_id,
+        "project_name": project_name,
+        "client_name": client_name,
+        "health_status": health_status,
+        "health_label": get_health_status_label(health_status),
+        "is_on_scope": is_on_scope,
+        "is_on_time": is_on_time,
+        "is_on_budget": is_on_budget,
+        "next_delivery": next_delivery,
+        "risks": risks,
+        "last_updated": updated_at,
+        "green_count": green_count,
+    }
+
+
+def iter_health_export(
+    filters: Optional[ReportFilters],
+    export_format: str,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """Stream per-project health metrics as CSV or NDJSON."""
+    rows = _map_partitions(stream_partitions(health_export_query(filters), session_factory), _health_row)
+    return encode_rows(rows, HEALTH_EXPORT_FIELDS, export_format)
+
+
+def _status_history_columns() -> Dict[str, Any]:
+    return {
+        "id": ProjectStatus.id,
+        "project_id": ProjectStatus.project_id,
+        "project_name": Project.name,
+        "client_id": Project.client_id,
+        "client_name": Client.name,
+        "is_on_scope": ProjectStatus.is_on_scope,
+        "is_on_time": ProjectStatus.is_on_time,
+        "is_on_budget": ProjectStatus.is_on_budget,
+        "next_delivery": ProjectStatus.next_delivery,
+        "risks": ProjectStatus.risks,
+        "updated_by": ProjectStatus.updated_by,
+        "updated_at": ProjectStatus.updated_at,
+    }
+
+
+def get_status_watermark(db: Session) -> ChangeLogBounds:
+    """
+    Change log bounds at the start of an export; last_seq is its watermark.
+
+    Sequence numbers become visible in commit order (see app.db.change_log), so
+    every status change committed after this point has a higher number and is
+    picked up by the next export, whatever its status id.
+    """
+    return get_change_log_bounds(db.connection())
+
+
+def status_history_query(
+    project_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    columns: Optional[List[str]] = None,
+    since_seq: Optional[int] = None,
+    through_seq: Optional[int] = None
+):
+    """
+    Select status history joined with project and client names, ordered by status id.
+
+    Only the requested columns are selected (the clients join is skipped when no
+    client column is requested). With since_seq, only statuses inserted or
+    edited by change log entries after since_seq (and through through_seq, when
+    given) are selected, with their current values; repeated exports with the
+    previous watermark as since_seq return new and edited rows. A row changed
+    again after the watermark was read may be exported twice: keep the latest
+    by id. Deleted statuses are not exported.
+    """
+    available = _status_history_columns()
+    selected = columns or STATUS_EXPORT_FIELDS
+    query = (
+        select(*(available[field] for field in selected))
+        .select_from(ProjectStatus)
+        .join(Project, ProjectStatus.project_id == Project.id)
+        .order_by(ProjectStatus.id)
+    )
+    if "client_name" in selected:
+        query = query.join(Client, Project.client_id == Client.id)
+    if project_id is not None:
+        query = query.where(ProjectStatus.project_id == project_id)
+    if date_from is not None:
+        query = query.where(ProjectStatus.updated_at >= date_from)
+    if date_to is not None:
+        query = query.where(ProjectStatus.updated_at <= date_to)
+    if since_seq is not None:
+        changed = select(change_log_table.c.row_id).where(
+            change_log_table.c.table_name == ProjectStatus.__tablename__,
+            change_log_table.c.operation != ChangeOperation.DELETE.value,
+            change_log_table.c.seq > since_seq
+        )
+        if through_seq is not None:
+            changed = changed.where(change_log_table.c.seq <= through_seq)
+        query = query.where(ProjectStatus.id.in_(changed))
+    return query
+
+
+def iter_status_history_export(
+    export_format: str,
+    project_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    columns: Optional[List[str]] = None,
+    since_seq: Optional[int] = None,
+    through_seq: Optional[int] = None,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """Stream project status history as CSV or NDJSON."""
+    fields = columns or STATUS_EXPORT_FIELDS
+    query = status_history_query(project_id, date_from, date_to, fields, since_seq, through_seq)
+    rows = _map_partitions(stream_partitions(query, session_factory), lambda record: dict(zip(fields, record)))
+    return encode_rows(rows, fields, export_format)
+
+
+def write_export_to_storage(chunks: Iterator[bytes], filename: str) -> str:
+    """
+    Write an export to the configured storage backend under exports/.
+
+    Returns the stored path (relative to UPLOAD_DIR for local storage, the S3
+    key for S3). SharePoint storage is organized per project and is not
+    supported for exports.
+    """
+    storage_type = settings.STORAGE_TYPE.lower()
+    if storage_type == "s3":
+        with tempfile.TemporaryFile() as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.seek(0)
+            s3_key = f"exports/{filename}"
+            if not upload_fileobj_to_s3(spool, s3_key):
+                raise RuntimeError("Failed to upload export to S3")
+            return s3_key
+    if storage_type == "sharepoint":
+        raise ValueError("Exports cannot be written to SharePoint storage")
+
+    export_dir = Path(settings.UPLOAD_DIR) / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    # Exclusive create: never replace an existing export
+    with open(export_dir / filename, "xb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    logger.info("Export written to %s", export_dir / filename)
+    return f"exports/{filename}"
+
+
+def export_filename(prefix: str, export_format: str) -> str:
+    """
+    Build a unique filename such as health-report-20240101T120000-3f2a9c1e0b7d.csv.
+
+    The random suffix keeps exports started within the same second from
+    overwriting each other in storage.
+    """
+    return f"{prefix}-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}.{export_format}"
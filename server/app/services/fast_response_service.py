@@ -0,0 +1,91 @@
+"""
+Service for building list responses directly from SQL row tuples.
+
+Used by the fast JSON path (settings.FAST_JSON_RESPONSES). The dictionaries
+produced here mirror ProjectResponse and ClientDetailResponse field for field,
+so they can be encoded without loading ORM objects or re-validating them.
+"""
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+
+from app.db.models.project import Project
+from app.db.models.client import Client
+
+PROJECT_COLUMNS = (
+    Project.id,
+    Project.name,
+    Project.client_id,
+    Project.created_by,
+    Project.created_at,
+    Project.updated_at,
+)
+
+CLIENT_COLUMNS = (
+    Client.id,
+    Client.name,
+    Client.created_at,
+    Client.updated_at,
+)
+
+
+def client_row_to_dict(row) -> Dict[str, Any]:
+    """Convert a (id, name, created_at, updated_at) client row to a ClientResponse dict."""
+    return {
+        "name": row[1],
+        "id": row[0],
+        "created_at": row[2],
+        "updated_at": row[3],
+    }
+
+
+def project_row_to_dict(row, client: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert a PROJECT_COLUMNS row to a ProjectResponse dict."""
+    return {
+        "name": row[1],
+        "client_id": row[2],
+        "id": row[0],
+        "created_by": row[3],
+        "created_at": row[4],
+        "updated_at": row[5],
+        "client": client,
+    }
+
+
+def get_project_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Get projects with their client as ProjectResponse dicts."""
+    query = select(*PROJECT_COLUMNS, *CLIENT_COLUMNS).join(Client, Project.client_id == Client.id)
+
+    if search:
+        query = query.where(
+            or_(
+                Project.name.ilike(f"%{search}%"),
+                Client.name.ilike(f"%{search}%")
+            )
+        )
+
+    rows = db.execute(query.offset(skip).limit(limit)).all()
+    offset = len(PROJECT_COLUMNS)
+    return [project_row_to_dict(row, client_row_to_dict(row[offset:])) for row in rows]
+
+
+def get_client_rows(db: Session) -> List[Dict[str, Any]]:
+    """Get all clients with their projects as ClientDetailResponse dicts."""
+    clients: Dict[int, Dict[str, Any]] = {}
+    client_refs: Dict[int, Dict[str, Any]] = {}
+
+    for row in db.execute(select(*CLIENT_COLUMNS)).all():
+        client_refs[row[0]] = client_row_to_dict(row)
+        clients[row[0]] = {**client_refs[row[0]], "projects": []}
+
+    for row in db.execute(select(*PROJECT_COLUMNS)).all():
+        client = clients.get(row[2])
+        if client is not None:
+            client["projects"].append(project_row_to_dict(row, client_refs[row[2]]))
+
+    return list(clients.values())
@@ -3,11 +3,14 @@ OpenAI service for transcription and AI processing.
 """
 import os
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
 from openai import OpenAI
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.metrics import external_call
 from app.utils.file_upload import get_file_content
 
 logger = logging.getLogger(__name__)
@@ -15,13 +18,18 @@ logger = logging.getLogger(__name__)
 # Initialize OpenAI client (lazy initialization to avoid errors if API key is not set)
 _client = None
 _client_initialized = False
+_client_lock = threading.Lock()  # Queue workers call this concurrently from the threadpool
 
 def get_openai_client():
     """Get OpenAI client, initializing it if needed."""
     global _client, _client_initialized
     
-    if not _client_initialized:
-        _client_initialized = True
+    if _client_initialized:
+        return _client
+    
+    with _client_lock:
+        if _client_initialized:
+            return _client
         if settings.OPENAI_API_KEY:
             try:
                 _client = OpenAI(api_key=settings.OPENAI_API_KEY)
@@ -32,6 +40,7 @@ def get_openai_client():
         else:
             logger.warning("OpenAI API key not configured. Transcription features will be disabled.")
             _client = None
+        _client_initialized = True
     
     return _client
 
@@ -52,8 +61,9 @@ async def transcribe_audio_video(file_path: str) -> Optional[str]:
         return None
     
     try:
-        # Get file content (works for both local and SharePoint)
-        file_content = get_file_content(file_path)
+        # Get file content (works for both local and SharePoint); blocking I/O
+        # runs in the threadpool so concurrent queue workers don't stall the loop
+        file_content = await run_in_threadpool(get_file_content, file_path)
         
         if not file_content:
             logger.error(f"File not found or could not be read: {file_path}")
@@ -63,7 +73,7 @@ async def transcribe_audio_video(file_path: str) -> Optional[str]:
         full_path = Path(file_path)
         
         # Transcribe file
-        logger.info(f"Transcribing file: {file_path}")
+        logger.info("Transcribing file: %s", file_path)
         
         # Determine content type based on file extension
         ext = full_path.suffix.lower()
@@ -82,21 +92,23 @@ async def transcribe_audio_video(file_path: str) -> Optional[str]:
         content_type = content_type_map.get(ext, "audio/mpeg")
         
         # Create file tuple for OpenAI API: (filename, file_content, content_type)
-        transcription = openai_client.audio.transcriptions.create(
-            model="whisper-1",
-            file=(full_path.name, file_content, content_type),
-            response_format="text"
-        )
+        with external_call("openai"):
+            transcription = await run_in_threadpool(
+                openai_client.audio.transcriptions.create,
+                model="whisper-1",
+                file=(full_path.name, file_content, content_type),
+                response_format="text"
+            )
         
         # When response_format="text", the API returns a string directly
         if isinstance(transcription, str):
-            logger.info(f"Transcription completed. Length: {len(transcription)} characters")
+            logger.info("Transcription completed. Length: %s characters", len(transcription))
             return transcription
         
         # Fallback: if response is an object with text attribute
         if hasattr(transcription, 'text'):
             text = transcription.text
-            logger.info(f"Transcription completed. Length: {len(text)} characters")
+            logger.info("Transcription completed. Length: %s characters", len(text))
             return text
         
         logger.warning(f"Unexpected transcription response format: {type(transcription)}")
@@ -105,33 +117,3 @@ async def transcribe_audio_video(file_path: str) -> Optional[str]:
     except Exception as e:
         logger.error(f"Error transcribing file {file_path}: {str(e)}")
         return None
-
-
-def read_text_file(file_path: str) -> Optional[str]:
-    """
-    Read text from a text file (local or SharePoint).
-    
-    Args:
-        file_path: Path to the text file
-        
-    Returns:
-        File contents as string or None if reading fails
-    """
-    try:
-        # Get file content (works for both local and SharePoint)
-        file_content = get_file_content(file_path)
-        
-        if not file_content:
-            logger.error(f"File not found or could not be read: {file_path}")
-            return None
-        
-        # Try decoding as UTF-8
-        try:
-            return file_content.decode("utf-8")
-        except UnicodeDecodeError:
-            # If UTF-8 fails, try with error handling
-            return file_content.decode("utf-8", errors="ignore")
-                
-    except Exception as e:
-        logger.error(f"Error reading text file {file_path}: {str(e)}")
-        return None
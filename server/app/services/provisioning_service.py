@@ -0,0 +1,309 @@
+"""
+Service for bulk client and project provisioning.
+
+Rows are validated up front; client names are resolved to ids in one query and
+name uniqueness is checked set-based, one query per chunk. Each chunk is then
+written with a single INSERT ... ON CONFLICT (name) statement and committed, and
+its per-item results are yielded so the endpoint can stream them while the next
+chunk is processed. Core inserts bypass the ORM flush hooks, so the change log,
+table versions, health aggregates and trend invalidations are maintained
+explicitly.
+"""
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.responses import dumps
+from app.db.change_log import record_row_changes
+from app.db.change_tracking import bump_table_versions
+from app.db.database import SessionLocal
+from app.db.health_aggregates import refresh_session_project_health
+from app.db.health_trends import EPOCH, invalidate_trend_rollups
+from app.db.models.change_log import ChangeOperation
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.schemas.client import ClientCreate
+from app.schemas.project import ProjectBulkRow
+from app.schemas.provisioning import ProvisioningItemResult, ProvisioningSummary
+from app.services.bulk_status_service import ParsedRow, describe_validation_error
+
+logger = logging.getLogger(__name__)
+
+PROVISIONING_CHUNK_SIZE = 1000
+
+# Dialects whose insert() supports ON CONFLICT ... RETURNING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _upsert_insert(connection: Connection, table):
+    try:
+        return _UPSERT_INSERTS[connection.dialect.name](table)
+    except KeyError:
+        raise ValueError(f"Bulk provisioning is not supported on {connection.dialect.name}")
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _validate(
+    parsed_rows: Iterable[ParsedRow],
+    schema
+) -> Tuple[int, List[Tuple[int, object]], List[ProvisioningItemResult]]:
+    """Validate rows against schema and reject names repeated within the payload."""
+    received = 0
+    valid = []
+    failed: List[ProvisioningItemResult] = []
+    seen = set()
+    for line_number, value in parsed_rows:
+        received += 1
+        if isinstance(value, str):
+            failed.append(ProvisioningItemResult(row=line_number, outcome="failed", error=value))
+            continue
+        try:
+            item = schema.model_validate(value)
+        except ValidationError as e:
+            name = value.get("name")
+            failed.append(ProvisioningItemResult(
+                row=line_number,
+                name=name if isinstance(name, str) else None,
+                outcome="failed",
+                error=describe_validation_error(e)
+            ))
+            continue
+        if item.name in seen:
+            failed.append(ProvisioningItemResult(
+                row=line_number, name=item.name, outcome="failed", error="Duplicate name in payload"
+            ))
+            continue
+        seen.add(item.name)
+        valid.append((line_number, item))
+    return received, valid, failed
+
+
+def _summarize(received: int, counts: Dict[str, int]) -> ProvisioningSummary:
+    return ProvisioningSummary(
+        received=received,
+        created=counts["created"],
+        updated=counts["updated"],
+        unchanged=counts["unchanged"],
+        failed=counts["failed"]
+    )
+
+
+def _provision(
+    received: int,
+    failed: List[ProvisioningItemResult],
+    chunk_results: Iterator[List[ProvisioningItemResult]]
+) -> Iterator[object]:
+    """Yield validation failures, then each chunk's results, then the summary."""
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "failed": len(failed)}
+    yield from failed
+    for results in chunk_results:
+        for result in results:
+            counts[result.outcome] += 1
+        yield from results
+    yield _summarize(received, counts)
+
+
+def provision_clients(
+    parsed_rows: Iterable[ParsedRow],
+    upsert: bool = False,
+    session_factory: Callable[[], Session] = SessionLocal,
+    chunk_size: int = PROVISIONING_CHUNK_SIZE
+) -> Iterator[object]:
+    """
+    Create clients in chunks, yielding a ProvisioningItemResult per row and a
+    final ProvisioningSummary.
+
+    Existing names fail, as in the single create; with upsert=True they are
+    reported as unchanged with their id instead.
+    """
+    received, valid, failed = _validate(parsed_rows, ClientCreate)
+
+    def chunk_results() -> Iterator[List[ProvisioningItemResult]]:
+        with session_factory() as db:
+            for chunk in _chunks(valid, chunk_size):
+                names = [item.name for _, item in chunk]
+                existing = dict(db.execute(select(Client.name, Client.id).where(Client.name.in_(names))).all())
+
+                new_rows = [{"name": name} for name in names if name not in existing]
+                created: Dict[str, int] = {}
+                if new_rows:
+                    connection = db.connection()
+                    statement = _upsert_insert(connection, Client.__table__)
+                    statement = statement.on_conflict_do_nothing(index_elements=["name"])
+                    created = dict(
+                        (row.name, row.id)
+                        for row in connection.execute(statement.returning(Client.id, Client.name), new_rows)
+                    )
+                    if created:
+                        record_row_changes(db, Client.__tablename__, ChangeOperation.INSERT, created.values())
+                        bump_table_versions(connection, [Client.__tablename__])
+                    db.commit()
+
+                missing = [name for name in names if name not in existing and name not in created]
+                if missing and upsert:
+                    # Created concurrently between the lookup and the insert
+                    existing.update(db.execute(select(Client.name, Client.id).where(Client.name.in_(missing))).all())
+
+                results = []
+                for line_number, item in chunk:
+                    if item.name in created:
+                        results.append(ProvisioningItemResult(
+                            row=line_number, name=item.name, id=created[item.name], outcome="created"
+                        ))
+                    elif upsert and item.name in existing:
+                        results.append(ProvisioningItemResult(
+                            row=line_number, name=item.name, id=existing[item.name], outcome="unchanged"
+                        ))
+                    else:
+                        results.append(ProvisioningItemResult(
+                            row=line_number, name=item.name, id=existing.get(item.name), outcome="failed",
+                            error="Client with this name already exists"
+                        ))
+                logger.info("Provisioned client chunk: %s created of %s", len(created), len(chunk))
+                yield results
+
+    return _provision(received, failed, chunk_results())
+
+
+def _resolve_clients(db: Session, items: List[ProjectBulkRow]) -> Tuple[set, Dict[str, int]]:
+    """Existing client ids and name -> id for every client referenced, in one query."""
+    client_ids = {item.client_id for item in items if item.client_id is not None}
+    client_names = {item.client_name for item in items if item.client_id is None}
+    if not client_ids and not client_names:
+        return set(), {}
+    rows = db.execute(
+        select(Client.id, Client.name).where(or_(Client.id.in_(client_ids), Client.name.in_(client_names)))
+    ).all()
+    return {row.id for row in rows}, {row.name: row.id for row in rows}
+
+
+def provision_projects(
+    parsed_rows: Iterable[ParsedRow],
+    user_id: int,
+    upsert: bool = False,
+    session_factory: Callable[[], Session] = SessionLocal,
+    chunk_size: int = PROVISIONING_CHUNK_SIZE
+) -> Iterator[object]:
+    """
+    Create projects in chunks, yielding a ProvisioningItemResult per row and a
+    final ProvisioningSummary.
+
+    Each row names its client by client_id or client_name. Existing project
+    names fail, as in the single create; with upsert=True they are moved to
+    the given client (updated) or left as they are (unchanged).
+    """
+    received, valid, failed = _validate(parsed_rows, ProjectBulkRow)
+
+    def chunk_results() -> Iterator[List[ProvisioningItemResult]]:
+        with session_factory() as db:
+            client_ids, client_names = _resolve_clients(db, [item for _, item in valid])
+            resolved = []
+            unresolved = []
+            for line_number, item in valid:
+                client_id = item.client_id if item.client_id is not None else client_names.get(item.client_name)
+                if client_id is None or client_id not in client_ids:
+                    unresolved.append(ProvisioningItemResult(
+                        row=line_number, name=item.name, outcome="failed", error="Client not found"
+                    ))
+                else:
+                    resolved.append((line_number, item.name, client_id))
+            if unresolved:
+                yield unresolved
+
+            for chunk in _chunks(resolved, chunk_size):
+                names = [name for _, name, _ in chunk]
+                existing = {
+                    row.name: row
+                    for row in db.execute(
+                        select(Project.id, Project.name, Project.client_id, Project.created_at)
+                        .where(Project.name.in_(names))
+                    )
+                }
+
+                outcomes: Dict[str, str] = {}
+                write_rows = []
+                for _, name, client_id in chunk:
+                    current = existing.get(name)
+                    if current is None:
+                        outcomes[name] = "created"
+                    elif not upsert:
+                        outcomes[name] = "failed"
+                        continue
+                    elif current.client_id == client_id:
+                        outcomes[name] = "unchanged"
+                        continue
+                    else:
+                        outcomes[name] = "updated"
+                    write_rows.append({"name": name, "client_id": client_id, "created_by": user_id})
+
+                written: Dict[str, int] = {}
+                if write_rows:
+                    connection = db.connection()
+                    statement = _upsert_insert(connection, Project.__table__)
+                    if upsert:
+                        statement = statement.on_conflict_do_update(
+                            index_elements=["name"],
+                            set_={"client_id": statement.excluded.client_id, "updated_at": func.now()}
+                        )
+                    else:
+                        statement = statement.on_conflict_do_nothing(index_elements=["name"])
+                    written = dict(
+                        (row.name, row.id)
+                        for row in connection.execute(statement.returning(Project.id, Project.name), write_rows)
+                    )
+                    if written:
+                        # Keep derived tables consistent, as the ORM flush hooks would
+                        for operation, outcome in ((ChangeOperation.INSERT, "created"), (ChangeOperation.UPDATE, "updated")):
+                            record_row_changes(db, Project.__tablename__, operation, [
+                                project_id for name, project_id in written.items() if outcomes[name] == outcome
+                            ])
+                        refresh_session_project_health(db, written.values())
+                        bump_table_versions(connection, [Project.__tablename__])
+                        moved = [
+                            existing[name].created_at or EPOCH
+                            for name in written if outcomes[name] == "updated"
+                        ]
+                        if moved:
+                            invalidate_trend_rollups(connection, min(moved))
+                    db.commit()
+
+                results = []
+                for line_number, name, _ in chunk:
+                    outcome = outcomes[name]
+                    if outcome in ("created", "updated") and name in written:
+                        results.append(ProvisioningItemResult(
+                            row=line_number, name=name, id=written[name], outcome=outcome
+                        ))
+                    elif outcome == "unchanged":
+                        results.append(ProvisioningItemResult(
+                            row=line_number, name=name, id=existing[name].id, outcome=outcome
+                        ))
+                    else:
+                        # Existing, or created concurrently between the lookup and the insert
+                        current = existing.get(name)
+                        results.append(ProvisioningItemResult(
+                            row=line_number, name=name, id=current.id if current else None, outcome="failed",
+                            error="Project with this name already exists"
+                        ))
+                logger.info("Provisioned project chunk: %s written of %s", len(written), len(chunk))
+                yield results
+
+    return _provision(received, failed, chunk_results())
+
+
+def encode_results(results: Iterable[object]) -> Iterator[bytes]:
+    """Encode provisioning results as NDJSON, one line per item plus the summary."""
+    for result in results:
+        yield dumps(result.model_dump()) + b"\n"
@@ -0,0 +1,229 @@
+"""
+Cached, single-flight project health report generation.
+
+Reports are cached per normalized ReportFilters and stamped with the change
+counters of the tables they read, so any write to projects, clients or statuses
+(from any worker) invalidates them. Concurrent requests for the same filters
+and data version share one computation instead of each building an identical
+report; a request arriving after a write never joins a build that started
+before it.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.change_tracking import get_table_versions
+from app.db.database import SessionLocal
+from app.schemas.report import ProjectHealthReport, ReportFilters
+from app.services.report_service import generate_project_health_report
+
+logger = logging.getLogger(__name__)
+
+# Tables a health report reads; writes to any of them invalidate cached reports
+REPORT_TABLES = ("projects", "clients", "project_statuses")
+
+CacheKey = Tuple[Any, ...]
+Versions = Dict[str, int]
+BuildKey = Tuple[CacheKey, Tuple[Tuple[str, int], ...]]
+
+
+def normalize_filters(filters: Optional[ReportFilters]) -> CacheKey:
+    """Build a cache key that is equal for filters producing the same report."""
+    if filters is None:
+        filters = ReportFilters()
+    return (
+        tuple(sorted(set(filters.client_ids))) if filters.client_ids else None,
+        filters.health_status or None,
+        filters.date_from.isoformat() if filters.date_from else None,
+        filters.date_to.isoformat() if filters.date_to else None,
+        filters.include_no_status,
+    )
+
+
+def _build_key(key: CacheKey, versions: Versions) -> BuildKey:
+    return key, tuple(sorted(versions.items()))
+
+
+def _newer(versions: Versions, than: Versions) -> bool:
+    """Whether versions reflect every write than does, and more."""
+    return versions != than and all(versions.get(table, 0) >= version for table, version in than.items())
+
+
+@dataclass
+class _CacheEntry:
+    report: ProjectHealthReport
+    versions: Versions
+
+
+@dataclass
+class ReportCacheStats:
+    """Counters describing cache effectiveness."""
+    requests: int = 0
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    builds: int = 0
+    build_errors: int = 0
+    build_seconds_total: float = 0.0
+    last_build_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        served_from_cache = self.hits + self.stale_hits + self.coalesced
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "builds": self.builds,
+            "build_errors": self.build_errors,
+            "hit_rate": round(served_from_cache / self.requests, 4) if self.requests else 0.0,
+            "build_seconds_total": round(self.build_seconds_total, 6),
+            "build_seconds_avg": round(self.build_seconds_total / self.builds, 6) if self.builds else 0.0,
+            "last_build_seconds": round(self.last_build_seconds, 6),
+        }
+
+
+class ReportCache:
+    """
+    In-process LRU cache of health reports with single-flight builds.
+
+    All bookkeeping happens on the event loop; report computation runs in the
+    threadpool with its own database session, so an abandoned request can never
+    close a session that a shared build is still using.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        stale_while_revalidate: bool = False,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self.session_factory = session_factory
+        self.stats = ReportCacheStats()
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[BuildKey, asyncio.Task] = {}
+
+    def clear(self) -> None:
+        """Drop all cached reports."""
+        self._entries.clear()
+
+    def _build_sync(self, filters: Optional[ReportFilters]) -> ProjectHealthReport:
+        db = self.session_factory()
+        try:
+            return generate_project_health_report(db=db, filters=filters)
+        finally:
+            db.close()
+
+    async def _build(self, key: CacheKey, filters: Optional[ReportFilters], versions: Versions) -> ProjectHealthReport:
+        start = time.perf_counter()
+        try:
+            report = await run_in_threadpool(self._build_sync, filters)
+        except Exception:
+            self.stats.build_errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.builds += 1
+            self.stats.build_seconds_total += elapsed
+            self.stats.last_build_seconds = elapsed
+            self._inflight.pop(_build_key(key, versions), None)
+
+        current = self._entries.get(key)
+        # A build that started before a later one may finish after it
+        if current is None or not _newer(current.versions, versions):
+            self._entries[key] = _CacheEntry(report=report, versions=versions)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return report
+
+    def _start_build(self, key: CacheKey, filters: Optional[ReportFilters], versions: Versions) -> asyncio.Task:
+        task = asyncio.ensure_future(self._build(key, filters, versions))
+        self._inflight[_build_key(key, versions)] = task
+        return task
+
+    async def get_report(
+        self,
+        db: Session,
+        filters: Optional[ReportFilters] = None,
+        user_name: Optional[str] = None,
+        versions: Optional[Versions] = None
+    ) -> Tuple[ProjectHealthReport, Versions]:
+        """
+        Get a report for the filters, building it at most once per data version.
+
+        Returns the report and the table versions it was built from, which are
+        older than the current ones when a stale report is served.
+        """
+        self.stats.requests += 1
+        key = normalize_filters(filters)
+        if versions is None:
+            versions = get_table_versions(db, REPORT_TABLES)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.versions == versions:
+            self.stats.hits += 1
+            self._entries.move_to_end(key)
+            return _personalize(entry.report, user_name), entry.versions
+
+        task = self._inflight.get(_build_key(key, versions))
+        if entry is not None and self.stale_while_revalidate:
+            self.stats.stale_hits += 1
+            if task is None:
+                task = self._start_build(key, filters, versions)
+                task.add_done_callback(_log_background_failure)
+            return _personalize(entry.report, user_name), entry.versions
+
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            task = self._start_build(key, filters, versions)
+
+        # Shield so a disconnecting client does not cancel a build others are waiting on
+        report = await asyncio.shield(task)
+        return _personalize(report, user_name), versions
+
+
+def _personalize(report: ProjectHealthReport, user_name: Optional[str]) -> ProjectHealthReport:
+    """Return a shallow copy of a shared report attributed to the requesting user."""
+    return report.model_copy(update={"generated_by": user_name})
+
+
+def _log_background_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background report refresh failed", exc_info=task.exception())
+
+
+report_cache = ReportCache(
+    max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+    stale_while_revalidate=settings.REPORT_CACHE_STALE_WHILE_REVALIDATE
+)
+
+
+async def get_project_health_report_cached(
+    db: Session,
+    filters: Optional[ReportFilters] = None,
+    user_name: Optional[str] = None,
+    versions: Optional[Versions] = None
+) -> Tuple[ProjectHealthReport, Versions]:
+    """
+    Get a project health report through the shared cache when it is enabled,
+    with the table versions it reflects (see ReportCache.get_report).
+    """
+    if not settings.REPORT_CACHE_ENABLED:
+        if versions is None:
+            versions = get_table_versions(db, REPORT_TABLES)
+        return generate_project_health_report(db=db, filters=filters, user_name=user_name), versions
+    return await report_cache.get_report(db, filters=filters, user_name=user_name, versions=versions)
@@ -3,19 +3,22 @@ Service for generating project health reports.
 """
 import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, or_, and_, select
 
 from app.db.models.project import Project
 from app.db.models.client import Client
 from app.db.models.project_status import ProjectStatus
+from app.db.models.client_health_aggregate import ClientHealthAggregate
+from app.core.config import settings
 from app.schemas.report import (
     ProjectHealthMetrics,
     ClientHealthSummary,
     OverallHealthMetrics,
     UpcomingDelivery,
     ProjectHealthReport,
+    ProjectHealthSummary,
     ReportFilters
 )
 from app.utils.project_status_utils import calculate_project_health_status, get_health_status_label
@@ -32,76 +35,89 @@ def calculate_green_count(is_on_scope: Optional[bool], is_on_time: Optional[bool
     ])
 
 
+# Health of a project without a status (all flags null), per the reference implementation
+NO_STATUS_HEALTH = calculate_project_health_status({})
+
+
+def latest_status_id_subquery(filters: Optional[ReportFilters] = None):
+    """Correlated subquery selecting the id of a project's latest status within the filter dates."""
+    latest_status_id = select(ProjectStatus.id).where(ProjectStatus.project_id == Project.id)
+    if filters and filters.date_from:
+        latest_status_id = latest_status_id.where(ProjectStatus.updated_at >= filters.date_from)
+    if filters and filters.date_to:
+        latest_status_id = latest_status_id.where(ProjectStatus.updated_at <= filters.date_to)
+    return (
+        latest_status_id
+        .order_by(ProjectStatus.updated_at.desc(), ProjectStatus.id.desc())
+        .limit(1)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+
+
+def project_health_status_column():
+    """Health status of the joined latest status, or the no-status health when there is none."""
+    return func.coalesce(ProjectStatus.health_status, NO_STATUS_HEALTH)
+
+
+def apply_report_filters(query, filters: Optional[ReportFilters] = None):
+    """
+    Apply client, no-status and health status filters to a query over projects
+    outer-joined to their latest status (see latest_status_id_subquery).
+    """
+    if not filters:
+        return query
+    if filters.client_ids:
+        query = query.where(Project.client_id.in_(filters.client_ids))
+    if not filters.include_no_status:
+        query = query.where(ProjectStatus.id.isnot(None))
+    if filters.health_status in ("green", "yellow", "red"):
+        query = query.where(project_health_status_column() == filters.health_status)
+    elif filters.health_status == "none":
+        query = query.where(ProjectStatus.id.is_(None))
+    return query
+
+
 def get_project_health_metrics(
     db: Session,
     filters: Optional[ReportFilters] = None
 ) -> List[ProjectHealthMetrics]:
-    """Get health metrics for all projects."""
-    # Get all projects with their clients
-    projects_query = db.query(Project).join(Client, Project.client_id == Client.id)
-    
-    # Apply client filter
-    if filters and filters.client_ids:
-        projects_query = projects_query.filter(Project.client_id.in_(filters.client_ids))
+    """Get health metrics for all projects, with every filter applied in SQL."""
+    query = (
+        select(
+            Project.id,
+            Project.name,
+            Client.name,
+            project_health_status_column(),
+            ProjectStatus.is_on_scope,
+            ProjectStatus.is_on_time,
+            ProjectStatus.is_on_budget,
+            ProjectStatus.next_delivery,
+            ProjectStatus.risks,
+            ProjectStatus.updated_at,
+            func.coalesce(ProjectStatus.green_count, 0)
+        )
+        .join(Client, Project.client_id == Client.id)
+        .outerjoin(ProjectStatus, ProjectStatus.id == latest_status_id_subquery(filters))
+        .order_by(Project.id)
+    )
+    query = apply_report_filters(query, filters)
     
-    projects = projects_query.all()
     metrics = []
-    
-    for project in projects:
-        # Get latest status for this project
-        status_query = db.query(ProjectStatus).filter(ProjectStatus.project_id == project.id)
-        
-        # Apply date filters if provided
-        if filters:
-            if filters.date_from:
-                status_query = status_query.filter(ProjectStatus.updated_at >= filters.date_from)
-            if filters.date_to:
-                status_query = status_query.filter(ProjectStatus.updated_at <= filters.date_to)
-        
-        latest_status = status_query.order_by(ProjectStatus.updated_at.desc()).first()
-        
-        # If no status and filter excludes no-status projects, skip
-        if not latest_status:
-            if filters and not filters.include_no_status:
-                continue
-        
-        # Calculate health metrics
-        is_on_scope = latest_status.is_on_scope if latest_status else None
-        is_on_time = latest_status.is_on_time if latest_status else None
-        is_on_budget = latest_status.is_on_budget if latest_status else None
-        
-        green_count = calculate_green_count(is_on_scope, is_on_time, is_on_budget)
-        health_status = calculate_project_health_status({
-            "is_on_scope": is_on_scope,
-            "is_on_time": is_on_time,
-            "is_on_budget": is_on_budget
-        })
-        
-        # Apply health status filter
-        if filters and filters.health_status:
-            if filters.health_status == "green" and health_status != "green":
-                continue
-            elif filters.health_status == "yellow" and health_status != "yellow":
-                continue
-            elif filters.health_status == "red" and health_status != "red":
-                continue
-            elif filters.health_status == "none" and latest_status is not None:
-                continue
-        
-        health_label = get_health_status_label(health_status)
-        
+    for (project_id, project_name, client_name, health_status, is_on_scope, is_on_time, is_on_budget,
+         next_delivery, risks, last_updated, green_count) in db.execute(query):
         metrics.append(ProjectHealthMetrics(
-            project_id=project.id,
-            project_name=project.name,
-            client_name=project.client.name,
+            project_id=project_id,
+            project_name=project_name,
+            client_name=client_name,
             health_status=health_status,
-            health_label=health_label,
+            health_label=get_health_status_label(health_status),
             is_on_scope=is_on_scope,
             is_on_time=is_on_time,
             is_on_budget=is_on_budget,
-            next_delivery=latest_status.next_delivery if latest_status else None,
-            risks=latest_status.risks if latest_status else None,
-            last_updated=latest_status.updated_at if latest_status else None,
+            next_delivery=next_delivery,
+            risks=risks,
+            last_updated=last_updated,
             green_count=green_count
         ))
     
@@ -190,6 +206,79 @@ def get_client_summaries(db: Session, metrics: List[ProjectHealthMetrics]) -> Li
     return sorted(summaries, key=lambda x: x.client_name)
 
 
+def can_use_health_aggregates(filters: Optional[ReportFilters]) -> bool:
+    """Check whether the overall and client sections can be read from the aggregate tables."""
+    if not settings.HEALTH_AGGREGATES_ENABLED:
+        return False
+    if filters is None:
+        return True
+    return (
+        not filters.health_status
+        and filters.date_from is None
+        and filters.date_to is None
+        and filters.include_no_status
+    )
+
+
+def get_summaries_from_aggregates(
+    db: Session,
+    client_ids: Optional[List[int]] = None
+) -> Tuple[OverallHealthMetrics, List[ClientHealthSummary]]:
+    """Get overall metrics and client summaries from the per-client aggregates in O(clients)."""
+    query = (
+        db.query(ClientHealthAggregate, Client.name)
+        .join(Client, ClientHealthAggregate.client_id == Client.id)
+        .filter(ClientHealthAggregate.total_projects > 0)
+    )
+    if client_ids:
+        query = query.filter(ClientHealthAggregate.client_id.in_(client_ids))
+    
+    totals = dict.fromkeys(
+        ["total", "healthy", "at_risk", "critical", "no_status", "scope", "time", "budget"], 0
+    )
+    summaries = []
+    for aggregate, client_name in query.all():
+        totals["total"] += aggregate.total_projects
+        totals["healthy"] += aggregate.healthy_projects
+        totals["at_risk"] += aggregate.at_risk_projects
+        totals["critical"] += aggregate.critical_projects
+        totals["no_status"] += aggregate.no_status_projects
+        totals["scope"] += aggregate.scope_compliant
+        totals["time"] += aggregate.time_compliant
+        totals["budget"] += aggregate.budget_compliant
+        
+        health_percentage = aggregate.healthy_projects / aggregate.total_projects * 100
+        summaries.append(ClientHealthSummary(
+            client_id=aggregate.client_id,
+            client_name=client_name,
+            total_projects=aggregate.total_projects,
+            healthy_projects=aggregate.healthy_projects,
+            at_risk_projects=aggregate.at_risk_projects,
+            critical_projects=aggregate.critical_projects,
+            no_status_projects=aggregate.no_status_projects,
+            health_percentage=round(health_percentage, 2)
+        ))
+    
+    total = totals["total"]
+    
+    def percentage(count: int) -> float:
+        return round((count / total * 100) if total > 0 else 0.0, 2)
+    
+    overall = OverallHealthMetrics(
+        total_projects=total,
+        healthy_projects=totals["healthy"],
+        at_risk_projects=totals["at_risk"],
+        critical_projects=totals["critical"],
+        no_status_projects=totals["no_status"],
+        overall_health_percentage=percentage(totals["healthy"]),
+        scope_compliance=percentage(totals["scope"]),
+        time_compliance=percentage(totals["time"]),
+        budget_compliance=percentage(totals["budget"])
+    )
+    
+    return overall, sorted(summaries, key=lambda x: x.client_name)
+
+
 def get_upcoming_deliveries(metrics: List[ProjectHealthMetrics]) -> List[UpcomingDelivery]:
     """Get projects with upcoming deliveries."""
     deliveries = []
@@ -208,22 +297,43 @@ def get_upcoming_deliveries(metrics: List[ProjectHealthMetrics]) -> List[Upcomin
     return sorted(deliveries, key=lambda x: x.last_updated, reverse=True)
 
 
+def use_vectorized_engine() -> bool:
+    """Check whether reports should be computed by the NumPy engine."""
+    if settings.REPORT_ENGINE.lower() != "vectorized":
+        return False
+    # Imported lazily: the vectorized engine builds on this module
+    from app.services.vectorized_report_service import NUMPY_AVAILABLE
+    if not NUMPY_AVAILABLE:
+        logger.warning("REPORT_ENGINE is 'vectorized' but numpy is not installed; using the python engine")
+    return NUMPY_AVAILABLE
+
+
 def generate_project_health_report(
     db: Session,
     filters: Optional[ReportFilters] = None,
     user_name: Optional[str] = None
 ) -> ProjectHealthReport:
     """Generate a complete project health report."""
+    if use_vectorized_engine():
+        from app.services.vectorized_report_service import generate_project_health_report_vectorized
+        return generate_project_health_report_vectorized(db, filters=filters, user_name=user_name)
+    
     logger.info("Generating project health report")
     
     # Get all project metrics
     project_metrics = get_project_health_metrics(db, filters)
     
-    # Calculate overall metrics
-    overall_metrics = calculate_overall_metrics(project_metrics)
-    
-    # Get client summaries
-    client_summaries = get_client_summaries(db, project_metrics)
+    if can_use_health_aggregates(filters):
+        # Overall and client sections come from incrementally maintained counters
+        overall_metrics, client_summaries = get_summaries_from_aggregates(
+            db, filters.client_ids if filters else None
+        )
+    else:
+        # Calculate overall metrics
+        overall_metrics = calculate_overall_metrics(project_metrics)
+        
+        # Get client summaries
+        client_summaries = get_client_summaries(db, project_metrics)
     
     # Get upcoming deliveries
     upcoming_deliveries = get_upcoming_deliveries(project_metrics)
@@ -242,3 +352,26 @@ def generate_project_health_report(
         projects_at_risk=projects_at_risk,
         critical_projects=critical_projects
     )
+
+
+def generate_project_health_summary(
+    db: Session,
+    client_ids: Optional[List[int]] = None
+) -> ProjectHealthSummary:
+    """Generate overall and per-client health counts without per-project detail."""
+    filters = ReportFilters(client_ids=client_ids)
+    if can_use_health_aggregates(filters):
+        overall_metrics, client_summaries = get_summaries_from_aggregates(db, client_ids)
+    elif use_vectorized_engine():
+        from app.services.vectorized_report_service import compute_health_summaries
+        overall_metrics, client_summaries = compute_health_summaries(db, filters)
+    else:
+        project_metrics = get_project_health_metrics(db, filters)
+        overall_metrics = calculate_overall_metrics(project_metrics)
+        client_summaries = get_client_summaries(db, project_metrics)
+    
+    return ProjectHealthSummary(
+        generated_at=datetime.now(),
+        overall_metrics=overall_metrics,
+        client_summaries=client_summaries
+    )
@@ -4,7 +4,7 @@ AWS S3 service for file storage.
 import logging
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 from io import BytesIO
 
 try:
@@ -15,6 +15,7 @@ except ImportError:
     S3_AVAILABLE = False
 
 from app.core.config import settings
+from app.core.metrics import external_call
 
 logger = logging.getLogger(__name__)
 
@@ -77,14 +78,15 @@ async def upload_file_to_s3(
             s3_key = f"projects/{project_id}/{unique_filename}"
         
         # Upload file
-        s3_client.upload_fileobj(
-            BytesIO(file_content),
-            settings.AWS_S3_BUCKET,
-            s3_key,
-            ExtraArgs={'ContentType': 'application/octet-stream'}
-        )
+        with external_call("s3"):
+            s3_client.upload_fileobj(
+                BytesIO(file_content),
+                settings.AWS_S3_BUCKET,
+                s3_key,
+                ExtraArgs={'ContentType': 'application/octet-stream'}
+            )
         
-        logger.info(f"File uploaded to S3: s3://{settings.AWS_S3_BUCKET}/{s3_key}")
+        logger.info("File uploaded to S3: s3://%s/%s", settings.AWS_S3_BUCKET, s3_key)
         return s3_key
         
     except ClientError as e:
@@ -95,6 +97,49 @@ async def upload_file_to_s3(
         return None
 
 
+def upload_fileobj_to_s3(
+    fileobj: BinaryIO,
+    s3_key: str,
+    content_type: str = 'application/octet-stream'
+) -> bool:
+    """
+    Upload a file-like object to S3 under an explicit key (multipart for large files).
+
+    Args:
+        fileobj: Readable binary file object positioned at the start
+        s3_key: S3 object key (path)
+        content_type: Content type stored with the object
+
+    Returns:
+        True if upload successful, False otherwise
+    """
+    if not S3_AVAILABLE:
+        logger.error("boto3 is not available")
+        return False
+
+    s3_client = get_s3_client()
+    if not s3_client:
+        return False
+
+    try:
+        with external_call("s3"):
+            s3_client.upload_fileobj(
+                fileobj,
+                settings.AWS_S3_BUCKET,
+                s3_key,
+                ExtraArgs={'ContentType': content_type}
+            )
+        logger.info("File uploaded to S3: s3://%s/%s", settings.AWS_S3_BUCKET, s3_key)
+        return True
+
+    except ClientError as e:
+        logger.error(f"AWS S3 error uploading file: {str(e)}")
+        return False
+    except Exception as e:
+        logger.error(f"Error uploading file to S3: {str(e)}")
+        return False
+
+
 def download_file_from_s3(s3_key: str) -> Optional[bytes]:
     """
     Download file from S3.
@@ -114,11 +159,12 @@ def download_file_from_s3(s3_key: str) -> Optional[bytes]:
         return None
     
     try:
-        response = s3_client.get_object(
-            Bucket=settings.AWS_S3_BUCKET,
-            Key=s3_key
-        )
-        return response['Body'].read()
+        with external_call("s3"):
+            response = s3_client.get_object(
+                Bucket=settings.AWS_S3_BUCKET,
+                Key=s3_key
+            )
+            return response['Body'].read()
         
     except ClientError as e:
         if e.response['Error']['Code'] == 'NoSuchKey':
@@ -150,11 +196,12 @@ def delete_file_from_s3(s3_key: str) -> bool:
         return False
     
     try:
-        s3_client.delete_object(
-            Bucket=settings.AWS_S3_BUCKET,
-            Key=s3_key
-        )
-        logger.info(f"File deleted from S3: s3://{settings.AWS_S3_BUCKET}/{s3_key}")
+        with external_call("s3"):
+            s3_client.delete_object(
+                Bucket=settings.AWS_S3_BUCKET,
+                Key=s3_key
+            )
+        logger.info("File deleted from S3: s3://%s/%s", settings.AWS_S3_BUCKET, s3_key)
         return True
         
     except ClientError as e:
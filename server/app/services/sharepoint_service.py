@@ -16,6 +16,7 @@ except ImportError:
     SHAREPOINT_AVAILABLE = False
 
 from app.core.config import settings
+from app.core.metrics import external_call
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +46,8 @@ def get_sharepoint_client() -> Optional[ClientContext]:
         # Test connection
         web = ctx.web
         ctx.load(web)
-        ctx.execute_query()
+        with external_call("sharepoint"):
+            ctx.execute_query()
         
         logger.info("Successfully authenticated with SharePoint")
         return ctx
@@ -94,21 +96,24 @@ async def upload_file_to_sharepoint(
         # Create folder if it doesn't exist
         try:
             ctx.load(target_folder_obj)
-            ctx.execute_query()
+            with external_call("sharepoint"):
+                ctx.execute_query()
         except:
             # Folder doesn't exist, create it
             parent_folder = ctx.web.get_folder_by_server_relative_url(settings.SHAREPOINT_DOCUMENT_LIBRARY)
             target_folder_obj = parent_folder.folders.add(f"{project_id}")
-            ctx.execute_query()
+            with external_call("sharepoint"):
+                ctx.execute_query()
         
         # Upload file using BytesIO for file-like object
         file_stream = BytesIO(file_content)
         
-        uploaded_file = target_folder_obj.upload_file(unique_filename, file_stream).execute_query()
+        with external_call("sharepoint"):
+            uploaded_file = target_folder_obj.upload_file(unique_filename, file_stream).execute_query()
         
         # Return relative path (server-relative URL format)
         file_path = f"{target_folder}/{unique_filename}"
-        logger.info(f"File uploaded to SharePoint: {file_path}")
+        logger.info("File uploaded to SharePoint: %s", file_path)
         return file_path
         
     except Exception as e:
@@ -133,7 +138,8 @@ def download_file_from_sharepoint(file_path: str) -> Optional[bytes]:
     try:
         file = ctx.web.get_file_by_server_relative_url(file_path)
         file_content = file.open_binary()
-        ctx.execute_query()
+        with external_call("sharepoint"):
+            ctx.execute_query()
         
         return file_content.content
         
@@ -159,9 +165,10 @@ def delete_file_from_sharepoint(file_path: str) -> bool:
     try:
         file = ctx.web.get_file_by_server_relative_url(file_path)
         file.delete_object()
-        ctx.execute_query()
+        with external_call("sharepoint"):
+            ctx.execute_query()
         
-        logger.info(f"File deleted from SharePoint: {file_path}")
+        logger.info("File deleted from SharePoint: %s", file_path)
         return True
         
     except Exception as e:
@@ -186,7 +193,8 @@ def get_file_url_from_sharepoint(file_path: str) -> Optional[str]:
     try:
         file = ctx.web.get_file_by_server_relative_url(file_path)
         ctx.load(file, ["ServerRelativeUrl"])
-        ctx.execute_query()
+        with external_call("sharepoint"):
+            ctx.execute_query()
         
         # Construct full URL
         base_url = settings.SHAREPOINT_SITE_URL.rstrip('/')
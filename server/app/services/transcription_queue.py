@@ -0,0 +1,229 @@
+"""
+In-process transcription processing queue.
+
+Jobs are queued FIFO per project and handed to a fixed pool of worker tasks
+round-robin across projects, so a large batch for one project cannot starve
+uploads for others. The queue only holds transcription ids; the database row
+(processing_status) is the source of truth, and pending rows are re-enqueued
+on startup and every TRANSCRIPTION_REQUEUE_INTERVAL_SECONDS, so nothing is lost
+when a worker process restarts.
+
+Several processes may queue the same row (each sweeps the table); a worker
+only processes a job after claiming it with a conditional UPDATE, which one
+process wins. The claim is a lease the worker keeps renewing while it works,
+so a job whose process died is taken over once its lease expires, and a job
+another live process is working on never is.
+"""
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.change_log import record_row_changes
+from app.db.change_tracking import bump_table_versions
+from app.db.models.change_log import ChangeOperation
+from app.db.models.transcription import Transcription, TranscriptionStatus
+
+logger = logging.getLogger(__name__)
+
+Job = Tuple[int, int]  # (project_id, transcription_id)
+
+
+class FairQueue:
+    """FIFO per project, round-robin across projects with queued jobs."""
+
+    def __init__(self):
+        self._jobs: Dict[int, Deque[int]] = {}
+        self._ready: Deque[int] = deque()  # Projects with queued jobs, in service order
+        self._available = asyncio.Semaphore(0)
+
+    def __len__(self) -> int:
+        return sum(len(jobs) for jobs in self._jobs.values())
+
+    def put(self, project_id: int, transcription_id: int) -> None:
+        jobs = self._jobs.get(project_id)
+        if jobs is None:
+            jobs = self._jobs[project_id] = deque()
+            self._ready.append(project_id)
+        jobs.append(transcription_id)
+        self._available.release()
+
+    async def get(self) -> Job:
+        await self._available.acquire()
+        project_id = self._ready.popleft()
+        jobs = self._jobs[project_id]
+        transcription_id = jobs.popleft()
+        if jobs:
+            # Back of the line until every other waiting project had a turn
+            self._ready.append(project_id)
+        else:
+            del self._jobs[project_id]
+        return project_id, transcription_id
+
+
+class TranscriptionQueue:
+    """Fair queue plus the worker tasks draining it."""
+
+    def __init__(self):
+        self._queue: Optional[FairQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._queued: set = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def __len__(self) -> int:
+        return len(self._queue) if self._queue is not None else 0
+
+    def enqueue(self, project_id: int, transcription_id: int) -> None:
+        """Queue a transcription for processing (no-op if it is already queued)."""
+        if self._queue is None:
+            self._queue = FairQueue()
+        if transcription_id in self._queued:
+            return
+        self._queued.add(transcription_id)
+        self._queue.put(project_id, transcription_id)
+
+    async def _work(self, process: Callable[[int], Awaitable[None]]) -> None:
+        while True:
+            _, transcription_id = await self._queue.get()
+            self._queued.discard(transcription_id)
+            try:
+                await process(transcription_id)
+            except Exception as e:
+                # process() records failures on the row; this only guards the worker
+                logger.error(f"Unhandled error processing transcription {transcription_id}: {str(e)}", exc_info=True)
+
+    def start(self, workers: int, process: Callable[[int], Awaitable[None]]) -> None:
+        """Start worker tasks on the running event loop."""
+        if self._queue is None:
+            self._queue = FairQueue()
+        for _ in range(workers):
+            self._workers.append(asyncio.create_task(self._work(process)))
+        logger.info("Transcription queue started with %s workers", workers)
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs stay pending in the database."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._queued.clear()
+
+
+transcription_queue = TranscriptionQueue()
+
+
+def _claimable(now: datetime):
+    """Pending, or processing by a worker that stopped renewing its lease."""
+    return or_(
+        Transcription.processing_status == TranscriptionStatus.PENDING,
+        and_(
+            Transcription.processing_status == TranscriptionStatus.PROCESSING,
+            or_(Transcription.lease_expires_at.is_(None), Transcription.lease_expires_at < now)
+        )
+    )
+
+
+def _set_status(db: Session, transcription_id: int, condition, **values) -> bool:
+    result = db.execute(
+        update(Transcription)
+        .where(Transcription.id == transcription_id, condition)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        return False
+    # Core statement: log it as the flush listeners would
+    record_row_changes(db, Transcription.__tablename__, ChangeOperation.UPDATE, [transcription_id])
+    bump_table_versions(db.connection(), [Transcription.__tablename__])
+    db.commit()
+    return True
+
+
+def claim_transcription(db: Session, transcription_id: int, lease_seconds: int) -> bool:
+    """
+    Take a transcription for processing, leased for lease_seconds; False if it
+    is finished, gone, or leased by another worker.
+    """
+    now = datetime.now(timezone.utc)
+    return _set_status(
+        db, transcription_id, _claimable(now),
+        processing_status=TranscriptionStatus.PROCESSING,
+        processing_error=None,
+        lease_expires_at=now + timedelta(seconds=lease_seconds)
+    )
+
+
+def release_transcription(db: Session, transcription_id: int) -> bool:
+    """Put a claimed transcription back to pending, for another worker to take at once."""
+    return _set_status(
+        db, transcription_id, Transcription.processing_status == TranscriptionStatus.PROCESSING,
+        processing_status=TranscriptionStatus.PENDING,
+        lease_expires_at=None
+    )
+
+
+def renew_lease(session_factory: Callable[[], Session], transcription_id: int, lease_seconds: int) -> None:
+    with session_factory() as db:
+        db.execute(
+            update(Transcription)
+            .where(Transcription.id == transcription_id, Transcription.processing_status == TranscriptionStatus.PROCESSING)
+            .values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+
+async def keep_lease(session_factory: Callable[[], Session], transcription_id: int, lease_seconds: int) -> None:
+    """Renew a claimed transcription's lease until cancelled."""
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        try:
+            await run_in_threadpool(renew_lease, session_factory, transcription_id, lease_seconds)
+        except Exception as e:
+            # Retried at the next renewal; the lease only runs out after several misses
+            logger.warning(f"Could not renew the lease of transcription {transcription_id}: {str(e)}")
+
+
+def claimable_transcriptions(session_factory: Callable[[], Session]) -> List[Job]:
+    """Pending transcriptions, and those whose worker stopped renewing its lease."""
+    with session_factory() as db:
+        return [
+            (project_id, transcription_id)
+            for project_id, transcription_id in db.execute(
+                select(Transcription.project_id, Transcription.id)
+                .where(_claimable(datetime.now(timezone.utc)))
+                .order_by(Transcription.id)
+            )
+        ]
+
+
+async def requeue_pending_transcriptions(session_factory: Callable[[], Session]) -> int:
+    """Enqueue claimable transcriptions (the query runs in the threadpool, the queue lives on the loop)."""
+    jobs = await run_in_threadpool(claimable_transcriptions, session_factory)
+    for project_id, transcription_id in jobs:
+        transcription_queue.enqueue(project_id, transcription_id)
+    if jobs:
+        logger.info("Re-enqueued %s pending transcriptions", len(jobs))
+    return len(jobs)
+
+
+async def run_periodic_requeue(session_factory: Callable[[], Session], interval_seconds: int) -> None:
+    """Re-enqueue claimable transcriptions now and then every interval_seconds (0: only now)."""
+    while True:
+        try:
+            await requeue_pending_transcriptions(session_factory)
+        except Exception as e:
+            logger.warning(f"Could not re-enqueue pending transcriptions: {e}")
+        if interval_seconds <= 0:
+            return
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,246 @@
+"""
+Transcription processing: text extraction and AI status extraction.
+
+process_transcription() is run by the transcription queue workers; it records
+its progress in Transcription.processing_status so clients (and a restarted
+worker) can tell where each file is, and announces each stage to the
+transcription and project event streams.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.db.models.transcription import Transcription, TranscriptionStatus
+from app.db.models.transcription_batch import TranscriptionBatch
+from app.schemas.transcription import (
+    TranscriptionBatchItem,
+    TranscriptionBatchResponse,
+    TranscriptionEvent,
+    TranscriptionStage,
+)
+from app.services.ai_status_extractor import extract_status_from_transcription, validate_extracted_status
+from app.services.event_broadcaster import broadcaster, project_topic, transcription_topic
+from app.services.document_extraction import DocumentExtractionError, DocumentExtractor, content_hash
+from app.services.openai_service import transcribe_audio_video
+from app.services.transcription_queue import claim_transcription, keep_lease, release_transcription
+from app.utils.file_upload import get_file_content, get_file_extension
+
+logger = logging.getLogger(__name__)
+
+document_extractor = DocumentExtractor(
+    workers=settings.DOCUMENT_EXTRACTION_WORKERS,
+    timeout_seconds=settings.DOCUMENT_EXTRACTION_TIMEOUT_SECONDS,
+    max_memory_mb=settings.DOCUMENT_EXTRACTION_MAX_MEMORY_MB,
+    max_chars=settings.DOCUMENT_MAX_TEXT_CHARS
+)
+
+
+def extract_project_status(
+    db: Session,
+    project: Project,
+    transcription_text: str,
+    updated_by: int
+) -> Optional[ProjectStatus]:
+    """Extract status information from text and persist it as a project status entry."""
+    if not transcription_text:
+        return None
+
+    client_name = project.client.name if project.client else "Unknown"
+    extracted_status = extract_status_from_transcription(
+        transcription_text=transcription_text,
+        project_name=project.name,
+        client_name=client_name
+    )
+
+    if not extracted_status:
+        logger.warning(f"Failed to extract status from transcription for project {project.id}")
+        return None
+
+    validated_status = validate_extracted_status(extracted_status)
+    project_status = ProjectStatus(
+        project_id=project.id,
+        is_on_scope=validated_status.get("is_on_scope"),
+        is_on_time=validated_status.get("is_on_time"),
+        is_on_budget=validated_status.get("is_on_budget"),
+        next_delivery=validated_status.get("next_delivery"),
+        risks=validated_status.get("risks"),
+        updated_by=updated_by
+    )
+
+    db.add(project_status)
+    db.commit()
+    logger.info("Status extracted and saved for project %s", project.id)
+    return project_status
+
+
+def publish_stage(transcription: Transcription, stage: TranscriptionStage, **details) -> None:
+    """Announce a pipeline stage to subscribers of the transcription and of its project."""
+    event = TranscriptionEvent(
+        transcription_id=transcription.id,
+        project_id=transcription.project_id,
+        batch_id=transcription.batch_id,
+        stage=stage,
+        processing_status=transcription.processing_status,
+        at=datetime.now(timezone.utc),
+        **details
+    )
+    broadcaster.publish(
+        (transcription_topic(transcription.id), project_topic(transcription.project_id)),
+        "stage",
+        event.model_dump_json()
+    )
+
+
+def find_cached_text(db: Session, digest: str) -> Optional[str]:
+    """Text already extracted from an identical document, if any."""
+    return db.scalar(
+        select(Transcription.raw_text)
+        .where(Transcription.content_hash == digest, Transcription.raw_text.isnot(None))
+        .limit(1)
+    )
+
+
+async def extract_document_text(db: Session, transcription: Transcription) -> str:
+    """Extract the text of a stored document upload, reusing text cached by content hash."""
+    content = await run_in_threadpool(get_file_content, transcription.file_path)
+    if content is None:
+        raise DocumentExtractionError("File not found or could not be read")
+
+    digest = content_hash(content)
+    transcription.content_hash = digest
+    cached = find_cached_text(db, digest)
+    if cached is not None:
+        logger.info("Reusing extracted text for transcription %s (content %s)", transcription.id, digest[:12])
+        return cached
+
+    extension = get_file_extension(transcription.file_name or transcription.file_path or "")
+    return await document_extractor.extract(content, extension)
+
+
+def _mark_failed(db: Session, transcription: Transcription, error: str) -> None:
+    transcription.processing_status = TranscriptionStatus.FAILED
+    transcription.processing_error = error
+    db.commit()
+    publish_stage(transcription, TranscriptionStage.FAILED, error=error)
+
+
+async def process_transcription(
+    transcription_id: int,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> None:
+    """
+    Extract the text of a stored transcription file, then a project status from it.
+
+    Returns at once unless the job can be claimed (see app.services.transcription_queue):
+    it may be finished, deleted, or taken by another worker.
+    """
+    db = session_factory()
+    transcription = None
+    lease = None
+    try:
+        if not claim_transcription(db, transcription_id, settings.TRANSCRIPTION_LEASE_SECONDS):
+            logger.debug("Transcription %s is finished, gone or claimed by another worker", transcription_id)
+            return
+        lease = asyncio.create_task(keep_lease(session_factory, transcription_id, settings.TRANSCRIPTION_LEASE_SECONDS))
+        transcription = db.get(Transcription, transcription_id)
+        publish_stage(transcription, TranscriptionStage.PROCESSING)
+
+        # Manual entries (and jobs resumed after the text stage) already have text
+        raw_text = transcription.raw_text
+        if raw_text is None:
+            if transcription.file_type in ["audio", "video"]:
+                # Transcribe audio/video using OpenAI Whisper
+                logger.info("Starting transcription for %s", transcription_id)
+                # Whisper receives the file in one request, so there is a single segment
+                publish_stage(transcription, TranscriptionStage.TRANSCRIBING, segment=1, segments=1)
+                raw_text = await transcribe_audio_video(transcription.file_path)
+            elif transcription.file_type == "text":
+                publish_stage(transcription, TranscriptionStage.EXTRACTING_TEXT)
+                try:
+                    raw_text = await extract_document_text(db, transcription)
+                except DocumentExtractionError as e:
+                    logger.warning(f"Text extraction failed for transcription {transcription_id}: {str(e)}")
+                    _mark_failed(db, transcription, str(e))
+                    return
+
+            if not raw_text:
+                logger.warning(f"No text extracted from transcription {transcription_id}")
+                _mark_failed(db, transcription, "No text could be extracted from the file")
+                return
+
+            transcription.raw_text = raw_text
+            db.commit()
+            logger.info("Transcription %s processed successfully", transcription_id)
+
+        project = db.query(Project).filter(Project.id == transcription.project_id).first()
+        if project is None:
+            _mark_failed(db, transcription, "Project not found")
+            return
+
+        publish_stage(transcription, TranscriptionStage.EXTRACTING_STATUS)
+        # The LLM call blocks, keep it off the event loop
+        project_status = await run_in_threadpool(
+            extract_project_status, db, project, raw_text, transcription.created_by
+        )
+        if project_status is None:
+            _mark_failed(db, transcription, "Status could not be extracted from the text")
+            return
+        publish_stage(transcription, TranscriptionStage.STATUS_CREATED, project_status_id=project_status.id)
+
+        transcription.processing_status = TranscriptionStatus.COMPLETED
+        transcription.processed_at = func.now()
+        db.commit()
+        publish_stage(transcription, TranscriptionStage.COMPLETED)
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back rather than leave it leased
+        db.rollback()
+        if transcription is not None:
+            release_transcription(db, transcription_id)
+        raise
+    except Exception as e:
+        logger.error(f"Error processing transcription {transcription_id}: {str(e)}", exc_info=True)
+        db.rollback()
+        if transcription is not None:
+            _mark_failed(db, transcription, str(e))
+    finally:
+        if lease is not None:
+            lease.cancel()
+        db.close()
+
+
+def get_batch_progress(db: Session, batch: TranscriptionBatch) -> TranscriptionBatchResponse:
+    """Aggregate the processing state of every transcription in a batch."""
+    transcriptions = (
+        db.query(Transcription)
+        .filter(Transcription.batch_id == batch.id)
+        .order_by(Transcription.id)
+        .all()
+    )
+    counts = {state: 0 for state in TranscriptionStatus}
+    for transcription in transcriptions:
+        counts[transcription.processing_status] += 1
+    total = len(transcriptions)
+    finished = counts[TranscriptionStatus.COMPLETED] + counts[TranscriptionStatus.FAILED]
+    return TranscriptionBatchResponse(
+        id=batch.id,
+        project_id=batch.project_id,
+        created_by=batch.created_by,
+        created_at=batch.created_at,
+        total=total,
+        pending=counts[TranscriptionStatus.PENDING],
+        processing=counts[TranscriptionStatus.PROCESSING],
+        completed=counts[TranscriptionStatus.COMPLETED],
+        failed=counts[TranscriptionStatus.FAILED],
+        progress=round((finished / total * 100) if total > 0 else 0.0, 2),
+        transcriptions=[TranscriptionBatchItem.model_validate(t) for t in transcriptions]
+    )
@@ -0,0 +1,261 @@
+"""
+Service for portfolio health trends over weekly buckets.
+
+A bucket's counts are an as-of snapshot: every project created before the end
+of the bucket, classified by its latest status updated before the end of the
+bucket. Snapshots are computed in SQL; closed buckets are stored in
+health_trend_rollups by a periodic background refresh, which recomputes them
+after an invalidation (see app.db.health_trends). Reads never write: the open
+bucket, and closed buckets that are missing or have a pending invalidation,
+are computed live.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, case, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.health_trends import BUCKET_SIZE, as_utc, week_start
+from app.db.models.client import Client
+from app.db.models.health_trend_rollup import HealthTrendRollup, HealthTrendInvalidation
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.schemas.report import HealthTrendPoint, ClientHealthTrend, HealthTrendReport
+from app.services.report_service import NO_STATUS_HEALTH
+
+logger = logging.getLogger(__name__)
+
+MAX_BUCKETS = 260  # Five years of weekly buckets
+SNAPSHOT_CHUNK_SIZE = 26  # Buckets computed per snapshot query
+PORTFOLIO_CLIENT_ID = 0
+
+COUNT_FIELDS = ("total_projects", "healthy_projects", "at_risk_projects", "critical_projects", "no_status_projects")
+
+Counts = Tuple[int, int, int, int, int]
+ZERO_COUNTS: Counts = (0, 0, 0, 0, 0)
+
+
+def get_bucket_starts(date_from: datetime, date_to: datetime) -> List[datetime]:
+    """Weekly bucket starts covering [date_from, date_to]."""
+    starts = []
+    current = week_start(date_from)
+    end = as_utc(date_to)
+    while current <= end:
+        starts.append(current)
+        current += BUCKET_SIZE
+    return starts
+
+
+def _snapshot_query(bucket_starts: List[datetime]):
+    """
+    Aggregate as-of health counts per (bucket, client).
+
+    The latest status per (bucket, project) is a correlated LIMIT 1 subquery,
+    which PostgreSQL plans like a LATERAL join: one index probe on
+    (project_id, updated_at) per project and bucket, no history scan.
+    """
+    bucket_selects = [
+        select(
+            literal(start, DateTime(timezone=True)).label("bucket_start"),
+            literal(start + BUCKET_SIZE, DateTime(timezone=True)).label("bucket_end")
+        )
+        for start in bucket_starts
+    ]
+    buckets = (union_all(*bucket_selects) if len(bucket_selects) > 1 else bucket_selects[0]).subquery("buckets")
+
+    latest_status_id = (
+        select(ProjectStatus.id)
+        .where(
+            ProjectStatus.project_id == Project.id,
+            ProjectStatus.updated_at < buckets.c.bucket_end
+        )
+        .order_by(ProjectStatus.updated_at.desc(), ProjectStatus.id.desc())
+        .limit(1)
+        .correlate(Project, buckets)
+        .scalar_subquery()
+    )
+    snapshot = (
+        select(buckets.c.bucket_start, Project.client_id, latest_status_id.label("status_id"))
+        .select_from(buckets)
+        .join(Project, Project.created_at < buckets.c.bucket_end)
+        .subquery("snapshot")
+    )
+
+    status = ProjectStatus.__table__
+    health_status = func.coalesce(status.c.health_status, NO_STATUS_HEALTH)
+    return (
+        select(
+            snapshot.c.bucket_start,
+            snapshot.c.client_id,
+            func.count(),
+            func.sum(case((health_status == "green", 1), else_=0)),
+            func.sum(case((health_status == "yellow", 1), else_=0)),
+            func.sum(case((health_status == "red", 1), else_=0)),
+            func.sum(case((snapshot.c.status_id.is_(None), 1), else_=0)),
+        )
+        .select_from(snapshot.outerjoin(status, status.c.id == snapshot.c.status_id))
+        .group_by(snapshot.c.bucket_start, snapshot.c.client_id)
+    )
+
+
+def compute_snapshots(db: Session, bucket_starts: List[datetime]) -> Dict[datetime, Dict[int, Counts]]:
+    """Compute as-of counts per bucket and client directly from status history."""
+    snapshots: Dict[datetime, Dict[int, Counts]] = {start: {} for start in bucket_starts}
+    for offset in range(0, len(bucket_starts), SNAPSHOT_CHUNK_SIZE):
+        chunk = bucket_starts[offset:offset + SNAPSHOT_CHUNK_SIZE]
+        for bucket_start, client_id, *counts in db.execute(_snapshot_query(chunk)):
+            snapshots[as_utc(bucket_start)][client_id] = tuple(int(value or 0) for value in counts)
+    return snapshots
+
+
+def _sum_counts(counts: Iterable[Counts]) -> Counts:
+    return tuple(sum(values) for values in zip(*counts)) or ZERO_COUNTS
+
+
+def _insert_ignoring_conflicts(db: Session, rows: List[Dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = pg_insert(HealthTrendRollup).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite_insert(HealthTrendRollup).on_conflict_do_nothing()
+    else:
+        statement = insert(HealthTrendRollup)
+    db.execute(statement, rows)
+
+
+def refresh_rollups(db: Session, closed_bucket_starts: List[datetime]) -> int:
+    """Apply pending invalidations and compute any missing closed buckets; returns buckets computed."""
+    # Consume exactly the markers deleted here: one committed meanwhile (even for
+    # an older bucket) survives and is applied by the next refresh
+    consumed = db.scalars(delete(HealthTrendInvalidation).returning(HealthTrendInvalidation.bucket_start)).all()
+    if consumed:
+        db.execute(delete(HealthTrendRollup).where(HealthTrendRollup.bucket_start >= min(consumed)))
+
+    present = _computed_buckets(db, closed_bucket_starts)
+    missing = [start for start in closed_bucket_starts if start not in present]
+
+    if missing:
+        rows = []
+        for bucket_start, per_client in compute_snapshots(db, missing).items():
+            # The portfolio row is written even when empty, marking the bucket as computed
+            per_client = {**per_client, PORTFOLIO_CLIENT_ID: _sum_counts(per_client.values())}
+            rows.extend(
+                {"bucket_start": bucket_start, "client_id": client_id, **dict(zip(COUNT_FIELDS, counts))}
+                for client_id, counts in per_client.items()
+            )
+        _insert_ignoring_conflicts(db, rows)
+        logger.info("Computed %s health trend buckets", len(missing))
+
+    db.commit()
+    return len(missing)
+
+
+def _computed_buckets(db: Session, bucket_starts: List[datetime]) -> Set[datetime]:
+    """Buckets among bucket_starts that have a stored rollup."""
+    return {
+        as_utc(bucket_start)
+        for bucket_start in db.scalars(
+            select(HealthTrendRollup.bucket_start).where(
+                HealthTrendRollup.client_id == PORTFOLIO_CLIENT_ID,
+                HealthTrendRollup.bucket_start.in_(bucket_starts)
+            )
+        )
+    }
+
+
+def refresh_recent_rollups(session_factory: Callable[[], Session], now: Optional[datetime] = None) -> int:
+    """Refresh the rollups of the last MAX_BUCKETS closed buckets; returns buckets computed."""
+    open_bucket = week_start(now or datetime.now(timezone.utc))
+    closed = get_bucket_starts(open_bucket - BUCKET_SIZE * MAX_BUCKETS, open_bucket - BUCKET_SIZE)
+    with session_factory() as db:
+        return refresh_rollups(db, closed)
+
+
+async def run_periodic_trend_refresh(session_factory: Callable[[], Session], interval_seconds: int) -> None:
+    """Refresh health trend rollups now and then every interval_seconds."""
+    while True:
+        try:
+            computed = await run_in_threadpool(refresh_recent_rollups, session_factory)
+            logger.debug("Health trend refresh computed %s buckets", computed)
+        except Exception as e:
+            logger.error(f"Health trend refresh failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
+
+
+def get_health_trend(
+    db: Session,
+    date_from: datetime,
+    date_to: datetime,
+    client_ids: Optional[List[int]] = None,
+    now: Optional[datetime] = None
+) -> HealthTrendReport:
+    """Get weekly as-of health counts for the portfolio and each client."""
+    bucket_starts = get_bucket_starts(date_from, date_to)
+    open_bucket = week_start(now or datetime.now(timezone.utc))
+    # Stored rollups are current up to the earliest pending invalidation
+    stale_from = db.scalar(select(func.min(HealthTrendInvalidation.bucket_start)))
+    stale_from = as_utc(stale_from) if stale_from is not None else open_bucket
+    stored_until = min(open_bucket, stale_from)
+
+    snapshots: Dict[datetime, Dict[int, Counts]] = defaultdict(dict)
+    stored = [start for start in bucket_starts if start < stored_until]
+    if stored:
+        query = select(HealthTrendRollup).where(
+            HealthTrendRollup.bucket_start >= stored[0],
+            HealthTrendRollup.bucket_start <= stored[-1]
+        )
+        for rollup in db.scalars(query):
+            snapshots[as_utc(rollup.bucket_start)][rollup.client_id] = tuple(
+                getattr(rollup, field) for field in COUNT_FIELDS
+            )
+    # Not yet refreshed, invalidated or open: computed for this request only
+    live = [
+        start for start in bucket_starts
+        if start >= stored_until or PORTFOLIO_CLIENT_ID not in snapshots.get(start, {})
+    ]
+    if live:
+        for bucket_start, per_client in compute_snapshots(db, live).items():
+            snapshots[bucket_start] = per_client
+
+    client_filter = set(client_ids) if client_ids else None
+    client_points: Dict[int, Dict[datetime, Counts]] = defaultdict(dict)
+    portfolio = []
+    for bucket_start in bucket_starts:
+        per_client = {
+            client_id: counts
+            for client_id, counts in snapshots.get(bucket_start, {}).items()
+            if client_id != PORTFOLIO_CLIENT_ID and (client_filter is None or client_id in client_filter)
+        }
+        for client_id, counts in per_client.items():
+            client_points[client_id][bucket_start] = counts
+        portfolio.append(_point(bucket_start, _sum_counts(per_client.values())))
+
+    client_names = dict(
+        db.execute(select(Client.id, Client.name).where(Client.id.in_(list(client_points)))).all()
+    ) if client_points else {}
+    clients = [
+        ClientHealthTrend(
+            client_id=client_id,
+            client_name=client_names.get(client_id, "Unknown"),
+            points=[_point(start, points.get(start, ZERO_COUNTS)) for start in bucket_starts]
+        )
+        for client_id, points in client_points.items()
+    ]
+
+    return HealthTrendReport(
+        bucket="week",
+        date_from=bucket_starts[0],
+        date_to=bucket_starts[-1] + BUCKET_SIZE,
+        portfolio=portfolio,
+        clients=sorted(clients, key=lambda x: x.client_name)
+    )
+
+
+def _point(bucket_start: datetime, counts: Counts) -> HealthTrendPoint:
+    return HealthTrendPoint(bucket_start=bucket_start, **dict(zip(COUNT_FIELDS, counts)))
@@ -0,0 +1,290 @@
+"""
+Vectorized project health report engine.
+
+Loads the latest status of every project as columns (flags as int8 codes:
+1 = true, 0 = false, -1 = null), then classifies health, applies filters and
+computes overall and per-client counts with NumPy array operations. Pydantic
+models are only constructed for the project rows that end up in the report.
+
+Results are identical to the reference implementation in report_service
+(calculate_project_health_status); tests/test_report_engine.py checks parity
+and benchmarks/bench_report_engine.py measures both engines. numpy is optional; without it the reference
+engine is used.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session
+
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.schemas.report import (
+    ProjectHealthMetrics,
+    ClientHealthSummary,
+    OverallHealthMetrics,
+    ProjectHealthReport,
+    ReportFilters
+)
+from app.services.report_service import (
+    can_use_health_aggregates,
+    get_summaries_from_aggregates,
+    get_upcoming_deliveries,
+    latest_status_id_subquery
+)
+from app.utils.project_status_utils import get_health_status_label
+
+logger = logging.getLogger(__name__)
+
+# Health codes index into these
+HEALTH_STATUSES = ("green", "yellow", "red")
+HEALTH_LABELS = tuple(get_health_status_label(health_status) for health_status in HEALTH_STATUSES)
+GREEN, YELLOW, RED = range(3)
+
+FLAG_VALUES = {1: True, 0: False, -1: None}
+
+
+@dataclass
+class HealthColumns:
+    """Latest-status columns for a set of projects, one entry per project."""
+    project_id: "np.ndarray"
+    client_id: "np.ndarray"
+    is_on_scope: "np.ndarray"  # int8 flag codes
+    is_on_time: "np.ndarray"
+    is_on_budget: "np.ndarray"
+    has_status: "np.ndarray"  # bool
+    project_name: List[str]
+    client_name: List[str]
+    next_delivery: List[Optional[str]]
+    risks: List[Optional[str]]
+    last_updated: List[Optional[datetime]]
+
+    def __len__(self) -> int:
+        return len(self.project_id)
+
+
+def _flag_code(column):
+    return case((column.is_(True), 1), (column.is_(False), 0), else_=-1)
+
+
+def latest_status_columns_query(filters: Optional[ReportFilters] = None):
+    """Select each project with its latest status (within the filter dates), flags as codes."""
+    query = (
+        select(
+            Project.id,
+            Project.client_id,
+            _flag_code(ProjectStatus.is_on_scope),
+            _flag_code(ProjectStatus.is_on_time),
+            _flag_code(ProjectStatus.is_on_budget),
+            ProjectStatus.id.isnot(None),
+            Project.name,
+            Client.name,
+            ProjectStatus.next_delivery,
+            ProjectStatus.risks,
+            ProjectStatus.updated_at,
+        )
+        .join(Client, Project.client_id == Client.id)
+        .outerjoin(ProjectStatus, ProjectStatus.id == latest_status_id_subquery(filters))
+        .order_by(Project.id)
+    )
+    if filters and filters.client_ids:
+        query = query.where(Project.client_id.in_(filters.client_ids))
+    return query
+
+
+def load_health_columns(db: Session, filters: Optional[ReportFilters] = None) -> HealthColumns:
+    """Load latest-status columns for the projects matching the client and date filters."""
+    rows = db.execute(latest_status_columns_query(filters)).all()
+    columns = list(zip(*rows)) if rows else [()] * 11
+    return HealthColumns(
+        project_id=np.fromiter(columns[0], dtype=np.int64, count=len(rows)),
+        client_id=np.fromiter(columns[1], dtype=np.int64, count=len(rows)),
+        is_on_scope=np.fromiter(columns[2], dtype=np.int8, count=len(rows)),
+        is_on_time=np.fromiter(columns[3], dtype=np.int8, count=len(rows)),
+        is_on_budget=np.fromiter(columns[4], dtype=np.int8, count=len(rows)),
+        has_status=np.fromiter(columns[5], dtype=bool, count=len(rows)),
+        project_name=list(columns[6]),
+        client_name=list(columns[7]),
+        next_delivery=list(columns[8]),
+        risks=list(columns[9]),
+        last_updated=list(columns[10]),
+    )
+
+
+def classify_health(is_on_scope: "np.ndarray", is_on_time: "np.ndarray", is_on_budget: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Vectorized calculate_project_health_status over int8 flag codes.
+
+    Returns (green_count, health_code); only true flags count as green, so
+    null flags behave like false ones, as in the reference implementation.
+    """
+    green_count = (
+        (is_on_scope == 1).astype(np.int8)
+        + (is_on_time == 1).astype(np.int8)
+        + (is_on_budget == 1).astype(np.int8)
+    )
+    health_code = np.where(green_count >= 3, GREEN, np.where(green_count == 2, YELLOW, RED)).astype(np.int8)
+    return green_count, health_code
+
+
+def select_rows(columns: HealthColumns, health_code: "np.ndarray", filters: Optional[ReportFilters]) -> "np.ndarray":
+    """Boolean mask of projects passing the no-status and health status filters."""
+    mask = np.ones(len(columns), dtype=bool)
+    if filters is None:
+        return mask
+    if not filters.include_no_status:
+        mask &= columns.has_status
+    if filters.health_status in HEALTH_STATUSES:
+        mask &= health_code == HEALTH_STATUSES.index(filters.health_status)
+    elif filters.health_status == "none":
+        mask &= ~columns.has_status
+    return mask
+
+
+def _percentage(count: int, total: int) -> float:
+    return round((count / total * 100) if total > 0 else 0.0, 2)
+
+
+def compute_overall_metrics(columns: HealthColumns, health_code: "np.ndarray", mask: "np.ndarray") -> OverallHealthMetrics:
+    """Overall counts and compliance percentages for the selected projects."""
+    total = int(np.count_nonzero(mask))
+    health_counts = np.bincount(health_code[mask], minlength=len(HEALTH_STATUSES))
+    healthy, at_risk, critical = (int(count) for count in health_counts)
+    return OverallHealthMetrics(
+        total_projects=total,
+        healthy_projects=healthy,
+        at_risk_projects=at_risk,
+        critical_projects=critical,
+        no_status_projects=int(np.count_nonzero(mask & ~columns.has_status)),
+        overall_health_percentage=_percentage(healthy, total),
+        scope_compliance=_percentage(int(np.count_nonzero(mask & (columns.is_on_scope == 1))), total),
+        time_compliance=_percentage(int(np.count_nonzero(mask & (columns.is_on_time == 1))), total),
+        budget_compliance=_percentage(int(np.count_nonzero(mask & (columns.is_on_budget == 1))), total)
+    )
+
+
+def compute_client_summaries(columns: HealthColumns, health_code: "np.ndarray", mask: "np.ndarray") -> List[ClientHealthSummary]:
+    """Per-client counts for the selected projects via bincount over client codes."""
+    indices = np.flatnonzero(mask)
+    if len(indices) == 0:
+        return []
+    client_ids, first_index, client_codes = np.unique(
+        columns.client_id[indices], return_index=True, return_inverse=True
+    )
+    n_clients = len(client_ids)
+    selected_health = health_code[indices]
+
+    def count_where(condition: "np.ndarray") -> "np.ndarray":
+        return np.bincount(client_codes, weights=condition, minlength=n_clients).astype(np.int64)
+
+    totals = np.bincount(client_codes, minlength=n_clients)
+    healthy = count_where(selected_health == GREEN)
+    at_risk = count_where(selected_health == YELLOW)
+    critical = count_where(selected_health == RED)
+    no_status = count_where(~columns.has_status[indices])
+
+    summaries = []
+    for code, client_id in enumerate(client_ids.tolist()):
+        total = int(totals[code])
+        summaries.append(ClientHealthSummary(
+            client_id=client_id,
+            client_name=columns.client_name[indices[first_index[code]]],
+            total_projects=total,
+            healthy_projects=int(healthy[code]),
+            at_risk_projects=int(at_risk[code]),
+            critical_projects=int(critical[code]),
+            no_status_projects=int(no_status[code]),
+            health_percentage=_percentage(int(healthy[code]), total)
+        ))
+    return sorted(summaries, key=lambda x: x.client_name)
+
+
+def compute_health_summaries(
+    db: Session,
+    filters: Optional[ReportFilters] = None
+) -> Tuple[OverallHealthMetrics, List[ClientHealthSummary]]:
+    """Overall metrics and client summaries without materializing any project rows."""
+    columns = load_health_columns(db, filters)
+    _, health_code = classify_health(columns.is_on_scope, columns.is_on_time, columns.is_on_budget)
+    mask = select_rows(columns, health_code, filters)
+    return compute_overall_metrics(columns, health_code, mask), compute_client_summaries(columns, health_code, mask)
+
+
+def materialize_metrics(
+    columns: HealthColumns,
+    green_count: "np.ndarray",
+    health_code: "np.ndarray",
+    indices: "np.ndarray"
+) -> List[ProjectHealthMetrics]:
+    """Build ProjectHealthMetrics for the given row indices only (values are already typed)."""
+    project_ids = columns.project_id[indices].tolist()
+    scope = columns.is_on_scope[indices].tolist()
+    time = columns.is_on_time[indices].tolist()
+    budget = columns.is_on_budget[indices].tolist()
+    greens = green_count[indices].tolist()
+    healths = health_code[indices].tolist()
+
+    metrics = []
+    for position, index in enumerate(indices.tolist()):
+        metrics.append(ProjectHealthMetrics.model_construct(
+            project_id=project_ids[position],
+            project_name=columns.project_name[index],
+            client_name=columns.client_name[index],
+            health_status=HEALTH_STATUSES[healths[position]],
+            health_label=HEALTH_LABELS[healths[position]],
+            is_on_scope=FLAG_VALUES[scope[position]],
+            is_on_time=FLAG_VALUES[time[position]],
+            is_on_budget=FLAG_VALUES[budget[position]],
+            next_delivery=columns.next_delivery[index],
+            risks=columns.risks[index],
+            last_updated=columns.last_updated[index],
+            green_count=greens[position]
+        ))
+    return metrics
+
+
+def generate_project_health_report_vectorized(
+    db: Session,
+    filters: Optional[ReportFilters] = None,
+    user_name: Optional[str] = None
+) -> ProjectHealthReport:
+    """Generate a complete project health report with the vectorized engine."""
+    logger.info("Generating project health report (vectorized)")
+
+    columns = load_health_columns(db, filters)
+    green_count, health_code = classify_health(columns.is_on_scope, columns.is_on_time, columns.is_on_budget)
+    mask = select_rows(columns, health_code, filters)
+    indices = np.flatnonzero(mask)
+    project_metrics = materialize_metrics(columns, green_count, health_code, indices)
+
+    if can_use_health_aggregates(filters):
+        overall_metrics, client_summaries = get_summaries_from_aggregates(
+            db, filters.client_ids if filters else None
+        )
+    else:
+        overall_metrics = compute_overall_metrics(columns, health_code, mask)
+        client_summaries = compute_client_summaries(columns, health_code, mask)
+
+    selected_health = health_code[indices]
+    projects_at_risk = [project_metrics[i] for i in np.flatnonzero(selected_health == YELLOW).tolist()]
+    critical_projects = [project_metrics[i] for i in np.flatnonzero(selected_health == RED).tolist()]
+
+    return ProjectHealthReport(
+        generated_at=datetime.now(),
+        generated_by=user_name,
+        overall_metrics=overall_metrics,
+        project_metrics=project_metrics,
+        client_summaries=client_summaries,
+        upcoming_deliveries=get_upcoming_deliveries(project_metrics),
+        projects_at_risk=projects_at_risk,
+        critical_projects=critical_projects
+    )
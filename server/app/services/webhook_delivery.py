@@ -0,0 +1,409 @@
+"""
+Outbound webhook delivery.
+
+The outbox (webhook_deliveries, see app.db.webhook_outbox) is written in the
+same transaction as the health change; this dispatcher delivers it in the
+background, so no write path ever waits on a subscriber's endpoint.
+
+- Batching: each endpoint has at most one request in flight, carrying up to
+  WEBHOOK_BATCH_SIZE of its pending events in order. Events queued while a
+  request is in flight go out together in the next one.
+- Pooling: every endpoint shares one httpx.AsyncClient, so connections are
+  kept alive and reused, capped at WEBHOOK_MAX_CONNECTIONS.
+- Retries: a failed batch (network error, timeout or non-2xx response) stays
+  in the outbox and is retried after an exponential backoff with jitter.
+  Delivery is at least once: receivers deduplicate on the event id.
+- Circuit breaking: after WEBHOOK_CIRCUIT_FAILURE_THRESHOLD consecutive
+  failures an endpoint is left alone for WEBHOOK_CIRCUIT_OPEN_SECONDS, then
+  probed with a single batch; the state is kept on the subscription so it is
+  visible through the API and survives restarts.
+
+Commits that queue events wake the dispatcher through the event broadcaster
+(in every worker when the Postgres bridge is enabled); the outbox is also
+re-checked every WEBHOOK_POLL_SECONDS.
+
+Every process may run a dispatcher: on PostgreSQL they elect one with a session
+advisory lock (DISPATCHER_LOCK_KEY), held on a dedicated connection, and only
+that one delivers. The others retry the lock at each scan, so one of them takes
+over within WEBHOOK_POLL_SECONDS when the elected process exits or loses its
+connection. Other databases have no such lock; run a single process there.
+
+Requests are signed: X-Webhook-Signature is "sha256=" followed by the hex
+HMAC-SHA256, keyed with the subscription secret, of X-Webhook-Timestamp, a dot
+and the request body.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.engine import Connection
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.database import SessionLocal
+from app.db.health_trends import as_utc
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.webhook_outbox import add_outbox_listener, delivery_table, subscription_table
+from app.services.event_broadcaster import broadcaster
+
+logger = logging.getLogger(__name__)
+
+WEBHOOKS_TOPIC = "webhooks"
+USER_AGENT = "project-status-tracker-webhooks/1.0"
+MAX_ERROR_LENGTH = 500
+EXPIRY_INTERVAL_SECONDS = 60
+DISPATCHER_LOCK_KEY = 7_290_451_638  # pg_try_advisory_lock key of the elected dispatcher
+
+
+def publish_outbox_pending() -> None:
+    """Outbox listener: wake the dispatcher, in whichever worker it runs."""
+    broadcaster.publish((WEBHOOKS_TOPIC,), "pending", "{}")
+
+
+add_outbox_listener(publish_outbox_pending)
+
+
+class Endpoint(NamedTuple):
+    """Where and how to deliver a subscription's events."""
+    url: str
+    secret: str
+    consecutive_failures: int
+    circuit_open_until: Optional[datetime]
+
+
+class Batch(NamedTuple):
+    endpoint: Endpoint
+    events: List[Dict]
+    last_id: int
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    digest = hmac.new(secret.encode("utf-8"), timestamp.encode("ascii") + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def _event(row) -> Dict:
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "occurred_at": as_utc(row.occurred_at),
+        "project_id": row.project_id,
+        "project_name": row.project_name,
+        "client_id": row.client_id,
+        "client_name": row.client_name,
+        "previous_health_status": row.previous_health_status,
+        "health_status": row.health_status,
+        "status_id": row.status_id,
+    }
+
+
+def pending_subscription_ids(session_factory) -> List[int]:
+    """Active subscriptions with events waiting in the outbox."""
+    with session_factory() as db:
+        return list(db.execute(
+            select(delivery_table.c.subscription_id)
+            .join(subscription_table, subscription_table.c.id == delivery_table.c.subscription_id)
+            .where(subscription_table.c.is_active.is_(True))
+            .group_by(delivery_table.c.subscription_id)
+        ).scalars())
+
+
+def expire_deliveries(session_factory, older_than: datetime) -> int:
+    """Drop events that could not be delivered within the retention period."""
+    with session_factory() as db:
+        expired = db.execute(delete(delivery_table).where(delivery_table.c.occurred_at < older_than)).rowcount
+        db.commit()
+        return expired
+
+
+def load_batch(session_factory, subscription_id: int, limit: int) -> Optional[Batch]:
+    """The oldest pending events of an active subscription, or None if there are none."""
+    with session_factory() as db:
+        subscription = db.execute(
+            select(
+                subscription_table.c.url,
+                subscription_table.c.secret,
+                subscription_table.c.consecutive_failures,
+                subscription_table.c.circuit_open_until,
+            ).where(subscription_table.c.id == subscription_id, subscription_table.c.is_active.is_(True))
+        ).first()
+        if subscription is None:
+            return None
+        rows = db.execute(
+            select(
+                delivery_table,
+                Project.name.label("project_name"),
+                Client.name.label("client_name"),
+            )
+            .outerjoin(Project, Project.id == delivery_table.c.project_id)
+            .outerjoin(Client, Client.id == delivery_table.c.client_id)
+            .where(delivery_table.c.subscription_id == subscription_id)
+            .order_by(delivery_table.c.id)
+            .limit(limit)
+        ).all()
+        if not rows:
+            return None
+        circuit_open_until = subscription.circuit_open_until
+        endpoint = Endpoint(
+            subscription.url,
+            subscription.secret,
+            subscription.consecutive_failures,
+            as_utc(circuit_open_until) if circuit_open_until is not None else None,
+        )
+        return Batch(endpoint, [_event(row) for row in rows], rows[-1].id)
+
+
+def complete_batch(session_factory, subscription_id: int, last_id: int) -> None:
+    """Remove a delivered batch from the outbox and close the endpoint's circuit."""
+    with session_factory() as db:
+        db.execute(
+            delete(delivery_table)
+            .where(delivery_table.c.subscription_id == subscription_id, delivery_table.c.id <= last_id)
+        )
+        db.execute(
+            update(subscription_table)
+            .where(subscription_table.c.id == subscription_id)
+            .values(
+                consecutive_failures=0,
+                circuit_open_until=None,
+                last_error=None,
+                last_delivered_at=func.now(),
+            )
+        )
+        db.commit()
+
+
+def record_failure(
+    session_factory,
+    subscription_id: int,
+    failures: int,
+    error: str,
+    circuit_open_until: Optional[datetime]
+) -> None:
+    with session_factory() as db:
+        db.execute(
+            update(subscription_table)
+            .where(subscription_table.c.id == subscription_id)
+            .values(
+                consecutive_failures=failures,
+                circuit_open_until=circuit_open_until,
+                last_error=error[:MAX_ERROR_LENGTH],
+            )
+        )
+        db.commit()
+
+
+class WebhookDispatcher:
+    """Background delivery of the webhook outbox: one drain task per endpoint with pending events."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._drains: Dict[int, asyncio.Task] = {}
+        self._lock_connection: Optional[Connection] = None  # Holds the election lock while elected
+        self._last_expiry = 0.0
+        self.delivered = 0  # Events acknowledged by their endpoints
+        self.failed_requests = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, client: Optional[httpx.AsyncClient] = None) -> None:
+        """Start dispatching on the running event loop."""
+        self._client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.WEBHOOK_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+            ),
+            headers={"User-Agent": USER_AGENT},
+        )
+        self._task = asyncio.create_task(self._run())
+        logger.info("Webhook dispatcher started")
+
+    async def stop(self) -> None:
+        """Stop dispatching; undelivered events stay in the outbox."""
+        tasks = [task for task in (self._task, *self._drains.values()) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._drains.clear()
+        await run_in_threadpool(self._resign)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def reset(self, subscription_id: int) -> None:
+        """Abandon a subscription's backoff (after it was changed or deleted); the next scan starts over."""
+        drain = self._drains.pop(subscription_id, None)
+        if drain is not None:
+            drain.cancel()
+
+    def _elect(self) -> bool:
+        """Whether this process delivers: holds, or just took, the election lock."""
+        if self._lock_connection is not None:
+            try:
+                self._lock_connection.execute(text("SELECT 1"))
+                self._lock_connection.commit()
+                return True
+            except Exception as e:
+                # The server released the lock with the connection; another process may hold it now
+                logger.warning(f"Webhook dispatcher lost its election lock: {str(e)}")
+                self._resign()
+        with self._session_factory() as db:
+            bind = db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return True
+        connection = bind.connect()
+        try:
+            elected = connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": DISPATCHER_LOCK_KEY})
+            # Session lock: it outlives the transaction, and lasts until released or disconnected
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not elected:
+            connection.close()
+            return False
+        self._lock_connection = connection
+        logger.info("Webhook dispatcher elected to deliver in this process")
+        return True
+
+    def _resign(self) -> None:
+        connection, self._lock_connection = self._lock_connection, None
+        if connection is None:
+            return
+        try:
+            # Unlock explicitly: a pooled connection is not closed, only returned
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": DISPATCHER_LOCK_KEY})
+            connection.commit()
+        except Exception:
+            connection.invalidate()
+        finally:
+            connection.close()
+
+    async def _run(self) -> None:
+        # Coalescing: one buffered wakeup is enough to trigger the next scan
+        subscription = broadcaster.subscribe(WEBHOOKS_TOPIC, max_queued=1)
+        try:
+            while True:
+                try:
+                    if await run_in_threadpool(self._elect):
+                        await self._expire()
+                        for subscription_id in await run_in_threadpool(pending_subscription_ids, self._session_factory):
+                            if subscription_id not in self._drains:
+                                self._drains[subscription_id] = asyncio.create_task(self._drain(subscription_id))
+                    else:
+                        # Another process delivers; stop anything left from before losing the lock
+                        for subscription_id in list(self._drains):
+                            self.reset(subscription_id)
+                except Exception as e:
+                    logger.error(f"Webhook outbox scan failed: {str(e)}")
+                await subscription.get(settings.WEBHOOK_POLL_SECONDS)
+        finally:
+            subscription.close()
+
+    async def _expire(self) -> None:
+        now = time.monotonic()
+        if now - self._last_expiry < EXPIRY_INTERVAL_SECONDS:
+            return
+        self._last_expiry = now
+        older_than = datetime.now(timezone.utc) - timedelta(hours=settings.WEBHOOK_RETENTION_HOURS)
+        expired = await run_in_threadpool(expire_deliveries, self._session_factory, older_than)
+        if expired:
+            logger.warning(f"Dropped {expired} webhook events not delivered within {settings.WEBHOOK_RETENTION_HOURS}h")
+
+    async def _drain(self, subscription_id: int) -> None:
+        """Deliver a subscription's pending events batch by batch, backing off on failures."""
+        acknowledged = None  # Last event id the endpoint accepted that may still be in the outbox
+        try:
+            while True:
+                try:
+                    if acknowledged is not None:
+                        await run_in_threadpool(complete_batch, self._session_factory, subscription_id, acknowledged)
+                        acknowledged = None
+                    batch = await run_in_threadpool(
+                        load_batch, self._session_factory, subscription_id, settings.WEBHOOK_BATCH_SIZE
+                    )
+                except Exception as e:
+                    # Database trouble: retry later without resending what was acknowledged
+                    logger.error(f"Webhook outbox access for subscription {subscription_id} failed: {str(e)}")
+                    await asyncio.sleep(settings.WEBHOOK_RETRY_BASE_SECONDS)
+                    continue
+                if batch is None:
+                    return
+
+                # Open circuit (possibly left by a previous process): wait for the probe
+                open_until = batch.endpoint.circuit_open_until
+                if open_until is not None:
+                    wait = (open_until - datetime.now(timezone.utc)).total_seconds()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                        continue
+
+                error = await self._send(batch)
+                if error is None:
+                    acknowledged = batch.last_id
+                    self.delivered += len(batch.events)
+                    continue
+
+                self.failed_requests += 1
+                failures = batch.endpoint.consecutive_failures + 1
+                delay, open_until = self._retry_after(failures)
+                if open_until is not None:
+                    logger.warning(
+                        f"Webhook subscription {subscription_id} failed {failures} times in a row; "
+                        f"pausing delivery until {open_until.isoformat()}: {error}"
+                    )
+                try:
+                    await run_in_threadpool(
+                        record_failure, self._session_factory, subscription_id, failures, error, open_until
+                    )
+                except Exception as e:
+                    logger.error(f"Could not record webhook failure for subscription {subscription_id}: {str(e)}")
+                await asyncio.sleep(delay)
+        finally:
+            if self._drains.get(subscription_id) is asyncio.current_task():
+                del self._drains[subscription_id]
+
+    @staticmethod
+    def _retry_after(failures: int) -> Tuple[float, Optional[datetime]]:
+        """Backoff before the next attempt, and when the circuit opens, until when it stays open."""
+        if failures >= settings.WEBHOOK_CIRCUIT_FAILURE_THRESHOLD:
+            delay = float(settings.WEBHOOK_CIRCUIT_OPEN_SECONDS)
+            return delay, datetime.now(timezone.utc) + timedelta(seconds=delay)
+        delay = min(settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (failures - 1), settings.WEBHOOK_RETRY_MAX_SECONDS)
+        # Jitter so endpoints failing together do not retry in lockstep
+        return random.uniform(delay / 2, delay), None
+
+    async def _send(self, batch: Batch) -> Optional[str]:
+        """POST a batch; returns None on success, otherwise what went wrong."""
+        body = dumps({"events": batch.events})
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Timestamp": timestamp,
+            "X-Webhook-Signature": sign(batch.endpoint.secret, timestamp, body),
+        }
+        try:
+            response = await self._client.post(batch.endpoint.url, content=body, headers=headers)
+        except httpx.HTTPError as e:
+            return f"{type(e).__name__}: {str(e) or 'request failed'}"
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+
+
+webhook_dispatcher = WebhookDispatcher()
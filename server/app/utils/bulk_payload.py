@@ -0,0 +1,62 @@
+"""
+Bulk payload utilities.
+"""
+from typing import List, Optional
+from fastapi import Request, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.bulk_status_service import ParsedRow, parse_csv, parse_ndjson
+
+
+def _payload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Payload exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+    )
+
+
+async def read_limited_body(request: Request, limit: int) -> bytes:
+    """
+    Read a request body, rejecting it with 413 as soon as it exceeds limit bytes.
+
+    A declared Content-Length over the limit is rejected before reading; chunked
+    bodies are counted while they stream in, so an oversized one is never
+    buffered whole.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+        raise _payload_too_large()
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise _payload_too_large()
+    return bytes(body)
+
+
+def _parse_rows(content: bytes, payload_format: str) -> List[ParsedRow]:
+    return list(parse_csv(content) if payload_format == "csv" else parse_ndjson(content))
+
+
+async def read_bulk_rows(request: Request, payload_format: Optional[str] = None) -> List[ParsedRow]:
+    """
+    Read an NDJSON or CSV request body into (line number, row) pairs.
+
+    The format defaults to CSV for a text/csv Content-Type and NDJSON otherwise.
+    Parsing a large body is CPU-bound, so it runs in the threadpool.
+    """
+    content = await read_limited_body(request, settings.MAX_UPLOAD_SIZE)
+
+    if payload_format is None:
+        content_type = request.headers.get("content-type", "")
+        payload_format = "csv" if "csv" in content_type else "ndjson"
+
+    try:
+        return await run_in_threadpool(_parse_rows, content, payload_format)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Payload must be UTF-8 encoded"
+        )
@@ -2,10 +2,12 @@
 File upload utilities.
 """
 import os
+import shutil
 import uuid
 from pathlib import Path
 from typing import Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.services.sharepoint_service import (
@@ -13,6 +15,12 @@ from app.services.sharepoint_service import (
     download_file_from_sharepoint,
     delete_file_from_sharepoint
 )
+from app.services.s3_service import (
+    upload_file_to_s3,
+    upload_fileobj_to_s3,
+    download_file_from_s3,
+    delete_file_from_s3
+)
 
 
 ALLOWED_AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".flac", ".webm"}
@@ -21,6 +29,8 @@ ALLOWED_TEXT_EXTENSIONS = {".txt", ".doc", ".docx", ".pdf"}
 
 ALLOWED_EXTENSIONS = ALLOWED_AUDIO_EXTENSIONS | ALLOWED_VIDEO_EXTENSIONS | ALLOWED_TEXT_EXTENSIONS
 
+COPY_CHUNK_SIZE = 1024 * 1024  # Bytes per read when streaming uploads to storage
+
 
 def get_file_extension(filename: str) -> str:
     """Get file extension from filename."""
@@ -145,6 +155,65 @@ async def save_uploaded_file(file: UploadFile, project_id: int) -> Tuple[str, in
         return relative_path, file_size
 
 
+def _uploaded_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def _copy_to_local(source, project_id: int, filename: str) -> str:
+    upload_dir = Path(settings.UPLOAD_DIR) / str(project_id)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    file_path = upload_dir / f"{uuid.uuid4()}{get_file_extension(filename)}"
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(source, f, COPY_CHUNK_SIZE)
+    return str(file_path.relative_to(Path(settings.UPLOAD_DIR)))
+
+
+async def store_uploaded_file(file: UploadFile, project_id: int) -> Tuple[str, int]:
+    """
+    Stream an uploaded file to storage without reading it into memory.
+    
+    The multipart parser has already spooled the upload to a temporary file;
+    it is copied to local storage or S3 in chunks from the threadpool, so many
+    files can be stored concurrently. SharePoint has no streaming upload and
+    falls back to save_uploaded_file.
+    
+    Returns:
+        tuple: (file_path, file_size)
+    """
+    if settings.STORAGE_TYPE.lower() == "sharepoint":
+        return await save_uploaded_file(file, project_id)
+    
+    validate_file(file)
+    file_size = _uploaded_size(file)
+    if file_size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
+        )
+    
+    await file.seek(0)
+    filename = file.filename or "unknown"
+    if settings.STORAGE_TYPE.lower() == "s3":
+        s3_key = f"projects/{project_id}/{uuid.uuid4()}{Path(filename).suffix}"
+        uploaded = await run_in_threadpool(
+            upload_fileobj_to_s3, file.file, s3_key, file.content_type or "application/octet-stream"
+        )
+        if not uploaded:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to upload file to S3"
+            )
+        return s3_key, file_size
+    
+    file_path = await run_in_threadpool(_copy_to_local, file.file, project_id, filename)
+    return file_path, file_size
+
+
 def delete_file(file_path: str) -> None:
     """Delete a file from storage (local, SharePoint, or S3)."""
     if settings.STORAGE_TYPE.lower() == "sharepoint":
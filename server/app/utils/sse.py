@@ -0,0 +1,77 @@
+"""
+Server-Sent Events responses.
+"""
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.services.event_broadcaster import Event, Subscription
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Stop nginx from buffering the stream
+}
+
+
+def sse_frame(name: str, data: str) -> bytes:
+    """Format one event (data must be single-line JSON)."""
+    return Event(name, data).frame
+
+
+async def stream_events(
+    subscription: Optional[Subscription],
+    initial: Iterable[bytes],
+    keepalive_seconds: float,
+    until: Optional[Callable[[Event], bool]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Yield the initial frames, then subscription events until until(event) is
+    true or the client disconnects. Without a subscription the stream ends
+    after the initial frames.
+    """
+    try:
+        for frame in initial:
+            yield frame
+        while subscription is not None:
+            event = await subscription.get(timeout=keepalive_seconds)
+            if event is None:
+                yield KEEPALIVE_FRAME
+                continue
+            yield event.frame
+            if until is not None and until(event):
+                return
+    finally:
+        if subscription is not None:
+            subscription.close()
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    text/event-stream response that unsubscribes as soon as the response ends.
+
+    A client disconnect aborts the body iterator without closing it, so the
+    subscription is released here rather than left for garbage collection.
+    """
+
+    def __init__(
+        self,
+        subscription: Optional[Subscription],
+        initial: Iterable[bytes],
+        keepalive_seconds: float,
+        until: Optional[Callable[[Event], bool]] = None
+    ):
+        super().__init__(
+            stream_events(subscription, list(initial), keepalive_seconds, until),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+        self.subscription = subscription
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.subscription is not None:
+                self.subscription.close()
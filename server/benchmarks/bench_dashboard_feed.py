@@ -0,0 +1,280 @@
+"""
+Load test for the live project health feed (/reports/health/live).
+
+Opens N concurrent WebSocket connections straight against the ASGI app (no
+network server needed), a share of them filtered to a few clients and a share
+of them slow consumers whose every send takes --slow-delay seconds, then
+measures:
+- time from connect to initial snapshot, and memory per connected subscriber
+  (growth of the process's peak RSS)
+- delta latency: one ProjectStatus committed through the ORM, until every
+  subscriber watching that project has the delta
+- a burst of small commits across many projects: slow consumers fall behind
+  and are resynced with a snapshot, fast ones keep up with deltas
+- correctness: a sample of subscribers rebuild their view from the snapshot
+  and deltas, which must equal the current health rows when the run ends
+
+Usage:
+    poetry run python benchmarks/bench_dashboard_feed.py --subscribers 2000 --projects 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), "bench_dashboard_feed.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_FILE}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.responses import dumps
+from app.core.security import create_access_token
+from app.db.database import Base, SessionLocal, engine
+import app.db.models  # noqa: F401 - registers all tables
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.db.models.user import User, UserRole
+from app.services.dashboard_feed import CLIENT_ID_INDEX, dashboard_feed
+from main import app
+
+FEED_PATH = "/api/v1/reports/health/live"
+
+
+class FakeWebSocket:
+    """One client connection driven through the ASGI websocket protocol."""
+
+    def __init__(self, index: int, query: str, slow_delay: float, keep_view: bool):
+        self.scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": FEED_PATH, "raw_path": FEED_PATH.encode(), "root_path": "", "query_string": query.encode(),
+            "headers": [], "server": ("bench", 80), "client": ("127.0.0.1", 10000 + index), "subprotocols": [],
+        }
+        self.slow_delay = slow_delay
+        self.keep_view = keep_view
+        self.connected_at = 0.0
+        self.snapshot_at = 0.0
+        self.snapshots = 0
+        self.messages = 0
+        self.last_message_at = 0.0
+        self.view = {}  # project_id -> row, rebuilt from the messages (sampled subscribers only)
+        self.closed = None
+        self._connected = False
+        self._disconnect = asyncio.Event()
+        self.message_event = asyncio.Event()
+
+    async def receive(self) -> dict:
+        if not self._connected:
+            self._connected = True
+            return {"type": "websocket.connect"}
+        await self._disconnect.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "websocket.close":
+            self.closed = message.get("code")
+            return
+        if message["type"] != "websocket.send":
+            return
+        if self.slow_delay:
+            await asyncio.sleep(self.slow_delay)
+        text = message["text"]
+        is_snapshot = text.startswith('{"type":"snapshot"')
+        if is_snapshot:
+            self.snapshots += 1
+            if not self.snapshot_at:
+                self.snapshot_at = time.perf_counter()
+        if self.keep_view:
+            payload = json.loads(text)
+            if is_snapshot:
+                self.view = {row[0]: row for row in payload["projects"]}
+            else:
+                self.view.update((row[0], row) for row in payload["projects"])
+                for project_id in payload["removed"]:
+                    self.view.pop(project_id, None)
+        self.messages += 1
+        self.last_message_at = time.perf_counter()
+        self.message_event.set()
+
+    async def run(self) -> None:
+        self.connected_at = time.perf_counter()
+        await app(self.scope, self.receive, self.send)
+
+    def disconnect(self) -> None:
+        self._disconnect.set()
+
+
+def seed(clients: int, projects: int, rng: random.Random) -> dict:
+    """Create the schema and initial statuses; returns project_id -> client_id."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", role=UserRole.ADMIN, hashed_password="x")
+        db.add(user)
+        db.add_all(Client(name=f"Client {i}") for i in range(clients))
+        db.commit()
+        client_ids = [client.id for client in db.query(Client).all()]
+        db.add_all(
+            Project(name=f"Project {i}", client_id=client_ids[i % clients], created_by=user.id) for i in range(projects)
+        )
+        db.commit()
+        owners = dict(db.query(Project.id, Project.client_id).all())
+        # Every second project has a status, the rest show up as "no status"
+        for project_id in list(owners)[::2]:
+            db.add(random_status(project_id, user.id, rng))
+        db.commit()
+        return owners
+
+
+def random_status(project_id: int, user_id: int, rng: random.Random) -> ProjectStatus:
+    return ProjectStatus(
+        project_id=project_id, updated_by=user_id,
+        is_on_scope=rng.choice((True, False, None)), is_on_time=rng.choice((True, False, None)),
+        is_on_budget=rng.choice((True, False, None)),
+    )
+
+
+def write_statuses(project_ids: list, rng: random.Random) -> None:
+    with SessionLocal() as db:
+        db.add_all(random_status(project_id, 1, rng) for project_id in project_ids)
+        db.commit()
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def watches(connection: FakeWebSocket, client_id: int, filters: dict) -> bool:
+    client_ids = filters[connection]
+    return client_ids is None or client_id in client_ids
+
+
+async def wait_for_messages(connections: list, counts: dict, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    for connection in connections:
+        while connection.messages <= counts[connection]:
+            connection.message_event.clear()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(connection.message_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    owners = seed(args.clients, args.projects, rng)
+    client_ids = sorted(set(owners.values()))
+    token = create_access_token({"sub": "bench@example.com", "role": "admin"})
+    dashboard_feed.max_pending = args.max_pending
+
+    connections, filters = [], {}
+    for i in range(args.subscribers):
+        query = f"token={token}"
+        watched = None
+        if i % 2:
+            watched = frozenset(rng.sample(client_ids, min(3, len(client_ids))))
+            query += "".join(f"&client_ids={client_id}" for client_id in sorted(watched))
+        slow = i < args.subscribers * args.slow_share
+        connection = FakeWebSocket(i, query, args.slow_delay if slow else 0.0, keep_view=slow or i % 20 == 0)
+        connections.append(connection)
+        filters[connection] = watched
+    slow = [connection for connection in connections if connection.slow_delay]
+    fast = [connection for connection in connections if not connection.slow_delay]
+    print(f"{args.subscribers} subscribers ({len(slow)} slow, half filtered to 3 of {args.clients} clients), "
+          f"{args.projects} projects, max pending {args.max_pending}")
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(connection.run()) for connection in connections]
+    await wait_for_messages(connections, {connection: 0 for connection in connections}, timeout=120)
+    connected = time.perf_counter() - start
+    memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) / len(connections)  # KiB
+    missing = sum(1 for connection in connections if not connection.snapshot_at)
+    waits = [connection.snapshot_at - connection.connected_at for connection in connections if connection.snapshot_at]
+    print(f"connect + snapshot: all in {connected:.2f}s, per connection p50 {percentile(waits, 0.5) * 1000:.0f}ms "
+          f"p99 {percentile(waits, 0.99) * 1000:.0f}ms, {missing} without snapshot")
+    print(f"memory per connected subscriber (peak RSS growth, incl. sampled views): {memory:.1f} KiB")
+
+    latencies = []
+    for _ in range(args.writes):
+        project_id = rng.choice(list(owners))
+        receivers = [connection for connection in fast if watches(connection, owners[project_id], filters)]
+        counts = {connection: connection.messages for connection in receivers}
+        committed = time.perf_counter()
+        await asyncio.to_thread(write_statuses, [project_id], rng)
+        await wait_for_messages(receivers, counts, timeout=10)
+        latencies.extend(
+            connection.last_message_at - committed for connection in receivers if connection.messages > counts[connection]
+        )
+    print(f"delta latency over {args.writes} single writes ({len(latencies)} deliveries): "
+          f"p50 {percentile(latencies, 0.5) * 1000:.1f}ms p99 {percentile(latencies, 0.99) * 1000:.1f}ms "
+          f"max {max(latencies) * 1000:.1f}ms")
+
+    snapshots_before = {connection: connection.snapshots for connection in connections}
+    start = time.perf_counter()
+    for _ in range(args.burst_commits):
+        await asyncio.to_thread(write_statuses, rng.sample(list(owners), min(args.burst_size, len(owners))), rng)
+    # Let every subscriber drain what it was sent, slow ones included
+    while True:
+        idle_since = max(connection.last_message_at for connection in connections)
+        if time.perf_counter() - idle_since > max(1.0, args.slow_delay * 3):
+            break
+        await asyncio.sleep(0.2)
+    resynced_slow = sum(1 for connection in slow if connection.snapshots > snapshots_before[connection])
+    resynced_fast = sum(1 for connection in fast if connection.snapshots > snapshots_before[connection])
+    print(f"burst of {args.burst_commits} commits x {args.burst_size} statuses: settled after {idle_since - start:.2f}s, "
+          f"resynced {resynced_slow}/{len(slow)} slow and {resynced_fast}/{len(fast)} fast subscribers")
+
+    rows, _ = dashboard_feed.cache.load()
+    current = {row[0]: json.loads(dumps(list(row))) for row in rows}
+    sampled = [connection for connection in connections if connection.keep_view]
+    stale = 0
+    for connection in sampled:
+        expected = {
+            project_id: row for project_id, row in current.items()
+            if filters[connection] is None or row[CLIENT_ID_INDEX] in filters[connection]
+        }
+        if connection.view != expected:
+            stale += 1
+    print(f"views rebuilt from snapshot + deltas: {len(sampled) - stale}/{len(sampled)} match the database")
+
+    for connection in connections:
+        connection.disconnect()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    print(f"subscribers left after disconnect: {len(dashboard_feed.subscribers)}")
+    await dashboard_feed.stop()
+    return 1 if stale or missing else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--burst-commits", type=int, default=40)
+    parser.add_argument("--burst-size", type=int, default=25)
+    parser.add_argument("--max-pending", type=int, default=100)
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    try:
+        status = asyncio.run(run(args))
+    finally:
+        engine.dispose()
+        os.remove(DATABASE_FILE)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Throughput benchmark for document text extraction.
+
+Generates a corpus of mixed documents (plain text, DOCX, multi-page PDF and a
+few corrupt files), then measures:
+1. serial extraction in this process (baseline)
+2. extraction through the DocumentExtractor process pool (time and memory
+   limited workers), checking it yields exactly the serial results
+3. a warm pass where every document is a cache hit (content hash lookup in
+   transcriptions), as for re-uploaded documents
+
+Usage:
+    poetry run python benchmarks/bench_document_extraction.py --documents 1000 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+WORDS = (
+    "scope delivery milestone budget risk vendor sprint review client approval integration "
+    "deadline testing deployment invoice estimate blocker dependency migration release"
+).split()
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+
+
+def make_txt(rng: random.Random, paragraphs: int) -> bytes:
+    return "\n".join(sentence(rng) for _ in range(paragraphs)).encode("utf-8")
+
+
+def make_docx(rng: random.Random, paragraphs: int) -> bytes:
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(sentence(rng))}</w:t></w:r></w:p>'
+        for _ in range(paragraphs)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", RELS)
+        archive.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+def make_pdf(rng: random.Random, pages: int, lines_per_page: int = 40) -> bytes:
+    """Minimal valid PDF with one Helvetica text stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            text = sentence(rng).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            lines.append(f"({text}) Tj T*")
+        stream = f"BT /F1 10 Tf 12 TL 40 760 Td {' '.join(lines)} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def make_corpus(n_documents: int, seed: int) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_documents):
+        kind = rng.random()
+        if kind < 0.02:
+            corpus.append((f"corrupt{i}.pdf", ".pdf", rng.randbytes(rng.randint(100, 5000))))
+        elif kind < 0.40:
+            corpus.append((f"notes{i}.txt", ".txt", make_txt(rng, rng.randint(5, 300))))
+        elif kind < 0.70:
+            corpus.append((f"minutes{i}.docx", ".docx", make_docx(rng, rng.randint(5, 300))))
+        else:
+            corpus.append((f"report{i}.pdf", ".pdf", make_pdf(rng, rng.randint(1, 12))))
+    return corpus
+
+
+def outcome(extract, *args):
+    from app.services.document_extraction import DocumentExtractionError
+    try:
+        return extract(*args)
+    except DocumentExtractionError as e:
+        return f"error: {e}"
+
+
+def report(label: str, documents: int, total_bytes: int, elapsed: float) -> None:
+    print(
+        f"{label:<28} {documents:>6} docs  {elapsed:7.2f}s  {documents / elapsed:8.1f} docs/s"
+        f"  {total_bytes / elapsed / 1024 / 1024:7.1f} MB/s"
+    )
+
+
+async def extract_with_pool(extractor, corpus: list) -> list:
+    from app.services.document_extraction import DocumentExtractionError
+
+    async def one(extension: str, content: bytes):
+        try:
+            return await extractor.extract(content, extension)
+        except DocumentExtractionError as e:
+            return f"error: {e}"
+
+    return await asyncio.gather(*(one(extension, content) for _, extension, content in corpus))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-chars", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.db.database import Base
+    import app.db.models  # noqa: F401 - registers all tables
+    from app.db.models.client import Client
+    from app.db.models.project import Project
+    from app.db.models.transcription import Transcription, TranscriptionStatus
+    from app.db.models.user import User, UserRole
+    from app.services.document_extraction import DocumentExtractor, content_hash, extract_text
+    from app.services.transcription_service import find_cached_text
+
+    corpus = make_corpus(args.documents, args.seed)
+    total_bytes = sum(len(content) for _, _, content in corpus)
+    counts = {}
+    for _, extension, _ in corpus:
+        counts[extension] = counts.get(extension, 0) + 1
+    print(f"corpus: {len(corpus)} documents, {total_bytes / 1024 / 1024:.1f} MB, {counts}\n")
+
+    start = time.perf_counter()
+    serial = [outcome(extract_text, content, extension, args.max_chars) for _, extension, content in corpus]
+    report("serial (in process)", len(corpus), total_bytes, time.perf_counter() - start)
+
+    extractor = DocumentExtractor(workers=args.workers, timeout_seconds=30, max_memory_mb=512, max_chars=args.max_chars)
+    asyncio.run(extract_with_pool(extractor, corpus[:args.workers]))  # Start the workers
+    start = time.perf_counter()
+    pooled = asyncio.run(extract_with_pool(extractor, corpus))
+    report(f"process pool ({args.workers} workers)", len(corpus), total_bytes, time.perf_counter() - start)
+    extractor.shutdown()
+
+    mismatches = sum(1 for a, b in zip(serial, pooled) if a != b)
+    failures = sum(1 for text in pooled if text.startswith("error: "))
+    print(f"{'':<28} {failures} documents failed (corrupt inputs), {mismatches} differ from serial")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.execute(insert(User), [{"id": 1, "email": "b@example.com", "name": "B", "role": UserRole.ADMIN, "hashed_password": "x"}])
+        db.execute(insert(Client), [{"id": 1, "name": "Client"}])
+        db.execute(insert(Project), [{"id": 1, "name": "Project", "client_id": 1, "created_by": 1}])
+        db.execute(insert(Transcription), [
+            {
+                "project_id": 1, "file_name": name, "file_type": "text", "raw_text": text,
+                "content_hash": content_hash(content), "processing_status": TranscriptionStatus.COMPLETED,
+                "created_by": 1,
+            }
+            for (name, _, content), text in zip(corpus, pooled) if not text.startswith("error: ")
+        ])
+        db.commit()
+
+        start = time.perf_counter()
+        hits = sum(1 for _, _, content in corpus if find_cached_text(db, content_hash(content)) is not None)
+        report("warm (content hash cache)", len(corpus), total_bytes, time.perf_counter() - start)
+        print(f"{'':<28} {hits} cache hits")
+    engine.dispose()
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
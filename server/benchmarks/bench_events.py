@@ -0,0 +1,97 @@
+"""
+Cost of idle Server-Sent Events subscribers and of event fan-out.
+
+Opens N subscriptions spread over projects, each drained by the same
+stream_events() generator the SSE endpoints use, and measures:
+- memory per idle subscriber (tracemalloc)
+- CPU used by the process while all subscribers sit idle
+- time to publish one event to a project's subscribers and until every
+  subscriber has received it, for a quiet project and for one project
+  watched by every subscriber
+
+Usage:
+    poetry run python benchmarks/bench_events.py --subscribers 10000 --projects 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.event_broadcaster import EventBroadcaster, project_topic
+from app.utils.sse import stream_events
+
+EVENT = '{"transcription_id":1,"project_id":1,"stage":"extracting_status","processing_status":"processing"}'
+ALL_PROJECTS = "project:all"
+
+
+async def consume(broadcaster: EventBroadcaster, topics: tuple, keepalive: float, received: list) -> None:
+    subscription = broadcaster.subscribe(*topics)
+    async for frame in stream_events(subscription, [], keepalive):
+        if not frame.startswith(b":"):
+            received.append(time.perf_counter())
+
+
+async def fan_out(broadcaster: EventBroadcaster, topic: str, received: list, expected: int) -> tuple:
+    received.clear()
+    start = time.perf_counter()
+    broadcaster.publish((topic,), "stage", EVENT)
+    published = time.perf_counter() - start
+    while len(received) < expected:
+        await asyncio.sleep(0)
+    return published, max(received) - start
+
+
+async def run(subscribers: int, projects: int, idle_seconds: float, keepalive: float) -> None:
+    broadcaster = EventBroadcaster(max_queued=100)
+    received = []
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [
+        asyncio.create_task(consume(broadcaster, (project_topic(i % projects), ALL_PROJECTS), keepalive, received))
+        for i in range(subscribers)
+    ]
+    await asyncio.sleep(0.1)  # Let every consumer subscribe and block
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / subscribers
+    tracemalloc.stop()
+    print(f"{subscribers} subscribers on {projects} projects")
+    print(f"memory per idle subscriber (stream task + subscription): {per_subscriber / 1024:.2f} KiB")
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(idle_seconds)
+    cpu = time.process_time() - cpu_start
+    print(f"CPU while idle for {idle_seconds:.0f}s (keepalive every {keepalive:.0f}s): {cpu * 1000:.1f}ms")
+
+    watching = subscribers // projects + (1 if subscribers % projects else 0)
+    published, delivered = await fan_out(broadcaster, project_topic(0), received, watching)
+    print(f"event to one project ({watching} subscribers): publish {published * 1e6:.0f}us, "
+          f"all delivered after {delivered * 1000:.2f}ms")
+    published, delivered = await fan_out(broadcaster, ALL_PROJECTS, received, subscribers)
+    print(f"event to every subscriber ({subscribers}): publish {published * 1000:.2f}ms, "
+          f"all delivered after {delivered * 1000:.2f}ms")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    print(f"subscribers left after disconnect: {broadcaster.subscriber_count}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--keepalive", type=float, default=15.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.projects, args.idle_seconds, args.keepalive))
+
+
+if __name__ == "__main__":
+    main()
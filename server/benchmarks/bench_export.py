@@ -0,0 +1,161 @@
+"""
+Memory ceiling check and throughput comparison for streaming exports.
+
+Seeds a file-backed SQLite database with synthetic status history, streams it
+through the status history (CSV, NDJSON and, with pyarrow, Arrow IPC and
+Parquet) and health report exporters, and fails (exit code 1) if peak Python
+heap usage while exporting exceeds the ceiling. Because rows are read in
+fixed-size partitions, the peak should not grow with the row count.
+
+For comparison it also pages through GET /project-status/ the way a client
+without the export has to (100 rows per page, ORM + response_model + JSON) and
+extrapolates the time to fetch every row.
+
+Usage:
+    poetry run python benchmarks/bench_export.py --rows 1000000 --max-peak-mb 32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, desc, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+import app.db.models  # noqa: F401 - registers all tables
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.db.models.user import User, UserRole
+from app.core.responses import dumps
+from app.schemas.project_status import ProjectStatusResponse
+from app.services.columnar_export_service import PYARROW_AVAILABLE, iter_columnar_export
+from app.services.export_service import iter_health_export, iter_status_history_export
+
+SEED_CHUNK_SIZE = 50_000
+
+
+def seed(engine, n_clients: int, n_projects: int, n_rows: int) -> None:
+    """Insert synthetic rows with Core inserts so seeding itself stays cheap."""
+    flags = [True, True, False, None]
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            "id": 1, "email": "bench@example.com", "name": "Bench", "role": UserRole.ADMIN, "hashed_password": "x"
+        }])
+        connection.execute(insert(Client), [{"id": i + 1, "name": f"Client {i}"} for i in range(n_clients)])
+        connection.execute(insert(Project), [
+            {"id": i + 1, "name": f"Project {i}", "client_id": i % n_clients + 1, "created_by": 1}
+            for i in range(n_projects)
+        ])
+        for offset in range(0, n_rows, SEED_CHUNK_SIZE):
+            connection.execute(insert(ProjectStatus), [
+                {
+                    "project_id": i % n_projects + 1,
+                    "is_on_scope": flags[i % 4],
+                    "is_on_time": flags[(i // 2) % 4],
+                    "is_on_budget": flags[(i // 3) % 4],
+                    "next_delivery": f"Milestone {i % 7}",
+                    "risks": "Vendor dependency" if i % 5 == 0 else None,
+                    "updated_by": 1,
+                }
+                for i in range(offset, min(offset + SEED_CHUNK_SIZE, n_rows))
+            ])
+
+
+def measure(name: str, export: Callable[[], Iterator[bytes]], max_peak_mb: float) -> bool:
+    """Drain an export, reporting bytes, wall time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = 0
+    for chunk in export():
+        total += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_mb = peak / (1024 * 1024)
+    ok = peak_mb <= max_peak_mb
+    print(
+        f"{name:<28} {total / (1024 * 1024):9.1f} MB out  {elapsed:7.2f}s  "
+        f"peak={peak_mb:6.2f} MB  {'ok' if ok else 'OVER CEILING'}"
+    )
+    return ok
+
+
+def measure_json_pages(session_factory, n_rows: int, pages: int, page_size: int = 100) -> None:
+    """Time the first pages of GET /project-status/ and extrapolate to all rows."""
+    adapter = TypeAdapter(List[ProjectStatusResponse])
+    start = time.perf_counter()
+    total = 0
+    with session_factory() as db:
+        for page in range(pages):
+            statuses = (
+                db.query(ProjectStatus)
+                .order_by(desc(ProjectStatus.updated_at))
+                .offset(page * page_size)
+                .limit(page_size)
+                .all()
+            )
+            total += len(dumps(jsonable_encoder(adapter.validate_python(statuses, from_attributes=True))))
+            db.expunge_all()
+    elapsed = time.perf_counter() - start
+    rows = pages * page_size
+    print(
+        f"{'json pages (' + str(pages) + ')':<28} {total / (1024 * 1024):9.1f} MB out  {elapsed:7.2f}s  "
+        f"~{elapsed / rows * n_rows:.0f}s extrapolated to {n_rows} rows (offset cost excluded)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Status history rows")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=20_000)
+    parser.add_argument("--max-peak-mb", type=float, default=32.0)
+    parser.add_argument("--json-pages", type=int, default=100, help="Pages of the paginated JSON endpoint to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/export.db")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        start = time.perf_counter()
+        seed(engine, args.clients, args.projects, args.rows)
+        print(f"Seeded {args.rows} statuses for {args.projects} projects in {time.perf_counter() - start:.1f}s\n")
+
+        results = [
+            measure(f"status history {export_format}", lambda export_format=export_format: iter_status_history_export(
+                export_format, session_factory=session_factory
+            ), args.max_peak_mb)
+            for export_format in ("csv", "ndjson")
+        ] + [
+            measure(f"status history {export_format}", lambda export_format=export_format: iter_columnar_export(
+                export_format, session_factory=session_factory
+            ), args.max_peak_mb)
+            for export_format in (("arrow", "parquet") if PYARROW_AVAILABLE else ())
+        ] + [
+            measure(f"health report {export_format}", lambda export_format=export_format: iter_health_export(
+                None, export_format, session_factory=session_factory
+            ), args.max_peak_mb)
+            for export_format in ("csv", "ndjson")
+        ]
+        measure_json_pages(session_factory, args.rows, args.json_pages)
+        engine.dispose()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Logging cost per request, before and after the queue-based JSON logging.
+
+Each simulated request logs what a typical request does: its access record
+(with the route, status and duration fields), one INFO message from a service,
+and --debug-calls DEBUG calls that are filtered out at the production level
+(INFO). Two pipelines log the same records:
+- before: the former setup, a StreamHandler writing text in the calling
+  thread, with messages built as f-strings
+- after: app.core.logging, records queued to a writer thread that formats
+  them as JSON, request context attached, messages built lazily
+
+to two sinks:
+- file: stdout redirected to a file, the fast case
+- slow: a stdout that takes --slow-write-ms per record, like a full pipe or a
+  log shipper applying backpressure
+
+For each, the table shows the time the logging thread (the event loop, in the
+server) spends per request in CPU and wall-clock terms, and the CPU time of the
+whole process including the writer thread; the lowest of several rounds.
+Formatting JSON costs more CPU than text overall, but it is done off the
+logging thread. With one CPU the writer thread runs on the same core, so its
+turns show up in the caller's wall-clock time on the fast sink.
+
+Usage:
+    poetry run python benchmarks/bench_logging.py --requests 2000 --rounds 10
+"""
+import argparse
+import gc
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.logging import (
+    TEXT_FORMAT,
+    DebugSampler,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RequestContextFilter,
+    _LogWriter
+)
+from app.core.request_context import _current_request_id, _current_scope
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/api/v1/projects/42",
+    "route": SimpleNamespace(path="/{project_id}"),
+}
+ROUTE = "/api/v1/projects/{project_id}"
+
+
+class SlowStream:
+    """A stdout that blocks for delay seconds on every record written."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        time.sleep(self.delay)
+
+
+def log_request(service: logging.Logger, access: logging.Logger, number: int, lazy: bool, debug_calls: int) -> None:
+    """Log what one request logs."""
+    request_id = _current_request_id.set(f"{number:032x}")
+    scope = _current_scope.set(SCOPE)
+    try:
+        if lazy:
+            for _ in range(debug_calls):
+                service.debug("Loaded project %s with %s statuses", number, len(SCOPE))
+            service.info("Status extracted and saved for project %s", number)
+            access.info(
+                "%s %s %s %.1fms", "GET", ROUTE, 200, 12.3,
+                extra={"method": "GET", "route": ROUTE, "status": 200, "duration_ms": 12.3}
+            )
+        else:
+            for _ in range(debug_calls):
+                service.debug(f"Loaded project {number} with {len(SCOPE)} statuses")
+            service.info(f"Status extracted and saved for project {number}")
+            access.info(
+                f"GET {ROUTE} 200 {12.3:.1f}ms",
+                extra={"method": "GET", "route": ROUTE, "status": 200, "duration_ms": 12.3}
+            )
+    finally:
+        _current_scope.reset(scope)
+        _current_request_id.reset(request_id)
+
+
+def before(logger: logging.Logger, stream) -> Tuple[Callable[[], None], Callable[[], None]]:
+    """The former setup: text written by the calling thread; returns (drain, close)."""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    logger.addHandler(handler)
+
+    def drain() -> None:
+        pass
+
+    def close() -> None:
+        logger.removeHandler(handler)
+
+    return drain, close
+
+
+def after(logger: logging.Logger, stream) -> Tuple[Callable[[], None], Callable[[], None]]:
+    """app.core.logging's pipeline: queued records written as JSON by a writer thread."""
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(JsonFormatter())
+    handler = NonBlockingQueueHandler(queue.Queue(10000))
+    handler.addFilter(DebugSampler(20, 0.01))
+    handler.addFilter(RequestContextFilter())
+    logger.addHandler(handler)
+    writer = _LogWriter(handler.queue, stream_handler)
+    writer.start()
+
+    def drain() -> None:
+        handler.queue.join()
+        if handler.dropped:
+            raise RuntimeError(f"{handler.dropped} records dropped; lower --requests")
+
+    def close() -> None:
+        logger.removeHandler(handler)
+        writer.stop()
+
+    return drain, close
+
+
+def run_round(requests: int, lazy: bool, debug_calls: int, drain: Callable[[], None]) -> Tuple[float, float, float]:
+    """Logging thread CPU, logging thread wall-clock and process CPU seconds per request."""
+    service = logging.getLogger("bench_logging.service")
+    access = logging.getLogger("bench_logging.access")
+    gc.collect()
+    start_process = time.process_time()
+    start_thread = time.thread_time()
+    start_wall = time.perf_counter()
+    for number in range(requests):
+        log_request(service, access, number, lazy, debug_calls)
+    wall = time.perf_counter() - start_wall
+    thread = time.thread_time() - start_thread
+    drain()
+    process = time.process_time() - start_process
+    return thread / requests, wall / requests, process / requests
+
+
+def bench(args) -> None:
+    logger = logging.getLogger("bench_logging")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    output = tempfile.NamedTemporaryFile("w", prefix="bench_logging_", suffix=".log", delete=False)
+    sinks = [
+        ("file", output, args.requests),
+        # Fewer requests, or every round would take seconds of sleeping
+        ("slow", SlowStream(args.slow_write_ms / 1000), max(1, args.requests // 20)),
+    ]
+    pipelines = [("before (sync text)", before, False), ("after (queue json)", after, True)]
+
+    print(
+        f"{args.requests} requests per round (slow sink: {sinks[1][2]}), {args.debug_calls} filtered debug calls "
+        f"per request, best of {args.rounds} rounds; output in {output.name}\n"
+    )
+    print(f"{'sink':<6} {'pipeline':<20} {'caller CPU':>11} {'caller wall':>12} {'process CPU':>12}")
+    results: Dict[Tuple[str, str], Tuple[float, float, float]] = {}
+    for sink, stream, requests in sinks:
+        for name, install, lazy in pipelines:
+            drain, close = install(logger, stream)
+            try:
+                run_round(min(requests, 100), lazy, args.debug_calls, drain)  # Warm up
+                rounds = [run_round(requests, lazy, args.debug_calls, drain) for _ in range(args.rounds)]
+            finally:
+                close()
+            best = tuple(min(values) for values in zip(*rounds))
+            results[(sink, name)] = best
+            print(f"{sink:<6} {name:<20} {best[0] * 1e6:9.1f}us {best[1] * 1e6:10.1f}us {best[2] * 1e6:10.1f}us")
+    output.close()
+
+    print()
+    for sink, _, _ in sinks:
+        old, new = results[(sink, pipelines[0][0])], results[(sink, pipelines[1][0])]
+        print(f"{sink}: the logging thread spends {new[1] * 1e6:.1f}us per request, was {old[1] * 1e6:.1f}us")
+    os.unlink(output.name)
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--debug-calls", type=int, default=5, help="Filtered DEBUG calls per request")
+    parser.add_argument("--slow-write-ms", type=float, default=1.0, help="Time the slow sink takes per record")
+    args = parser.parse_args()
+    bench(args)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,291 @@
+"""
+Overhead of the request metrics middleware and query hooks.
+
+The difference between two end-to-end runs of a millisecond endpoint is
+smaller than the noise between them, so the cost is measured in parts:
+- what MetricsMiddleware adds to a request, around an app that does nothing
+- what the cursor hooks add to each query while a request is measured
+- how many queries each endpoint issues, and how long it takes without metrics
+
+and each endpoint's overhead is middleware + queries x hook cost, relative to
+its latency. The application's ASGI stack is called directly (no HTTP client
+or server diluting the difference); end-to-end timings with and without
+MetricsMiddleware are printed next to the estimate as a sanity check. All
+timings are CPU time of this process (the database is SQLite, in-process), the
+lowest of several rounds.
+
+Exits with code 1 if the overhead over the whole request mix exceeds
+--max-overhead percent.
+
+Usage:
+    poetry run python benchmarks/bench_metrics.py --projects 500 --rounds 10
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+WORK_DIR = tempfile.mkdtemp(prefix="bench_metrics_")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORK_DIR}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["METRICS_ENABLED"] = "true"
+os.environ["REPORT_CACHE_ENABLED"] = "false"
+
+import main
+from sqlalchemy import text
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    RequestMetrics,
+    _current,
+    install_query_metrics,
+    uninstall_query_metrics
+)
+from app.core.security import create_access_token
+from app.db.database import Base, SessionLocal, engine
+from app.db.models import Client, Project, ProjectStatus, User
+from app.db.models.user import UserRole
+
+
+def seed(n_clients: int, n_projects: int) -> List[int]:
+    """Create clients, projects and statuses; return the project ids."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", role=UserRole.ADMIN, hashed_password="x")
+        db.add(user)
+        db.flush()
+        clients = [Client(name=f"Client {i}") for i in range(n_clients)]
+        db.add_all(clients)
+        db.flush()
+        projects = [
+            Project(name=f"Project {i}", client_id=clients[i % n_clients].id, created_by=user.id)
+            for i in range(n_projects)
+        ]
+        db.add_all(projects)
+        db.flush()
+        flags = [True, True, False, None]
+        db.add_all([
+            ProjectStatus(
+                project_id=project.id,
+                is_on_scope=flags[i % 4],
+                is_on_time=flags[(i + 1) % 4],
+                is_on_budget=flags[(i + 2) % 4],
+                updated_by=user.id
+            )
+            for i, project in enumerate(projects)
+        ])
+        db.commit()
+        return [project.id for project in projects]
+
+
+def build_stacks():
+    """The application's middleware stack with and without MetricsMiddleware."""
+    app = main.app
+    instrumented = app.build_middleware_stack()
+    user_middleware = app.user_middleware
+    app.user_middleware = [m for m in user_middleware if m.cls is not MetricsMiddleware]
+    try:
+        bare = app.build_middleware_stack()
+    finally:
+        app.user_middleware = user_middleware
+    return instrumented, bare
+
+
+async def call(stack, path: str, query: str, headers: List[Tuple[bytes, bytes]]) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "app": main.app,
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await stack(scope, receive, send)
+    return status
+
+
+async def run_round(stack, requests: int, path: str, query: str, headers) -> float:
+    """CPU seconds per request over one round."""
+    start = time.process_time()
+    for _ in range(requests):
+        status = await call(stack, path, query, headers)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+    return (time.process_time() - start) / requests
+
+
+async def best_of(rounds: int, func) -> float:
+    """Lowest of several timings; the least disturbed run is the closest to the real cost."""
+    best = float("inf")
+    for _ in range(rounds):
+        gc.collect()
+        best = min(best, await func())
+    return best
+
+
+async def middleware_cost(rounds: int, iterations: int) -> float:
+    """Seconds MetricsMiddleware adds to a request, around an app that does nothing."""
+    async def noop(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    wrapped = MetricsMiddleware(noop, registry=MetricsRegistry())
+    scope = {"type": "http", "method": "GET", "path": "/noop", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def timed(app):
+        start = time.process_time()
+        for _ in range(iterations):
+            await app(dict(scope), receive, send)
+        return (time.process_time() - start) / iterations
+
+    bare = await best_of(rounds, lambda: timed(noop))
+    instrumented = await best_of(rounds, lambda: timed(wrapped))
+    return instrumented - bare
+
+
+async def query_cost(rounds: int, iterations: int) -> float:
+    """Seconds the cursor hooks add to each query issued while a request is measured."""
+    statement = text("SELECT 1")
+
+    def timed():
+        with engine.connect() as connection:
+            start = time.process_time()
+            for _ in range(iterations):
+                connection.execute(statement).scalar()
+            return (time.process_time() - start) / iterations
+
+    bare = instrumented = float("inf")
+    for _ in range(rounds):
+        gc.collect()
+        bare = min(bare, timed())
+        install_query_metrics(engine)
+        token = _current.set(RequestMetrics())
+        try:
+            gc.collect()
+            instrumented = min(instrumented, timed())
+        finally:
+            _current.reset(token)
+            uninstall_query_metrics(engine)
+    return instrumented - bare
+
+
+class QueryCounter(MetricsRegistry):
+    """Registry that remembers the query count of the last request."""
+
+    def record_request(self, method, route, status, seconds, response_bytes, request) -> None:
+        self.last_queries = request.db_queries
+
+
+async def bench(args) -> float:
+    project_ids = seed(args.clients, args.projects)
+    token = create_access_token({"sub": "bench@example.com", "role": "admin"})
+    headers = [(b"authorization", f"Bearer {token}".encode()), (b"accept-encoding", b"gzip, br")]
+    instrumented, bare = build_stacks()
+    endpoints = [
+        ("/health", "", args.requests * 10),
+        (f"/api/v1/projects/{project_ids[0]}", "", args.requests),
+        ("/api/v1/projects/", "limit=100", args.requests),
+        ("/api/v1/clients/", "", args.requests),
+        ("/api/v1/reports/health", "", args.requests),
+    ]
+
+    per_request = await middleware_cost(args.rounds, 2000)
+    per_query = await query_cost(args.rounds, 2000)
+    print(f"{args.projects} projects, best of {args.rounds} rounds")
+    print(f"middleware: {per_request * 1e6:.1f}us per request, query hooks: {per_query * 1e6:.1f}us per query\n")
+
+    counter = QueryCounter()
+    install_query_metrics(engine)
+    try:
+        counting = MetricsMiddleware(bare, registry=counter, server_timing_threshold=None)
+        queries = {}
+        for path, query, _ in endpoints:
+            await call(counting, path, query, headers)
+            queries[path] = counter.last_queries
+    finally:
+        uninstall_query_metrics(engine)
+
+    # End-to-end CPU time per request, alternating variants; only a sanity
+    # check, the noise between rounds is about as large as the difference
+    results: Dict[str, Dict[str, List[float]]] = {path: {"bare": [], "metrics": []} for path, _, _ in endpoints}
+    for round_number in range(args.rounds):
+        order = [("bare", bare), ("metrics", instrumented)]
+        if round_number % 2:
+            order.reverse()
+        for variant, stack in order:
+            if variant == "metrics":
+                install_query_metrics(engine)
+            try:
+                for path, query, requests in endpoints:
+                    gc.collect()
+                    results[path][variant].append(await run_round(stack, requests, path, query, headers))
+            finally:
+                if variant == "metrics":
+                    uninstall_query_metrics(engine)
+
+    print(f"{'endpoint':<36} {'queries':>7} {'bare':>10} {'metrics':>10} {'measured':>9} {'cost':>7}")
+    total_latency = total_cost = 0.0
+    for path, _, requests in endpoints:
+        bare_best = min(results[path]["bare"])
+        metrics_best = min(results[path]["metrics"])
+        measured = (metrics_best - bare_best) / bare_best * 100
+        cost = per_request + per_query * queries[path]
+        # Weight by requests per round, as in the mix that was actually run
+        total_latency += bare_best * requests
+        total_cost += cost * requests
+        print(
+            f"{path[:36]:<36} {queries[path]:>7} {bare_best * 1e6:8.0f}us {metrics_best * 1e6:8.0f}us "
+            f"{measured:8.2f}% {cost / bare_best * 100:6.2f}%"
+        )
+    overall = total_cost / total_latency * 100
+    print(f"\noverhead over the request mix: {overall:.2f}% ({total_cost * 1e3:.2f}ms of {total_latency * 1e3:.1f}ms)")
+    return overall
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per endpoint per round (x10 for /health)")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="Allowed overhead over the mix, percent")
+    args = parser.parse_args()
+
+    overall = asyncio.run(bench(args))
+    if overall > args.max_overhead:
+        print(f"FAIL: overhead {overall:.2f}% > {args.max_overhead}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_()
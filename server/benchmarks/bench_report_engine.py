@@ -0,0 +1,110 @@
+"""
+Benchmark for the SQL (python) and vectorized report engines.
+
+Times both engines on a large dataset (100k projects by default). Parity of
+the two engines is checked by tests/test_report_engine.py, and of the
+generated health columns by tests/test_health_columns.py.
+
+Usage:
+    poetry run python benchmarks/bench_report_engine.py --projects 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.database import Base
+import app.db.models  # noqa: F401 - registers all tables
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.db.models.user import User, UserRole
+from app.schemas.report import ReportFilters
+from app.services.report_service import generate_project_health_report
+from app.services.vectorized_report_service import generate_project_health_report_vectorized
+
+FLAGS = [True, False, None]
+BASE_TIME = datetime(2024, 1, 1)
+
+
+def seed(engine, rng: random.Random, n_clients: int, n_projects: int, max_statuses: int) -> None:
+    """Insert random clients, projects and status histories (some projects without status)."""
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            "id": 1, "email": "bench@example.com", "name": "Bench", "role": UserRole.ADMIN, "hashed_password": "x"
+        }])
+        connection.execute(insert(Client), [{"id": i + 1, "name": f"Client {i:05d}"} for i in range(n_clients)])
+        projects = [
+            {"id": i + 1, "name": f"Project {i}", "client_id": rng.randint(1, n_clients), "created_by": 1}
+            for i in range(n_projects)
+        ]
+        if projects:
+            connection.execute(insert(Project), projects)
+        statuses = [
+            {
+                "project_id": project_id,
+                "is_on_scope": rng.choice(FLAGS),
+                "is_on_time": rng.choice(FLAGS),
+                "is_on_budget": rng.choice(FLAGS),
+                "next_delivery": rng.choice([None, "", "Milestone"]),
+                "risks": rng.choice([None, "Vendor dependency"]),
+                "updated_by": 1,
+                # Coarse timestamps so ties (broken by id) occur
+                "updated_at": BASE_TIME + timedelta(days=rng.randint(0, 60)),
+            }
+            for project_id in range(1, n_projects + 1)
+            for _ in range(rng.randint(0, max_statuses))
+        ]
+        if statuses:
+            connection.execute(insert(ProjectStatus), statuses)
+
+
+def bench(n_clients: int, n_projects: int, max_statuses: int, repeat: int) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, random.Random(0), n_clients, n_projects, max_statuses)
+    session_factory = sessionmaker(bind=engine)
+    print(f"\n{n_clients} clients, {n_projects} projects, up to {max_statuses} statuses/project")
+
+    for name, generate in (
+        ("vectorized", generate_project_health_report_vectorized),
+        ("python", generate_project_health_report),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            with session_factory() as db:
+                start = time.perf_counter()
+                generate(db, filters=ReportFilters(include_no_status=True, health_status="red"))
+                best = min(best, time.perf_counter() - start)
+        print(f"{name:<12} best of {repeat}: {best * 1000:10.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--statuses", type=int, default=3, help="Maximum statuses per project")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Both engines compute the overall/client sections themselves
+    settings.HEALTH_AGGREGATES_ENABLED = False
+    settings.REPORT_ENGINE = "python"
+
+    bench(args.clients, args.projects, args.statuses, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Microbenchmarks for list and report response serialization.
+
+Compares the default path (ORM objects validated through the response_model and
+encoded by FastAPI) against the fast path (row tuples encoded directly), and
+reports CPU time spent in query, validation and encoding for each endpoint.
+
+Usage:
+    poetry run python benchmarks/bench_serialization.py --clients 50 --projects 5000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.pool import StaticPool
+
+from app.core.responses import dumps, ORJSON_AVAILABLE
+from app.db.database import Base
+from app.db.models import User, Client, Project, ProjectStatus
+from app.db.models.user import UserRole
+import app.schemas  # noqa: F401 - resolves forward references
+from app.schemas.client import ClientDetailResponse
+from app.schemas.project import ProjectResponse
+from app.schemas.report import ProjectHealthReport
+from app.services.fast_response_service import get_project_rows, get_client_rows
+from app.services.report_service import generate_project_health_report
+
+
+def seed(db, n_clients: int, n_projects: int, statuses_per_project: int) -> None:
+    """Seed the database with synthetic clients, projects and statuses."""
+    user = User(email="bench@example.com", name="Bench", role=UserRole.ADMIN, hashed_password="x")
+    db.add(user)
+    db.flush()
+
+    clients = [Client(name=f"Client {i}") for i in range(n_clients)]
+    db.add_all(clients)
+    db.flush()
+
+    projects = [
+        Project(name=f"Project {i}", client_id=clients[i % n_clients].id, created_by=user.id)
+        for i in range(n_projects)
+    ]
+    db.add_all(projects)
+    db.flush()
+
+    flags = [True, True, False, None]
+    db.add_all([
+        ProjectStatus(
+            project_id=project.id,
+            is_on_scope=flags[(i + k) % 4],
+            is_on_time=flags[(i + 2 * k) % 4],
+            is_on_budget=flags[(i + 3 * k) % 4],
+            next_delivery=f"Milestone {k}" if k % 2 else None,
+            risks="Vendor dependency" if i % 5 == 0 else None,
+            updated_by=user.id
+        )
+        for i, project in enumerate(projects)
+        for k in range(statuses_per_project)
+    ])
+    db.commit()
+
+
+def cpu_time(func: Callable, repeat: int):
+    """Return (result, best CPU seconds) over repeat runs."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = func()
+        best = min(best, time.process_time() - start)
+    return result, best
+
+
+def bench_endpoint(name: str, session_factory, stages: List[Tuple[str, Callable]], repeat: int) -> Dict[str, float]:
+    """Run stages in order, feeding each stage the previous result."""
+    timings: Dict[str, float] = {}
+    db = session_factory()
+    try:
+        value = None
+        for index, (stage, func) in enumerate(stages):
+            def run(func=func, value=value, fresh=index == 0):
+                if fresh:
+                    # Start each query run from an empty identity map
+                    db.expunge_all()
+                return func(db, value)
+            value, timings[stage] = cpu_time(run, repeat)
+    finally:
+        db.close()
+    total = sum(timings.values())
+    parts = "  ".join(f"{stage}={seconds * 1000:8.2f}ms" for stage, seconds in timings.items())
+    print(f"{name:<28} {parts}  total={total * 1000:8.2f}ms")
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--statuses", type=int, default=3, help="Statuses per project")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with session_factory() as db:
+        seed(db, args.clients, args.projects, args.statuses)
+
+    print(f"orjson available: {ORJSON_AVAILABLE}")
+    print(f"{args.clients} clients, {args.projects} projects, {args.statuses} statuses/project\n")
+
+    projects_adapter = TypeAdapter(List[ProjectResponse])
+    clients_adapter = TypeAdapter(List[ClientDetailResponse])
+    limit = args.projects
+
+    bench_endpoint("GET /projects/ default", session_factory, [
+        ("query", lambda db, _: db.query(Project).options(joinedload(Project.client)).limit(limit).all()),
+        ("validate", lambda db, rows: projects_adapter.validate_python(rows, from_attributes=True)),
+        ("encode", lambda db, models: dumps(jsonable_encoder(models))),
+    ], args.repeat)
+    bench_endpoint("GET /projects/ fast", session_factory, [
+        ("query", lambda db, _: get_project_rows(db, limit=limit)),
+        ("encode", lambda db, rows: dumps(rows)),
+    ], args.repeat)
+
+    bench_endpoint("GET /clients/ default", session_factory, [
+        ("query", lambda db, _: db.query(Client).options(joinedload(Client.projects)).all()),
+        ("validate", lambda db, rows: clients_adapter.validate_python(rows, from_attributes=True)),
+        ("encode", lambda db, models: dumps(jsonable_encoder(models))),
+    ], args.repeat)
+    bench_endpoint("GET /clients/ fast", session_factory, [
+        ("query", lambda db, _: get_client_rows(db)),
+        ("encode", lambda db, rows: dumps(rows)),
+    ], args.repeat)
+
+    bench_endpoint("GET /reports/health default", session_factory, [
+        ("query", lambda db, _: generate_project_health_report(db)),
+        ("validate", lambda db, report: ProjectHealthReport.model_validate(report.model_dump())),
+        ("encode", lambda db, report: dumps(jsonable_encoder(report))),
+    ], args.repeat)
+    bench_endpoint("GET /reports/health fast", session_factory, [
+        ("query", lambda db, _: generate_project_health_report(db)),
+        ("encode", lambda db, report: report.model_dump_json().encode("utf-8")),
+    ], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
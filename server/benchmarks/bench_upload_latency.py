@@ -0,0 +1,173 @@
+"""
+Upload latency vs. LLM latency for transcription uploads.
+
+Runs the app in-process (TestClient, with the transcription queue workers)
+against a local OpenAI-compatible server that answers chat completions after a
+configurable delay (the app reaches it through OPENAI_BASE_URL). For each LLM
+delay it measures:
+- the response time of POST /transcriptions/ (text file) and POST
+  /transcriptions/text, which must not depend on the LLM delay
+- the time until GET /transcriptions/{id}/status reports completed, which does
+
+Exits with code 1 if the median upload response time at the largest delay
+exceeds the one at the smallest delay by more than --max-overhead-ms.
+
+Usage:
+    poetry run python benchmarks/bench_upload_latency.py --delays 0 1 3 --uploads 10
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+WORK_DIR = tempfile.mkdtemp(prefix="bench_upload_")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORK_DIR}/bench.db"
+os.environ["UPLOAD_DIR"] = f"{WORK_DIR}/uploads"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["OPENAI_API_KEY"] = "benchmark"
+
+COMPLETION = {
+    "is_on_scope": True,
+    "is_on_time": False,
+    "is_on_budget": True,
+    "next_delivery": "Sprint review",
+    "risks": None,
+}
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Answers any POST with a chat completion after server.delay seconds."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.delay)
+        body = json.dumps({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(COMPLETION)},
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+llm_server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+llm_server.delay = 0.0
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{llm_server.server_address[1]}/v1"
+
+from fastapi.testclient import TestClient
+
+import main
+from app.core.security import create_access_token
+from app.db.database import Base, SessionLocal, engine
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.user import User, UserRole
+
+
+def seed() -> tuple:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", role=UserRole.ADMIN, hashed_password="x")
+        client = Client(name="Bench client")
+        db.add_all([user, client])
+        db.commit()
+        project = Project(name="Bench project", client_id=client.id, created_by=user.id)
+        db.add(project)
+        db.commit()
+        token = create_access_token({"sub": user.email, "role": user.role.value})
+        return project.id, {"Authorization": f"Bearer {token}"}
+
+
+def wait_until_finished(client: TestClient, headers: dict, transcription_ids: list, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    pending = set(transcription_ids)
+    while pending:
+        for transcription_id in list(pending):
+            job = client.get(f"/api/v1/transcriptions/{transcription_id}/status", headers=headers).json()
+            if job["processing_status"] == "failed":
+                raise SystemExit(f"transcription {transcription_id} failed: {job['processing_error']}")
+            if job["processing_status"] == "completed":
+                pending.discard(transcription_id)
+        if time.perf_counter() > deadline:
+            raise SystemExit(f"{len(pending)} transcriptions not processed within {timeout}s")
+        time.sleep(0.02)
+
+
+def measure(client: TestClient, headers: dict, project_id: int, delay: float, uploads: int) -> float:
+    llm_server.delay = delay
+    latencies = []
+    transcription_ids = []
+    start = time.perf_counter()
+    for i in range(uploads):
+        request_start = time.perf_counter()
+        if i % 2:
+            response = client.post(
+                "/api/v1/transcriptions/text",
+                json={"project_id": project_id, "text": f"Weekly sync {i}: all on track."},
+                headers=headers
+            )
+        else:
+            response = client.post(
+                "/api/v1/transcriptions/",
+                data={"project_id": str(project_id)},
+                files={"file": (f"week{i}.txt", f"Weekly sync {i}: all on track.".encode(), "text/plain")},
+                headers=headers
+            )
+        latencies.append(time.perf_counter() - request_start)
+        if response.status_code != 202:
+            raise SystemExit(f"upload failed: {response.status_code} {response.text}")
+        transcription_ids.append(response.json()["id"])
+
+    wait_until_finished(client, headers, transcription_ids, timeout=uploads * delay + 30)
+    total = time.perf_counter() - start
+    median = statistics.median(latencies)
+    print(
+        f"LLM delay {delay:5.1f}s  upload median {median * 1000:7.1f}ms  max {max(latencies) * 1000:7.1f}ms"
+        f"  all processed after {total:6.2f}s"
+    )
+    return median
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delays", type=float, nargs="+", default=[0.0, 1.0, 3.0], help="LLM delays in seconds")
+    parser.add_argument("--uploads", type=int, default=10, help="Uploads per delay (half files, half pasted text)")
+    parser.add_argument("--max-overhead-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    threading.Thread(target=llm_server.serve_forever, daemon=True).start()
+    project_id, headers = seed()
+    delays = sorted(args.delays)
+    try:
+        with TestClient(main.app) as client:
+            medians = {delay: measure(client, headers, project_id, delay, args.uploads) for delay in delays}
+    finally:
+        llm_server.shutdown()
+
+    overhead_ms = (medians[delays[-1]] - medians[delays[0]]) * 1000
+    print(f"\nupload median at {delays[-1]}s vs {delays[0]}s LLM delay: {overhead_ms:+.1f}ms")
+    sys.exit(0 if overhead_ms <= args.max_overhead_ms else 1)
+
+
+if __name__ == "__main__":
+    main_()
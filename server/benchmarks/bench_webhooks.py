@@ -0,0 +1,295 @@
+"""
+Throughput test for outbound webhook delivery.
+
+Runs a local HTTP sink (asyncio, keep-alive) with a set of webhook endpoints:
+some receive every health transition, some only projects turning red, some
+only one client's projects, plus a few slow endpoints (every response takes
+--slow-delay seconds) and a few failing ones (always HTTP 500). A writer
+thread then commits project statuses that flip projects between green and red
+at --rate transitions per minute, --per-commit statuses per transaction (1 is
+the CRUD endpoint; more is what bulk ingest and AI extraction do), while the
+webhook dispatcher delivers the outbox. Measures:
+- commit latency without subscriptions and with them, i.e. the cost of the
+  in-transaction fan-out (and, on one core, of sharing it with delivery)
+- delivery latency from commit to the sink receiving the event, and the
+  number of events per request (batching)
+- whether delivery keeps up: every event for a healthy endpoint delivered,
+  exactly the expected ones, none twice
+- failing endpoints end up with an open circuit and a bounded request count
+
+Usage:
+    poetry run python benchmarks/bench_webhooks.py --rate 10000 --per-commit 10 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), "bench_webhooks.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_FILE}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.db.database import Base, SessionLocal, engine
+import app.db.models  # noqa: F401 - registers all tables
+from app.db.models.client import Client
+from app.db.models.project import Project
+from app.db.models.project_status import ProjectStatus
+from app.db.models.user import User, UserRole
+from app.db.models.webhook import WebhookDelivery, WebhookSubscription
+from app.services.webhook_delivery import WebhookDispatcher
+
+
+class Sink:
+    """Local HTTP server recording the events each endpoint path receives."""
+
+    def __init__(self, slow_delay: float):
+        self.slow_delay = slow_delay
+        self.behaviour = {}  # path -> "ok", "slow" or "fail"
+        self.requests = defaultdict(int)
+        self.received = defaultdict(list)  # path -> event ids, in arrival order
+        self.batch_sizes = []
+        self.latencies = []
+        self.committed_at = {}  # status_id -> perf_counter at commit (filled by the writer)
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                path = request_line.split()[1].decode()
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                body = await reader.readexactly(length)
+                self.requests[path] += 1
+                behaviour = self.behaviour.get(path, "ok")
+                if behaviour == "slow":
+                    await asyncio.sleep(self.slow_delay)
+                if behaviour == "fail":
+                    writer.write(b"HTTP/1.1 500 Internal Server Error\r\nContent-Length: 0\r\n\r\n")
+                else:
+                    now = time.perf_counter()
+                    events = json.loads(body)["events"]
+                    self.batch_sizes.append(len(events))
+                    for event in events:
+                        self.received[path].append(event["id"])
+                        committed_at = self.committed_at.get(event["status_id"])
+                        if committed_at is not None:
+                            self.latencies.append(now - committed_at)
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def seed(clients: int, projects: int) -> tuple:
+    """Create the schema with every project green; returns (user id, project_id -> client_id)."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", role=UserRole.ADMIN, hashed_password="x")
+        db.add(user)
+        db.add_all(Client(name=f"Client {i}") for i in range(clients))
+        db.commit()
+        client_ids = [client.id for client in db.query(Client).all()]
+        db.add_all(
+            Project(name=f"Project {i}", client_id=client_ids[i % clients], created_by=user.id) for i in range(projects)
+        )
+        db.commit()
+        owners = dict(db.query(Project.id, Project.client_id).all())
+        db.add_all(
+            ProjectStatus(project_id=project_id, is_on_scope=True, is_on_time=True, is_on_budget=True, updated_by=user.id)
+            for project_id in owners
+        )
+        db.commit()
+        return user.id, owners
+
+
+def subscribe(port: int, args, client_ids: list, sink: Sink, user_id: int) -> dict:
+    """Create the endpoints; returns path -> (client_id filter, to_health filter) of the healthy ones."""
+    healthy = {}
+    kinds = []
+    for i in range(args.endpoints):
+        if i % 4 == 0:
+            kinds.append((f"/all/{i}", None, None))
+        elif i % 4 == 1:
+            kinds.append((f"/red/{i}", None, "red"))
+        else:
+            kinds.append((f"/client/{i}", client_ids[i % len(client_ids)], None))
+    kinds += [(f"/slow/{i}", None, None) for i in range(args.slow)]
+    kinds += [(f"/fail/{i}", None, None) for i in range(args.failing)]
+    with SessionLocal() as db:
+        for path, client_id, to_health in kinds:
+            db.add(WebhookSubscription(
+                url=f"http://127.0.0.1:{port}{path}", secret="benchmark-secret-0123456789",
+                client_id=client_id, to_health=to_health, is_active=True, consecutive_failures=0, created_by=user_id
+            ))
+            behaviour = path.split("/")[1]
+            sink.behaviour[path] = {"slow": "slow", "fail": "fail"}.get(behaviour, "ok")
+            if behaviour != "fail":
+                healthy[path] = (client_id, to_health)
+        db.commit()
+    return healthy
+
+
+class Writer:
+    """Flips projects between green and red; every status written is a transition."""
+
+    def __init__(self, owners: dict, user_id: int):
+        self.owners = owners
+        self.user_id = user_id
+        self.project_ids = list(owners)
+        self.health = {project_id: "green" for project_id in owners}
+        self.next = 0
+
+    def write(self, count: int, per_commit: int, rate_per_minute: float, sink: Sink) -> tuple:
+        """Commit count transitions; returns (commit latencies, [(project, client, new health)])."""
+        interval = 60.0 * per_commit / rate_per_minute if rate_per_minute else 0.0
+        latencies = []
+        transitions = []
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            for commit in range(count // per_commit):
+                if interval:
+                    delay = start + commit * interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                statuses = []
+                for _ in range(per_commit):
+                    project_id = self.project_ids[self.next % len(self.project_ids)]
+                    self.next += 1
+                    flag = self.health[project_id] == "red"
+                    statuses.append(ProjectStatus(
+                        project_id=project_id, is_on_scope=flag, is_on_time=flag, is_on_budget=flag,
+                        updated_by=self.user_id
+                    ))
+                    self.health[project_id] = "green" if flag else "red"
+                    transitions.append((project_id, self.owners[project_id], self.health[project_id]))
+                began = time.perf_counter()
+                db.add_all(statuses)
+                db.flush()
+                status_ids = [status.id for status in statuses]  # Read before commit expires them
+                db.commit()
+                committed = time.perf_counter()
+                latencies.append(committed - began)
+                for status_id in status_ids:
+                    sink.committed_at[status_id] = committed
+        return latencies, transitions
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+async def run(args) -> int:
+    user_id, owners = seed(args.clients, args.projects)
+    client_ids = sorted(set(owners.values()))
+
+    # Baseline: commit latency with no subscriptions (nothing is fanned out)
+    writer = Writer(owners, user_id)
+    baseline, _ = await asyncio.to_thread(writer.write, args.baseline_writes, args.per_commit, 0, Sink(0))
+    print(f"{args.projects} projects, {args.clients} clients, {args.per_commit} statuses per commit")
+    print(f"commit latency without subscriptions: p50 {percentile(baseline, 0.5) * 1000:.2f}ms, "
+          f"p99 {percentile(baseline, 0.99) * 1000:.2f}ms")
+
+    sink = Sink(args.slow_delay)
+    port = await sink.start()
+    healthy = subscribe(port, args, client_ids, sink, user_id)
+    dispatcher = WebhookDispatcher(SessionLocal)
+    dispatcher.start()
+
+    count = int(args.rate * args.duration / 60) // args.per_commit * args.per_commit
+    print(f"{args.endpoints} endpoints + {args.slow} slow ({args.slow_delay * 1000:.0f}ms) + {args.failing} failing; "
+          f"{count} transitions at {args.rate:.0f}/min")
+    started = time.perf_counter()
+    writes, transitions = await asyncio.to_thread(writer.write, count, args.per_commit, args.rate, sink)
+    written = time.perf_counter() - started
+
+    expected = {
+        path: sum(
+            1 for _, client_id, health in transitions
+            if (client_filter is None or client_filter == client_id) and (health_filter is None or health_filter == health)
+        )
+        for path, (client_filter, health_filter) in healthy.items()
+    }
+    total_expected = sum(expected.values())
+    deadline = time.perf_counter() + args.drain_timeout
+    while time.perf_counter() < deadline and sum(len(sink.received[path]) for path in healthy) < total_expected:
+        await asyncio.sleep(0.05)
+    drained = time.perf_counter() - started
+    delivered = sum(len(sink.received[path]) for path in healthy)
+
+    print(f"commit latency with subscriptions: p50 {percentile(writes, 0.5) * 1000:.2f}ms, "
+          f"p99 {percentile(writes, 0.99) * 1000:.2f}ms ({count / written * 60:.0f} transitions/min written)")
+    print(f"delivered {delivered}/{total_expected} events to healthy endpoints in {drained:.1f}s "
+          f"({delivered / drained * 60:.0f} events/min)")
+    print(f"delivery latency (commit to sink): p50 {percentile(sink.latencies, 0.5) * 1000:.0f}ms, "
+          f"p95 {percentile(sink.latencies, 0.95) * 1000:.0f}ms, p99 {percentile(sink.latencies, 0.99) * 1000:.0f}ms")
+    print(f"requests: {len(sink.batch_sizes)}, events per request: mean {statistics.mean(sink.batch_sizes or [0]):.1f}, "
+          f"max {max(sink.batch_sizes or [0])}")
+
+    problems = 0
+    for path in healthy:
+        ids = sink.received[path]
+        if len(ids) != expected[path] or len(set(ids)) != len(ids) or ids != sorted(ids):
+            problems += 1
+            print(f"  {path}: {len(ids)} received ({len(set(ids))} distinct), {expected[path]} expected")
+    print(f"endpoints with missing, duplicate or out-of-order events: {problems}/{len(healthy)}")
+
+    with SessionLocal() as db:
+        for subscription in db.query(WebhookSubscription).filter(WebhookSubscription.url.contains("/fail/")):
+            pending = db.query(WebhookDelivery).filter(WebhookDelivery.subscription_id == subscription.id).count()
+            path = subscription.url.split(str(port), 1)[1]
+            print(f"failing endpoint {path}: {sink.requests[path]} requests, "
+                  f"{subscription.consecutive_failures} consecutive failures, "
+                  f"circuit {'open' if subscription.circuit_open_until else 'closed'}, {pending} events kept")
+
+    await dispatcher.stop()
+    sink.server.close()
+    return 1 if problems or delivered < total_expected else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10000, help="Transitions per minute")
+    parser.add_argument("--per-commit", type=int, default=10, help="Statuses (transitions) per transaction")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of writing")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--endpoints", type=int, default=8)
+    parser.add_argument("--slow", type=int, default=1)
+    parser.add_argument("--slow-delay", type=float, default=0.2)
+    parser.add_argument("--failing", type=int, default=1)
+    parser.add_argument("--baseline-writes", type=int, default=500)
+    parser.add_argument("--drain-timeout", type=float, default=60)
+    args = parser.parse_args()
+    try:
+        status = asyncio.run(run(args))
+    finally:
+        engine.dispose()
+        os.remove(DATABASE_FILE)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
 import logging
-from fastapi import FastAPI
+from datetime import timedelta
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, install_query_metrics, metrics_registry
+from app.core.profiler import ProfilingMiddleware, profile_history
+from app.core.query_inspector import QueryInspectorMiddleware, install_query_inspector, query_budget
+from app.core.request_context import RequestContextMiddleware
 from app.core.exceptions import (
     AppException,
     app_exception_handler,
@@ -17,7 +25,17 @@ from app.core.exceptions import (
     database_exception_handler
 )
 from app.api.v1.router import api_router
-from app.db.database import engine, Base
+from app.api.v1.endpoints.diagnostics import metrics_authorized, profiling_authorized
+from app.db.database import engine, Base, SessionLocal
+from app.db.change_log import run_periodic_change_log_maintenance
+from app.db.health_aggregates import run_periodic_verifier
+from app.db.slow_query_log import slow_query_log
+from app.services.dashboard_feed import dashboard_feed
+from app.services.event_broadcaster import PostgresEventBridge, broadcaster
+from app.services.transcription_queue import transcription_queue, run_periodic_requeue
+from app.services.trend_service import run_periodic_trend_refresh
+from app.services.transcription_service import document_extractor, process_transcription
+from app.services.webhook_delivery import webhook_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +54,68 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Could not connect to database on startup: {e}")
         logger.warning("The application will start, but database operations will fail until PostgreSQL is running")
     
+    # Periodically recompute health aggregates from scratch to detect drift
+    verifier_task = None
+    if settings.HEALTH_AGGREGATES_ENABLED and settings.HEALTH_AGGREGATES_VERIFY_INTERVAL_SECONDS > 0:
+        verifier_task = asyncio.create_task(
+            run_periodic_verifier(SessionLocal, settings.HEALTH_AGGREGATES_VERIFY_INTERVAL_SECONDS)
+        )
+    
+    # Store closed health trend buckets and recompute invalidated ones
+    trend_refresh_task = None
+    if settings.HEALTH_TRENDS_REFRESH_INTERVAL_SECONDS > 0:
+        trend_refresh_task = asyncio.create_task(
+            run_periodic_trend_refresh(SessionLocal, settings.HEALTH_TRENDS_REFRESH_INTERVAL_SECONDS)
+        )
+    
+    # Compact and expire old change log segments
+    change_log_task = None
+    if settings.CHANGE_LOG_MAINTENANCE_INTERVAL_SECONDS > 0:
+        change_log_task = asyncio.create_task(run_periodic_change_log_maintenance(
+            SessionLocal,
+            settings.CHANGE_LOG_MAINTENANCE_INTERVAL_SECONDS,
+            compact_after=timedelta(hours=settings.CHANGE_LOG_COMPACT_AFTER_HOURS),
+            retain_for=timedelta(days=settings.CHANGE_LOG_RETENTION_DAYS)
+        ))
+    
+    # Process queued transcriptions, resuming any left pending by a previous run
+    # and taking over those whose worker died
+    requeue_task = None
+    if settings.TRANSCRIPTION_WORKERS > 0:
+        transcription_queue.start(settings.TRANSCRIPTION_WORKERS, process_transcription)
+        requeue_task = asyncio.create_task(
+            run_periodic_requeue(SessionLocal, settings.TRANSCRIPTION_REQUEUE_INTERVAL_SECONDS)
+        )
+    
+    # Deliver queued webhook events in the background
+    if settings.WEBHOOK_DELIVERY_ENABLED:
+        webhook_dispatcher.start()
+    
+    # Relay real-time events between worker processes
+    if settings.EVENTS_PG_NOTIFY_ENABLED:
+        if engine.dialect.name == "postgresql":
+            await broadcaster.start_bridge(PostgresEventBridge(engine, settings.EVENTS_PG_CHANNEL))
+        else:
+            logger.warning("EVENTS_PG_NOTIFY_ENABLED requires PostgreSQL; events stay within this process")
+    
     yield
     # Shutdown
-    pass
+    await dashboard_feed.stop()
+    await broadcaster.stop_bridge()
+    if verifier_task is not None:
+        verifier_task.cancel()
+    if trend_refresh_task is not None:
+        trend_refresh_task.cancel()
+    if change_log_task is not None:
+        change_log_task.cancel()
+    if requeue_task is not None:
+        requeue_task.cancel()
+    if transcription_queue.running:
+        await transcription_queue.stop()
+    if webhook_dispatcher.running:
+        await webhook_dispatcher.stop()
+    document_extractor.shutdown()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -57,6 +134,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (brotli when available, otherwise gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Slow statements with their plans, attributed to the endpoint that issued them
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine)
+
+# Development aid: warn about query budget overruns and N+1 patterns
+if settings.QUERY_INSPECTOR_ENABLED:
+    app.add_middleware(QueryInspectorMiddleware, repeat_threshold=settings.QUERY_REPEAT_THRESHOLD)
+    install_query_inspector(engine)
+
+# Sample the stacks of requests sent with X-Profile: 1 by an admin
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        authorize=profiling_authorized,
+        history=profile_history,
+        interval=settings.PROFILING_REQUEST_INTERVAL_MS / 1000
+    )
+
+# Per-route request metrics; outside the other middleware, so it sees the full latency and compressed sizes
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        server_timing_threshold=(
+            settings.METRICS_SERVER_TIMING_THRESHOLD_MS / 1000 if settings.METRICS_SERVER_TIMING_THRESHOLD_MS >= 0 else None
+        )
+    )
+    install_query_metrics(engine)
+
+# Request ids and access records for the logs (and the endpoint for the slow query log); outermost
+app.add_middleware(RequestContextMiddleware, access_log=settings.LOG_REQUESTS)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -67,6 +178,7 @@ app.add_exception_handler(SQLAlchemyError, database_exception_handler)
 
 
 @app.get("/")
+@query_budget(0)
 async def root():
     """Root endpoint."""
     return {
@@ -77,6 +189,21 @@ async def root():
 
 
 @app.get("/health")
+@query_budget(0)
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    @query_budget(1)  # The admin role lookup, cached per user (ADMIN_ROLE_CACHE_SECONDS)
+    async def metrics(request: Request):
+        """Request metrics of this worker process, for Prometheus to scrape (METRICS_TOKEN or an admin token)."""
+        if not metrics_authorized(request.scope):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="A metrics or admin bearer token is required",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,176 @@
+"""
+Microbenchmarks for functions that run on every request or report.
+
+Covered:
+- calculate_project_health_status, validate_extracted_status (per 1,000 inputs)
+- calculate_overall_metrics, get_client_summaries, get_upcoming_deliveries
+  (at each of SIZES projects)
+- create_access_token, decode_access_token
+- serialization of ProjectHealthReport (model_dump_json, model_dump and
+  FastAPI's jsonable_encoder) at each size
+
+Timed with pytest-benchmark (CPU time of this process, garbage collector off,
+after a warmup). Baselines are only comparable on the machine they were
+recorded on; record one there before changing code, then fail the run when a
+benchmark got more than 10% slower by its round minimum (the least disturbed
+rounds are the most repeatable):
+
+    poetry run pytest tests/benchmarks --benchmark-save=baseline
+    ... change code ...
+    poetry run pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=min:10%
+
+Skipped when pytest-benchmark is not installed.
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.security import create_access_token, decode_access_token
+from app.db.database import Base
+from app.db.models import Client
+from app.schemas.report import ProjectHealthMetrics, ProjectHealthReport
+from app.services.ai_status_extractor import validate_extracted_status
+from app.services.report_service import (
+    calculate_overall_metrics,
+    get_client_summaries,
+    get_upcoming_deliveries
+)
+from app.utils.project_status_utils import calculate_project_health_status, get_health_status_label
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = [pytest.mark.slow, pytest.mark.benchmark(timer=time.process_time, disable_gc=True, warmup=True)]
+
+SIZES = [100, 1000, 10000]
+CLIENTS = 50
+SEED = 1
+
+FLAGS = [True, True, False, None]
+
+
+# Inputs
+
+def random_status(rng: random.Random) -> Dict:
+    return {
+        "is_on_scope": rng.choice(FLAGS),
+        "is_on_time": rng.choice(FLAGS),
+        "is_on_budget": rng.choice(FLAGS),
+    }
+
+
+def random_extraction(rng: random.Random) -> Dict:
+    """What the LLM returns: mostly booleans, sometimes strings or missing fields."""
+    values = [True, False, None, "true", "No", "yes", "unknown", 1]
+    data = {field: rng.choice(values) for field in ("is_on_scope", "is_on_time", "is_on_budget") if rng.random() < 0.9}
+    data["next_delivery"] = rng.choice([None, "", "  Sprint review on Friday  ", "UAT sign-off " * 20])
+    data["risks"] = rng.choice([None, "Vendor dependency", "Key person on leave; budget pressure " * 10])
+    return data
+
+
+def random_metrics(rng: random.Random, n_projects: int) -> List[ProjectHealthMetrics]:
+    now = datetime.now(timezone.utc)
+    metrics = []
+    for project_id in range(1, n_projects + 1):
+        status = random_status(rng) if rng.random() < 0.9 else {}
+        health_status = calculate_project_health_status(status)
+        metrics.append(ProjectHealthMetrics(
+            project_id=project_id,
+            project_name=f"Project {project_id:05d}",
+            client_name=f"Client {rng.randrange(CLIENTS):04d}",
+            health_status=health_status,
+            health_label=get_health_status_label(health_status),
+            next_delivery=rng.choice([None, "Sprint review", "Release to production"]) if status else None,
+            risks=rng.choice([None, "Vendor dependency"]) if status else None,
+            last_updated=now - timedelta(days=rng.randint(0, 90)) if status else None,
+            green_count=sum(1 for value in status.values() if value is True),
+            **status
+        ))
+    return metrics
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Session on an in-memory database holding the clients the metrics refer to."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Client), [{"id": i + 1, "name": f"Client {i:04d}"} for i in range(CLIENTS)])
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}")
+def metrics(request) -> List[ProjectHealthMetrics]:
+    return random_metrics(random.Random(SEED), request.param)
+
+
+@pytest.fixture(scope="module")
+def report(metrics, db) -> ProjectHealthReport:
+    return ProjectHealthReport(
+        generated_at=datetime.now(timezone.utc),
+        generated_by="Benchmark",
+        overall_metrics=calculate_overall_metrics(metrics),
+        project_metrics=metrics,
+        client_summaries=get_client_summaries(db, metrics),
+        upcoming_deliveries=get_upcoming_deliveries(metrics),
+        projects_at_risk=[m for m in metrics if m.health_status == "yellow"],
+        critical_projects=[m for m in metrics if m.health_status == "red"]
+    )
+
+
+# Per input
+
+def test_calculate_project_health_status_x1000(benchmark):
+    rng = random.Random(SEED)
+    statuses = [random_status(rng) for _ in range(1000)]
+    benchmark(lambda: [calculate_project_health_status(s) for s in statuses])
+
+
+def test_validate_extracted_status_x1000(benchmark):
+    rng = random.Random(SEED)
+    extractions = [random_extraction(rng) for _ in range(1000)]
+    benchmark(lambda: [validate_extracted_status(e) for e in extractions])
+
+
+def test_create_access_token(benchmark):
+    benchmark(create_access_token, {"sub": "bench@example.com", "role": "admin"})
+
+
+def test_decode_access_token(benchmark):
+    token = create_access_token({"sub": "bench@example.com", "role": "admin"})
+    benchmark(decode_access_token, token)
+
+
+# Per report size
+
+def test_calculate_overall_metrics(benchmark, metrics):
+    benchmark(calculate_overall_metrics, metrics)
+
+
+def test_get_client_summaries(benchmark, metrics, db):
+    # Reads the client ids by name from the database, as in a report build
+    benchmark(get_client_summaries, db, metrics)
+
+
+def test_get_upcoming_deliveries(benchmark, metrics):
+    benchmark(get_upcoming_deliveries, metrics)
+
+
+def test_report_model_dump_json(benchmark, report):
+    benchmark(report.model_dump_json)
+
+
+def test_report_model_dump(benchmark, report):
+    benchmark(report.model_dump, mode="json")
+
+
+def test_report_jsonable_encoder(benchmark, report):
+    benchmark(jsonable_encoder, report)
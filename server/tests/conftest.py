@@ -0,0 +1,125 @@
+"""
+Test configuration.
+
+Settings are read from the environment when app.core.config is first
+imported, so the test environment is set here, before any test module imports
+the application: a SQLite database in a temporary directory, local storage and
+no background workers.
+"""
+import os
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="project_status_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORK_DIR}/tests.db"
+os.environ["UPLOAD_DIR"] = f"{WORK_DIR}/uploads"
+os.environ["STORAGE_TYPE"] = "local"
+os.environ["SECRET_KEY"] = "tests"
+os.environ["QUERY_INSPECTOR_ENABLED"] = "false"
+os.environ["TRANSCRIPTION_WORKERS"] = "0"
+os.environ["WEBHOOK_DELIVERY_ENABLED"] = "false"
+
+from typing import Dict
+
+import pytest
+from fastapi import FastAPI
+
+PASSWORD = "tests-password"
+ROWS = 12  # Rows of each kind seeded; above the N+1 repeat threshold
+
+
+@pytest.fixture(scope="session")
+def app() -> FastAPI:
+    """The application (its lifespan is not run: no background tasks)."""
+    import main
+    return main.app
+
+
+@pytest.fixture(scope="session")
+def seeded(app) -> Dict[str, int]:
+    """Create ROWS of each kind of record; returns the ids of the ones tests use."""
+    from app.core.security import get_password_hash
+    from app.db.database import Base, SessionLocal, engine
+    from app.db.models import (
+        Client,
+        Project,
+        ProjectStatus,
+        Transcription,
+        TranscriptionBatch,
+        User,
+        WebhookSubscription
+    )
+    from app.db.models.transcription import TranscriptionStatus
+    from app.db.models.user import UserRole
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        admin = User(
+            email="admin@example.com", name="Admin", role=UserRole.ADMIN,
+            hashed_password=get_password_hash(PASSWORD)
+        )
+        db.add(admin)
+        db.add_all([
+            User(email=f"user{i}@example.com", name=f"User {i}", role=UserRole.USER, hashed_password="x")
+            for i in range(ROWS)
+        ])
+        db.flush()
+        clients = [Client(name=f"Client {i}") for i in range(ROWS)]
+        db.add_all(clients)
+        db.flush()
+        projects = [
+            Project(name=f"Project {i}", client_id=clients[i % ROWS].id, created_by=admin.id)
+            for i in range(ROWS * 3)
+        ]
+        db.add_all(projects)
+        db.flush()
+        flags = [True, True, False, None]
+        statuses = [
+            ProjectStatus(
+                project_id=project.id,
+                is_on_scope=flags[(i + k) % 4],
+                is_on_time=flags[(i + 2 * k) % 4],
+                is_on_budget=flags[(i + 3 * k) % 4],
+                next_delivery=f"Milestone {k}" if k % 2 else None,
+                updated_by=admin.id
+            )
+            for i, project in enumerate(projects)
+            for k in range(3)
+        ]
+        db.add_all(statuses)
+        batch = TranscriptionBatch(project_id=projects[0].id, created_by=admin.id)
+        db.add(batch)
+        transcriptions = [
+            Transcription(
+                project_id=projects[0].id,
+                batch=batch if i % 2 else None,
+                file_name=f"meeting-{i}.txt",
+                file_type="text",
+                raw_text="Discussed scope and timeline.",
+                processing_status=TranscriptionStatus.COMPLETED,
+                created_by=admin.id
+            )
+            for i in range(ROWS)
+        ]
+        db.add_all(transcriptions)
+        webhooks = [
+            WebhookSubscription(url=f"https://hooks.example.com/{i}", secret="s" * 32, created_by=admin.id)
+            for i in range(ROWS)
+        ]
+        db.add_all(webhooks)
+        db.commit()
+        return {
+            "admin": admin.id,
+            "client": clients[0].id,
+            "project": projects[0].id,
+            "status": statuses[0].id,
+            "transcription": transcriptions[0].id,
+            "batch": batch.id,
+            "webhook": webhooks[0].id,
+        }
+
+
+@pytest.fixture(scope="session")
+def admin_headers(seeded) -> Dict[str, str]:
+    from app.core.security import create_access_token
+    token = create_access_token({"sub": "admin@example.com", "role": "admin"})
+    return {"Authorization": f"Bearer {token}"}
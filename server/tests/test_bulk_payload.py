@@ -0,0 +1,42 @@
+"""
+Bulk endpoints reject oversized bodies before or while reading them.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+LIMIT = 1024
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+@pytest.fixture
+def client(app, seeded, admin_headers, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", LIMIT)
+    return TestClient(app, headers=admin_headers)
+
+
+def rows(count: int) -> bytes:
+    return "\n".join(json.dumps({"name": f"Payload client {i}"}) for i in range(count)).encode()
+
+
+def test_declared_length_over_the_limit_is_rejected(client):
+    response = client.post("/api/v1/clients/bulk", headers=NDJSON, content=rows(100))
+    assert response.status_code == 413
+
+
+def test_streamed_body_over_the_limit_is_rejected(client):
+    def chunks():
+        # No Content-Length: the limit applies while the body streams in
+        for i in range(100):
+            yield json.dumps({"name": f"Streamed client {i}"}).encode() + b"\n"
+
+    response = client.post("/api/v1/clients/bulk", headers=NDJSON, content=chunks())
+    assert response.status_code == 413
+
+
+def test_body_within_the_limit_is_imported(client):
+    response = client.post("/api/v1/clients/bulk?mode=upsert", headers=NDJSON, content=rows(5))
+    assert response.status_code == 200, response.text
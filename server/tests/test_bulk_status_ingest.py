@@ -0,0 +1,61 @@
+"""
+Bulk status imports commit in chunks, each logged to the change log.
+"""
+from typing import List
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.database import SessionLocal
+from app.db.models import ChangeLogEntry, ProjectStatus
+from app.services.bulk_status_service import ingest_project_statuses
+
+
+def parsed(project_id: int, count: int):
+    return [(line, {"project_id": project_id, "is_on_time": bool(line % 2)}) for line in range(1, count + 1)]
+
+
+class CountingSession:
+    """A session whose commits are counted."""
+
+    def __init__(self):
+        self.db = SessionLocal()
+        self.commits: List[int] = []
+        commit = self.db.commit
+
+        def counted_commit():
+            self.commits.append(1)
+            commit()
+
+        self.db.commit = counted_commit
+
+
+@pytest.fixture
+def session(seeded):
+    counting = CountingSession()
+    yield counting
+    counting.db.close()
+
+
+def test_rows_are_committed_in_chunks(seeded, session):
+    db = session.db
+    before = db.scalar(select(func.max(ProjectStatus.id)))
+
+    result = ingest_project_statuses(db, parsed(seeded["project"], 12), seeded["admin"], chunk_size=5)
+
+    assert result.inserted == 12
+    assert len(session.commits) == 3
+    ids = db.scalars(select(ProjectStatus.id).where(ProjectStatus.id > before)).all()
+    assert len(ids) == 12
+    logged = db.scalar(select(func.count()).select_from(ChangeLogEntry).where(
+        ChangeLogEntry.table_name == ProjectStatus.__tablename__, ChangeLogEntry.row_id.in_(ids)
+    ))
+    assert logged == 12
+
+
+def test_atomic_imports_are_one_transaction(seeded, session):
+    db = session.db
+    result = ingest_project_statuses(db, parsed(seeded["project"], 12), seeded["admin"], atomic=True, chunk_size=5)
+
+    assert result.inserted == 12
+    assert len(session.commits) == 1
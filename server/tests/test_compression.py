@@ -0,0 +1,74 @@
+"""
+CompressionMiddleware: per-encoding ETags and flushed NDJSON streams.
+"""
+import asyncio
+import zlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import BROTLI_AVAILABLE, CompressionMiddleware
+from app.core.http_cache import cache_headers, etag_matches, not_modified
+
+ETAG = '"0123456789abcdef"'
+ITEMS = [b'{"index": %d}\n' % i for i in range(20)]
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=16)
+
+    @app.get("/versioned")
+    def versioned(request: Request):
+        if etag_matches(request, ETAG):
+            return not_modified(ETAG)
+        return JSONResponse({"rows": list(range(100))}, headers=cache_headers(ETAG))
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", pytest.param("br", marks=pytest.mark.skipif(
+    not BROTLI_AVAILABLE, reason="brotli not installed"
+))])
+def test_each_encoding_has_its_own_etag(client, encoding):
+    response = client.get("/versioned", headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["ETag"] == f'"0123456789abcdef-{encoding}"'
+
+    revalidated = client.get(
+        "/versioned", headers={"Accept-Encoding": encoding, "If-None-Match": response.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+
+
+def test_identity_keeps_the_etag(client):
+    response = client.get("/versioned", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == ETAG
+    assert client.get("/versioned", headers={"Accept-Encoding": "identity", "If-None-Match": ETAG}).status_code == 304
+
+
+def test_ndjson_chunks_are_flushed():
+    async def stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        for item in ITEMS:
+            await send({"type": "http.response.body", "body": item, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(stream, minimum_size=16)(scope, None, send))
+
+    decompressor = zlib.decompressobj(31)
+    # Each compressed chunk decodes to its item without waiting for the next
+    chunks = [decompressor.decompress(message["body"]) for message in messages[1:]]
+    assert chunks[:len(ITEMS)] == ITEMS
@@ -0,0 +1,41 @@
+"""
+/metrics and X-Profile check the admin role in the database, not the token.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.api.v1.endpoints import diagnostics
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.database import SessionLocal
+from app.db.models.user import User, UserRole
+
+EMAIL = "user0@example.com"
+
+
+def set_role(role: UserRole) -> None:
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.email == EMAIL).values(role=role))
+        db.commit()
+
+
+@pytest.fixture
+def client(app, seeded, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_ROLE_CACHE_SECONDS", 0)
+    monkeypatch.setattr(diagnostics, "_role_cache", {})
+    token = create_access_token({"sub": EMAIL, "role": UserRole.ADMIN.value})
+    yield TestClient(app, headers={"Authorization": f"Bearer {token}"})
+    set_role(UserRole.USER)
+
+
+def test_admin_claim_of_a_user_is_rejected(client):
+    assert client.get("/metrics").status_code == 401
+
+
+def test_demoted_admin_loses_access_before_the_token_expires(client):
+    set_role(UserRole.ADMIN)
+    assert client.get("/metrics").status_code == 200
+
+    set_role(UserRole.USER)
+    assert client.get("/metrics").status_code == 401
@@ -0,0 +1,90 @@
+"""
+Memory ceiling of the streaming exports.
+
+Rows are read in fixed-size partitions, so the peak Python heap while draining
+an export should stay under a fixed ceiling whatever the row count.
+benchmarks/bench_export.py runs the same check at a million rows and reports
+throughput.
+"""
+import tracemalloc
+from typing import Callable, Iterator
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import Client, Project, ProjectStatus, User
+from app.db.models.user import UserRole
+from app.services.columnar_export_service import PYARROW_AVAILABLE, iter_columnar_export
+from app.services.export_service import iter_health_export, iter_status_history_export
+
+ROWS = 100_000
+PROJECTS = 5_000
+CLIENTS = 50
+MAX_PEAK_MB = 32.0
+SEED_CHUNK_SIZE = 50_000
+
+pytestmark = pytest.mark.slow
+
+
+@pytest.fixture(scope="module")
+def session_factory(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('export')}/export.db")
+    Base.metadata.create_all(bind=engine)
+    flags = [True, True, False, None]
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            "id": 1, "email": "export@example.com", "name": "Export", "role": UserRole.ADMIN, "hashed_password": "x"
+        }])
+        connection.execute(insert(Client), [{"id": i + 1, "name": f"Client {i}"} for i in range(CLIENTS)])
+        connection.execute(insert(Project), [
+            {"id": i + 1, "name": f"Project {i}", "client_id": i % CLIENTS + 1, "created_by": 1}
+            for i in range(PROJECTS)
+        ])
+        for offset in range(0, ROWS, SEED_CHUNK_SIZE):
+            connection.execute(insert(ProjectStatus), [
+                {
+                    "project_id": i % PROJECTS + 1,
+                    "is_on_scope": flags[i % 4],
+                    "is_on_time": flags[(i // 2) % 4],
+                    "is_on_budget": flags[(i // 3) % 4],
+                    "next_delivery": f"Milestone {i % 7}",
+                    "risks": "Vendor dependency" if i % 5 == 0 else None,
+                    "updated_by": 1,
+                }
+                for i in range(offset, min(offset + SEED_CHUNK_SIZE, ROWS))
+            ])
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def peak_mb(export: Callable[[], Iterator[bytes]]) -> float:
+    """Drain an export and return the peak traced heap in MB."""
+    tracemalloc.start()
+    try:
+        total = sum(len(chunk) for chunk in export())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert total > 0
+    return peak / (1024 * 1024)
+
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_status_history_export_memory(session_factory, export_format):
+    peak = peak_mb(lambda: iter_status_history_export(export_format, session_factory=session_factory))
+    assert peak <= MAX_PEAK_MB, f"peak {peak:.1f} MB"
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+@pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+def test_columnar_export_memory(session_factory, export_format):
+    peak = peak_mb(lambda: iter_columnar_export(export_format, session_factory=session_factory))
+    assert peak <= MAX_PEAK_MB, f"peak {peak:.1f} MB"
+
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_health_export_memory(session_factory, export_format):
+    peak = peak_mb(lambda: iter_health_export(None, export_format, session_factory=session_factory))
+    assert peak <= MAX_PEAK_MB, f"peak {peak:.1f} MB"
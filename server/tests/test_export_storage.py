@@ -0,0 +1,17 @@
+"""
+Exports written to storage never overwrite each other.
+"""
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.export_service import export_filename, write_export_to_storage
+
+
+def test_exports_in_the_same_second_get_distinct_paths():
+    paths = [
+        write_export_to_storage(iter([f"export {i}\n".encode()]), export_filename("project-statuses", "csv"))
+        for i in range(5)
+    ]
+    assert len(set(paths)) == len(paths)
+    contents = [(Path(settings.UPLOAD_DIR) / path).read_bytes() for path in paths]
+    assert contents == [f"export {i}\n".encode() for i in range(5)]
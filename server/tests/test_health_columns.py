@@ -0,0 +1,52 @@
+"""
+Parity of the generated green_count/health_status columns of project_status
+with calculate_project_health_status, on every combination of
+true/false/null flags (the full input space).
+"""
+import itertools
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.db.models import Client, Project, ProjectStatus, User
+from app.db.models.user import UserRole
+from app.services.report_service import calculate_green_count
+from app.utils.project_status_utils import calculate_project_health_status
+
+COMBINATIONS = list(itertools.product([True, False, None], repeat=3))
+
+
+@pytest.fixture(scope="module")
+def generated_columns():
+    """(flags) -> (green_count, health_status) as computed by the database."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            "id": 1, "email": "health@example.com", "name": "Health", "role": UserRole.ADMIN, "hashed_password": "x"
+        }])
+        connection.execute(insert(Client), [{"id": 1, "name": "Client"}])
+        connection.execute(insert(Project), [{"id": 1, "name": "Project", "client_id": 1, "created_by": 1}])
+        connection.execute(insert(ProjectStatus), [
+            {"project_id": 1, "is_on_scope": scope, "is_on_time": time_, "is_on_budget": budget, "updated_by": 1}
+            for scope, time_, budget in COMBINATIONS
+        ])
+        rows = connection.execute(
+            select(
+                ProjectStatus.is_on_scope, ProjectStatus.is_on_time, ProjectStatus.is_on_budget,
+                ProjectStatus.green_count, ProjectStatus.health_status
+            )
+        ).all()
+    engine.dispose()
+    return {(scope, time_, budget): (green_count, health) for scope, time_, budget, green_count, health in rows}
+
+
+@pytest.mark.parametrize("scope, time_, budget", COMBINATIONS)
+def test_generated_columns_match_reference(generated_columns, scope, time_, budget):
+    green_count, health_status = generated_columns[(scope, time_, budget)]
+    assert health_status == calculate_project_health_status(
+        {"is_on_scope": scope, "is_on_time": time_, "is_on_budget": budget}
+    )
+    assert green_count == calculate_green_count(scope, time_, budget)
@@ -0,0 +1,262 @@
+"""
+Query budget and N+1 checks for every API endpoint.
+
+Every endpoint is called in-process against the seeded SQLite database (more
+rows of each kind than the repeat threshold) while the statements each
+request sends are recorded. A request fails if it issues more statements than
+its endpoint's @query_budget, or the same statement shape REPEAT_THRESHOLD
+times or more (a query per row: N+1). Every endpoint must declare a budget,
+and every endpoint with a budget must be exercised by STEPS.
+
+Budgets are counted on SQLite: paths that only run on PostgreSQL (advisory
+locks, generated-column refreshes, COPY) are not measured here. When a change
+needs more queries on purpose, raise the budget next to the endpoint.
+
+Run with -s -k <request> and QUERY_BUDGET_VERBOSE=1 to print the statements
+of a request.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pytest
+from fastapi.routing import APIRoute, APIWebSocketRoute
+from fastapi.testclient import TestClient
+
+from tests.conftest import PASSWORD, ROWS
+
+REPEAT_THRESHOLD = 5
+
+
+def ndjson(rows: List[dict]) -> bytes:
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+@dataclass
+class Step:
+    """One request; `url` and `kwargs` are formatted with the ids saved so far."""
+    method: str
+    url: str
+    expected: int = 200
+    authenticated: bool = True
+    kwargs: Callable[[Dict[str, Any]], Dict[str, Any]] = lambda ids: {}
+    save: Optional[str] = None  # Name under which to keep the response's id
+    save_from: Callable[[Any], Any] = field(default=lambda response: response.json()["id"])
+    name: str = ""
+
+    @property
+    def label(self) -> str:
+        return self.name or f"{self.method} {self.url.split('?')[0]}"
+
+
+STEPS: List[Step] = [
+    # Application
+    Step("GET", "/", authenticated=False),
+    Step("GET", "/health", authenticated=False),
+    Step("GET", "/api/v1/", authenticated=False),
+    Step("GET", "/metrics", 401, authenticated=False, name="GET /metrics (unauthenticated)"),
+    Step("GET", "/metrics"),
+
+    # Authentication
+    Step("POST", "/api/v1/auth/register", 201, authenticated=False,
+         kwargs=lambda ids: {"json": {"email": "new@example.com", "name": "New", "password": PASSWORD}}),
+    Step("POST", "/api/v1/auth/login", authenticated=False,
+         kwargs=lambda ids: {"data": {"username": "admin@example.com", "password": PASSWORD}}),
+    Step("POST", "/api/v1/auth/login/json", authenticated=False,
+         kwargs=lambda ids: {"json": {"email": "admin@example.com", "password": PASSWORD}}),
+    Step("GET", "/api/v1/auth/me"),
+
+    # Users
+    Step("GET", "/api/v1/users/"),
+    Step("GET", "/api/v1/users/{admin}"),
+    Step("POST", "/api/v1/users/", 201, save="user",
+         kwargs=lambda ids: {"json": {"email": "created@example.com", "name": "Created", "password": PASSWORD}}),
+    Step("PUT", "/api/v1/users/{user}", kwargs=lambda ids: {"json": {"name": "Renamed"}}),
+    Step("DELETE", "/api/v1/users/{user}", 204),
+
+    # Clients
+    Step("GET", "/api/v1/clients/"),
+    Step("GET", "/api/v1/clients/{client}"),
+    Step("POST", "/api/v1/clients/", 201, save="new_client",
+         kwargs=lambda ids: {"json": {"name": "Created client"}}),
+    Step("POST", "/api/v1/clients/bulk?mode=upsert", kwargs=lambda ids: {
+        "headers": NDJSON, "content": ndjson([{"name": f"Bulk client {i}"} for i in range(ROWS)])}),
+    Step("PUT", "/api/v1/clients/{new_client}", kwargs=lambda ids: {"json": {"name": "Renamed client"}}),
+
+    # Projects
+    Step("GET", "/api/v1/projects/"),
+    Step("GET", "/api/v1/projects/{project}"),
+    Step("POST", "/api/v1/projects/", 201, save="new_project",
+         kwargs=lambda ids: {"json": {"name": "Created project", "client_id": ids["new_client"]}}),
+    Step("POST", "/api/v1/projects/bulk", kwargs=lambda ids: {
+        "headers": NDJSON,
+        "content": ndjson([{"name": f"Bulk project {i}", "client_name": f"Client {i}"} for i in range(ROWS)])}),
+    Step("PUT", "/api/v1/projects/{new_project}", kwargs=lambda ids: {"json": {"name": "Renamed project"}}),
+
+    # Project statuses
+    Step("GET", "/api/v1/project-status/"),
+    Step("GET", "/api/v1/project-status/export?format=csv"),
+    Step("GET", "/api/v1/project-status/{status}"),
+    Step("GET", "/api/v1/project-status/project/{project}/latest"),
+    Step("POST", "/api/v1/project-status/", 201, save="new_status", kwargs=lambda ids: {
+        "json": {"project_id": ids["new_project"], "is_on_scope": True, "is_on_time": False}}),
+    Step("POST", "/api/v1/project-status/bulk", kwargs=lambda ids: {
+        "headers": NDJSON,
+        "content": ndjson([{"project_id": ids["project"] + i, "is_on_time": bool(i % 2)} for i in range(ROWS)])}),
+    Step("PUT", "/api/v1/project-status/{new_status}", kwargs=lambda ids: {"json": {"is_on_budget": True}}),
+    Step("DELETE", "/api/v1/project-status/{new_status}", 204),
+
+    # Reports
+    Step("GET", "/api/v1/reports/health"),
+    Step("GET", "/api/v1/reports/health/export?format=csv"),
+    Step("GET", "/api/v1/reports/health/summary"),
+    Step("GET", "/api/v1/reports/health/trend"),
+    Step("GET", "/api/v1/reports/cache/metrics"),
+
+    # Transcriptions
+    Step("GET", "/api/v1/transcriptions/"),
+    Step("GET", "/api/v1/transcriptions/{transcription}"),
+    Step("GET", "/api/v1/transcriptions/{transcription}/status"),
+    Step("GET", "/api/v1/transcriptions/batches/{batch}"),
+    Step("POST", "/api/v1/transcriptions/", 202, save="new_transcription", kwargs=lambda ids: {
+        "data": {"project_id": str(ids["new_project"])},
+        "files": {"file": ("notes.txt", b"Meeting notes", "text/plain")}}),
+    Step("POST", "/api/v1/transcriptions/batch", 202, kwargs=lambda ids: {
+        "data": {"project_id": str(ids["new_project"])},
+        "files": [("files", (f"notes-{i}.txt", b"Meeting notes", "text/plain")) for i in range(ROWS)]}),
+    Step("POST", "/api/v1/transcriptions/text", 202, kwargs=lambda ids: {
+        "json": {"project_id": ids["new_project"], "text": "Scope is on track."}}),
+    Step("DELETE", "/api/v1/transcriptions/{new_transcription}", 204),
+
+    # Change feed
+    Step("GET", "/api/v1/changes/?since=0&timeout=0"),
+    Step("GET", "/api/v1/changes/head"),
+
+    # Webhooks
+    Step("GET", "/api/v1/webhooks/"),
+    Step("GET", "/api/v1/webhooks/{webhook}"),
+    Step("POST", "/api/v1/webhooks/", 201, save="new_webhook",
+         kwargs=lambda ids: {"json": {"url": "https://hooks.example.com/new"}}),
+    Step("PUT", "/api/v1/webhooks/{new_webhook}", kwargs=lambda ids: {"json": {"is_active": False}}),
+    Step("DELETE", "/api/v1/webhooks/{new_webhook}", 204),
+
+    # Diagnostics
+    Step("GET", "/api/v1/diagnostics/slow-queries"),
+    Step("DELETE", "/api/v1/diagnostics/slow-queries", 204),
+    Step("GET", "/api/v1/diagnostics/profile?seconds=0.05"),
+    # The X-Profile check's admin role lookup was cached by GET /metrics above
+    Step("GET", "/health", name="GET /health (X-Profile)", save="profile",
+         save_from=lambda response: response.headers["X-Profile-Id"],
+         kwargs=lambda ids: {"headers": {"X-Profile": "1"}}),
+    Step("GET", "/api/v1/diagnostics/profiles"),
+    Step("GET", "/api/v1/diagnostics/profiles/{profile}"),
+
+    # Deletes last, so the rows above are still there
+    Step("DELETE", "/api/v1/projects/{new_project}", 204),
+    Step("DELETE", "/api/v1/clients/{new_client}", 204),
+]
+
+
+@dataclass
+class Result:
+    status_code: int
+    body: str
+    endpoint: Any
+    report: Any
+
+
+class Recorder:
+    """ASGI wrapper keeping the matched route and statements of the last request."""
+
+    def __init__(self, app):
+        self.app = app
+        self.route = None
+        self.report = None
+
+    async def __call__(self, scope, receive, send):
+        from app.core.query_inspector import inspect_queries
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with inspect_queries() as report:
+            await self.app(scope, receive, send)
+        self.route = scope.get("route")
+        self.report = report
+
+
+def api_routes(routes) -> Iterator:
+    """API routes of the application, including those of included routers."""
+    for route in routes:
+        original_router = getattr(route, "original_router", None)
+        if original_router is not None:
+            yield from api_routes(original_router.routes)
+        elif isinstance(route, (APIRoute, APIWebSocketRoute)):
+            yield route
+
+
+@pytest.fixture(scope="module")
+def results(app, seeded, admin_headers) -> Dict[str, Result]:
+    """Run every step in order (later steps use ids created by earlier ones)."""
+    from app.core.query_inspector import install_query_inspector, statement_shape
+    from app.db.database import engine
+
+    install_query_inspector(engine)
+    recorder = Recorder(app)
+    client = TestClient(recorder)
+    ids: Dict[str, Any] = dict(seeded)
+    recorded: Dict[str, Result] = {}
+    for step in STEPS:
+        kwargs = step.kwargs(ids)
+        if step.authenticated:
+            kwargs["headers"] = {**admin_headers, **kwargs.get("headers", {})}
+        response = client.request(step.method, step.url.format(**ids), **kwargs)
+        if step.save and response.status_code == step.expected:
+            ids[step.save] = step.save_from(response)
+        recorded[step.label] = Result(
+            response.status_code, response.text[:200], getattr(recorder.route, "endpoint", None), recorder.report
+        )
+        if os.environ.get("QUERY_BUDGET_VERBOSE"):
+            print(step.label)
+            for statement in recorder.report.statements:
+                print(f"    {statement_shape(statement)[:160]}")
+    return recorded
+
+
+@pytest.mark.parametrize("step", STEPS, ids=lambda step: step.label)
+def test_request_within_budget(results, step):
+    from app.core.query_inspector import find_problems, get_query_budget
+
+    result = results[step.label]
+    assert result.status_code == step.expected, result.body
+    problems = find_problems(result.report, get_query_budget(result.endpoint), REPEAT_THRESHOLD)
+    assert not problems, "\n".join(problems)
+
+
+def test_every_endpoint_declares_a_budget(app):
+    from app.core.query_inspector import has_query_budget
+
+    missing = [
+        f"{','.join(sorted(getattr(route, 'methods', None) or ['WS']))} {route.path}"
+        for route in api_routes(app.routes)
+        if not has_query_budget(route.endpoint)
+    ]
+    assert not missing, f"no @query_budget declared: {missing}"
+
+
+def test_every_budgeted_endpoint_is_exercised(app, results):
+    from app.core.query_inspector import get_query_budget, has_query_budget
+
+    exercised = {result.endpoint for result in results.values()}
+    missing = [
+        f"{','.join(sorted(getattr(route, 'methods', None) or ['WS']))} {route.path}"
+        for route in api_routes(app.routes)
+        if has_query_budget(route.endpoint)
+        and get_query_budget(route.endpoint) is not None
+        and route.endpoint not in exercised
+    ]
+    assert not missing, f"not exercised by STEPS: {missing}"
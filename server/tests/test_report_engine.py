@@ -0,0 +1,127 @@
+"""
+Parity of the vectorized report engine with the reference (SQL + Python) one.
+
+classify_health is checked on every combination of true/false/null flags (the
+full input space); whole reports are compared on datasets and ReportFilters
+generated by hypothesis. benchmarks/bench_report_engine.py times both engines.
+"""
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from hypothesis import HealthCheck, given, settings as hypothesis_settings, strategies as st
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import Client, Project, ProjectStatus, User
+from app.db.models.user import UserRole
+from app.schemas.report import ReportFilters
+from app.services.report_service import calculate_green_count, generate_project_health_report
+from app.services.vectorized_report_service import (
+    FLAG_VALUES,
+    HEALTH_STATUSES,
+    classify_health,
+    generate_project_health_report_vectorized
+)
+from app.utils.project_status_utils import calculate_project_health_status
+
+np = pytest.importorskip("numpy")
+
+FLAGS = [True, False, None]
+BASE_TIME = datetime(2024, 1, 1)
+MAX_CLIENTS = 6
+
+flags = st.sampled_from(FLAGS)
+statuses = st.fixed_dictionaries({
+    "is_on_scope": flags,
+    "is_on_time": flags,
+    "is_on_budget": flags,
+    "next_delivery": st.sampled_from([None, "", "Milestone"]),
+    "risks": st.sampled_from([None, "Vendor dependency"]),
+    # Coarse timestamps so ties (broken by id) occur
+    "updated_at": st.integers(0, 60).map(lambda days: BASE_TIME + timedelta(days=days)),
+})
+projects = st.lists(
+    st.tuples(st.integers(1, MAX_CLIENTS), st.lists(statuses, max_size=4)),
+    max_size=40
+)
+dates = st.integers(0, 70).map(lambda days: BASE_TIME + timedelta(days=days))
+filters = st.none() | st.builds(
+    ReportFilters,
+    client_ids=st.none() | st.lists(st.integers(1, MAX_CLIENTS + 1), min_size=1, max_size=2, unique=True),
+    health_status=st.sampled_from([None, "green", "yellow", "red", "none"]),
+    date_from=st.none() | dates,
+    date_to=st.none() | dates,
+    include_no_status=st.booleans()
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def engines_compute_summaries():
+    """Both engines must compute the overall/client sections themselves to be compared."""
+    previous = settings.HEALTH_AGGREGATES_ENABLED, settings.REPORT_ENGINE
+    settings.HEALTH_AGGREGATES_ENABLED = False
+    settings.REPORT_ENGINE = "python"
+    yield
+    settings.HEALTH_AGGREGATES_ENABLED, settings.REPORT_ENGINE = previous
+
+
+def seed(engine, project_rows) -> None:
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            "id": 1, "email": "report@example.com", "name": "Report", "role": UserRole.ADMIN, "hashed_password": "x"
+        }])
+        connection.execute(insert(Client), [{"id": i + 1, "name": f"Client {i:05d}"} for i in range(MAX_CLIENTS)])
+        if project_rows:
+            connection.execute(insert(Project), [
+                {"id": i + 1, "name": f"Project {i}", "client_id": client_id, "created_by": 1}
+                for i, (client_id, _) in enumerate(project_rows)
+            ])
+        status_rows = [
+            {**status, "project_id": i + 1, "updated_by": 1}
+            for i, (_, history) in enumerate(project_rows)
+            for status in history
+        ]
+        if status_rows:
+            connection.execute(insert(ProjectStatus), status_rows)
+
+
+def comparable(report) -> dict:
+    """The report without generated_at, in an order both engines define."""
+    data = report.model_dump(exclude={"generated_at"})
+    for key in ("project_metrics", "projects_at_risk", "critical_projects"):
+        data[key] = sorted(data[key], key=lambda m: m["project_id"])
+    data["upcoming_deliveries"] = sorted(
+        data["upcoming_deliveries"], key=lambda d: (d["last_updated"], d["project_id"])
+    )
+    return data
+
+
+def test_classification_matches_reference():
+    codes = {value: code for code, value in FLAG_VALUES.items()}
+    combinations = list(itertools.product(FLAGS, repeat=3))
+    arrays = [np.array([codes[combo[i]] for combo in combinations], dtype=np.int8) for i in range(3)]
+    green_count, health_code = classify_health(*arrays)
+
+    for index, (scope, time_, budget) in enumerate(combinations):
+        expected = calculate_project_health_status({"is_on_scope": scope, "is_on_time": time_, "is_on_budget": budget})
+        assert HEALTH_STATUSES[health_code[index]] == expected, (scope, time_, budget)
+        assert green_count[index] == calculate_green_count(scope, time_, budget), (scope, time_, budget)
+
+
+@hypothesis_settings(max_examples=100, deadline=None, suppress_health_check=[HealthCheck.too_slow])
+@given(project_rows=projects, report_filters=filters)
+def test_vectorized_report_matches_reference(project_rows, report_filters):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    try:
+        Base.metadata.create_all(bind=engine)
+        seed(engine, project_rows)
+        with sessionmaker(bind=engine)() as db:
+            expected = comparable(generate_project_health_report(db, filters=report_filters, user_name="u"))
+            actual = comparable(generate_project_health_report_vectorized(db, filters=report_filters, user_name="u"))
+    finally:
+        engine.dispose()
+    assert actual == expected
@@ -0,0 +1,84 @@
+"""
+Health trend rollups: reads never write, invalidated buckets are computed live
+until the periodic refresh consumes their markers.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.db.health_trends import BUCKET_SIZE, week_start
+from app.db.models import Client, HealthTrendInvalidation, HealthTrendRollup, Project, ProjectStatus, User
+from app.db.models.user import UserRole
+from app.services.trend_service import PORTFOLIO_CLIENT_ID, get_health_trend, refresh_recent_rollups
+
+NOW = datetime(2024, 6, 12, 12, 0, tzinfo=timezone.utc)
+OPEN_BUCKET = week_start(NOW)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        user = User(email="trend@example.com", name="Trend", role=UserRole.ADMIN, hashed_password="x")
+        client = Client(name="Client")
+        db.add_all([user, client])
+        db.flush()
+        project = Project(
+            name="Project", client_id=client.id, created_by=user.id, created_at=OPEN_BUCKET - 5 * BUCKET_SIZE
+        )
+        db.add(project)
+        db.flush()
+        db.add(ProjectStatus(
+            project_id=project.id, is_on_scope=True, is_on_time=True, is_on_budget=True,
+            updated_by=user.id, updated_at=OPEN_BUCKET - 4 * BUCKET_SIZE
+        ))
+        db.commit()
+        # Seeding backdated rows invalidates; start from computed rollups
+        refresh_recent_rollups(factory, now=NOW)
+    yield factory
+    engine.dispose()
+
+
+def trend(db):
+    return get_health_trend(db, OPEN_BUCKET - 3 * BUCKET_SIZE, NOW, now=NOW)
+
+
+def stored_healthy(db, bucket_start: datetime) -> int:
+    return db.scalar(select(HealthTrendRollup.healthy_projects).where(
+        HealthTrendRollup.bucket_start == bucket_start, HealthTrendRollup.client_id == PORTFOLIO_CLIENT_ID
+    ))
+
+
+def test_invalidated_buckets_are_computed_live_until_refreshed(session_factory):
+    bucket = OPEN_BUCKET - 2 * BUCKET_SIZE
+    with session_factory() as db:
+        assert [point.healthy_projects for point in trend(db).portfolio] == [1, 1, 1, 1]
+        status = db.scalars(select(ProjectStatus)).one()
+        status.is_on_budget = False
+        status.is_on_time = False
+        db.commit()
+
+        # The edit left a marker; the read reflects it without touching the rollups
+        assert [point.critical_projects for point in trend(db).portfolio] == [1, 1, 1, 1]
+        assert db.scalar(select(func.count()).select_from(HealthTrendInvalidation)) == 1
+        assert stored_healthy(db, bucket) == 1
+
+    assert refresh_recent_rollups(session_factory, now=NOW) > 0
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(HealthTrendInvalidation)) == 0
+        assert stored_healthy(db, bucket) == 0
+        assert [point.critical_projects for point in trend(db).portfolio] == [1, 1, 1, 1]
+
+
+def test_missing_buckets_are_computed_live(session_factory):
+    with session_factory() as db:
+        db.query(HealthTrendRollup).delete()
+        db.commit()
+        assert [point.healthy_projects for point in trend(db).portfolio] == [1, 1, 1, 1]
+        assert db.scalar(select(func.count()).select_from(HealthTrendRollup)) == 0
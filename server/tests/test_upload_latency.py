@@ -0,0 +1,88 @@
+"""
+Upload latency does not depend on LLM latency.
+
+Status extraction is replaced by a fake LLM that takes LLM_DELAY seconds;
+uploads must return 202 well before that, while the queue worker (running on
+the same event loop, as under the application lifespan) finishes the job in
+the background. benchmarks/bench_upload_latency.py measures the same against
+an OpenAI-compatible server at several delays.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.db.database import SessionLocal
+from app.db.models import Transcription, TranscriptionStatus
+from app.services import transcription_service
+from app.services.transcription_queue import transcription_queue
+
+LLM_DELAY = 2.0
+MAX_UPLOAD_SECONDS = LLM_DELAY / 4
+
+COMPLETION = {
+    "is_on_scope": True,
+    "is_on_time": False,
+    "is_on_budget": True,
+    "next_delivery": "Sprint review",
+    "risks": None,
+}
+
+
+def slow_llm(transcription_text: str, project_name: str, client_name: str) -> dict:
+    time.sleep(LLM_DELAY)
+    return dict(COMPLETION)
+
+
+async def wait_until_finished(transcription_ids, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    pending = set(transcription_ids)
+    while pending:
+        with SessionLocal() as db:
+            rows = db.query(Transcription.id, Transcription.processing_status).filter(
+                Transcription.id.in_(pending)
+            ).all()
+        for transcription_id, processing_status in rows:
+            assert processing_status != TranscriptionStatus.FAILED, f"transcription {transcription_id} failed"
+            if processing_status == TranscriptionStatus.COMPLETED:
+                pending.discard(transcription_id)
+        assert time.perf_counter() < deadline, f"{len(pending)} transcriptions not processed within {timeout}s"
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.slow
+def test_upload_returns_before_the_llm_answers(app, seeded, admin_headers, monkeypatch):
+    monkeypatch.setattr(transcription_service, "extract_status_from_transcription", slow_llm)
+    project_id = seeded["project"]
+
+    async def scenario():
+        transcription_queue.start(1, transcription_service.process_transcription)
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=admin_headers) as client:
+                uploads = [
+                    lambda: client.post(
+                        "/api/v1/transcriptions/",
+                        data={"project_id": str(project_id)},
+                        files={"file": ("weekly.txt", b"Weekly sync: all on track.", "text/plain")}
+                    ),
+                    lambda: client.post(
+                        "/api/v1/transcriptions/text",
+                        json={"project_id": project_id, "text": "Weekly sync: all on track."}
+                    ),
+                ]
+                transcription_ids = []
+                for upload in uploads:
+                    start = time.perf_counter()
+                    response = await upload()
+                    elapsed = time.perf_counter() - start
+                    assert response.status_code == 202, response.text
+                    assert elapsed < MAX_UPLOAD_SECONDS, f"upload took {elapsed:.2f}s with a {LLM_DELAY}s LLM"
+                    transcription_ids.append(response.json()["id"])
+            # The LLM did run, after the uploads had returned
+            await wait_until_finished(transcription_ids, timeout=len(uploads) * LLM_DELAY + 30)
+        finally:
+            await transcription_queue.stop()
+
+    asyncio.run(scenario())